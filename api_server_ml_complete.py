@@ -7,7 +7,7 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -117,7 +117,7 @@ async def predict(startup_data: StartupData):
         
         # Record in monitoring system
         latency_ms = (datetime.now() - start_time).total_seconds() * 1000
-        monitoring_system.record_prediction(
+        prediction_id = monitoring_system.record_prediction(
             model_type="unified_orchestrator",
             model_version="complete_v1",
             prediction=result["prediction"],
@@ -133,6 +133,7 @@ async def predict(startup_data: StartupData):
             "monitoring_active": True,
             "total_models_used": orchestrator.get_model_info()["total_models"]
         }
+        result["metadata"]["prediction_id"] = prediction_id
         
         return result
         
@@ -185,6 +186,15 @@ async def get_active_alerts():
     
     return monitoring_system.get_active_alerts()
 
+# Drift endpoint
+@app.get("/monitoring/drift")
+async def get_drift_report():
+    """Drift of input features and model outputs against the training baseline"""
+    if not monitoring_system:
+        raise HTTPException(status_code=503, detail="Monitoring system not initialized")
+    
+    return {"drift": monitoring_system.get_drift_report()}
+
 # A/B testing endpoint
 @app.post("/experiments/create")
 async def create_ab_test(experiment_name: str, model_a: str, model_b: str, traffic_split: float = 0.5):
@@ -240,13 +250,32 @@ async def get_performance_report():
 
 # Feedback endpoint for model improvement
 @app.post("/feedback")
-async def record_feedback(features_hash: str, actual_outcome: float):
-    """Record actual outcome for a prediction"""
+async def record_feedback(actual_outcome: float, features_hash: Optional[str] = None,
+                          prediction_id: Optional[str] = None):
+    """Record actual outcome for a prediction, by prediction ID or features hash"""
+    if not monitoring_system:
+        raise HTTPException(status_code=503, detail="Monitoring system not initialized")
+    if not features_hash and not prediction_id:
+        raise HTTPException(status_code=400, detail="prediction_id or features_hash is required")
+    
+    result = monitoring_system.record_feedback(features_hash, actual_outcome, prediction_id=prediction_id)
+    return {"status": "recorded", "features_hash": features_hash, "prediction_id": prediction_id, **result}
+
+@app.post("/feedback/bulk")
+async def record_feedback_bulk(outcomes: List[Dict]):
+    """Join a batch of late outcomes, each with prediction_id or features_hash and actual_outcome"""
+    if not monitoring_system:
+        raise HTTPException(status_code=503, detail="Monitoring system not initialized")
+    
+    return monitoring_system.record_feedback_bulk(outcomes)
+
+@app.get("/monitoring/outcomes")
+async def get_outcome_metrics(model_version: Optional[str] = None, days: int = 30):
+    """Rolling AUC, Brier score and calibration from joined feedback"""
     if not monitoring_system:
         raise HTTPException(status_code=503, detail="Monitoring system not initialized")
     
-    monitoring_system.record_feedback(features_hash, actual_outcome)
-    return {"status": "recorded", "features_hash": features_hash}
+    return monitoring_system.get_outcome_metrics(model_version=model_version, days=days)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
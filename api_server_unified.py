@@ -6,14 +6,18 @@ Integrates all fixes and improvements
 
 import os
 import sys
+import asyncio
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Union
 
 import numpy as np
+import pandas as pd
 import uvicorn
+from anyio import to_thread
 from fastapi import FastAPI, HTTPException, Security, status, Request, Response, Depends, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel, Field, field_validator, ValidationError
@@ -36,6 +40,9 @@ from utils.error_handling import (
 from utils.data_validation import data_validator
 from utils.redis_cache import redis_cache
 from utils.background_tasks import task_manager, async_batch_predict, async_generate_report
+from ml_core.models.startup_dna_library import STARTUP_DNA_LIBRARY
+from whatif_calculator import WhatIfEngine, ScenarioValidationError
+from models.counterfactual_search import CounterfactualSearch
 from auth import auth_router, get_current_active_user, CurrentUser
 from auth.api_key_or_jwt import get_current_user_flexible
 from monitoring.metrics_collector import (
@@ -43,6 +50,9 @@ from monitoring.metrics_collector import (
     record_prometheus_error, update_prometheus_system_metrics, get_prometheus_metrics,
     PROMETHEUS_ENABLED
 )
+from monitoring.system_sampler import system_sampler
+from monitoring.tracing import start_trace, span, TIMING_HEADER
+from monitoring.loop_monitor import loop_monitor
 
 # Import the intelligent framework API
 from api_framework_intelligent import include_intelligent_routes
@@ -68,6 +78,14 @@ except ImportError:
     logger.warning("Enhanced analysis module not available")
     ENHANCED_ANALYSIS_AVAILABLE = False
 
+# Import SHAP explanation service
+try:
+    from shap_explainer import get_flash_explainer
+    SHAP_EXPLAINER_AVAILABLE = True
+except ImportError:
+    logger.warning("SHAP explainer not available")
+    SHAP_EXPLAINER_AVAILABLE = False
+
 # Import configuration service
 try:
     from config_service import config_service
@@ -198,8 +216,9 @@ async def log_requests(request: Request, call_next):
     logger.info(f"[{request_id}] {request.method} {request.url.path}")
     
     try:
-        # Process request
-        response = await call_next(request)
+        # Process request, timing its stages
+        with start_trace(request.url.path) as trace:
+            response = await call_next(request)
         
         # Log response
         duration = (time.time() - start_time) * 1000
@@ -223,6 +242,8 @@ async def log_requests(request: Request, call_next):
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
         response.headers["X-Response-Time"] = f"{duration:.2f}ms"
+        if trace.stages and (settings.ENABLE_TIMING_HEADER or TIMING_HEADER in request.headers):
+            response.headers[TIMING_HEADER] = trace.header()
         
         return response
         
@@ -231,6 +252,16 @@ async def log_requests(request: Request, call_next):
         logger.error(f"[{request_id}] Failed after {duration:.2f}ms - Error: {str(e)}")
         raise
 
+@app.on_event("startup")
+async def start_system_sampler():
+    """Sample system metrics in the background of each worker"""
+    system_sampler.start(
+        loop=asyncio.get_running_loop(),
+        thread_limiter=to_thread.current_default_thread_limiter()
+    )
+    if settings.ENABLE_LOOP_MONITOR:
+        loop_monitor.start()
+
 # Initialize components
 orchestrator = UnifiedOrchestratorV3()
 type_converter = TypeConverter()
@@ -620,6 +651,43 @@ class StartupDataStrict(StartupData):
         validate_assignment = True
 
 
+class PatternEvolutionRequest(BaseModel):
+    """Portfolio of current patterns to project forward"""
+    patterns: List[str] = Field(..., min_length=1, max_length=1000)
+    max_steps: int = Field(3, ge=1, le=6)
+    min_probability: float = Field(0.05, ge=0, le=1)
+
+
+class ExplainBatchRequest(BaseModel):
+    """Portfolio of startups to explain in one pass"""
+    startups: List[StartupData] = Field(..., min_length=1)
+    model_name: Optional[str] = None
+    top_k: int = Field(10, ge=1, le=45)
+
+
+class WhatIfScenario(BaseModel):
+    """Feature edits applied on top of the base startup"""
+    id: str = Field(..., min_length=1, max_length=100)
+    edits: Dict[str, Union[bool, int, float, str]] = Field(..., min_length=1)
+
+
+class WhatIfRequest(BaseModel):
+    """Base startup and the edited variants to re-score"""
+    startup: StartupData
+    scenarios: List[WhatIfScenario] = Field(..., min_length=1, max_length=50)
+    include_attributions: bool = False
+    top_k: int = Field(5, ge=1, le=45)
+
+
+class CounterfactualRequest(BaseModel):
+    """Startup to improve and the verdict it should reach"""
+    startup: StartupData
+    target_verdict: Optional[str] = None
+    max_edits: int = Field(3, ge=1, le=5)
+    max_results: int = Field(5, ge=1, le=20)
+    time_budget_ms: int = Field(500, ge=50, le=5000)
+
+
 def transform_response_for_frontend(response: Dict) -> Dict:
     """Transform backend response to match frontend expectations"""
     
@@ -680,6 +748,10 @@ async def root():
             "/predict/batch",
             "/features",
             "/patterns",
+            "/patterns/evolution",
+            "/explain/batch",
+            "/whatif/rescore",
+            "/whatif/counterfactual",
             "/system_info",
             "/health",
             "/metrics",
@@ -723,7 +795,8 @@ async def predict(
         
         # Sanitize input data
         try:
-            sanitized_data = sanitize_startup_data(data_dict)
+            with span("sanitize"):
+                sanitized_data = sanitize_startup_data(data_dict)
         except Exception as e:
             logger.error(f"Sanitization error: {str(e)}")
             raise HTTPException(
@@ -732,7 +805,8 @@ async def predict(
             )
         
         # Comprehensive validation
-        is_valid, validation_errors, validated_data = data_validator.validate(sanitized_data)
+        with span("validate"):
+            is_valid, validation_errors, validated_data = data_validator.validate(sanitized_data)
         if not is_valid:
             logger.error(f"Validation failed: {validation_errors}")
             raise HTTPException(
@@ -749,7 +823,8 @@ async def predict(
         
         # Check cache first
         cache_key_data = {k: v for k, v in sanitized_data.items() if k != 'startup_name'}
-        cached_result = redis_cache.get_prediction(cache_key_data)
+        with span("cache.get"):
+            cached_result = redis_cache.get_prediction(cache_key_data)
         if cached_result:
             logger.info("Cache hit - returning cached prediction")
             metrics_collector.record_request(
@@ -762,7 +837,8 @@ async def predict(
             return cached_result
         
         # Convert data for backend
-        features = type_converter.convert_frontend_to_backend(sanitized_data)
+        with span("convert"):
+            features = type_converter.convert_frontend_to_backend(sanitized_data)
         logger.info(f"After conversion: {len(features)} features")
         
         # Import feature config to filter to canonical features
@@ -799,10 +875,11 @@ async def predict(
         
         # Get prediction with circuit breaker protection
         try:
-            result = prediction_circuit_breaker.call(
-                orchestrator.predict,
-                canonical_features
-            )
+            with span("orchestrator"):
+                result = prediction_circuit_breaker.call(
+                    orchestrator.predict,
+                    canonical_features
+                )
         except Exception as e:
             logger.error(f"Orchestrator prediction failed: {str(e)}")
             record_prometheus_error("prediction_failed", "/predict")
@@ -814,7 +891,8 @@ async def predict(
         
         # Calculate CAMP pillar scores if not provided
         if 'pillar_scores' not in result or not result.get('pillar_scores'):
-            camp_scores = calculate_camp_scores(canonical_features)
+            with span("camp"):
+                camp_scores = calculate_camp_scores(canonical_features)
             logger.info(f"Calculated CAMP scores: {camp_scores}")
             result['pillar_scores'] = camp_scores
         
@@ -827,7 +905,8 @@ async def predict(
             raise ValueError(f"Invalid probability value: {result['success_probability']}")
         
         # Transform for frontend
-        response = transform_response_for_frontend(result)
+        with span("transform"):
+            response = transform_response_for_frontend(result)
         
         # Add additional fields expected by frontend
         response['risk_level'] = 'high' if result['success_probability'] < 0.3 else ('medium' if result['success_probability'] < 0.7 else 'low')
@@ -858,7 +937,8 @@ async def predict(
         )
         
         # Cache the result
-        redis_cache.set_prediction(cache_key_data, response)
+        with span("cache.set"):
+            redis_cache.set_prediction(cache_key_data, response)
         
         return response
         
@@ -1059,6 +1139,55 @@ async def get_pattern_details(pattern_name: str):
         raise HTTPException(status_code=503, detail="Pattern system not available")
 
 
+@app.post("/patterns/evolution")
+@limiter.limit("20/minute")
+async def get_pattern_evolution(
+    request: Request,
+    evolution_request: PatternEvolutionRequest,
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Project evolution paths for a portfolio of patterns"""
+    graph = STARTUP_DNA_LIBRARY.graph
+    patterns = evolution_request.patterns
+    max_steps = evolution_request.max_steps
+
+    # One matrix product per step covers the whole portfolio
+    distributions = [graph.evolution_distribution(patterns, step) for step in range(1, max_steps + 1)]
+
+    results = []
+    for row, pattern in enumerate(patterns):
+        if pattern not in graph.node_positions:
+            results.append({"pattern": pattern, "found": False})
+            continue
+
+        paths = STARTUP_DNA_LIBRARY.get_multi_step_evolution(
+            pattern, max_steps, evolution_request.min_probability
+        )
+        steps = []
+        for distribution in distributions:
+            reachable = np.flatnonzero(distribution[row] > 0)
+            reachable = reachable[np.argsort(-distribution[row][reachable], kind='stable')]
+            steps.append({
+                graph.node_names[i]: round(float(distribution[row][i]), 4) for i in reachable
+            })
+
+        results.append({
+            "pattern": pattern,
+            "found": True,
+            "paths": [
+                {"path": path, "probability": round(probability, 4)} for path, probability in paths
+            ],
+            "step_distribution": steps
+        })
+
+    return {
+        "total_patterns": len(patterns),
+        "max_steps": max_steps,
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.post("/analyze_pattern")
 @limiter.limit("20/minute")
 async def analyze_pattern(
@@ -1411,9 +1540,16 @@ async def get_system_info(current_user: CurrentUser = Depends(get_current_active
 async def explain_prediction(
     request: Request, 
     data: Annotated[StartupData, Body()],  # Explicitly mark as body parameter
+    include_shap: Optional[str] = None,
     current_user: CurrentUser = Depends(get_current_active_user)
 ):
-    """Generate explanations for a prediction"""
+    """
+    Generate explanations for a prediction
+    
+    include_shap adds model SHAP attributions: "lazy" returns plot specs for
+    client-side rendering (PNGs on demand from /explain/plot/{plot_id}),
+    "plots" embeds rendered PNGs and "values" skips plots.
+    """
     try:
         # Get prediction first
         features = type_converter.convert_frontend_to_backend(data.model_dump())
@@ -1469,18 +1605,185 @@ async def explain_prediction(
             'overall_confidence': result.get('confidence_score', 0.7)
         }
         
-        return {
+        response = {
             'prediction': result,
             'explanations': explanations,
             'methodology': "CAMP framework analysis with pattern recognition",
             'timestamp': datetime.now().isoformat()
         }
         
+        if include_shap and SHAP_EXPLAINER_AVAILABLE:
+            include_plots = {'lazy': 'lazy', 'plots': True}.get(include_shap, False)
+            try:
+                explainer = await run_in_threadpool(get_flash_explainer)
+                response['shap'] = await run_in_threadpool(
+                    explainer.explain_prediction, pd.DataFrame([features]), None, include_plots
+                )
+            except Exception as e:
+                logger.warning(f"SHAP explanation unavailable: {e}")
+                response['shap'] = {'error': str(e)}
+        
+        return response
+        
     except Exception as e:
         logger.error(f"Explanation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/explain/batch")
+@limiter.limit("5/minute")
+async def explain_batch(
+    request: Request,
+    batch_request: ExplainBatchRequest,
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """SHAP attributions for a portfolio of startups"""
+    if not SHAP_EXPLAINER_AVAILABLE:
+        raise HTTPException(status_code=503, detail="SHAP explainer not available")
+    
+    if len(batch_request.startups) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch size limited to {settings.MAX_BATCH_SIZE} startups"
+        )
+    
+    try:
+        features = pd.DataFrame([
+            type_converter.convert_frontend_to_backend(startup.model_dump())
+            for startup in batch_request.startups
+        ])
+        
+        explainer = await run_in_threadpool(get_flash_explainer)
+        batch = await run_in_threadpool(explainer.explain_batch, features, batch_request.model_name)
+        
+        top_k = batch_request.top_k
+        feature_names = batch['feature_names']
+        rows = []
+        for row in range(len(features)):
+            attributions = {}
+            for name, values in batch['shap_values'].items():
+                top = np.argsort(-np.abs(values[row]), kind='stable')[:top_k]
+                attributions[name] = [
+                    {'feature': feature_names[i], 'impact': float(values[row, i])} for i in top
+                ]
+            rows.append({
+                'ensemble_prediction': float(batch['ensemble_predictions'][row]),
+                'model_predictions': {
+                    name: float(preds[row]) for name, preds in batch['predictions'].items()
+                },
+                'top_attributions': attributions
+            })
+        
+        return {
+            'batch_size': len(rows),
+            'results': rows,
+            'portfolio': explainer.summarize_batch(batch, top_k),
+            'expected_values': batch['expected_values'],
+            'errors': batch['errors'],
+            'timestamp': datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch explanation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/explain/plot/{plot_id}")
+@limiter.limit("60/minute")
+async def get_explanation_plot(
+    request: Request,
+    plot_id: str,
+    kind: str = "feature_importance",
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Rendered PNG for a lazy explanation, cached after the first request"""
+    if not SHAP_EXPLAINER_AVAILABLE:
+        raise HTTPException(status_code=503, detail="SHAP explainer not available")
+    
+    explainer = await run_in_threadpool(get_flash_explainer)
+    image = await run_in_threadpool(explainer.render_plot, plot_id, kind)
+    if image is None:
+        raise HTTPException(status_code=404, detail=f"Plot '{kind}' not found for {plot_id}")
+    
+    return Response(
+        content=image,
+        media_type="image/png",
+        headers={"Cache-Control": "private, max-age=86400"}
+    )
+
+
+@app.post("/whatif/rescore")
+@limiter.limit("120/minute")
+async def whatif_rescore(
+    request: Request,
+    whatif_request: WhatIfRequest,
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """
+    Re-score feature edits against the production models
+    
+    The base startup, every scenario and every individual edit are scored in
+    one batch, so slider changes in the frontend get model-based answers.
+    """
+    try:
+        startup = type_converter.convert_frontend_to_backend(whatif_request.startup.model_dump())
+        scenarios = [scenario.model_dump() for scenario in whatif_request.scenarios]
+        
+        explainer = None
+        if whatif_request.include_attributions and SHAP_EXPLAINER_AVAILABLE:
+            explainer = await run_in_threadpool(get_flash_explainer)
+        
+        engine = WhatIfEngine(orchestrator, explainer)
+        result = await run_in_threadpool(
+            engine.evaluate, startup, scenarios,
+            whatif_request.include_attributions, whatif_request.top_k
+        )
+        result["timestamp"] = datetime.now().isoformat()
+        return result
+        
+    except ScenarioValidationError as e:
+        logger.error(f"What-if validation failed: {e.errors}")
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Scenario validation failed",
+                "validation_errors": e.errors
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"What-if error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/whatif/counterfactual")
+@limiter.limit("30/minute")
+async def whatif_counterfactual(
+    request: Request,
+    counterfactual_request: CounterfactualRequest,
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Cheapest edits to burn, runway, retention and team that reach the target verdict"""
+    try:
+        startup = type_converter.convert_frontend_to_backend(counterfactual_request.startup.model_dump())
+        search = CounterfactualSearch(orchestrator, max_edits=counterfactual_request.max_edits)
+        result = await run_in_threadpool(
+            search.search, startup, counterfactual_request.target_verdict,
+            counterfactual_request.time_budget_ms / 1000, counterfactual_request.max_results
+        )
+        result["timestamp"] = datetime.now().isoformat()
+        return result
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Counterfactual search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1661,6 +1964,15 @@ async def get_metrics_summary(current_user: CurrentUser = Depends(get_current_us
     return metrics_collector.get_summary()
 
 
+@app.get("/metrics/event-loop")
+async def get_event_loop_report(
+    top: int = 10,
+    current_user: CurrentUser = Depends(get_current_user_flexible)
+):
+    """Event-loop lag and the call sites that blocked the loop, with stack samples"""
+    return loop_monitor.report(top=top)
+
+
 @app.post("/metrics/export")
 @limiter.limit("1/minute")
 async def export_metrics(
@@ -1681,26 +1993,6 @@ if __name__ == "__main__":
     logger.info(f"Loaded {len(orchestrator.models)} models")
     logger.info(f"Pattern system: {'Available' if hasattr(orchestrator, 'pattern_classifier') and orchestrator.pattern_classifier else 'Not available'}")
     
-    # Set up periodic system metrics collection
-    import threading
-    import time
-    
-    def collect_system_metrics():
-        """Collect system metrics every 30 seconds"""
-        while True:
-            try:
-                metrics_collector.record_system_metrics()
-                if PROMETHEUS_ENABLED:
-                    update_prometheus_system_metrics()
-            except Exception as e:
-                logger.error(f"Failed to collect system metrics: {e}")
-            time.sleep(30)
-    
-    # Start metrics collection in background
-    metrics_thread = threading.Thread(target=collect_system_metrics, daemon=True)
-    metrics_thread.start()
-    logger.info("Started system metrics collection")
-    
     # Add shutdown handler
     @app.on_event("shutdown")
     async def shutdown():
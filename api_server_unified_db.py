@@ -9,6 +9,7 @@ import sys
 import logging
 import hashlib
 import time
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict, List, Any
@@ -34,6 +35,8 @@ from database.repositories import (
     PredictionRepository, StartupProfileRepository, 
     APIKeyRepository, AuditLogRepository
 )
+from database.write_behind import write_behind, prediction_records, audit_record, WriteBehindFull
+from database.api_key_cache import api_key_cache
 
 # Import models and utilities
 from models.unified_orchestrator_v3_integrated import UnifiedOrchestratorV3
@@ -108,6 +111,10 @@ async def lifespan(app: FastAPI):
         if not settings.is_development():
             raise
     
+    # Predictions and audit logs are persisted by a background writer
+    write_behind.start()
+    api_key_cache.start()
+    
     # Initialize components
     type_converter = TypeConverter()
     orchestrator = UnifiedOrchestratorV3()
@@ -128,6 +135,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down FLASH API Server...")
+    write_behind.stop()
+    api_key_cache.stop()
     redis_cache.close()
 
 # Initialize FastAPI app
@@ -324,6 +333,7 @@ async def health_check(db: Session = Depends(get_db)):
         "timestamp": datetime.utcnow().isoformat(),
         "database": db_status,
         "database_stats": db_stats,
+        "write_behind": write_behind.get_stats(),
         "models_loaded": orchestrator is not None,
         "cache_connected": redis_cache.is_connected()
     }
@@ -457,10 +467,15 @@ async def predict(
         if cached_result:
             logger.info("Cache hit - returning cached prediction")
             # Still log to database for tracking
-            background_tasks.add_task(
-                log_cached_prediction,
-                db, validated_data, cached_result, current_user
-            )
+            await write_behind.asubmit(audit_record(
+                action="prediction_cached",
+                user_id=current_user["user_id"],
+                details={
+                    "startup_name": validated_data.get("startup_name"),
+                    "verdict": cached_result.get("verdict"),
+                    "cached": True
+                }
+            ))
             return cached_result
         
         # Convert and predict
@@ -496,64 +511,48 @@ async def predict(
             "confidence_interval": result.get("confidence_interval", {})
         }
         
-        # Store in database
-        startup_repo = StartupProfileRepository(db)
-        prediction_repo = PredictionRepository(db)
-        
-        # Get or create startup profile
+        # Queue the prediction, profile update and audit entry for the background writer
         startup_name = validated_data.get("startup_name", "Unknown")
-        startup_profile = startup_repo.get_or_create(
-            name=startup_name,
-            sector=validated_data.get("sector"),
-            funding_stage=validated_data.get("funding_stage"),
-            hq_location=validated_data.get("hq_location")
-        )
-        
-        # Create prediction record
-        prediction = prediction_repo.create(
-            input_features=canonical_features,
-            success_probability=response["success_probability"],
-            confidence_score=response["confidence_score"],
-            verdict=response["verdict"],
-            verdict_strength=response["verdict_strength"],
-            camp_scores=response["pillar_scores"],
-            model_predictions=result.get("model_predictions", {}),
-            risk_factors=response["risk_factors"],
-            success_factors=response["success_factors"],
-            key_insights=response["key_insights"],
-            startup_name=startup_name,
-            user_id=current_user["user_id"],
-            api_key_id=current_user.get("api_key_id"),
-            model_version=orchestrator.get_version(),
-            processing_time_ms=int((time.time() - start_time) * 1000)
+        prediction_id, records = prediction_records(
+            prediction=dict(
+                input_features=canonical_features,
+                success_probability=response["success_probability"],
+                confidence_score=response["confidence_score"],
+                verdict=response["verdict"],
+                verdict_strength=response["verdict_strength"],
+                camp_scores=response["pillar_scores"],
+                model_predictions=result.get("model_predictions", {}),
+                risk_factors=response["risk_factors"],
+                success_factors=response["success_factors"],
+                key_insights=response["key_insights"],
+                startup_name=startup_name,
+                user_id=current_user["user_id"],
+                api_key_id=current_user.get("api_key_id"),
+                model_version=orchestrator.get_version(),
+                processing_time_ms=int((time.time() - start_time) * 1000)
+            ),
+            profile=dict(
+                name=startup_name,
+                sector=validated_data.get("sector"),
+                funding_stage=validated_data.get("funding_stage"),
+                hq_location=validated_data.get("hq_location")
+            ),
+            audit=dict(
+                action="prediction",
+                user_id=current_user["user_id"],
+                details={
+                    "startup_name": startup_name,
+                    "verdict": response["verdict"],
+                    "probability": response["success_probability"]
+                },
+                duration_ms=int((time.time() - start_time) * 1000)
+            )
         )
-        
-        # Update startup profile
-        startup_repo.update_latest_prediction(startup_profile, prediction)
-        
-        # Commit to database
-        db.commit()
+        await write_behind.asubmit(*records)
         
         # Cache result
         redis_cache.set_prediction(cache_key_data, response)
         
-        # Log success
-        audit_repo = AuditLogRepository(db)
-        audit_repo.log(
-            action="prediction",
-            status="success",
-            entity_type="prediction",
-            entity_id=str(prediction.id),
-            user_id=current_user["user_id"],
-            details={
-                "startup_name": startup_name,
-                "verdict": response["verdict"],
-                "probability": response["success_probability"]
-            },
-            duration_ms=int((time.time() - start_time) * 1000)
-        )
-        db.commit()
-        
         # Record metrics
         metrics_collector.record_prediction(
             verdict=response["verdict"],
@@ -563,62 +562,60 @@ async def predict(
         
         return response
         
+    except WriteBehindFull:
+        logger.error("Persistence queue full - rejecting prediction")
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retry shortly"
+        )
     except Exception as e:
         # Log error
         logger.error(f"Prediction error: {str(e)}")
         
-        audit_repo = AuditLogRepository(db)
-        audit_repo.log(
-            action="prediction",
-            status="error",
-            user_id=current_user["user_id"],
-            error_message=str(e),
-            duration_ms=int((time.time() - start_time) * 1000)
-        )
-        db.commit()
+        try:
+            await write_behind.asubmit(audit_record(
+                action="prediction",
+                status="error",
+                user_id=current_user["user_id"],
+                error_message=str(e),
+                duration_ms=int((time.time() - start_time) * 1000)
+            ))
+        except WriteBehindFull:
+            pass
         
         raise HTTPException(
             status_code=500,
             detail="Prediction failed"
         )
 
-async def log_cached_prediction(
-    db: Session,
-    input_data: Dict,
-    result: Dict,
-    current_user: Dict
-):
-    """Background task to log cached predictions"""
-    try:
-        audit_repo = AuditLogRepository(db)
-        audit_repo.log(
-            action="prediction_cached",
-            status="success",
-            user_id=current_user["user_id"],
-            details={
-                "startup_name": input_data.get("startup_name"),
-                "verdict": result.get("verdict"),
-                "cached": True
-            }
-        )
-        db.commit()
-    except Exception as e:
-        logger.error(f"Failed to log cached prediction: {e}")
-
 @app.get("/predictions/history")
 async def get_prediction_history(
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
     current_user: Dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's prediction history"""
+    """Get user's prediction history; pass the returned next_cursor for the following page"""
+    before = None
+    if cursor:
+        try:
+            created_at, prediction_id = cursor.split("|", 1)
+            before = (datetime.fromisoformat(created_at), uuid.UUID(prediction_id))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor"
+            )
+    
     prediction_repo = PredictionRepository(db)
     predictions = prediction_repo.get_user_predictions(
         user_id=current_user["user_id"],
         limit=limit,
-        offset=offset
+        offset=offset,
+        before=before
     )
+    last = predictions[-1] if len(predictions) == limit else None
     
     return {
         "predictions": [
@@ -640,7 +637,8 @@ async def get_prediction_history(
         ],
         "total": len(predictions),
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": f"{last.created_at.isoformat()}|{last.id}" if last else None
     }
 
 @app.get("/predictions/{prediction_id}")
@@ -725,6 +723,57 @@ async def search_startups(
         "total": len(startups)
     }
 
+@app.get("/startups/{name}/trajectory")
+async def get_startup_trajectory(
+    name: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: Dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a startup's score history, oldest first"""
+    startup_repo = StartupProfileRepository(db)
+    trajectory = startup_repo.get_trajectory(name, since=since, until=until)
+    
+    return {
+        "name": name,
+        "trajectory": [
+            {
+                "revision": point["revision"],
+                "recorded_at": point["recorded_at"].isoformat(),
+                "prediction_id": str(point["prediction_id"]) if point["prediction_id"] else None,
+                "success_probability": point["success_probability"],
+                "confidence_score": point["confidence_score"],
+                "verdict": point["verdict"]
+            }
+            for point in trajectory
+        ],
+        "total": len(trajectory)
+    }
+
+@app.get("/startups/{name}/features")
+async def get_startup_features(
+    name: str,
+    as_of: Optional[datetime] = None,
+    current_user: Dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the features a startup was scored with at a point in time (latest by default)"""
+    startup_repo = StartupProfileRepository(db)
+    features = startup_repo.get_features_as_of(name, at=as_of)
+    
+    if features is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No history for this startup at that time"
+        )
+    
+    return {
+        "name": name,
+        "as_of": as_of.isoformat() if as_of else None,
+        "features": features
+    }
+
 @app.post("/api-keys/create")
 async def create_api_key(
     name: str,
@@ -845,7 +894,17 @@ async def process_batch_predictions(
     """Process batch predictions in background"""
     try:
         results = []
-        for startup in startups:
+        records = [sanitize_startup_data(startup.dict()) for startup in startups]
+        validations = data_validator.validate_records(records)
+        for startup, (is_valid, validation_errors, validated_data) in zip(records, validations):
+            if not is_valid:
+                results.append({
+                    "startup_name": startup.get("startup_name"),
+                    "status": "invalid",
+                    "validation_errors": validation_errors[:5]
+                })
+                continue
+            
             # Process each startup
             # (Similar to single prediction logic)
             pass
@@ -1,7 +1,10 @@
 """
 Authentication routes for FLASH Platform
 """
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from auth.jwt_auth import (
@@ -64,4 +67,28 @@ async def get_me(current_user: CurrentUser = Depends(get_current_active_user)):
 async def logout(current_user: CurrentUser = Depends(get_current_active_user)):
     """Logout user (client should delete tokens)"""
     # In a real app, you might blacklist the token
-    return {"message": "Successfully logged out"}
\ No newline at end of file
+    return {"message": "Successfully logged out"}
+
+
+@router.delete("/api-keys/{key_id}")
+async def revoke_api_key(key_id: uuid.UUID, current_user: CurrentUser = Depends(get_current_active_user)):
+    """Revoke an API key; it stops authenticating immediately in this process"""
+    if not (current_user.is_admin or current_user.is_superuser):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can revoke API keys"
+        )
+    
+    from database.connection import get_session
+    from database.repositories import APIKeyRepository
+    
+    def revoke() -> bool:
+        with get_session() as session:
+            return APIKeyRepository(session).revoke(key_id)
+    
+    if not await run_in_threadpool(revoke):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+    return {"message": "API key revoked", "key_id": str(key_id)}
@@ -47,10 +47,17 @@ class Settings:
     
     # Database (if needed in future)
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
+    # Predictions and audit logs are written in the background; requests wait for room past this many
+    WRITE_BEHIND_MAX_PENDING: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+    WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
     
     # Monitoring
     ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "true").lower() == "true"
     METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9090"))
+    # Send the per-stage X-Timing breakdown on every response, not only when requested
+    ENABLE_TIMING_HEADER: bool = os.getenv("ENABLE_TIMING_HEADER", "false").lower() == "true"
+    # Event-loop lag monitor with stack sampling of blocking calls (FLASH_LOOP_BLOCK_MS threshold)
+    ENABLE_LOOP_MONITOR: bool = os.getenv("ENABLE_LOOP_MONITOR", "false").lower() == "true"
     
     # Feature Flags
     ENABLE_EXPLANATION_API: bool = os.getenv("ENABLE_EXPLANATION_API", "true").lower() == "true"
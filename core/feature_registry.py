@@ -29,7 +29,8 @@ class FeatureDefinition:
                  default_value: Optional[Any] = None,
                  validator: Optional[Callable] = None,
                  transformer: Optional[Callable] = None,
-                 is_required: bool = True):
+                 is_required: bool = True,
+                 monotonicity: Optional[int] = None):
         self.name = name
         self.position = position
         self.dtype = dtype
@@ -42,6 +43,8 @@ class FeatureDefinition:
         self.validator = validator
         self.transformer = transformer
         self.is_required = is_required
+        # +1 if success never falls as the value rises, -1 if it never rises
+        self.monotonicity = monotonicity
     
     def validate(self, value: Any) -> tuple[bool, Optional[str]]:
         """Validate a single value against this feature's constraints"""
@@ -100,7 +103,8 @@ class FeatureDefinition:
             'max_value': self.max_value,
             'allowed_values': self.allowed_values,
             'default_value': self.default_value,
-            'is_required': self.is_required
+            'is_required': self.is_required,
+            'monotonicity': self.monotonicity
         }
 
 
@@ -147,7 +151,8 @@ class FeatureRegistry:
             description="Number of full-time employees",
             min_value=0,
             max_value=10000,
-            default_value=1
+            default_value=1,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -180,7 +185,8 @@ class FeatureRegistry:
             description="Annual revenue run rate",
             min_value=0,
             max_value=10_000_000_000,
-            default_value=0
+            default_value=0,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -191,7 +197,8 @@ class FeatureRegistry:
             description="Burn multiple (burn rate / growth rate)",
             min_value=0,
             max_value=100,
-            default_value=2.0
+            default_value=2.0,
+            monotonicity=-1
         )
         
         # Market features (positions 7-17)
@@ -236,7 +243,8 @@ class FeatureRegistry:
             description="Customer acquisition cost in USD",
             min_value=0,
             max_value=100000,
-            default_value=100
+            default_value=100,
+            monotonicity=-1
         )
         
         self.register_feature(
@@ -247,7 +255,8 @@ class FeatureRegistry:
             description="Customer lifetime value in USD",
             min_value=0,
             max_value=1000000,
-            default_value=1000
+            default_value=1000,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -269,7 +278,8 @@ class FeatureRegistry:
             description="Net revenue retention percentage",
             min_value=0,
             max_value=300,
-            default_value=100
+            default_value=100,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -323,7 +333,8 @@ class FeatureRegistry:
             description="Product-market fit score (1-5)",
             min_value=1,
             max_value=5,
-            default_value=3
+            default_value=3,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -528,7 +539,8 @@ class FeatureRegistry:
             description="Runway in months",
             min_value=0,
             max_value=120,
-            default_value=12
+            default_value=12,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -539,7 +551,8 @@ class FeatureRegistry:
             description="Calculated runway in months",
             min_value=0,
             max_value=120,
-            default_value=12
+            default_value=12,
+            monotonicity=1
         )
         
         self.register_feature(
@@ -592,7 +605,8 @@ class FeatureRegistry:
             description="Regulatory risk score (1-5, lower is better)",
             min_value=1,
             max_value=5,
-            default_value=3
+            default_value=3,
+            monotonicity=-1
         )
     
     def register_feature(self, 
@@ -607,7 +621,8 @@ class FeatureRegistry:
                         default_value: Optional[Any] = None,
                         validator: Optional[Callable] = None,
                         transformer: Optional[Callable] = None,
-                        is_required: bool = True):
+                        is_required: bool = True,
+                        monotonicity: Optional[int] = None):
         """Register a feature with all its metadata"""
         if name in self.features:
             raise ValueError(f"Feature {name} already registered")
@@ -624,7 +639,8 @@ class FeatureRegistry:
             default_value=default_value,
             validator=validator,
             transformer=transformer,
-            is_required=is_required
+            is_required=is_required,
+            monotonicity=monotonicity
         )
         
         self.features[name] = feature
@@ -640,6 +656,10 @@ class FeatureRegistry:
         """Get all features in a category"""
         return [f for f in self.features.values() if f.category == category]
     
+    def get_monotonicity_hints(self) -> Dict[str, int]:
+        """Get feature name to direction (+1/-1) for features with a known direction"""
+        return {name: feat.monotonicity for name, feat in self.features.items() if feat.monotonicity}
+    
     def get_feature_names(self) -> List[str]:
         """Get ordered list of feature names"""
         return list(self.features.keys())
@@ -661,7 +681,8 @@ class FeatureRegistry:
                 'min_value': feature.min_value,
                 'max_value': feature.max_value,
                 'default_value': feature.default_value,
-                'is_required': feature.is_required
+                'is_required': feature.is_required,
+                'monotonicity': feature.monotonicity
             })
         return pd.DataFrame(data)
     
@@ -11,10 +11,13 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
+import os
 import re
-from fuzzywuzzy import fuzz
+from concurrent.futures import ProcessPoolExecutor
 import requests
 
+from utils.duplicate_detection import DuplicateDetector, DuplicateCluster
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -69,7 +72,7 @@ class DataValidator:
                 'min_value': 0,
                 'max_value': 1000000000000,
                 'type': 'float',
-                'conditional': lambda row: row['outcome'] in ['acquired', 'ipo']
+                'required_when': ('outcome', ['acquired', 'ipo'])
             },
             'data_completeness': {
                 'required': True,
@@ -157,9 +160,10 @@ class DataValidator:
                     issues.append(f"Invalid date format for {field}: {value}")
             
             # Conditional validation
-            if 'conditional' in rules:
-                if rules['conditional'](record) and not value:
-                    issues.append(f"{field} required when {rules['conditional'].__doc__}")
+            if 'required_when' in rules:
+                other, values = rules['required_when']
+                if record.get(other) in values and not value:
+                    issues.append(f"{field} required when {other} is {record.get(other)}")
         
         # Cross-field validations
         issues.extend(self._cross_field_validation(record))
@@ -368,37 +372,30 @@ class DataValidator:
         filled = sum(1 for field in important_fields if record.get(field))
         return filled / len(important_fields)
     
-    def detect_duplicates(self) -> List[Tuple[str, str, float]]:
-        """Detect potential duplicate companies"""
+    def validate_database(self, chunk_size: int = 50000, workers: int = 1, rejected_path: Optional[str] = None,
+                          state_path: Optional[str] = None) -> 'BatchValidationReport':
+        """Clean and validate the whole startups table in chunks (see BatchValidator.run)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            chunks = pd.read_sql_query("SELECT * FROM startups", conn, chunksize=chunk_size)
+            return BatchValidator(self, chunk_size, workers).run(chunks, rejected_path, state_path)
+        finally:
+            conn.close()
+    
+    def _load_companies(self) -> pd.DataFrame:
         conn = sqlite3.connect(self.db_path)
         df = pd.read_sql_query("SELECT company_id, company_name, website FROM startups", conn)
         conn.close()
-        
-        duplicates = []
-        
-        for i in range(len(df)):
-            for j in range(i + 1, len(df)):
-                # Name similarity
-                name_sim = fuzz.ratio(df.iloc[i]['company_name'], df.iloc[j]['company_name'])
-                
-                # Domain similarity
-                domain_sim = 0
-                if df.iloc[i]['website'] and df.iloc[j]['website']:
-                    domain1 = df.iloc[i]['website'].replace('https://', '').replace('http://', '').split('/')[0]
-                    domain2 = df.iloc[j]['website'].replace('https://', '').replace('http://', '').split('/')[0]
-                    domain_sim = fuzz.ratio(domain1, domain2)
-                
-                # Combined similarity
-                similarity = max(name_sim, domain_sim)
-                
-                if similarity > 85:  # Threshold for potential duplicates
-                    duplicates.append((
-                        df.iloc[i]['company_id'],
-                        df.iloc[j]['company_id'],
-                        similarity
-                    ))
-        
-        return duplicates
+        return df
+    
+    def detect_duplicates(self, threshold: float = 85.0) -> List[Tuple[str, str, float]]:
+        """Detect potential duplicate companies as (company_id, company_id, similarity) pairs"""
+        pairs = DuplicateDetector(threshold=threshold).find_pairs(self._load_companies())
+        return list(zip(pairs['id_a'], pairs['id_b'], pairs['score'].astype(float)))
+    
+    def detect_duplicate_clusters(self, threshold: float = 85.0) -> List[DuplicateCluster]:
+        """Group potential duplicates into scored clusters of company IDs"""
+        return DuplicateDetector(threshold=threshold).find_clusters(self._load_companies())
     
     def verify_outcomes(self) -> Dict[str, List[Dict]]:
         """Verify startup outcomes against external sources"""
@@ -555,6 +552,484 @@ class DataValidator:
         conn.close()
         return report
 
+class BatchValidationReport:
+    """Outcome of a BatchValidator run"""
+    
+    def __init__(self):
+        self.total_rows = 0
+        self.valid_rows = 0
+        self.skipped_rows = 0  # already validated in an earlier incremental run
+        self.rule_counts: Dict[str, int] = {}
+        self.accepted = pd.DataFrame()  # cleaned rows that passed
+    
+    @property
+    def rejected_rows(self) -> int:
+        return self.total_rows - self.valid_rows
+    
+    def to_dict(self) -> Dict:
+        return {
+            'total_rows': self.total_rows,
+            'valid_rows': self.valid_rows,
+            'rejected_rows': self.rejected_rows,
+            'skipped_rows': self.skipped_rows,
+            'rule_counts': dict(sorted(self.rule_counts.items(), key=lambda item: -item[1]))
+        }
+
+def _truthy(series: pd.Series) -> np.ndarray:
+    """Python truthiness of each value, with missing values counted as empty"""
+    if pd.api.types.is_bool_dtype(series):
+        return series.fillna(False).to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(series):
+        return (series.notna() & (series != 0)).to_numpy()
+    values = series.to_numpy(dtype=object)
+    present = pd.notna(values)
+    truthy = np.zeros(len(values), dtype=bool)
+    truthy[present] = [bool(v) for v in values[present]]
+    return truthy
+
+def _kinds(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """(is_str, is_number) masks, matching isinstance checks on the raw values"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return np.zeros(len(series), dtype=bool), series.notna().to_numpy()
+    types = series.map(type).to_numpy(dtype=object)
+    is_str = types == str
+    is_number = np.isin(types, [int, float, bool, np.int64, np.float64, np.int32, np.float32, np.bool_])
+    return is_str, is_number & series.notna().to_numpy()
+
+def _map_distinct(values: np.ndarray, func) -> np.ndarray:
+    """func(value) per value, computed once for each distinct value"""
+    cache = {}
+    result = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        try:
+            result[i] = cache[value]
+        except KeyError:
+            result[i] = cache[value] = func(value)
+        except TypeError:
+            result[i] = func(value)
+    return result
+
+def _converts(values: np.ndarray, kind) -> np.ndarray:
+    """Whether kind(value) succeeds, per value"""
+    def ok(value):
+        try:
+            kind(value)
+            return True
+        except Exception:
+            return False
+    return _map_distinct(values, ok).astype(bool)
+
+def _parse_dates(series: pd.Series, fmt: str, rows: np.ndarray) -> np.ndarray:
+    """datetime64[s] of str(value) for the selected rows, NaT where strptime would fail"""
+    result = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[s]')
+    if not rows.any():
+        return result
+    text = series[rows].map(str)
+    parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+    result[rows] = parsed.to_numpy(dtype='datetime64[s]')
+    # Years outside the pandas range still parse with strptime
+    def strptime(value):
+        try:
+            return np.datetime64(datetime.strptime(value, fmt), 's')
+        except ValueError:
+            return np.datetime64('NaT')
+    failed = parsed.isna().to_numpy()
+    if failed.any():
+        result[np.flatnonzero(rows)[failed]] = _map_distinct(text.to_numpy(dtype=object)[failed], strptime).astype('datetime64[s]')
+    return result
+
+class BatchValidator:
+    """
+    Column-wise version of DataValidator.clean_and_standardize and validate_record
+    
+    Each rule is evaluated as a mask over a chunk of rows, producing the same
+    issue messages, in the same order, as the per-record methods. Chunks can
+    be spread over a process pool, rejected rows are appended to an ndjson
+    file, and with a state file only rows not seen by an earlier run are
+    validated.
+    """
+    
+    NUMERIC_FIELDS = ['total_funding', 'exit_value', 'last_funding_amount', 'market_size']
+    DATE_FIELDS = ['founded_date', 'outcome_date', 'last_funding_date']
+    DATE_FORMATS = [
+        '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%B %d, %Y', '%b %d, %Y'
+    ]
+    IMPORTANT_FIELDS = [
+        'company_name', 'founded_date', 'industry', 'headquarters_location',
+        'founder_names', 'total_funding', 'funding_rounds', 'outcome',
+        'team_size', 'website', 'business_model', 'target_market'
+    ]
+    
+    def __init__(self, validator: Optional[DataValidator] = None, chunk_size: int = 50000, workers: int = 1):
+        self.validator = validator or DataValidator()
+        self.chunk_size = chunk_size
+        self.workers = workers
+    
+    # Cleaning
+    
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Clean and standardize every row of a chunk"""
+        cleaned = df.copy()
+        
+        if 'company_name' in cleaned:
+            cleaned['company_name'] = self._clean_strings(cleaned['company_name'], self._standardize_names)
+        
+        for field in self.DATE_FIELDS:
+            if field in cleaned:
+                cleaned[field] = self._standardize_dates(cleaned[field])
+        
+        for field in self.NUMERIC_FIELDS:
+            if field in cleaned:
+                cleaned[field] = self._clean_numbers(cleaned[field])
+        
+        if 'headquarters_location' in cleaned:
+            cleaned['headquarters_location'] = self._clean_strings(
+                cleaned['headquarters_location'], self._standardize_locations
+            )
+        
+        if 'website' in cleaned:
+            cleaned['website'] = self._clean_strings(cleaned['website'], self._clean_urls)
+        
+        filled = sum(
+            _truthy(cleaned[field]).astype(np.int32) for field in self.IMPORTANT_FIELDS if field in cleaned
+        )
+        cleaned['data_completeness'] = np.asarray(filled, dtype=float) / len(self.IMPORTANT_FIELDS)
+        
+        return cleaned
+    
+    @staticmethod
+    def _clean_strings(series: pd.Series, transform) -> pd.Series:
+        """Apply a vectorized string transform to the non-empty string values"""
+        is_str, _ = _kinds(series)
+        rows = is_str & _truthy(series)
+        if not rows.any():
+            return series
+        result = series.astype(object)
+        result[rows] = transform(series[rows].astype(str)).to_numpy()
+        return result
+    
+    @staticmethod
+    def _standardize_names(names: pd.Series) -> pd.Series:
+        for suffix in [' Inc.', ' Inc', ' LLC', ' Ltd.', ' Ltd', ' Corp.', ' Corp', ' Co.', ' Co']:
+            ends = names.str.endswith(suffix)
+            names = names.where(~ends, names.str[:-len(suffix)])
+        return names.str.split().str.join(' ').str.title().str.strip()
+    
+    @staticmethod
+    def _standardize_locations(locations: pd.Series) -> pd.Series:
+        replacements = {
+            'SF': 'San Francisco',
+            'NYC': 'New York City',
+            'LA': 'Los Angeles',
+            'UK': 'United Kingdom',
+            'USA': 'United States'
+        }
+        for abbr, full in replacements.items():
+            locations = locations.str.replace(abbr, full, regex=False)
+        return locations.str.strip()
+    
+    @staticmethod
+    def _clean_urls(urls: pd.Series) -> pd.Series:
+        has_scheme = urls.str.startswith('http://') | urls.str.startswith('https://')
+        return urls.where(has_scheme, 'https://' + urls).str.rstrip('/')
+    
+    def _standardize_dates(self, series: pd.Series) -> pd.Series:
+        rows = _truthy(series)
+        if not rows.any():
+            return series
+        values = series[rows].map(str).str.split('T').str[0]
+        result = pd.Series(None, index=values.index, dtype=object)
+        remaining = np.ones(len(values), dtype=bool)
+        for fmt in self.DATE_FORMATS:
+            parsed = pd.to_datetime(values[remaining], format=fmt, errors='coerce')
+            ok = parsed.notna().to_numpy()
+            result.iloc[np.flatnonzero(remaining)[ok]] = parsed[ok].dt.strftime('%Y-%m-%d').to_numpy()
+            remaining[np.flatnonzero(remaining)[ok]] = False
+        # Whatever pandas can't represent (e.g. years before 1677) goes through strptime
+        if remaining.any():
+            raw = series[rows].to_numpy(dtype=object)[remaining]
+            result.iloc[np.flatnonzero(remaining)] = _map_distinct(raw, self.validator._standardize_date)
+        
+        cleaned = series.astype(object)
+        cleaned[rows] = result.to_numpy()
+        return cleaned
+    
+    def _clean_numbers(self, series: pd.Series) -> pd.Series:
+        rows = _truthy(series)
+        # Falsy values are left as they are, so a 0 stays an int as it does per record
+        if pd.api.types.is_float_dtype(series) or (pd.api.types.is_integer_dtype(series) and rows.all()):
+            return series.astype(float)
+        is_str, is_number = _kinds(series)
+        result = series.astype(object)
+        result[rows & ~is_str & ~is_number] = None
+        result[rows & is_number] = series[rows & is_number].astype(float)
+        
+        strings = rows & is_str
+        if strings.any():
+            text = series[strings].astype(str)
+            for symbol in ['$', ',', '€', '£']:
+                text = text.str.replace(symbol, '', regex=False)
+            multiplier = text.str[-1:].str.lower().map({'k': 1000, 'm': 1000000, 'b': 1000000000})
+            has_suffix = multiplier.notna()
+            values = pd.to_numeric(text.where(~has_suffix, text.str[:-1]), errors='coerce')
+            values = values.where(~has_suffix, values * multiplier)
+            values = values.astype(object).where(values.notna(), None).to_numpy()
+            # float() accepts a few spellings pandas doesn't ('1_000', ' nan '), so retry those per value
+            failed = pd.isna(values)
+            if failed.any():
+                raw = series[strings].to_numpy(dtype=object)[failed]
+                values[failed] = _map_distinct(raw, self.validator._clean_numeric)
+            result[strings] = values
+        
+        # Without any falsy values left untouched the column is plain float
+        if not (~rows & series.notna().to_numpy()).any():
+            return result.astype(float)
+        return result
+    
+    # Validation
+    
+    def validate(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[List[str]], Dict[str, int]]:
+        """(valid mask, issues per row, violation count per rule) for a chunk"""
+        n = len(df)
+        issues: List[List[str]] = [[] for _ in range(n)]
+        counts: Dict[str, int] = {}
+        
+        def report(rule: str, mask: np.ndarray, message):
+            positions = np.flatnonzero(mask)
+            if not len(positions):
+                return
+            counts[rule] = counts.get(rule, 0) + len(positions)
+            for i in positions:
+                issues[i].append(message(i))
+        
+        missing = pd.Series([None] * n, index=df.index, dtype=object)
+        for field, rules in self.validator.validation_rules.items():
+            if field not in df:
+                if rules.get('required', False):
+                    report(f"{field}.missing", np.ones(n, dtype=bool), lambda i: f"Missing required field: {field}")
+                continue
+            
+            series = df[field]
+            values = series.to_numpy(dtype=object)
+            active = series.notna().to_numpy()
+            
+            if rules.get('required', False):
+                empty = ~_truthy(series)
+                report(f"{field}.empty", empty, lambda i: f"Empty required field: {field}")
+                active &= ~empty
+            
+            is_str, is_number = _kinds(series)
+            is_str &= active
+            is_number &= active
+            
+            if rules.get('type') == 'float':
+                invalid = active & ~is_number
+                invalid[invalid] = ~_converts(values[invalid], float)
+                report(f"{field}.type", invalid, lambda i: f"Invalid float value for {field}: {values[i]}")
+            elif rules.get('type') == 'int':
+                numbers = pd.to_numeric(series.where(is_number), errors='coerce').to_numpy(dtype=float)
+                invalid = active & ~(is_number & np.isfinite(numbers))
+                invalid[invalid] = ~_converts(values[invalid], int)
+                report(f"{field}.type", invalid, lambda i: f"Invalid integer value for {field}: {values[i]}")
+            
+            if is_str.any():
+                text = series.where(is_str).astype(str)
+                lengths = text.str.len().to_numpy()
+                if 'min_length' in rules:
+                    report(f"{field}.min_length", is_str & (lengths < rules['min_length']),
+                           lambda i: f"{field} too short: {lengths[i]} < {rules['min_length']}")
+                if 'max_length' in rules:
+                    report(f"{field}.max_length", is_str & (lengths > rules['max_length']),
+                           lambda i: f"{field} too long: {lengths[i]} > {rules['max_length']}")
+                if 'pattern' in rules:
+                    matches = text.str.match(rules['pattern']).fillna(False).to_numpy(dtype=bool)
+                    report(f"{field}.pattern", is_str & ~matches,
+                           lambda i: f"{field} doesn't match pattern: {values[i]}")
+                if 'forbidden_values' in rules:
+                    lowered = text.str.lower()
+                    forbidden = np.zeros(n, dtype=bool)
+                    for word in rules['forbidden_values']:
+                        forbidden |= lowered.str.contains(word, regex=False).fillna(False).to_numpy(dtype=bool)
+                    report(f"{field}.forbidden", is_str & forbidden,
+                           lambda i: f"{field} contains forbidden value: {values[i]}")
+            
+            if is_number.any():
+                numbers = pd.to_numeric(series.where(is_number), errors='coerce').to_numpy(dtype=float)
+                if 'min_value' in rules:
+                    report(f"{field}.min_value", is_number & (numbers < rules['min_value']),
+                           lambda i: f"{field} below minimum: {values[i]} < {rules['min_value']}")
+                if 'max_value' in rules:
+                    report(f"{field}.max_value", is_number & (numbers > rules['max_value']),
+                           lambda i: f"{field} above maximum: {values[i]} > {rules['max_value']}")
+            
+            if 'allowed_values' in rules:
+                allowed = series.isin(rules['allowed_values']).to_numpy()
+                report(f"{field}.allowed_values", active & ~allowed,
+                       lambda i: f"{field} not in allowed values: {values[i]}")
+            
+            if 'date_format' in rules:
+                fmt = rules['date_format']
+                dates = _parse_dates(series, fmt, active)
+                parsed = active & ~np.isnat(dates)
+                report(f"{field}.date_format", active & np.isnat(dates),
+                       lambda i: f"Invalid date format for {field}: {values[i]}")
+                if 'min_date' in rules:
+                    report(f"{field}.min_date", parsed & (dates < np.datetime64(datetime.strptime(rules['min_date'], fmt))),
+                           lambda i: f"{field} before minimum date: {values[i]}")
+                if 'max_date' in rules:
+                    report(f"{field}.max_date", parsed & (dates > np.datetime64(datetime.strptime(rules['max_date'], fmt))),
+                           lambda i: f"{field} after maximum date: {values[i]}")
+            
+            if 'required_when' in rules:
+                other, trigger_values = rules['required_when']
+                triggers = (df[other] if other in df else missing).to_numpy(dtype=object)
+                triggered = (df[other] if other in df else missing).isin(trigger_values).to_numpy()
+                report(f"{field}.required_when", active & triggered & ~_truthy(series),
+                       lambda i: f"{field} required when {other} is {triggers[i]}")
+        
+        self._cross_field_validation(df, report)
+        
+        valid = np.fromiter((not row for row in issues), dtype=bool, count=n)
+        return valid, issues, counts
+    
+    def _cross_field_validation(self, df: pd.DataFrame, report):
+        """Column-wise DataValidator._cross_field_validation"""
+        n = len(df)
+        
+        def column(name: str) -> pd.Series:
+            return df[name] if name in df else pd.Series([None] * n, index=df.index, dtype=object)
+        
+        outcome = column('outcome').to_numpy(dtype=object)
+        report("cross.ipo_ticker", (outcome == 'ipo') & ~_truthy(column('ipo_ticker')),
+               lambda i: "IPO outcome requires ticker symbol")
+        report("cross.acquirer", (outcome == 'acquired') & ~_truthy(column('acquirer')),
+               lambda i: "Acquisition outcome requires acquirer name")
+        report("cross.shutdown_reason", (outcome == 'shutdown') & ~_truthy(column('shutdown_reason')),
+               lambda i: "Shutdown outcome should have reason")
+        
+        # Date consistency
+        both = _truthy(column('founded_date')) & _truthy(column('outcome_date'))
+        if both.any():
+            founded = _parse_dates(column('founded_date'), '%Y-%m-%d', both)
+            ended = _parse_dates(column('outcome_date'), '%Y-%m-%d', both)
+            dated = both & ~np.isnat(founded) & ~np.isnat(ended)
+            days = np.where(dated, (ended - founded).astype('timedelta64[D]').astype(np.int64), 0)
+            report("cross.outcome_before_founded", dated & (ended < founded),
+                   lambda i: "Outcome date before founded date")
+            report("cross.short_lifespan", dated & (days < 180),
+                   lambda i: f"Company lifespan suspiciously short: {days[i]} days")
+        
+        # Funding consistency; rounds are JSON, so this one is checked row by row
+        rounds = column('funding_rounds')
+        has_rounds = _truthy(rounds)
+        if has_rounds.any():
+            total_funding = column('total_funding').to_numpy(dtype=object)
+            raw_rounds = rounds.to_numpy(dtype=object)
+            mismatches = {}
+            for i in np.flatnonzero(has_rounds):
+                try:
+                    parsed = json.loads(raw_rounds[i]) if isinstance(raw_rounds[i], str) else raw_rounds[i]
+                    total_from_rounds = sum(r.get('amount', 0) for r in parsed)
+                    if abs(total_from_rounds - total_funding[i]) > 1000:
+                        mismatches[i] = total_from_rounds
+                except Exception:
+                    pass
+            mask = np.zeros(n, dtype=bool)
+            mask[list(mismatches)] = True
+            report("cross.funding_rounds_total", mask,
+                   lambda i: f"Total funding doesn't match sum of rounds: {mismatches[i]} vs {total_funding[i]}")
+        
+        # Exit value validation
+        exits = _truthy(column('exit_value')) & _truthy(column('total_funding'))
+        if exits.any():
+            exit_value = pd.to_numeric(column('exit_value').where(exits), errors='coerce').to_numpy(dtype=float)
+            funding = pd.to_numeric(column('total_funding').where(exits), errors='coerce').to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                multiple = np.where(funding > 0, exit_value / funding, 0.0)
+            exits &= ~np.isnan(multiple)
+            report("cross.exit_multiple_low", exits & (multiple < 0.1),
+                   lambda i: f"Exit multiple suspiciously low: {multiple[i]:.2f}x")
+            report("cross.exit_multiple_high", exits & (multiple > 1000),
+                   lambda i: f"Exit multiple suspiciously high: {multiple[i]:.2f}x")
+    
+    # Pipeline
+    
+    def process_chunk(self, chunk: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, List[List[str]], Dict[str, int]]:
+        """Clean then validate one chunk"""
+        cleaned = self.clean(chunk)
+        valid, issues, counts = self.validate(cleaned)
+        return cleaned, valid, issues, counts
+    
+    def run(self, source, rejected_path: Optional[str] = None, state_path: Optional[str] = None) -> BatchValidationReport:
+        """
+        Clean and validate a DataFrame, or an iterable of DataFrames / Arrow record batches
+        
+        Rejected rows are appended to ``rejected_path`` (ndjson, with their
+        issues); with ``state_path`` rows whose content was validated by a
+        previous run are skipped and the new fingerprints are saved.
+        """
+        report = BatchValidationReport()
+        seen = np.load(state_path) if state_path and os.path.exists(state_path) else np.zeros(0, dtype=np.uint64)
+        fresh = []
+        
+        def new_rows():
+            for chunk in self._chunks(source):
+                if state_path:
+                    fingerprints = _fingerprints(chunk)
+                    new = ~np.isin(fingerprints, seen)
+                    report.skipped_rows += int((~new).sum())
+                    chunk = chunk[new]
+                    fresh.append(fingerprints[new])
+                if len(chunk):
+                    yield chunk
+        
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                self._collect(pool.map(self.process_chunk, new_rows()), report, rejected_path)
+        else:
+            self._collect(map(self.process_chunk, new_rows()), report, rejected_path)
+        
+        if state_path:
+            np.save(state_path, np.union1d(seen, np.concatenate(fresh) if fresh else seen))
+        
+        logger.info(f"Validated {report.total_rows:,} rows: {report.valid_rows:,} valid, "
+                    f"{report.rejected_rows:,} rejected, {report.skipped_rows:,} unchanged")
+        return report
+    
+    def _chunks(self, source):
+        if isinstance(source, pd.DataFrame):
+            source = [source]
+        for batch in source:
+            frame = batch.to_pandas() if hasattr(batch, 'to_pandas') else batch
+            for start in range(0, len(frame), self.chunk_size):
+                yield frame.iloc[start:start + self.chunk_size]
+    
+    @staticmethod
+    def _collect(results, report: BatchValidationReport, rejected_path: Optional[str]):
+        accepted = []
+        for cleaned, valid, issues, counts in results:
+            report.total_rows += len(cleaned)
+            report.valid_rows += int(valid.sum())
+            for rule, count in counts.items():
+                report.rule_counts[rule] = report.rule_counts.get(rule, 0) + count
+            accepted.append(cleaned[valid])
+            
+            if rejected_path and not valid.all():
+                rejected = cleaned[~valid].copy()
+                rejected['validation_issues'] = [issues[i] for i in np.flatnonzero(~valid)]
+                with open(rejected_path, 'a') as f:
+                    rejected.to_json(f, orient='records', lines=True, date_format='iso', default_handler=str)
+        if accepted:
+            report.accepted = pd.concat(accepted)
+
+def _fingerprints(chunk: pd.DataFrame) -> np.ndarray:
+    """64-bit content hash per row"""
+    try:
+        return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    except TypeError:
+        # Unhashable cells (lists, dicts) are hashed by their text
+        return pd.util.hash_pandas_object(chunk.astype(str), index=False).to_numpy()
+
 def main():
     """Run data validation pipeline"""
     validator = DataValidator()
@@ -582,10 +1057,22 @@ def main():
     print(f"  Updated in last 90 days: {report['data_age']['updated_last_90_days']:,}")
     print(f"  Updated in last year: {report['data_age']['updated_last_year']:,}")
     
+    # Validate every record
+    print("\n\nValidating records...")
+    validation = validator.validate_database(rejected_path='rejected_records.ndjson',
+                                             state_path='validation_state.npy')
+    print(f"Validated {validation.total_rows:,} new or changed records "
+          f"({validation.skipped_rows:,} unchanged): {validation.rejected_rows:,} rejected")
+    for rule, count in list(validation.to_dict()['rule_counts'].items())[:10]:
+        print(f"  {rule}: {count:,}")
+    
     # Detect duplicates
     print("\n\nChecking for duplicates...")
-    duplicates = validator.detect_duplicates()
-    print(f"Found {len(duplicates)} potential duplicate pairs")
+    clusters = validator.detect_duplicate_clusters()
+    print(f"Found {len(clusters)} potential duplicate clusters "
+          f"covering {sum(len(c.ids) for c in clusters):,} records")
+    for cluster in clusters[:10]:
+        print(f"  {cluster.score:.0f}: {', '.join(map(str, cluster.names))}")
     
     # Save detailed report
     with open('data_quality_report.json', 'w') as f:
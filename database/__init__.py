@@ -17,7 +17,9 @@ from database.connection import (
 from database.models import (
     Base,
     Prediction,
+    PredictionRollup,
     StartupProfile,
+    ProfileRevision,
     APIKey,
     ModelVersion,
     AuditLog,
@@ -32,6 +34,25 @@ from database.repositories import (
     AuditLogRepository
 )
 
+from database.rollups import (
+    HyperLogLog,
+    apply_prediction_rollups,
+    rebuild_rollups,
+    read_statistics
+)
+
+from database.profile_history import (
+    append_revisions,
+    features_as_of,
+    score_trajectory
+)
+
+from database.write_behind import (
+    WriteBehindQueue,
+    WriteBehindFull,
+    write_behind
+)
+
 __all__ = [
     # Connection management
     'init_database',
@@ -46,7 +67,9 @@ __all__ = [
     # Models
     'Base',
     'Prediction',
+    'PredictionRollup',
     'StartupProfile',
+    'ProfileRevision',
     'APIKey',
     'ModelVersion',
     'AuditLog',
@@ -58,4 +81,20 @@ __all__ = [
     'APIKeyRepository',
     'ModelVersionRepository',
     'AuditLogRepository',
+    
+    # Prediction rollups
+    'HyperLogLog',
+    'apply_prediction_rollups',
+    'rebuild_rollups',
+    'read_statistics',
+    
+    # Startup profile history
+    'append_revisions',
+    'features_as_of',
+    'score_trajectory',
+    
+    # Write-behind persistence
+    'WriteBehindQueue',
+    'WriteBehindFull',
+    'write_behind',
 ]
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+In-process cache for API-key authentication
+Validated key hashes are kept for a short TTL (misses for a shorter one) and
+usage counters are summed in memory, then written back in one bulk UPDATE,
+so an authenticated request costs no database round trip.
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+
+from database.connection import get_session
+from database.models import APIKey
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedAPIKey:
+    """The fields of a validated key that request handling needs"""
+    id: Any
+    name: str
+    owner_email: Optional[str]
+    rate_limit_per_minute: Optional[int]
+    expires_at: Optional[datetime]
+
+
+class APIKeyCache:
+    """
+    TTL cache of key hash -> validated key (or None for unknown keys)
+
+    Revocations through ``APIKeyRepository.revoke`` invalidate the entry in
+    this process; other worker processes stop accepting the key when their
+    entry expires, so ``ttl`` bounds how long a revoked key keeps working.
+    """
+
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 10.0, max_entries: int = 10000,
+                 flush_interval: float = 30.0, session_factory: Callable = get_session):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+
+        self._entries: Dict[str, Tuple[float, Optional[CachedAPIKey]]] = {}
+        self._usage: Dict[Any, list] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"hits": 0, "misses": 0, "usage_flushes": 0}
+
+    def lookup(self, key_hash: str, loader: Callable[[str], Optional[CachedAPIKey]]) -> Optional[CachedAPIKey]:
+        """Validated key for a hash, calling ``loader`` only on a miss or expired entry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key_hash)
+        if entry is not None and entry[0] > now:
+            self.stats["hits"] += 1
+            key = entry[1]
+        else:
+            self.stats["misses"] += 1
+            key = loader(key_hash)
+            self._store(key_hash, key, now)
+
+        if key is not None and key.expires_at is not None and key.expires_at < datetime.utcnow():
+            return None
+        return key
+
+    def _store(self, key_hash: str, key: Optional[CachedAPIKey], now: float):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key_hash not in self._entries:
+                for stale in [h for h, (expires, _) in self._entries.items() if expires <= now]:
+                    del self._entries[stale]
+                if len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key_hash] = (now + (self.ttl if key is not None else self.negative_ttl), key)
+
+    def invalidate(self, key_hash: Optional[str] = None):
+        """Drop one key hash, or every entry"""
+        with self._lock:
+            if key_hash is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key_hash, None)
+
+    def record_use(self, key_id: Any):
+        """Count a request against a key; written back on the next flush"""
+        now = datetime.utcnow()
+        with self._lock:
+            usage = self._usage.get(key_id)
+            if usage is None:
+                self._usage[key_id] = [1, now]
+            else:
+                usage[0] += 1
+                usage[1] = now
+
+    def flush_usage(self) -> int:
+        """Add the pending request counts to their keys in one bulk UPDATE; returns keys updated"""
+        with self._lock:
+            pending, self._usage = self._usage, {}
+        if not pending:
+            return 0
+
+        table = APIKey.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("key_id"))
+            .values(
+                total_requests=func.coalesce(table.c.total_requests, 0) + bindparam("requests"),
+                last_used_at=bindparam("used_at")
+            )
+        )
+        rows = [{"key_id": key_id, "requests": count, "used_at": used_at}
+                for key_id, (count, used_at) in pending.items()]
+        try:
+            with self.session_factory() as session:
+                session.execute(statement, rows)
+        except Exception as e:
+            logger.error(f"API key usage flush failed, keeping counts for the next one: {e}")
+            with self._lock:
+                for key_id, (count, used_at) in pending.items():
+                    usage = self._usage.setdefault(key_id, [0, used_at])
+                    usage[0] += count
+                    usage[1] = max(usage[1], used_at)
+            return 0
+
+        self.stats["usage_flushes"] += 1
+        return len(rows)
+
+    def start(self):
+        """Flush usage counters every ``flush_interval`` seconds on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="api-key-usage", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write back the remaining counts"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush_usage()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush_usage()
+
+
+# Global cache, shared by every APIKeyRepository in the process
+api_key_cache = APIKeyCache()
@@ -3,7 +3,7 @@ Database Models for FLASH Platform
 Uses SQLAlchemy ORM for PostgreSQL support
 """
 
-from sqlalchemy import Column, String, Float, Boolean, Integer, JSON, DateTime, ForeignKey, Index, Text
+from sqlalchemy import Column, String, Float, Boolean, Integer, JSON, DateTime, ForeignKey, Index, Text, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -86,11 +86,32 @@ class Prediction(Base):
     __table_args__ = (
         Index('idx_created_at', created_at),
         Index('idx_user_id', user_id),
+        Index('idx_user_created', user_id, created_at, id),  # Keyset pagination of history
         Index('idx_verdict', verdict),
         Index('idx_success_probability', success_probability),
     )
 
 
+class PredictionRollup(Base):
+    """Per-hour and per-day prediction aggregates, maintained as predictions are written"""
+    __tablename__ = 'prediction_rollups'
+    
+    period = Column(String(10), primary_key=True)  # 'hour', 'day'
+    bucket_start = Column(DateTime, primary_key=True)  # UTC
+    updated_at = Column(DateTime)
+    
+    # Aggregates
+    prediction_count = Column(Integer, nullable=False, default=0)
+    probability_sum = Column(Float, nullable=False, default=0.0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    verdict_counts = Column(JSON)  # verdict -> count
+    user_sketch = Column(LargeBinary)  # HyperLogLog registers of user IDs
+    
+    __table_args__ = (
+        Index('idx_rollup_bucket', bucket_start),
+    )
+
+
 class StartupProfile(Base):
     """Store detailed startup profiles for tracking"""
     __tablename__ = 'startup_profiles'
@@ -121,6 +142,34 @@ class StartupProfile(Base):
     # Relationships will be defined separately to avoid circular dependencies
 
 
+class ProfileRevision(Base):
+    """
+    Feature history of a startup: a full snapshot every few revisions and
+    per-prediction deltas ({"set": {...}, "unset": [...]}) in between
+    """
+    __tablename__ = 'startup_profile_revisions'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    startup_name = Column(String(255), nullable=False)
+    revision = Column(Integer, nullable=False)  # 1, 2, ... per startup
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    prediction_id = Column(UUID(as_uuid=True), ForeignKey('predictions.id'))
+    
+    # Features: full dict when is_snapshot, otherwise a delta from the previous revision
+    is_snapshot = Column(Boolean, nullable=False, default=False)
+    features = Column(JSON, nullable=False)
+    
+    # Scores, so trajectories never touch the feature payloads
+    success_probability = Column(Float, nullable=False)
+    confidence_score = Column(Float)
+    verdict = Column(String(50))
+    
+    __table_args__ = (
+        Index('idx_revision_startup', startup_name, revision, unique=True),
+        Index('idx_revision_startup_time', startup_name, recorded_at),
+    )
+
+
 class APIKey(Base):
     """Manage API keys for authentication"""
     __tablename__ = 'api_keys'
@@ -0,0 +1,141 @@
+"""
+Startup profile time series
+Each prediction for a named startup appends a revision holding its scores and
+only the features that changed since the previous one; a full snapshot every
+few revisions bounds how many deltas a point-in-time read has to replay.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, select
+
+from database.models import ProfileRevision
+
+# A snapshot is written at least this often, so "as of" reads replay few deltas
+SNAPSHOT_EVERY = 12
+
+_MISSING = object()
+
+
+def feature_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Changes turning ``old`` into ``new``"""
+    delta = {"set": {k: v for k, v in new.items() if old.get(k, _MISSING) != v}}
+    unset = [k for k in old if k not in new]
+    if unset:
+        delta["unset"] = unset
+    return delta
+
+
+def apply_delta(features: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Features after a delta; ``features`` is left unchanged"""
+    features = {**features, **delta.get("set", {})}
+    for key in delta.get("unset", ()):
+        features.pop(key, None)
+    return features
+
+
+def _replay(rows) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+    """(revision, features) after rows ordered by revision, starting at a snapshot"""
+    revision, features = None, None
+    for row in rows:
+        features = dict(row.features) if row.is_snapshot else apply_delta(features or {}, row.features)
+        revision = row.revision
+    return revision, features
+
+
+def _snapshot_chain(names: List[str], at: Optional[datetime] = None):
+    """Revisions from each startup's latest snapshot (at or before ``at``) onwards"""
+    table = ProfileRevision.__table__
+    window = [table.c.startup_name.in_(names)]
+    if at is not None:
+        window.append(table.c.recorded_at <= at)
+    last_snapshot = (
+        select(table.c.startup_name, func.max(table.c.revision).label("revision"))
+        .where(table.c.is_snapshot.is_(True), *window)
+        .group_by(table.c.startup_name)
+        .subquery()
+    )
+    return (
+        select(table.c.startup_name, table.c.revision, table.c.is_snapshot, table.c.features)
+        .select_from(table.join(last_snapshot, and_(
+            table.c.startup_name == last_snapshot.c.startup_name,
+            table.c.revision >= last_snapshot.c.revision
+        )))
+        .where(*window)
+        .order_by(table.c.startup_name, table.c.revision)
+    )
+
+
+def append_revisions(session, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Append one revision per prediction row (name, created_at, input_features,
+    success_probability, plus optional confidence_score, verdict, prediction_id)
+
+    Runs in the caller's transaction; rows for the same startup are applied in
+    created_at order. Returns the number of revisions written.
+    """
+    by_name = defaultdict(list)
+    for row in rows:
+        by_name[row["name"]].append(row)
+    if not by_name:
+        return 0
+
+    chains = defaultdict(list)
+    for row in session.execute(_snapshot_chain(list(by_name))):
+        chains[row.startup_name].append(row)
+
+    revisions = []
+    for name, updates in by_name.items():
+        revision, features = _replay(chains.get(name, ()))
+        revision = revision or 0
+        last_snapshot = max((r.revision for r in chains.get(name, ()) if r.is_snapshot), default=0)
+
+        for row in sorted(updates, key=lambda r: r["created_at"]):
+            new = row["input_features"] or {}
+            revision += 1
+            delta = feature_delta(features, new) if features is not None else None
+            snapshot = (
+                delta is None
+                or revision - last_snapshot >= SNAPSHOT_EVERY
+                or len(delta["set"]) + len(delta.get("unset", ())) > len(new) // 2
+            )
+            if snapshot:
+                last_snapshot = revision
+            revisions.append({
+                "startup_name": name,
+                "revision": revision,
+                "recorded_at": row["created_at"],
+                "prediction_id": row.get("prediction_id"),
+                "is_snapshot": snapshot,
+                "features": new if snapshot else delta,
+                "success_probability": row["success_probability"],
+                "confidence_score": row.get("confidence_score"),
+                "verdict": row.get("verdict"),
+            })
+            features = new
+
+    session.execute(insert(ProfileRevision.__table__), revisions)
+    return len(revisions)
+
+
+def features_as_of(session, name: str, at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """A startup's features at ``at`` (latest if None), or None before its first revision"""
+    return _replay(session.execute(_snapshot_chain([name], at)))[1]
+
+
+def score_trajectory(session, name: str, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """A startup's scores over time, oldest first, without reading any features"""
+    table = ProfileRevision.__table__
+    query = (
+        select(table.c.revision, table.c.recorded_at, table.c.prediction_id,
+               table.c.success_probability, table.c.confidence_score, table.c.verdict)
+        .where(table.c.startup_name == name)
+    )
+    if since is not None:
+        query = query.where(table.c.recorded_at >= since)
+    if until is not None:
+        query = query.where(table.c.recorded_at <= until)
+    return [dict(row._mapping) for row in session.execute(query.order_by(table.c.revision))]
@@ -6,14 +6,17 @@ Provides data access layer with business logic
 import hashlib
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import and_, desc, or_, select, update
 
 from database.models import (
     Prediction, StartupProfile, APIKey, 
     ModelVersion, AuditLog, PerformanceMetrics
 )
+from database.api_key_cache import api_key_cache, CachedAPIKey
+from database.rollups import apply_prediction_rollups, read_statistics
+from database.profile_history import append_revisions, features_as_of, score_trajectory
 
 
 class PredictionRepository:
@@ -45,9 +48,18 @@ class PredictionRepository:
             model_predictions=model_predictions,
             **kwargs
         )
+        if prediction.created_at is None:
+            prediction.created_at = datetime.utcnow()
         
         self.session.add(prediction)
         self.session.flush()
+        apply_prediction_rollups(self.session, [{
+            'created_at': prediction.created_at,
+            'success_probability': success_probability,
+            'confidence_score': confidence_score,
+            'verdict': verdict,
+            'user_id': prediction.user_id
+        }])
         return prediction
     
     def get_by_id(self, prediction_id: uuid.UUID) -> Optional[Prediction]:
@@ -58,46 +70,34 @@ class PredictionRepository:
         self, 
         user_id: str, 
         limit: int = 100,
-        offset: int = 0
-    ) -> List[Prediction]:
-        """Get predictions for a specific user"""
-        return (
-            self.session.query(Prediction)
-            .filter_by(user_id=user_id)
-            .order_by(desc(Prediction.created_at))
-            .limit(limit)
-            .offset(offset)
-            .all()
-        )
+        offset: int = 0,
+        before: Optional[Tuple[datetime, Any]] = None
+    ) -> List[Any]:
+        """
+        Get predictions for a specific user, newest first
+        
+        Pass the (created_at, id) of the last row seen as ``before`` to fetch
+        the next page; unlike ``offset`` this reads only the rows returned.
+        """
+        table = Prediction.__table__
+        query = select(table).where(table.c.user_id == user_id)
+        if before is not None:
+            created_at, prediction_id = before
+            query = query.where(or_(
+                table.c.created_at < created_at,
+                and_(table.c.created_at == created_at, table.c.id < prediction_id)
+            ))
+        elif offset:
+            query = query.offset(offset)
+        
+        return self.session.execute(
+            query.order_by(desc(table.c.created_at), desc(table.c.id)).limit(limit)
+        ).all()
     
     def get_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """Get prediction statistics for the last N days"""
+        """Get prediction statistics for the last N days, read from the hourly/daily rollups"""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        stats = self.session.query(
-            func.count(Prediction.id).label('total'),
-            func.avg(Prediction.success_probability).label('avg_probability'),
-            func.avg(Prediction.confidence_score).label('avg_confidence'),
-            func.count(func.distinct(Prediction.user_id)).label('unique_users')
-        ).filter(Prediction.created_at >= cutoff_date).first()
-        
-        verdict_counts = (
-            self.session.query(
-                Prediction.verdict,
-                func.count(Prediction.id).label('count')
-            )
-            .filter(Prediction.created_at >= cutoff_date)
-            .group_by(Prediction.verdict)
-            .all()
-        )
-        
-        return {
-            'total_predictions': stats.total or 0,
-            'avg_success_probability': float(stats.avg_probability or 0),
-            'avg_confidence_score': float(stats.avg_confidence or 0),
-            'unique_users': stats.unique_users or 0,
-            'verdict_distribution': {v: c for v, c in verdict_counts}
-        }
+        return read_statistics(self.session, since=cutoff_date)
 
 
 class StartupProfileRepository:
@@ -143,6 +143,28 @@ class StartupProfileRepository:
             profile.avg_success_probability = prediction.success_probability
         
         self.session.flush()
+        append_revisions(self.session, [{
+            'name': profile.name,
+            'created_at': prediction.created_at,
+            'input_features': prediction.input_features,
+            'success_probability': prediction.success_probability,
+            'confidence_score': prediction.confidence_score,
+            'verdict': prediction.verdict,
+            'prediction_id': prediction.id
+        }])
+    
+    def get_trajectory(
+        self,
+        name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Score history of a startup, oldest first"""
+        return score_trajectory(self.session, name, since=since, until=until)
+    
+    def get_features_as_of(self, name: str, at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Features a startup was scored with at a point in time (latest if None)"""
+        return features_as_of(self.session, name, at)
     
     def search(
         self,
@@ -198,30 +220,48 @@ class APIKeyRepository:
         
         self.session.add(api_key)
         self.session.flush()
+        api_key_cache.invalidate(key_hash)
         
         return api_key, raw_key
     
-    def validate_key(self, raw_key: str) -> Optional[APIKey]:
-        """Validate API key and return key object if valid"""
-        key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
+    def validate_key(self, raw_key: str) -> Optional[CachedAPIKey]:
+        """
+        Validate API key and return its cached details if valid
         
-        api_key = self.session.query(APIKey).filter_by(
-            key_hash=key_hash,
-            is_active=True
-        ).first()
+        Served from the process-wide cache; usage counters are written back
+        in bulk by the cache rather than on every call.
+        """
+        key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
+        api_key = api_key_cache.lookup(key_hash, self._load_active_key)
         
         if api_key:
-            # Check expiration
-            if api_key.expires_at and api_key.expires_at < datetime.utcnow():
-                return None
-            
-            # Update usage
-            api_key.last_used_at = datetime.utcnow()
-            api_key.total_requests = (api_key.total_requests or 0) + 1
-            self.session.flush()
+            api_key_cache.record_use(api_key.id)
         
         return api_key
     
+    def _load_active_key(self, key_hash: str) -> Optional[CachedAPIKey]:
+        table = APIKey.__table__
+        row = self.session.execute(
+            select(table.c.id, table.c.name, table.c.owner_email,
+                   table.c.rate_limit_per_minute, table.c.expires_at)
+            .where(table.c.key_hash == key_hash, table.c.is_active.is_(True))
+        ).first()
+        return CachedAPIKey(**row._mapping) if row else None
+    
+    def revoke(self, key_id: uuid.UUID) -> bool:
+        """Deactivate a key and drop it from the cache; returns False if no such key"""
+        table = APIKey.__table__
+        key_hash = self.session.execute(
+            select(table.c.key_hash).where(table.c.id == key_id)
+        ).scalar()
+        if key_hash is None:
+            return False
+        
+        self.session.execute(update(table).where(table.c.id == key_id).values(is_active=False))
+        self.session.flush()
+        api_key_cache.invalidate(key_hash)
+        return True
+    
     def get_all_active(self) -> List[APIKey]:
         """Get all active API keys"""
         return self.session.query(APIKey).filter_by(is_active=True).all()
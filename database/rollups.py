@@ -0,0 +1,209 @@
+"""
+Hourly and daily prediction rollups
+Counts, probability/confidence sums, verdict histograms and a HyperLogLog
+sketch of user IDs per time bucket, folded in as predictions are written, so
+statistics read a few hundred rollup rows instead of scanning predictions.
+"""
+
+import hashlib
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import insert, or_, select, update
+
+from database.models import Prediction, PredictionRollup
+
+HOUR = "hour"
+DAY = "day"
+PERIODS = (HOUR, DAY)
+
+
+class HyperLogLog:
+    """
+    Fixed-size distinct-count sketch (2 ** precision one-byte registers)
+
+    Sketches merge with an element-wise max, so a range of buckets yields one
+    estimate without ever revisiting the user IDs. The default precision keeps
+    the standard error near 1.6% in 4 KB.
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        self.precision = precision
+        size = 1 << precision
+        if registers is None:
+            self.registers = np.zeros(size, dtype=np.uint8)
+        else:
+            self.registers = np.frombuffer(registers, dtype=np.uint8).copy()
+            if self.registers.size != size:
+                raise ValueError(f"Expected {size} registers, got {self.registers.size}")
+
+    def add(self, value: str):
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
+
+
+def bucket_start(ts: datetime, period: str) -> datetime:
+    """Start of the hour or day containing ``ts``, as naive UTC"""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if period == DAY else ts
+
+
+def apply_prediction_rollups(session, rows: Iterable[Dict[str, Any]]):
+    """
+    Fold prediction rows into their hourly and daily rollups
+
+    Runs in the caller's transaction, so rollups commit with the predictions
+    they count. Each touched bucket is read (locked on PostgreSQL), merged
+    and written back once per call.
+    """
+    table = PredictionRollup.__table__
+    folded: Dict[Tuple[str, datetime], Dict[str, Any]] = defaultdict(
+        lambda: {"count": 0, "probability": 0.0, "confidence": 0.0, "verdicts": Counter(), "users": set()}
+    )
+    for row in rows:
+        created_at = row.get("created_at") or datetime.utcnow()
+        for period in PERIODS:
+            bucket = folded[(period, bucket_start(created_at, period))]
+            bucket["count"] += 1
+            bucket["probability"] += row["success_probability"]
+            bucket["confidence"] += row.get("confidence_score") or 0.0
+            bucket["verdicts"][row["verdict"]] += 1
+            if row.get("user_id"):
+                bucket["users"].add(str(row["user_id"]))
+    if not folded:
+        return
+
+    existing = {}
+    for period in PERIODS:
+        starts = [start for p, start in folded if p == period]
+        if starts:
+            for current in session.execute(
+                select(table).where(table.c.period == period, table.c.bucket_start.in_(starts)).with_for_update()
+            ):
+                existing[(period, current.bucket_start)] = current
+
+    now = datetime.utcnow()
+    created = []
+    for key, bucket in folded.items():
+        current = existing.get(key)
+        sketch = HyperLogLog(registers=current.user_sketch if current is not None and current.user_sketch else None)
+        for user_id in bucket["users"]:
+            sketch.add(user_id)
+        verdicts = Counter(current.verdict_counts or {}) if current is not None else Counter()
+        verdicts.update(bucket["verdicts"])
+        values = {
+            "prediction_count": (current.prediction_count if current is not None else 0) + bucket["count"],
+            "probability_sum": (current.probability_sum if current is not None else 0.0) + bucket["probability"],
+            "confidence_sum": (current.confidence_sum if current is not None else 0.0) + bucket["confidence"],
+            "verdict_counts": dict(verdicts),
+            "user_sketch": sketch.to_bytes(),
+            "updated_at": now,
+        }
+        if current is None:
+            created.append({"period": key[0], "bucket_start": key[1], **values})
+        else:
+            session.execute(
+                update(table).where(table.c.period == key[0], table.c.bucket_start == key[1]).values(**values)
+            )
+
+    if created:
+        session.execute(insert(table), created)
+
+
+def rebuild_rollups(session, since: Optional[datetime] = None, chunk_size: int = 5000) -> int:
+    """Recompute rollups from the predictions table (e.g. after the table is added); returns rows read"""
+    rollups = PredictionRollup.__table__
+    predictions = Prediction.__table__
+    delete = rollups.delete()
+    if since is not None:
+        # Whole days, so the daily bucket containing ``since`` is rebuilt completely
+        since = bucket_start(since, DAY)
+        delete = delete.where(rollups.c.bucket_start >= since)
+    session.execute(delete)
+
+    query = select(predictions.c.created_at, predictions.c.success_probability,
+                   predictions.c.confidence_score, predictions.c.verdict, predictions.c.user_id)
+    if since is not None:
+        query = query.where(predictions.c.created_at >= since)
+
+    total = 0
+    result = session.execute(query.execution_options(yield_per=chunk_size))
+    for chunk in result.partitions(chunk_size):
+        apply_prediction_rollups(session, (row._asdict() for row in chunk))
+        total += len(chunk)
+    return total
+
+
+def _covering_buckets(since: datetime, until: datetime) -> List[Tuple[str, datetime, datetime]]:
+    """Daily buckets for whole days inside [since, until], hourly buckets for the edges"""
+    start = bucket_start(since, HOUR)
+    first_day = bucket_start(start, DAY)
+    if first_day < start:
+        first_day += timedelta(days=1)
+    last_day = bucket_start(until, DAY)
+    if first_day >= last_day:
+        return [(HOUR, start, until)]
+    ranges = [(DAY, first_day, last_day - timedelta(days=1))]
+    if start < first_day:
+        ranges.append((HOUR, start, first_day - timedelta(hours=1)))
+    ranges.append((HOUR, last_day, until))
+    return ranges
+
+
+def read_statistics(session, since: datetime, until: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Prediction statistics for [since, until] from the rollups
+
+    Resolution is one hour: the hour containing ``since`` is counted whole.
+    ``unique_users`` is a HyperLogLog estimate.
+    """
+    table = PredictionRollup.__table__
+    until = until or datetime.utcnow()
+    conditions = [
+        (table.c.period == period) & table.c.bucket_start.between(first, last)
+        for period, first, last in _covering_buckets(since, until)
+    ]
+    rows = session.execute(
+        select(table.c.prediction_count, table.c.probability_sum, table.c.confidence_sum,
+               table.c.verdict_counts, table.c.user_sketch).where(or_(*conditions))
+    ).all()
+
+    total = sum(row.prediction_count for row in rows)
+    verdicts = Counter()
+    users = HyperLogLog()
+    for row in rows:
+        verdicts.update(row.verdict_counts or {})
+        if row.user_sketch:
+            users.merge(HyperLogLog(registers=row.user_sketch))
+
+    return {
+        'total_predictions': total,
+        'avg_success_probability': sum(row.probability_sum for row in rows) / total if total else 0.0,
+        'avg_confidence_score': sum(row.confidence_sum for row in rows) / total if total else 0.0,
+        'unique_users': users.count(),
+        'verdict_distribution': dict(verdicts)
+    }
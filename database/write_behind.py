@@ -0,0 +1,277 @@
+"""
+Write-behind persistence for predictions, profile updates and audit logs
+Requests enqueue records and return; a background worker bulk-inserts them
+in one transaction per batch, so database latency stays off the request path.
+"""
+
+import json
+import time
+import uuid
+import queue
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+
+from config import settings
+from database.connection import get_session
+from database.models import Prediction, StartupProfile, AuditLog
+from database.rollups import apply_prediction_rollups
+from database.profile_history import append_revisions
+
+logger = logging.getLogger(__name__)
+
+# Record kinds, written in this order so profiles can reference their prediction
+PREDICTION = "prediction"
+PROFILE = "profile"
+AUDIT = "audit"
+
+
+class WriteBehindFull(Exception):
+    """The queue stayed full for the whole enqueue timeout"""
+    pass
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of pending database records with a batching writer thread
+
+    ``submit()`` waits up to ``enqueue_timeout`` for room, so a database that
+    falls behind slows producers down instead of growing memory; callers get
+    ``WriteBehindFull`` once that wait runs out. The writer takes up to
+    ``batch_size`` records (or whatever arrived within ``flush_interval``),
+    inserts predictions and audit rows with one multi-row INSERT each, folds
+    profile updates, feature revisions and hourly/daily rollups per batch,
+    and commits once. A failed batch is retried
+    and then spilled to ``dead_letter_path`` rather than dropped; ``stop()``
+    drains everything still queued before returning.
+    """
+
+    def __init__(self, session_factory: Callable = get_session, max_pending: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 0.25,
+                 enqueue_timeout: float = 2.0, max_retries: int = 3,
+                 dead_letter_path: str = "write_behind_failed.ndjson"):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.dead_letter_path = Path(dead_letter_path)
+
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"written": 0, "batches": 0, "failed_batches": 0, "dead_lettered": 0, "rejected": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        """Start the writer thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        logger.info(f"Write-behind persistence started (max {self._queue.maxsize} pending)")
+
+    def stop(self, timeout: float = 30.0):
+        """Stop the writer after flushing every queued record"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        # Anything enqueued after the writer's last drain
+        while self.pending:
+            self._write(self._take(block=False))
+        logger.info(f"Write-behind persistence stopped ({self.stats['written']} records written)")
+
+    def submit(self, *records: Tuple[str, Dict[str, Any]]):
+        """Enqueue records, waiting for room up to ``enqueue_timeout``"""
+        deadline = time.monotonic() + self.enqueue_timeout
+        for record in records:
+            try:
+                self._queue.put(record, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                self.stats["rejected"] += 1
+                raise WriteBehindFull(f"{self.pending} records pending")
+
+    async def asubmit(self, *records: Tuple[str, Dict[str, Any]]):
+        """Enqueue from the event loop; only waits in a worker thread when the queue is full"""
+        try:
+            for i, record in enumerate(records):
+                self._queue.put_nowait(record)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.submit(*records[i:]))
+
+    def _run(self):
+        while not self._stop.is_set() or self.pending:
+            batch = self._take(block=True)
+            if batch:
+                self._write(batch)
+
+    def _take(self, block: bool) -> List[Tuple[str, Dict[str, Any]]]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        if not batch:
+            return
+        by_kind = defaultdict(list)
+        for kind, row in batch:
+            by_kind[kind].append(row)
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with self.session_factory() as session:
+                    if by_kind[PREDICTION]:
+                        self._bulk_insert(session, Prediction.__table__, by_kind[PREDICTION])
+                        apply_prediction_rollups(session, by_kind[PREDICTION])
+                    if by_kind[PROFILE]:
+                        self._apply_profile_updates(session, by_kind[PROFILE])
+                        append_revisions(session, by_kind[PROFILE])
+                    if by_kind[AUDIT]:
+                        self._bulk_insert(session, AuditLog.__table__, by_kind[AUDIT])
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                self.stats["failed_batches"] += 1
+                logger.error(f"Write-behind batch of {len(batch)} failed (attempt {attempt}): {e}")
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+
+        self._dead_letter(batch)
+
+    @staticmethod
+    def _bulk_insert(session, table, rows: List[Dict[str, Any]]):
+        """One multi-row INSERT; rows are widened to the same columns, as VALUES lists require"""
+        columns = sorted({name for row in rows for name in row})
+        session.execute(insert(table).values([{name: row.get(name) for name in columns} for row in rows]))
+
+    @staticmethod
+    def _apply_profile_updates(session, updates: List[Dict[str, Any]]):
+        """Get-or-create each startup once per batch and fold its predictions in"""
+        profiles = StartupProfile.__table__
+        by_name = defaultdict(list)
+        for profile_update in updates:
+            by_name[profile_update["name"]].append(profile_update)
+
+        existing = {
+            row.name: row for row in session.execute(
+                select(profiles.c.name, profiles.c.total_predictions, profiles.c.avg_success_probability,
+                       profiles.c.first_prediction_date).where(profiles.c.name.in_(list(by_name)))
+            )
+        }
+        created = []
+        for name, rows in by_name.items():
+            rows.sort(key=lambda r: r["created_at"])
+            latest = rows[-1]
+            current = existing.get(name)
+            previous = (current.total_predictions or 0) if current else 0
+            total = previous + len(rows)
+            batch_sum = sum(r["success_probability"] for r in rows)
+            values = {
+                "latest_features": latest["input_features"],
+                "latest_prediction_id": latest["prediction_id"],
+                "last_prediction_date": latest["created_at"],
+                "total_predictions": total,
+                "avg_success_probability": (
+                    ((current.avg_success_probability or 0) if current else 0) * previous + batch_sum
+                ) / total,
+            }
+
+            if current is None:
+                first = rows[0]
+                created.append({
+                    **values, "id": uuid.uuid4(), "name": name, "sector": first.get("sector"),
+                    "funding_stage": first.get("funding_stage"), "hq_location": first.get("hq_location"),
+                    "first_prediction_date": first["created_at"]
+                })
+            else:
+                if not current.first_prediction_date:
+                    values["first_prediction_date"] = rows[0]["created_at"]
+                session.execute(update(profiles).where(profiles.c.name == name).values(**values))
+
+        if created:
+            WriteBehindQueue._bulk_insert(session, profiles, created)
+
+    def _dead_letter(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Keep records the database would not take, for replay"""
+        try:
+            with open(self.dead_letter_path, "a") as f:
+                for kind, row in batch:
+                    f.write(json.dumps({"kind": kind, "row": row}, default=str) + "\n")
+            self.stats["dead_lettered"] += len(batch)
+            logger.error(f"Spilled {len(batch)} records to {self.dead_letter_path}")
+        except OSError as e:
+            logger.critical(f"Lost {len(batch)} records, dead-letter file unwritable: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"running": self.running, "pending": self.pending, **self.stats}
+
+
+def prediction_records(prediction: Dict[str, Any], profile: Optional[Dict[str, Any]] = None,
+                       audit: Optional[Dict[str, Any]] = None) -> Tuple[uuid.UUID, List[Tuple[str, Dict]]]:
+    """
+    Records for one stored prediction: the row, its profile update and its audit entry
+
+    The prediction ID and timestamp are assigned here, at request time, so the
+    response and the audit entry can reference a row that is not written yet.
+    """
+    prediction_id = uuid.uuid4()
+    created_at = datetime.utcnow()
+    camp_scores = prediction.pop("camp_scores", {}) or {}
+    records = [(PREDICTION, {
+        **prediction,
+        "id": prediction_id,
+        "created_at": created_at,
+        "capital_score": camp_scores.get("capital"),
+        "advantage_score": camp_scores.get("advantage"),
+        "market_score": camp_scores.get("market"),
+        "people_score": camp_scores.get("people"),
+    })]
+    if profile is not None:
+        records.append((PROFILE, {
+            **profile,
+            "prediction_id": prediction_id,
+            "created_at": created_at,
+            "success_probability": prediction["success_probability"],
+            "confidence_score": prediction.get("confidence_score"),
+            "verdict": prediction.get("verdict"),
+            "input_features": prediction["input_features"],
+        }))
+    if audit is not None:
+        records.append(audit_record(entity_type="prediction", entity_id=str(prediction_id), **audit))
+    return prediction_id, records
+
+
+def audit_record(action: str, status: str = "success", **fields) -> Tuple[str, Dict[str, Any]]:
+    """Audit log record, timestamped at request time"""
+    return AUDIT, {"id": uuid.uuid4(), "timestamp": datetime.utcnow(), "action": action,
+                   "status": status, **fields}
+
+
+# Global queue, started and drained by the API server lifespan
+write_behind = WriteBehindQueue(
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE
+)
@@ -15,9 +15,22 @@ import os
 
 from strategic_context_engine import CompanyContext, StrategicInflection
 from framework_intelligence.framework_database import Framework, get_framework_by_id, FRAMEWORKS
+from utils.vector_index import VectorIndex
 
 logger = logging.getLogger(__name__)
 
+# Context embedding layout (see _embed_context)
+CONTEXT_EMBEDDING_DIM = 17
+
+# Minimum cosine similarity for a historical pattern to count as similar
+PATTERN_SIMILARITY_THRESHOLD = 0.6
+
+# Challenge keywords in pattern libraries imply an inflection point
+CHALLENGE_INFLECTIONS = {
+    "pmf": StrategicInflection.PRE_PMF,
+    "scaling": StrategicInflection.SCALING_GROWTH
+}
+
 
 # Industry-specific framework variants
 INDUSTRY_FRAMEWORK_VARIANTS = {
@@ -152,6 +165,7 @@ class IntelligentFrameworkSelector:
         self.embeddings_model = self._initialize_embeddings_model()
         self.pattern_matcher = self._initialize_pattern_matcher()
         self.success_patterns = self._load_success_patterns()
+        self.pattern_index = self._build_pattern_index()
         self.phd_enhancements = self._load_phd_enhancements()
         self.framework_synergies = self._load_framework_synergies()
         self.framework_prerequisites = self._load_framework_prerequisites()
@@ -204,6 +218,41 @@ class IntelligentFrameworkSelector:
             ]
         }
     
+    def _load_historical_patterns(self) -> List[Dict]:
+        """Load historical successful-company patterns, if a library is available"""
+        try:
+            library_path = os.path.join(os.path.dirname(__file__), 'success_pattern_library.json')
+            with open(library_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Error loading success pattern library: {e}")
+            return []
+    
+    def _build_pattern_index(self) -> VectorIndex:
+        """Embed every known success pattern into a nearest-neighbour index"""
+        index = VectorIndex(CONTEXT_EMBEDDING_DIM, approximate=True)
+        patterns = [
+            pattern
+            for patterns in self.success_patterns.values()
+            for pattern in patterns
+        ]
+        patterns.extend(self._load_historical_patterns())
+        self._add_patterns_to_index(index, patterns)
+        logger.info(f"Indexed {len(index)} success patterns for framework selection")
+        return index
+    
+    def add_success_patterns(self, patterns: List[Dict]) -> None:
+        """Add historical success patterns to the similarity index"""
+        self._add_patterns_to_index(self.pattern_index, patterns)
+    
+    def _add_patterns_to_index(self, index: VectorIndex, patterns: List[Dict]) -> None:
+        if not patterns:
+            return
+        embeddings = np.vstack([self._generate_pattern_embedding(p) for p in patterns])
+        index.add(embeddings, patterns)
+    
     def _load_phd_enhancements(self) -> Dict[str, Dict[str, Any]]:
         """Load PhD-level framework enhancements"""
         try:
@@ -286,60 +335,97 @@ class IntelligentFrameworkSelector:
         
     def _generate_context_embedding(self, context: CompanyContext) -> np.ndarray:
         """Generate embedding for company context"""
-        # In production, would use actual embeddings model
-        # For now, creating feature vector
+        return self._embed_context(
+            key_metrics=context.key_metrics,
+            industry=context.industry,
+            stage=context.stage,
+            inflection=context.current_inflection,
+            num_challenges=len(context.key_challenges),
+            num_opportunities=len(context.strategic_opportunities)
+        )
+    
+    def _generate_pattern_embedding(self, pattern: Dict) -> np.ndarray:
+        """Generate embedding for a historical success pattern"""
+        pattern_context = pattern.get("context", {})
+        challenges = [c for c in pattern_context.get("challenge", "").split(",") if c]
+        
+        inflection = pattern_context.get("inflection")
+        if inflection is not None:
+            inflection = StrategicInflection(inflection)
+        else:
+            inflection = next(
+                (CHALLENGE_INFLECTIONS[c] for c in challenges if c in CHALLENGE_INFLECTIONS),
+                None
+            )
+        
+        return self._embed_context(
+            key_metrics=pattern_context.get("key_metrics", {}),
+            industry=pattern_context.get("industry"),
+            stage=pattern_context.get("stage"),
+            inflection=inflection,
+            num_challenges=len(challenges),
+            num_opportunities=pattern_context.get("num_opportunities", 0)
+        )
+    
+    def _embed_context(
+        self,
+        key_metrics: Dict[str, float],
+        industry: Optional[str],
+        stage: Optional[str],
+        inflection: Optional[StrategicInflection],
+        num_challenges: int,
+        num_opportunities: int
+    ) -> np.ndarray:
+        """Build the context feature vector shared by companies and patterns"""
+        # Numeric features are squashed with tanh so a large revenue or burn
+        # figure cannot dominate the cosine similarity of the one-hot blocks
+        numeric = np.tanh([
+            (key_metrics.get("revenue", 0) or 0) / 1e6,  # Revenue in millions
+            (key_metrics.get("growth_rate", 0) or 0) / 100,
+            (key_metrics.get("burn_rate", 0) or 0) / 1e5,
+            key_metrics.get("ltv_cac", 0) or 0,
+            (key_metrics.get("market_share", 0) or 0) / 100
+        ])
+        
         features = [
-            # Numeric features
-            context.key_metrics.get("revenue", 0) / 1e6,  # Revenue in millions
-            context.key_metrics.get("growth_rate", 0) / 100,
-            context.key_metrics.get("burn_rate", 0) / 1e5,
-            context.key_metrics.get("ltv_cac", 0),
-            context.key_metrics.get("market_share", 0) / 100,
+            *numeric,
             
             # Categorical features (one-hot encoded)
-            1 if context.industry == "saas_b2b" else 0,
-            1 if context.industry == "marketplace" else 0,
-            1 if context.industry == "fintech" else 0,
-            1 if context.industry == "healthtech" else 0,
+            1 if industry == "saas_b2b" else 0,
+            1 if industry == "marketplace" else 0,
+            1 if industry == "fintech" else 0,
+            1 if industry == "healthtech" else 0,
             
             # Stage features
-            1 if context.stage == "pre_seed" else 0,
-            1 if context.stage == "seed" else 0,
-            1 if context.stage == "series_a" else 0,
-            1 if context.stage == "growth" else 0,
+            1 if stage == "pre_seed" else 0,
+            1 if stage == "seed" else 0,
+            1 if stage == "series_a" else 0,
+            1 if stage == "growth" else 0,
             
             # Inflection features
-            1 if context.current_inflection == StrategicInflection.PRE_PMF else 0,
-            1 if context.current_inflection == StrategicInflection.SCALING_GROWTH else 0,
+            1 if inflection == StrategicInflection.PRE_PMF else 0,
+            1 if inflection == StrategicInflection.SCALING_GROWTH else 0,
             
             # Challenge features
-            len(context.key_challenges) / 5,
-            len(context.strategic_opportunities) / 5
+            num_challenges / 5,
+            num_opportunities / 5
         ]
         
-        return np.array(features)
+        return np.array(features, dtype=np.float32)
         
     def _find_similar_patterns(
         self, 
         embedding: np.ndarray, 
-        context: CompanyContext
+        context: CompanyContext,
+        top_k: int = 5
     ) -> List[Dict]:
-        """Find similar successful patterns"""
-        # In production, would use vector similarity search
-        # For now, using rule-based matching
-        
-        similar_patterns = []
-        pattern_key = f"{context.stage}_{context.industry}"
-        
-        if pattern_key in self.success_patterns:
-            patterns = self.success_patterns[pattern_key]
-            for pattern in patterns:
-                # Check if challenges match
-                if any(challenge in str(context.key_challenges) 
-                      for challenge in pattern["context"].get("challenge", "").split(",")):
-                    similar_patterns.append(pattern)
-                    
-        return similar_patterns
+        """Find the most similar successful patterns by cosine similarity"""
+        return [
+            {**pattern, "similarity": similarity}
+            for similarity, pattern in self.pattern_index.search(
+                embedding, k=top_k, min_similarity=PATTERN_SIMILARITY_THRESHOLD
+            )
+        ]
         
     def _score_all_frameworks(
         self, 
@@ -349,17 +435,21 @@ class IntelligentFrameworkSelector:
         """Score all frameworks based on context"""
         scores = []
         
-        # Extract frameworks from similar patterns
-        pattern_frameworks = set()
+        # Extract frameworks from similar patterns, keeping the best similarity
+        pattern_frameworks = {}
         for pattern in similar_patterns:
-            pattern_frameworks.update(pattern.get("frameworks", []))
+            for framework_id in pattern.get("frameworks", []):
+                pattern_frameworks[framework_id] = max(
+                    pattern_frameworks.get(framework_id, 0.0),
+                    pattern.get("similarity", 1.0)
+                )
             
         for framework_id, framework in FRAMEWORKS.items():
             # Context relevance score (0-100)
             context_score = self._calculate_context_score(framework, context)
             
             # Pattern match score (0-100)
-            pattern_score = 100 if framework_id in pattern_frameworks else 0
+            pattern_score = 100 * pattern_frameworks.get(framework_id, 0.0)
             
             # Synergy score with other high-scoring frameworks (0-100)
             synergy_score = self._calculate_synergy_score(framework, context, scores)
@@ -5,7 +5,7 @@ Matches startups to DNA patterns using multi-factor analysis
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Callable
 from dataclasses import dataclass
 import logging
 from sklearn.preprocessing import StandardScaler
@@ -16,6 +16,23 @@ from .startup_dna_library import StartupDNALibrary, DNAPattern
 
 logger = logging.getLogger(__name__)
 
+# Score assigned to descriptive (non-callable) indicators like 'high'
+STRING_INDICATOR_SCORE = 0.7
+
+# Score assigned when an indicator raises on a value
+INDICATOR_ERROR_SCORE = 0.5
+
+@dataclass
+class CompiledIndicators:
+    """DNA library indicators flattened into arrays for vectorized matching"""
+    pattern_names: List[str]
+    rule_names: List[str]  # indicator name of each callable rule
+    rule_columns: List[str]  # dataframe column each rule reads
+    rule_funcs: List[Callable]
+    rule_membership: np.ndarray  # (patterns, rules) 1 where rule belongs to pattern
+    string_counts: np.ndarray  # (patterns,) number of descriptive indicators
+    pattern_rule_indices: List[np.ndarray]  # rule columns of each pattern, in definition order
+
 @dataclass
 class DNAMatch:
     """Represents a match to a DNA pattern"""
@@ -39,6 +56,9 @@ class DNAMatcher:
         self.pattern_profiles = {}  # Statistical profiles
         self.is_trained = False
         
+        # Compile indicator rules of the whole library once
+        self.compiled_indicators = self._compile_indicators()
+        
     def train(self, X: pd.DataFrame, y: np.ndarray, 
               pattern_assignments: Optional[Dict[int, str]] = None):
         """Train the DNA matcher on historical data"""
@@ -61,120 +81,173 @@ class DNAMatcher:
         self.is_trained = True
         logger.info("DNA matcher training complete")
         
+    def _compile_indicators(self) -> CompiledIndicators:
+        """Compile DNA indicators into column lookups and a membership matrix"""
+        rule_names = []
+        rule_columns = []
+        rule_funcs = []
+        pattern_rule_indices = []
+        string_counts = np.zeros(len(self.dna_library.patterns))
+        
+        for i, pattern in enumerate(self.dna_library.patterns):
+            indices = []
+            for indicator_name, indicator_func in pattern.indicators.items():
+                if callable(indicator_func):
+                    indices.append(len(rule_funcs))
+                    rule_names.append(indicator_name)
+                    rule_columns.append(self._map_indicator_to_column(indicator_name))
+                    rule_funcs.append(indicator_func)
+                else:
+                    # It's a string condition like 'high' or 'aggressive'
+                    string_counts[i] += 1
+            pattern_rule_indices.append(np.array(indices, dtype=int))
+        
+        rule_membership = np.zeros((len(self.dna_library.patterns), len(rule_funcs)))
+        for i, indices in enumerate(pattern_rule_indices):
+            rule_membership[i, indices] = 1.0
+        
+        return CompiledIndicators(
+            pattern_names=[p.name for p in self.dna_library.patterns],
+            rule_names=rule_names,
+            rule_columns=rule_columns,
+            rule_funcs=rule_funcs,
+            rule_membership=rule_membership,
+            string_counts=string_counts,
+            pattern_rule_indices=pattern_rule_indices
+        )
+    
     def match_dna(self, startup_data: pd.DataFrame, 
                   top_k: int = 3) -> List[DNAMatch]:
         """Match a startup to DNA patterns"""
+        return self.match_dna_batch(startup_data.iloc[:1], top_k=top_k)[0]
+    
+    def match_dna_batch(self, startup_data: pd.DataFrame,
+                        top_k: int = 3) -> List[List[DNAMatch]]:
+        """Match many startups to DNA patterns in one vectorized pass"""
+        scores = self.score_patterns(startup_data)
+        overall = scores['overall']
+        
+        results = []
+        for row in range(len(startup_data)):
+            row_data = startup_data.iloc[row:row + 1]
+            ranked = np.argsort(-overall[row], kind='stable')[:top_k]
+            results.append([
+                self._build_match(row_data, idx, row, scores) for idx in ranked
+            ])
         
-        # Ensure single row
-        if len(startup_data) > 1:
-            startup_data = startup_data.iloc[:1]
-        
-        # Calculate scores for each pattern
-        matches = []
-        
-        for pattern in self.dna_library.patterns:
-            # 1. Indicator-based matching (rule-based)
-            indicator_score = self._calculate_indicator_score(
-                startup_data, pattern
-            )
-            
-            # 2. Statistical similarity (if trained)
-            statistical_score = 0.5  # Default
-            if self.is_trained and pattern.name in self.pattern_profiles:
-                statistical_score = self._calculate_statistical_score(
-                    startup_data, pattern.name
-                )
-            
-            # 3. ML-based score (if trained)
-            ml_score = 0.5  # Default
-            if self.is_trained and pattern.name in self.pattern_models:
-                ml_score = self._calculate_ml_score(
-                    startup_data, pattern.name
-                )
-            
-            # Weighted combination
-            weights = {
-                'indicator': 0.4,
-                'statistical': 0.3,
-                'ml': 0.3
-            }
-            
-            if not self.is_trained:
-                # Use only indicators if not trained
-                weights = {'indicator': 1.0, 'statistical': 0, 'ml': 0}
-            
-            overall_score = (
-                weights['indicator'] * indicator_score +
-                weights['statistical'] * statistical_score +
-                weights['ml'] * ml_score
-            )
-            
-            # Calculate confidence based on score components
-            confidence = self._calculate_confidence(
-                indicator_score, statistical_score, ml_score
-            )
-            
-            # Get match details
-            match_details = self._get_match_details(
-                startup_data, pattern, indicator_score
-            )
-            
-            # Determine evolution stage
-            evolution_stage = self._determine_evolution_stage(
-                startup_data, pattern
-            )
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                startup_data, pattern, overall_score
-            )
+        return results
+    
+    def score_patterns(self, startup_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Score every (startup, pattern) pair
+        
+        Returns:
+            Dict of (startups, patterns) arrays: 'indicator', 'statistical',
+            'ml', 'overall', 'confidence', plus the (startups, rules)
+            'rule_outcomes' matrix (1 match, 0 miss, 0.5 error, NaN absent)
+        """
+        n_rows = len(startup_data)
+        n_patterns = len(self.compiled_indicators.pattern_names)
+        
+        # 1. Indicator-based matching (rule-based)
+        rule_outcomes = self._evaluate_indicators(startup_data)
+        indicator = self._calculate_indicator_scores(rule_outcomes)
+        
+        # 2. Statistical similarity and 3. ML-based score (if trained)
+        statistical = np.full((n_rows, n_patterns), 0.5)  # Default
+        ml = np.full((n_rows, n_patterns), 0.5)  # Default
+        if self.is_trained:
+            statistical = self._calculate_statistical_scores(startup_data)
+            ml = self._calculate_ml_scores(startup_data)
+            overall = 0.4 * indicator + 0.3 * statistical + 0.3 * ml
             
-            matches.append(DNAMatch(
-                pattern_name=pattern.name,
-                overall_score=overall_score,
-                indicator_score=indicator_score,
-                statistical_score=statistical_score,
-                ml_score=ml_score,
-                confidence=confidence,
-                match_details=match_details,
-                evolution_stage=evolution_stage,
-                recommendations=recommendations
-            ))
-        
-        # Sort by overall score
-        matches.sort(key=lambda x: x.overall_score, reverse=True)
-        
-        return matches[:top_k]
+            # Calculate confidence based on agreement between methods
+            std = np.std(np.stack([indicator, statistical, ml]), axis=0)
+            confidence = np.clip(1 - (std * 2), 0.1, 0.95)
+        else:
+            # Use only indicators if not trained
+            overall = indicator.copy()
+            # Single score - moderate confidence
+            confidence = np.full((n_rows, n_patterns), 0.7)
+        
+        return {
+            'indicator': indicator,
+            'statistical': statistical,
+            'ml': ml,
+            'overall': overall,
+            'confidence': confidence,
+            'rule_outcomes': rule_outcomes
+        }
     
-    def _calculate_indicator_score(self, data: pd.DataFrame, 
-                                  pattern: DNAPattern) -> float:
-        """Calculate rule-based indicator matching score"""
-        scores = []
-        details = {}
-        
-        for indicator_name, indicator_func in pattern.indicators.items():
-            if callable(indicator_func):
-                # It's a lambda function
-                try:
-                    # Map indicator names to dataframe columns
-                    col_name = self._map_indicator_to_column(indicator_name)
-                    if col_name in data.columns:
-                        value = data[col_name].iloc[0]
-                        matches = indicator_func(value)
-                        scores.append(1.0 if matches else 0.0)
-                        details[indicator_name] = {
-                            'value': value,
-                            'matches': matches
-                        }
-                except Exception as e:
-                    logger.debug(f"Error evaluating {indicator_name}: {e}")
-                    scores.append(0.5)  # Neutral score for errors
-            else:
-                # It's a string condition like 'high' or 'aggressive'
-                # These need domain-specific evaluation
-                scores.append(0.7)  # Default positive score
+    def _build_match(self, data: pd.DataFrame, pattern_idx: int, row: int,
+                     scores: Dict[str, np.ndarray]) -> DNAMatch:
+        """Build the detailed match for one pattern from precomputed scores"""
+        pattern = self.dna_library.patterns[pattern_idx]
+        overall_score = float(scores['overall'][row, pattern_idx])
+        
+        return DNAMatch(
+            pattern_name=pattern.name,
+            overall_score=overall_score,
+            indicator_score=float(scores['indicator'][row, pattern_idx]),
+            statistical_score=float(scores['statistical'][row, pattern_idx]),
+            ml_score=float(scores['ml'][row, pattern_idx]),
+            confidence=float(scores['confidence'][row, pattern_idx]),
+            match_details=self._get_match_details(
+                data, pattern_idx, scores['rule_outcomes'][row]
+            ),
+            evolution_stage=self._determine_evolution_stage(data, pattern),
+            recommendations=self._generate_recommendations(data, pattern, overall_score)
+        )
+    
+    def _evaluate_indicators(self, data: pd.DataFrame) -> np.ndarray:
+        """Evaluate every compiled indicator rule over all rows"""
+        compiled = self.compiled_indicators
+        outcomes = np.full((len(data), len(compiled.rule_funcs)), np.nan)
+        
+        for rule_idx, (col_name, indicator_func) in enumerate(
+                zip(compiled.rule_columns, compiled.rule_funcs)):
+            if col_name in data.columns:
+                outcomes[:, rule_idx] = self._apply_indicator(
+                    indicator_func, data[col_name].to_numpy()
+                )
         
-        return np.mean(scores) if scores else 0.5
+        return outcomes
+    
+    @staticmethod
+    def _apply_indicator(indicator_func: Callable, values: np.ndarray) -> np.ndarray:
+        """Apply an indicator to a column, element-wise only if it cannot broadcast"""
+        try:
+            result = np.asarray(indicator_func(values))
+            if result.shape == values.shape:
+                return result.astype(bool).astype(float)
+        except Exception:
+            pass
+        
+        # Chained comparisons like `100 < x < 300` need scalar inputs
+        result = np.empty(len(values))
+        for i, value in enumerate(values):
+            try:
+                result[i] = 1.0 if indicator_func(value) else 0.0
+            except Exception as e:
+                logger.debug(f"Error evaluating indicator: {e}")
+                result[i] = INDICATOR_ERROR_SCORE  # Neutral score for errors
+        return result
+    
+    def _calculate_indicator_scores(self, rule_outcomes: np.ndarray) -> np.ndarray:
+        """Mean indicator score of every pattern for every row
+        
+        Rules whose column is absent are skipped; descriptive indicators
+        count as a default positive score.
+        """
+        compiled = self.compiled_indicators
+        present = ~np.isnan(rule_outcomes)
+        
+        totals = (
+            np.where(present, rule_outcomes, 0) @ compiled.rule_membership.T +
+            STRING_INDICATOR_SCORE * compiled.string_counts
+        )
+        counts = present.astype(float) @ compiled.rule_membership.T + compiled.string_counts
+        
+        return np.divide(totals, counts, out=np.full(totals.shape, 0.5), where=counts > 0)
     
     def _map_indicator_to_column(self, indicator_name: str) -> str:
         """Map indicator names to dataframe column names"""
@@ -196,64 +269,48 @@ class DNAMatcher:
         
         return mappings.get(indicator_name, indicator_name)
     
-    def _calculate_statistical_score(self, data: pd.DataFrame, 
-                                    pattern_name: str) -> float:
-        """Calculate statistical similarity to pattern profile"""
-        if pattern_name not in self.pattern_profiles:
-            return 0.5
-        
-        profile = self.pattern_profiles[pattern_name]
-        
-        # Scale the data
+    def _calculate_statistical_scores(self, data: pd.DataFrame) -> np.ndarray:
+        """Calculate statistical similarity to every pattern profile"""
+        scores = np.full((len(data), len(self.compiled_indicators.pattern_names)), 0.5)
+        profiled = [
+            (idx, name) for idx, name in enumerate(self.compiled_indicators.pattern_names)
+            if name in self.pattern_profiles
+        ]
+        if not profiled:
+            return scores
+        
+        # Scale the data once
         data_scaled = self.scaler.transform(data)
+        profile_matrix = np.vstack([
+            self.pattern_profiles[name]['mean_features'] for _, name in profiled
+        ])
         
-        # Calculate cosine similarity
-        similarity = cosine_similarity(
-            data_scaled.reshape(1, -1),
-            profile['mean_features'].reshape(1, -1)
-        )[0, 0]
+        # Calculate cosine similarity and convert to 0-1 range
+        similarity = cosine_similarity(data_scaled, profile_matrix)
+        scores[:, [idx for idx, _ in profiled]] = (similarity + 1) / 2
         
-        # Convert to 0-1 range
-        return (similarity + 1) / 2
+        return scores
     
-    def _calculate_ml_score(self, data: pd.DataFrame, 
-                           pattern_name: str) -> float:
-        """Calculate ML model probability for pattern"""
-        if pattern_name not in self.pattern_models:
-            return 0.5
+    def _calculate_ml_scores(self, data: pd.DataFrame) -> np.ndarray:
+        """Calculate ML model probability for every pattern"""
+        scores = np.full((len(data), len(self.compiled_indicators.pattern_names)), 0.5)
         
-        model = self.pattern_models[pattern_name]
+        for idx, pattern_name in enumerate(self.compiled_indicators.pattern_names):
+            if pattern_name not in self.pattern_models:
+                continue
+            try:
+                # Get probability of matching this pattern
+                scores[:, idx] = self.pattern_models[pattern_name].predict_proba(data)[:, 1]
+            except Exception as e:
+                logger.debug(f"ML prediction error for {pattern_name}: {e}")
         
-        try:
-            # Get probability of matching this pattern
-            prob = model.predict_proba(data)[0, 1]
-            return float(prob)
-        except Exception as e:
-            logger.debug(f"ML prediction error for {pattern_name}: {e}")
-            return 0.5
-    
-    def _calculate_confidence(self, indicator: float, 
-                             statistical: float, ml: float) -> float:
-        """Calculate confidence based on agreement between methods"""
-        scores = [indicator, statistical, ml]
-        
-        # Remove default values (0.5) if not trained
-        if not self.is_trained:
-            scores = [indicator]
-        
-        # Calculate standard deviation as measure of disagreement
-        if len(scores) > 1:
-            std = np.std(scores)
-            # Convert to confidence (low std = high confidence)
-            confidence = 1 - (std * 2)  # Scale std to confidence
-            return max(0.1, min(0.95, confidence))
-        else:
-            # Single score - moderate confidence
-            return 0.7
+        return scores
     
-    def _get_match_details(self, data: pd.DataFrame, pattern: DNAPattern,
-                          indicator_score: float) -> Dict[str, Any]:
+    def _get_match_details(self, data: pd.DataFrame, pattern_idx: int,
+                          rule_outcomes: np.ndarray) -> Dict[str, Any]:
         """Get detailed matching information"""
+        pattern = self.dna_library.patterns[pattern_idx]
+        compiled = self.compiled_indicators
         details = {
             'pattern_description': pattern.description,
             'typical_examples': pattern.examples[:3],
@@ -263,26 +320,23 @@ class DNAMatcher:
             'gaps': []
         }
         
-        # Analyze each indicator
-        for indicator_name, indicator_func in pattern.indicators.items():
-            if callable(indicator_func):
-                try:
-                    col_name = self._map_indicator_to_column(indicator_name)
-                    if col_name in data.columns:
-                        value = data[col_name].iloc[0]
-                        matches = indicator_func(value)
-                        
-                        details['indicator_matches'][indicator_name] = {
-                            'current_value': value,
-                            'matches_pattern': matches
-                        }
-                        
-                        if matches:
-                            details['strengths'].append(indicator_name)
-                        else:
-                            details['gaps'].append(indicator_name)
-                except:
-                    pass
+        # Analyze each indicator that could be evaluated
+        for rule_idx in compiled.pattern_rule_indices[pattern_idx]:
+            outcome = rule_outcomes[rule_idx]
+            if np.isnan(outcome) or outcome == INDICATOR_ERROR_SCORE:
+                continue
+            
+            indicator_name = compiled.rule_names[rule_idx]
+            matches = bool(outcome)
+            details['indicator_matches'][indicator_name] = {
+                'current_value': data[compiled.rule_columns[rule_idx]].iloc[0],
+                'matches_pattern': matches
+            }
+            
+            if matches:
+                details['strengths'].append(indicator_name)
+            else:
+                details['gaps'].append(indicator_name)
         
         return details
     
@@ -348,19 +402,16 @@ class DNAMatcher:
     
     def _auto_assign_patterns(self, X: pd.DataFrame, y: np.ndarray) -> Dict[int, str]:
         """Automatically assign patterns to training data"""
-        assignments = {}
-        
-        for i in range(len(X)):
-            # Get top match for this startup
-            startup_data = X.iloc[i:i+1]
-            matches = self.match_dna(startup_data, top_k=1)
-            
-            if matches:
-                assignments[i] = matches[0].pattern_name
-            else:
-                assignments[i] = 'UNKNOWN'
+        top_patterns = self._top_patterns(X)
+        return {i: pattern_name for i, pattern_name in enumerate(top_patterns)}
+    
+    def _top_patterns(self, X: pd.DataFrame) -> List[str]:
+        """Best matching pattern name for every row"""
+        if len(X) == 0 or not self.compiled_indicators.pattern_names:
+            return ['UNKNOWN'] * len(X)
         
-        return assignments
+        best = np.argmax(self.score_patterns(X)['overall'], axis=1)
+        return [self.compiled_indicators.pattern_names[idx] for idx in best]
     
     def _build_pattern_profiles(self, X: pd.DataFrame, y: np.ndarray,
                                assignments: Dict[int, str]):
@@ -430,11 +481,8 @@ class DNAMatcher:
         """Get distribution of patterns in a dataset"""
         distribution = {}
         
-        for i in range(len(X)):
-            matches = self.match_dna(X.iloc[i:i+1], top_k=1)
-            if matches:
-                pattern = matches[0].pattern_name
-                distribution[pattern] = distribution.get(pattern, 0) + 1
+        for pattern in self._top_patterns(X):
+            distribution[pattern] = distribution.get(pattern, 0) + 1
         
         return distribution
     
@@ -5,7 +5,7 @@ Handles 45 patterns organized into 8 master categories
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set, Union
 from dataclasses import dataclass
 import joblib
 import logging
@@ -65,6 +65,22 @@ class StartupPatternProfile:
         }
 
 
+@dataclass
+class PatternScoreBatch:
+    """Compact category and pattern scores for a batch of startups"""
+    category_names: List[str]
+    category_scores: np.ndarray  # (startups, categories)
+    pattern_names: List[str]
+    pattern_scores: np.ndarray  # (startups, patterns), NaN where the category gate failed
+    pattern_thresholds: np.ndarray  # (patterns,) detection cut-off per pattern
+    
+    @property
+    def detected(self) -> np.ndarray:
+        """(startups, patterns) mask of patterns passing their threshold"""
+        with np.errstate(invalid='ignore'):
+            return self.pattern_scores >= self.pattern_thresholds
+
+
 class HierarchicalPatternClassifier:
     """
     Two-tier hierarchical classifier for startup patterns
@@ -357,26 +373,125 @@ class HierarchicalPatternClassifier:
     
     def predict(self, features: Dict[str, float]) -> StartupPatternProfile:
         """Predict patterns for a startup"""
+        return self.predict_batch([features])[0]
+    
+    def predict_batch(self, 
+                      features: Union[pd.DataFrame, List[Dict[str, float]]]
+                      ) -> List[StartupPatternProfile]:
+        """Predict pattern profiles for many startups"""
+        scores = self.predict_scores(features)
+        return [self._format_profile(scores, row) for row in range(len(scores.category_scores))]
+    
+    def predict_scores(self, 
+                       features: Union[pd.DataFrame, List[Dict[str, float]]]
+                       ) -> PatternScoreBatch:
+        """Score master categories and gated pattern models over many rows
+        
+        Each distinct (feature subset, scaler) combination is scaled once for
+        the whole batch, and each pattern model only sees the rows whose
+        master category passed the gate.
+        """
         if not self.is_trained:
             raise ValueError("Classifier not trained yet")
         
-        # Convert to DataFrame for consistency
-        df = pd.DataFrame([features])
-        df = df.reindex(columns=self.all_features, fill_value=0)
+        # Features absent from the input default to 0
+        if isinstance(features, pd.DataFrame):
+            X = features.reindex(columns=self.all_features, fill_value=0).to_numpy(dtype=float)
+        else:
+            X = np.array([
+                [row.get(feature, 0) for feature in self.all_features] for row in features
+            ], dtype=float).reshape(len(features), len(self.all_features))
+        scaled_cache = {}
         
         # Step 1: Predict master categories
-        category_scores = self._predict_master_categories(df)
+        category_names = [
+            name for name in self.master_category_models if name in self.scalers
+        ]
+        category_scores = np.zeros((len(X), len(category_names)))
+        all_columns = np.arange(len(self.all_features))
+        for col, category_name in enumerate(category_names):
+            X_scaled = self._scale_columns(X, all_columns, self.scalers[category_name], scaled_cache)
+            model = self.master_category_models[category_name]
+            category_scores[:, col] = np.round(model.predict_proba(X_scaled)[:, 1], 3)
+        
+        # Step 2: Predict individual patterns for rows passing the category gate
+        category_lookup = {name: col for col, name in enumerate(category_names)}
+        pattern_names = [name for name in self.pattern_models if name in self.scalers]
+        pattern_scores = np.full((len(X), len(pattern_names)), np.nan)
+        thresholds = np.zeros(len(pattern_names))
+        feature_positions = {name: i for i, name in enumerate(self.all_features)}
+        
+        for col, pattern_name in enumerate(pattern_names):
+            pattern_info = self.pattern_models[pattern_name]
+            # 80% of optimal threshold
+            thresholds[col] = pattern_info['threshold'] * 0.8
+            
+            category_col = category_lookup.get(PATTERN_LOOKUP[pattern_name].master_category.value)
+            if category_col is None:
+                continue
+            rows = np.flatnonzero(category_scores[:, category_col] >= 0.3)
+            if len(rows) == 0:
+                continue
+            
+            columns = np.array([feature_positions[f] for f in pattern_info['features']])
+            X_scaled = self._scale_columns(X, columns, self.scalers[pattern_name], scaled_cache)
+            pattern_scores[rows, col] = pattern_info['model'].predict_proba(X_scaled[rows])[:, 1]
+        
+        return PatternScoreBatch(
+            category_names=category_names,
+            category_scores=category_scores,
+            pattern_names=pattern_names,
+            pattern_scores=pattern_scores,
+            pattern_thresholds=thresholds
+        )
+    
+    @staticmethod
+    def _scale_columns(X: np.ndarray, columns: np.ndarray, scaler: StandardScaler,
+                       cache: Dict[tuple, np.ndarray]) -> np.ndarray:
+        """Standardize a column subset, reusing results for identical scalers"""
+        mean = scaler.mean_ if scaler.with_mean else None
+        scale = scaler.scale_ if scaler.with_std else None
+        key = (
+            columns.tobytes(),
+            None if mean is None else mean.tobytes(),
+            None if scale is None else scale.tobytes()
+        )
         
-        # Step 2: Predict individual patterns
-        pattern_predictions = self._predict_patterns(df, category_scores)
+        if key not in cache:
+            X_scaled = X[:, columns]
+            if mean is not None:
+                X_scaled = X_scaled - mean
+            if scale is not None:
+                X_scaled = X_scaled / scale
+            cache[key] = X_scaled
         
-        # Step 3: Check compatibility and conflicts
+        return cache[key]
+    
+    def _format_profile(self, scores: PatternScoreBatch, row: int) -> StartupPatternProfile:
+        """Build the pattern profile of one batch row"""
+        category_scores = {
+            name: float(score)
+            for name, score in zip(scores.category_names, scores.category_scores[row])
+        }
+        
+        pattern_predictions = []
+        for col in np.flatnonzero(scores.detected[row]):
+            pattern = PATTERN_LOOKUP[scores.pattern_names[col]]
+            pattern_predictions.append(PatternPrediction(
+                pattern_name=pattern.name,
+                confidence=float(scores.pattern_scores[row, col]),
+                master_category=pattern.master_category,
+                compatible_patterns=pattern.compatible_patterns,
+                incompatible_patterns=pattern.incompatible_patterns
+            ))
+        
+        # Check compatibility and conflicts
         warnings = self._check_pattern_conflicts(pattern_predictions)
         
-        # Step 4: Generate recommendations
+        # Generate recommendations
         recommendations = self._generate_recommendations(pattern_predictions)
         
-        # Step 5: Create profile
+        # Create profile
         primary_patterns = [p for p in pattern_predictions if p.confidence >= 0.7]
         secondary_patterns = [p for p in pattern_predictions 
                             if 0.4 <= p.confidence < 0.7]
@@ -393,54 +508,6 @@ class HierarchicalPatternClassifier:
             recommendations=recommendations
         )
     
-    def _predict_master_categories(self, df: pd.DataFrame) -> Dict[str, float]:
-        """Predict master category scores"""
-        scores = {}
-        
-        for category_name, model in self.master_category_models.items():
-            if category_name in self.scalers:
-                X_scaled = self.scalers[category_name].transform(df[self.all_features])
-                score = float(model.predict_proba(X_scaled)[0, 1])
-                scores[category_name] = round(score, 3)
-        
-        return scores
-    
-    def _predict_patterns(self, df: pd.DataFrame, 
-                         category_scores: Dict[str, float]) -> List[PatternPrediction]:
-        """Predict individual patterns"""
-        predictions = []
-        
-        for pattern_name, pattern_info in self.pattern_models.items():
-            pattern = PATTERN_LOOKUP[pattern_name]
-            
-            # Check if category score is high enough
-            category_score = category_scores.get(pattern.master_category.value, 0)
-            if category_score < 0.3:
-                continue
-            
-            # Get features and scale
-            features = pattern_info['features']
-            X_pattern = df[features]
-            
-            if pattern_name in self.scalers:
-                X_scaled = self.scalers[pattern_name].transform(X_pattern)
-                
-                # Predict
-                model = pattern_info['model']
-                confidence = float(model.predict_proba(X_scaled)[0, 1])
-                
-                # Apply threshold
-                if confidence >= pattern_info['threshold'] * 0.8:  # 80% of optimal threshold
-                    predictions.append(PatternPrediction(
-                        pattern_name=pattern_name,
-                        confidence=confidence,
-                        master_category=pattern.master_category,
-                        compatible_patterns=pattern.compatible_patterns,
-                        incompatible_patterns=pattern.incompatible_patterns
-                    ))
-        
-        return predictions
-    
     def _check_pattern_conflicts(self, predictions: List[PatternPrediction]) -> List[str]:
         """Check for incompatible pattern combinations"""
         warnings = []
@@ -9,6 +9,8 @@ from enum import Enum
 from collections import defaultdict
 import numpy as np
 
+from .pattern_graph import PatternGraph
+
 class PatternCategory(Enum):
     """Pattern categories for organization"""
     EFFICIENT_GROWTH = "efficient_growth"
@@ -58,6 +60,13 @@ class StartupPatternLibrary:
         self.patterns = self._initialize_all_patterns()
         self.pattern_index = {p.name: p for p in self.patterns}
         self.category_index = self._build_category_index()
+        self.graph = PatternGraph(
+            names=[p.name for p in self.patterns],
+            categories=[p.category.value for p in self.patterns],
+            stages=[p.typical_stages for p in self.patterns],
+            evolution_paths=[p.evolution_paths for p in self.patterns],
+            success_rates=[np.mean(p.success_rate_range) for p in self.patterns]
+        )
         
     def _initialize_all_patterns(self) -> List[PatternDefinition]:
         """Initialize all 40-50 patterns based on data analysis"""
@@ -699,7 +708,7 @@ class StartupPatternLibrary:
     
     def get_patterns_by_stage(self, stage: str) -> List[PatternDefinition]:
         """Get patterns typical for a funding stage"""
-        return [p for p in self.patterns if stage in p.typical_stages]
+        return [self.pattern_index[name] for name in self.graph.get_patterns_by_stage(stage)]
     
     def get_patterns_by_industry(self, industry: str) -> List[PatternDefinition]:
         """Get patterns typical for an industry"""
@@ -0,0 +1,156 @@
+"""
+Pattern Graph
+Precomputed similarity, evolution and lookup indexes over a pattern library
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Optional, Sequence
+from collections import defaultdict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PatternGraph:
+    """
+    Pattern relationships built once from a library
+
+    Nodes are the library patterns plus any evolution targets that are not
+    library patterns themselves (these are terminal). Evolution edges carry
+    transition probabilities; when none are supplied, a pattern's outgoing
+    probability is split evenly across its evolution paths.
+    """
+
+    def __init__(self,
+                 names: Sequence[str],
+                 categories: Sequence[str],
+                 stages: Sequence[Sequence[str]],
+                 evolution_paths: Sequence[Sequence[str]],
+                 success_rates: Sequence[float],
+                 transition_probabilities: Optional[Dict[str, Dict[str, float]]] = None):
+        self.pattern_names = list(names)
+        self.pattern_positions = {name: i for i, name in enumerate(self.pattern_names)}
+
+        # Stage and category indexes
+        self.stage_index = defaultdict(list)
+        self.category_index = defaultdict(list)
+        for name, category, pattern_stages in zip(names, categories, stages):
+            self.category_index[category].append(name)
+            for stage in pattern_stages:
+                self.stage_index[stage].append(name)
+
+        # Similarity: same category, closer success rate is more similar
+        rates = np.asarray(success_rates, dtype=float)
+        category_codes = np.unique(np.asarray(categories), return_inverse=True)[1]
+        same_category = category_codes[:, np.newaxis] == category_codes[np.newaxis, :]
+        np.fill_diagonal(same_category, False)
+        self.similarity_matrix = np.where(
+            same_category, 1 - np.abs(rates[:, np.newaxis] - rates[np.newaxis, :]), np.nan
+        )
+        self._neighbours = [
+            self._rank_neighbours(row) for row in self.similarity_matrix
+        ]
+
+        # Evolution adjacency over all nodes
+        self.node_names = list(self.pattern_names)
+        for paths in evolution_paths:
+            for target in paths:
+                if target not in self.pattern_positions and target not in self.node_names:
+                    self.node_names.append(target)
+        self.node_positions = {name: i for i, name in enumerate(self.node_names)}
+
+        self.successors: Dict[str, List[Tuple[str, float]]] = {}
+        self.transition_matrix = np.zeros((len(self.node_names), len(self.node_names)))
+        for name, paths in zip(names, evolution_paths):
+            probabilities = (transition_probabilities or {}).get(name)
+            edges = []
+            for target in paths:
+                if probabilities is not None:
+                    probability = probabilities.get(target, 0.0)
+                else:
+                    probability = 1.0 / len(paths)
+                edges.append((target, probability))
+                self.transition_matrix[self.node_positions[name], self.node_positions[target]] = probability
+            self.successors[name] = edges
+
+        self._step_matrices = [np.eye(len(self.node_names))]
+
+        logger.info(
+            f"Built pattern graph: {len(self.pattern_names)} patterns, "
+            f"{len(self.node_names)} nodes, {int((self.transition_matrix > 0).sum())} evolution edges"
+        )
+
+    def _rank_neighbours(self, similarities: np.ndarray) -> List[Tuple[str, float]]:
+        """Neighbours sorted by descending similarity"""
+        candidates = np.flatnonzero(~np.isnan(similarities))
+        ranked = candidates[np.argsort(-similarities[candidates], kind='stable')]
+        return [(self.pattern_names[i], float(similarities[i])) for i in ranked]
+
+    def get_similar(self, name: str, max_results: int = 5) -> List[Tuple[str, float]]:
+        """Most similar patterns as (name, similarity)"""
+        position = self.pattern_positions.get(name)
+        if position is None:
+            return []
+        return self._neighbours[position][:max_results]
+
+    def get_successors(self, name: str) -> List[Tuple[str, float]]:
+        """Direct evolution targets as (name, probability)"""
+        return self.successors.get(name, [])
+
+    def get_patterns_by_stage(self, stage: str) -> List[str]:
+        return self.stage_index.get(stage, [])
+
+    def get_patterns_by_category(self, category: str) -> List[str]:
+        return self.category_index.get(category, [])
+
+    def get_evolution_paths(self, name: str, max_steps: int = 3,
+                            min_probability: float = 0.0) -> List[Tuple[List[str], float]]:
+        """
+        Enumerate evolution paths from a pattern
+
+        Returns:
+            (path, probability) pairs, where path starts after the given
+            pattern and probability is the product of edge probabilities,
+            sorted by descending probability
+        """
+        paths = []
+        stack = [([name], 1.0)]
+
+        while stack:
+            path, probability = stack.pop()
+            edges = self.successors.get(path[-1], []) if len(path) <= max_steps else []
+            extended = False
+            for target, edge_probability in edges:
+                next_probability = probability * edge_probability
+                if target in path or next_probability < min_probability or next_probability <= 0:
+                    continue
+                stack.append((path + [target], next_probability))
+                extended = True
+            if not extended and len(path) > 1:
+                paths.append((path[1:], probability))
+
+        paths.sort(key=lambda x: (-x[1], x[0]))
+        return paths
+
+    def evolution_distribution(self, names: Sequence[str], steps: int) -> np.ndarray:
+        """
+        Probability of being at each node after a number of steps
+
+        Probability mass leaving a terminal node is dropped, so rows sum to
+        at most 1.
+
+        Returns:
+            (len(names), len(node_names)) array; unknown names give zero rows
+        """
+        start = np.zeros((len(names), len(self.node_names)))
+        for row, name in enumerate(names):
+            position = self.node_positions.get(name)
+            if position is not None:
+                start[row, position] = 1.0
+        return start @ self._step_matrix(steps)
+
+    def _step_matrix(self, steps: int) -> np.ndarray:
+        """Transition matrix raised to a power, cached per step count"""
+        while len(self._step_matrices) <= steps:
+            self._step_matrices.append(self._step_matrices[-1] @ self.transition_matrix)
+        return self._step_matrices[steps]
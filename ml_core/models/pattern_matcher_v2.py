@@ -5,7 +5,7 @@ Matches startups to patterns using CAMP scores and multi-label classification
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Any, Set
+from typing import Dict, List, Tuple, Optional, Any, Set, Callable, Union
 from dataclasses import dataclass
 import logging
 from sklearn.preprocessing import StandardScaler
@@ -15,13 +15,37 @@ from pathlib import Path
 
 from .pattern_definitions import (
     StartupPatternLibrary, 
-    PatternDefinition, 
     PATTERN_TAGS,
     PatternCategory
 )
 
 logger = logging.getLogger(__name__)
 
+CAMP_DIMENSIONS = ['capital', 'advantage', 'market', 'people']
+
+# Key numerical features appended to CAMP scores for statistical matching
+STATISTICAL_FEATURES = [
+    'revenue_growth_rate_percent',
+    'burn_multiple',
+    'net_dollar_retention_percent',
+    'product_retention_30d',
+    'team_size_full_time'
+]
+
+MIN_MATCH_CONFIDENCE = 0.3
+
+@dataclass
+class CompiledPatternRules:
+    """Pattern library flattened into arrays for vectorized matching"""
+    pattern_names: List[str]
+    camp_min: np.ndarray  # (patterns, 4)
+    camp_max: np.ndarray  # (patterns, 4)
+    rule_features: List[str]  # feature checked by each rule
+    rule_funcs: List[Callable]
+    rule_membership: np.ndarray  # (patterns, rules) 1 where rule belongs to pattern
+    rule_counts: np.ndarray  # (patterns,)
+    pattern_rule_indices: List[np.ndarray]  # rule columns of each pattern, in definition order
+
 @dataclass
 class PatternMatch:
     """Represents a match to a startup pattern"""
@@ -84,10 +108,14 @@ class PatternMatcherV2:
         self.tag_models = {}  # Models for multi-label tag prediction
         self.evolution_matrix = {}  # Pattern transition probabilities
         self.is_trained = False
+        self._next_pattern_cache = {}  # (pattern, stage) -> next patterns
         
         # Load discovered patterns if available
         self.discovered_patterns = self._load_discovered_patterns()
         
+        # Compile thresholds and rules of the whole library once
+        self.compiled_rules = self._compile_pattern_library()
+        
     def _load_discovered_patterns(self) -> Dict[str, Any]:
         """Load patterns discovered from data analysis"""
         patterns_path = Path('ml_core/discovered_patterns.json')
@@ -113,32 +141,128 @@ class PatternMatcherV2:
         self.is_trained = True
         logger.info("Pattern matcher training complete")
     
+    def _compile_pattern_library(self) -> CompiledPatternRules:
+        """Compile CAMP thresholds and feature rules into matrices"""
+        patterns = self.pattern_library.patterns
+        
+        camp_min = np.zeros((len(patterns), len(CAMP_DIMENSIONS)))
+        camp_max = np.full((len(patterns), len(CAMP_DIMENSIONS)), 100.0)
+        rule_features = []
+        rule_funcs = []
+        pattern_rule_indices = []
+        
+        for i, pattern in enumerate(patterns):
+            for j, dimension in enumerate(CAMP_DIMENSIONS):
+                camp_min[i, j], camp_max[i, j] = pattern.camp_thresholds.get(dimension, (0, 100))
+            
+            indices = []
+            for feature_name, rule_func in pattern.feature_rules.items():
+                indices.append(len(rule_funcs))
+                rule_features.append(feature_name)
+                rule_funcs.append(rule_func)
+            pattern_rule_indices.append(np.array(indices, dtype=int))
+        
+        rule_membership = np.zeros((len(patterns), len(rule_funcs)))
+        for i, indices in enumerate(pattern_rule_indices):
+            rule_membership[i, indices] = 1.0
+        
+        return CompiledPatternRules(
+            pattern_names=[p.name for p in patterns],
+            camp_min=camp_min,
+            camp_max=camp_max,
+            rule_features=rule_features,
+            rule_funcs=rule_funcs,
+            rule_membership=rule_membership,
+            rule_counts=rule_membership.sum(axis=1),
+            pattern_rule_indices=pattern_rule_indices
+        )
+    
     def match_patterns(self, startup_data: pd.DataFrame, 
                       camp_scores: Dict[str, float],
                       top_k: int = 5) -> PatternAnalysis:
         """Match a startup to patterns"""
+        return self.match_patterns_batch(
+            startup_data.iloc[:1], [camp_scores], top_k=top_k
+        )[0]
+    
+    def match_patterns_batch(self, startup_data: pd.DataFrame,
+                             camp_scores: Union[pd.DataFrame, List[Dict[str, float]]],
+                             top_k: int = 5) -> List[PatternAnalysis]:
+        """Match many startups to patterns in one vectorized pass
+        
+        Args:
+            startup_data: One row per startup
+            camp_scores: DataFrame with '<dimension>_score' columns, or one
+                dict per startup, aligned with startup_data rows
+            top_k: Number of detailed matches (primary + secondary) to build
+        """
+        if isinstance(camp_scores, pd.DataFrame):
+            camp_scores = camp_scores.to_dict('records')
+        
+        camp_matrix = np.array([
+            [scores.get(f'{dim}_score', 50) for dim in CAMP_DIMENSIONS]
+            for scores in camp_scores
+        ], dtype=float).reshape(len(camp_scores), len(CAMP_DIMENSIONS))
+        
+        # Confidence of every (startup, pattern) pair
+        camp_match, camp_distances = self._calculate_camp_matches(camp_matrix)
+        rule_outcomes = self._evaluate_rules(startup_data)
+        feature_match = self._calculate_feature_matches(rule_outcomes)
+        statistical_match = self._calculate_statistical_matches(startup_data, camp_matrix)
+        
+        weights = [0.4, 0.4, 0.2] if self.is_trained else [0.5, 0.5, 0.0]
+        confidence = (
+            weights[0] * camp_match +
+            weights[1] * feature_match +
+            weights[2] * statistical_match
+        )
         
-        # Calculate match scores for all patterns
-        all_matches = []
+        analyses = []
+        for row in range(len(camp_scores)):
+            analyses.append(self._build_analysis(
+                startup_data.iloc[row:row + 1], camp_scores[row], top_k,
+                confidence[row], camp_match[row], feature_match[row],
+                statistical_match[row], camp_distances[row], rule_outcomes[row]
+            ))
         
-        for pattern in self.pattern_library.patterns:
-            match = self._evaluate_pattern_match(
-                startup_data, camp_scores, pattern
+        return analyses
+    
+    def _build_analysis(self, startup_data: pd.DataFrame,
+                        camp_scores: Dict[str, float],
+                        top_k: int,
+                        confidence: np.ndarray,
+                        camp_match: np.ndarray,
+                        feature_match: np.ndarray,
+                        statistical_match: np.ndarray,
+                        camp_distances: np.ndarray,
+                        rule_outcomes: np.ndarray) -> PatternAnalysis:
+        """Assemble the analysis for one startup from its score vectors"""
+        # Patterns above the minimum threshold, best first
+        candidates = np.flatnonzero(confidence > MIN_MATCH_CONFIDENCE)
+        ranked = candidates[np.argsort(-confidence[candidates], kind='stable')]
+        ranked_confidence = confidence[ranked]
+        
+        # Gap analysis and suggestions only for the returned matches
+        top_matches = [
+            self._build_pattern_match(
+                idx, camp_scores, confidence[idx], camp_match[idx],
+                feature_match[idx], statistical_match[idx],
+                camp_distances[idx], rule_outcomes
             )
-            if match.confidence > 0.3:  # Minimum threshold
-                all_matches.append(match)
-        
-        # Sort by confidence
-        all_matches.sort(key=lambda x: x.confidence, reverse=True)
+            for idx in ranked[:max(top_k, 1)]
+        ]
         
         # Identify primary pattern
-        primary_pattern = all_matches[0] if all_matches else self._get_default_match()
+        primary_pattern = top_matches[0] if top_matches else self._get_default_match()
         
         # Get secondary patterns
-        secondary_patterns = all_matches[1:top_k]
+        secondary_patterns = top_matches[1:top_k]
         
         # Calculate pattern mixture (probability distribution)
-        pattern_mixture = self._calculate_pattern_mixture(all_matches)
+        pattern_mixture = self._calculate_pattern_mixture(
+            [self.compiled_rules.pattern_names[idx] for idx in ranked],
+            ranked_confidence
+        )
         
         # Predict multi-label tags
         tags, tag_confidence = self._predict_tags(startup_data, camp_scores)
@@ -151,10 +275,8 @@ class PatternMatcherV2:
         )
         
         # Calculate pattern stability and uniqueness
-        pattern_stability = self._calculate_stability(all_matches)
-        pattern_uniqueness = self._calculate_uniqueness(
-            primary_pattern, all_matches
-        )
+        pattern_stability = self._calculate_stability(ranked_confidence)
+        pattern_uniqueness = self._calculate_uniqueness(ranked_confidence)
         
         # Success modifier based on pattern fit
         success_modifier = self._calculate_success_modifier(
@@ -174,34 +296,25 @@ class PatternMatcherV2:
             pattern_success_modifier=success_modifier
         )
     
-    def _evaluate_pattern_match(self, startup_data: pd.DataFrame,
-                               camp_scores: Dict[str, float],
-                               pattern: PatternDefinition) -> PatternMatch:
-        """Evaluate how well a startup matches a specific pattern"""
-        
-        # 1. CAMP-based matching (40% weight)
-        camp_match_score, camp_distances = self._calculate_camp_match(
-            camp_scores, pattern.camp_thresholds
-        )
-        
-        # 2. Feature-based matching (40% weight)
-        feature_match_score, matching_features, missing_features = \
-            self._calculate_feature_match(startup_data, pattern.feature_rules)
-        
-        # 3. Statistical matching if trained (20% weight)
-        statistical_match_score = 0.5  # Default
-        if self.is_trained and pattern.name in self.pattern_profiles:
-            statistical_match_score = self._calculate_statistical_match(
-                startup_data, camp_scores, pattern.name
-            )
+    def _build_pattern_match(self, pattern_idx: int,
+                             camp_scores: Dict[str, float],
+                             confidence: float,
+                             camp_match_score: float,
+                             feature_match_score: float,
+                             statistical_match_score: float,
+                             camp_distances: np.ndarray,
+                             rule_outcomes: np.ndarray) -> PatternMatch:
+        """Build the detailed match for one pattern from precomputed scores"""
+        pattern = self.pattern_library.patterns[pattern_idx]
+        rules = self.compiled_rules
         
-        # Weighted combination
-        weights = [0.4, 0.4, 0.2] if self.is_trained else [0.5, 0.5, 0.0]
-        confidence = (
-            weights[0] * camp_match_score +
-            weights[1] * feature_match_score +
-            weights[2] * statistical_match_score
-        )
+        matching_features = []
+        missing_features = []
+        for rule_idx in rules.pattern_rule_indices[pattern_idx]:
+            if rule_outcomes[rule_idx]:
+                matching_features.append(rules.rule_features[rule_idx])
+            else:
+                missing_features.append(rules.rule_features[rule_idx])
         
         # Determine match type
         if confidence > 0.75:
@@ -224,14 +337,16 @@ class PatternMatcherV2:
         
         return PatternMatch(
             pattern_name=pattern.name,
-            confidence=confidence,
+            confidence=float(confidence),
             match_type=match_type,
-            camp_match_score=camp_match_score,
-            feature_match_score=feature_match_score,
-            statistical_match_score=statistical_match_score,
+            camp_match_score=float(camp_match_score),
+            feature_match_score=float(feature_match_score),
+            statistical_match_score=float(statistical_match_score),
             matching_features=matching_features,
             missing_features=missing_features,
-            camp_distances=camp_distances,
+            camp_distances={
+                dim: float(dist) for dim, dist in zip(CAMP_DIMENSIONS, camp_distances)
+            },
             pattern_category=pattern.category.value,
             expected_success_rate=np.mean(pattern.success_rate_range),
             similar_companies=pattern.example_companies[:3],
@@ -239,126 +354,120 @@ class PatternMatcherV2:
             improvement_suggestions=improvement_suggestions
         )
     
-    def _calculate_camp_match(self, camp_scores: Dict[str, float],
-                             thresholds: Dict[str, tuple]) -> Tuple[float, Dict[str, float]]:
-        """Calculate CAMP-based pattern match score"""
-        match_scores = []
-        distances = {}
-        
-        for dimension in ['capital', 'advantage', 'market', 'people']:
-            score = camp_scores.get(f'{dimension}_score', 50)
-            min_val, max_val = thresholds.get(dimension, (0, 100))
-            
-            # Calculate match score for this dimension
-            if min_val <= score <= max_val:
-                # Perfect match within range
-                dim_score = 1.0
-                distance = 0
-            else:
-                # Calculate distance from range
-                if score < min_val:
-                    distance = min_val - score
-                else:
-                    distance = score - max_val
-                
-                # Convert distance to score (exponential decay)
-                dim_score = np.exp(-distance / 20)  # 20 point scale
-            
-            match_scores.append(dim_score)
-            distances[dimension] = distance
-        
-        # Overall match is average of dimensions
-        overall_match = np.mean(match_scores)
+    def _calculate_camp_matches(self, camp_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate CAMP-based match scores for every (startup, pattern) pair
+        
+        Returns:
+            (startups, patterns) match scores and (startups, patterns, 4) distances
+        """
+        scores = camp_matrix[:, np.newaxis, :]
+        
+        # Distance from the pattern range, 0 inside it
+        distances = (
+            np.maximum(self.compiled_rules.camp_min - scores, 0) +
+            np.maximum(scores - self.compiled_rules.camp_max, 0)
+        )
         
-        return overall_match, distances
+        # Convert distance to score (exponential decay on a 20 point scale)
+        return np.exp(-distances / 20).mean(axis=2), distances
     
-    def _calculate_feature_match(self, startup_data: pd.DataFrame,
-                                feature_rules: Dict[str, callable]) -> Tuple[float, List[str], List[str]]:
-        """Calculate feature-based pattern match score"""
-        matching_features = []
-        missing_features = []
-        
-        for feature_name, rule_func in feature_rules.items():
-            if feature_name in startup_data.columns:
-                value = startup_data[feature_name].iloc[0]
-                try:
-                    if rule_func(value):
-                        matching_features.append(feature_name)
-                    else:
-                        missing_features.append(feature_name)
-                except:
-                    missing_features.append(feature_name)
-            else:
-                # Feature not available in data
-                missing_features.append(feature_name)
-        
-        # Calculate match score
-        total_rules = len(feature_rules)
-        if total_rules > 0:
-            match_score = len(matching_features) / total_rules
-        else:
-            match_score = 0.5  # No rules defined
-        
-        return match_score, matching_features, missing_features
+    def _evaluate_rules(self, startup_data: pd.DataFrame) -> np.ndarray:
+        """Evaluate every compiled feature rule over all rows
+        
+        Returns:
+            (startups, rules) boolean matrix; missing features and rules that
+            raise count as not matching
+        """
+        rules = self.compiled_rules
+        n_rows = len(startup_data)
+        outcomes = np.zeros((n_rows, len(rules.rule_funcs)), dtype=bool)
+        columns = {}
+        
+        for rule_idx, (feature_name, rule_func) in enumerate(zip(rules.rule_features, rules.rule_funcs)):
+            if feature_name not in startup_data.columns:
+                continue
+            if feature_name not in columns:
+                columns[feature_name] = startup_data[feature_name].to_numpy()
+            outcomes[:, rule_idx] = self._apply_rule(rule_func, columns[feature_name])
+        
+        return outcomes
     
-    def _calculate_statistical_match(self, startup_data: pd.DataFrame,
-                                   camp_scores: Dict[str, float],
-                                   pattern_name: str) -> float:
-        """Calculate statistical similarity to pattern profile"""
-        if pattern_name not in self.pattern_profiles:
-            return 0.5
-        
-        profile = self.pattern_profiles[pattern_name]
-        
-        # Create feature vector combining CAMP scores and key features
-        feature_vector = []
-        
-        # Add CAMP scores
-        for dim in ['capital', 'advantage', 'market', 'people']:
-            feature_vector.append(camp_scores.get(f'{dim}_score', 50))
-        
-        # Add key numerical features
-        key_features = [
-            'revenue_growth_rate_percent',
-            'burn_multiple',
-            'net_dollar_retention_percent',
-            'product_retention_30d',
-            'team_size_full_time'
-        ]
-        
-        for feature in key_features:
-            if feature in startup_data.columns:
-                feature_vector.append(startup_data[feature].iloc[0])
-            else:
-                feature_vector.append(profile.get(f'{feature}_mean', 0))
-        
-        # Convert to numpy array
-        feature_vector = np.array(feature_vector).reshape(1, -1)
-        profile_vector = profile['mean_vector'].reshape(1, -1)
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(feature_vector, profile_vector)[0, 0]
+    @staticmethod
+    def _apply_rule(rule_func: Callable, values: np.ndarray) -> np.ndarray:
+        """Apply a rule to a column, element-wise only if it cannot broadcast"""
+        try:
+            result = np.asarray(rule_func(values))
+            if result.shape == values.shape:
+                return result.astype(bool)
+        except Exception:
+            pass
+        
+        # Rules like chained comparisons or `or` need scalar inputs
+        result = np.zeros(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                result[i] = bool(rule_func(value))
+            except Exception:
+                result[i] = False
+        return result
+    
+    def _calculate_feature_matches(self, rule_outcomes: np.ndarray) -> np.ndarray:
+        """Fraction of each pattern's rules met, for every (startup, pattern) pair"""
+        rules = self.compiled_rules
+        matched = rule_outcomes.astype(float) @ rules.rule_membership.T
+        
+        return np.divide(
+            matched, rules.rule_counts,
+            out=np.full(matched.shape, 0.5),  # No rules defined
+            where=rules.rule_counts > 0
+        )
+    
+    def _calculate_statistical_matches(self, startup_data: pd.DataFrame,
+                                       camp_matrix: np.ndarray) -> np.ndarray:
+        """Calculate statistical similarity to pattern profiles for all pairs"""
+        n_rows = camp_matrix.shape[0]
+        result = np.full((n_rows, len(self.compiled_rules.pattern_names)), 0.5)  # Default
+        if not self.is_trained:
+            return result
+        
+        for pattern_idx, pattern_name in enumerate(self.compiled_rules.pattern_names):
+            if pattern_name not in self.pattern_profiles:
+                continue
+            profile = self.pattern_profiles[pattern_name]
+            
+            # Feature vectors combining CAMP scores and key features,
+            # falling back to the profile mean for absent features
+            feature_columns = [
+                startup_data[feature].to_numpy(dtype=float)
+                if feature in startup_data.columns
+                else np.full(n_rows, profile.get(f'{feature}_mean', 0), dtype=float)
+                for feature in STATISTICAL_FEATURES
+            ]
+            feature_matrix = np.column_stack([camp_matrix, *feature_columns])
+            
+            # Calculate cosine similarity and convert to 0-1 range
+            similarity = cosine_similarity(
+                feature_matrix, profile['mean_vector'].reshape(1, -1)
+            )[:, 0]
+            result[:, pattern_idx] = (similarity + 1) / 2
         
-        # Convert to 0-1 range
-        return (similarity + 1) / 2
+        return result
     
-    def _calculate_pattern_mixture(self, matches: List[PatternMatch]) -> Dict[str, float]:
+    def _calculate_pattern_mixture(self, pattern_names: List[str],
+                                   confidences: np.ndarray) -> Dict[str, float]:
         """Calculate probability distribution over patterns"""
-        if not matches:
+        if len(pattern_names) == 0:
             return {}
         
-        # Get all confidence scores
-        confidences = [m.confidence for m in matches]
-        
         # Convert to probabilities using softmax
         exp_scores = np.exp(confidences)
         probabilities = exp_scores / exp_scores.sum()
         
         # Create mixture dictionary
         mixture = {}
-        for match, prob in zip(matches, probabilities):
+        for name, prob in zip(pattern_names, probabilities):
             if prob > 0.01:  # Only include significant probabilities
-                mixture[match.pattern_name] = float(prob)
+                mixture[name] = float(prob)
         
         return mixture
     
@@ -458,22 +567,29 @@ class PatternMatcherV2:
     
     def _predict_next_patterns(self, current_pattern: str,
                               current_stage: str) -> List[Tuple[str, float]]:
-        """Predict likely next patterns based on evolution matrix"""
+        """Predict likely next patterns based on the pattern evolution graph"""
+        key = (current_pattern, current_stage)
+        if key not in self._next_pattern_cache:
+            self._next_pattern_cache[key] = self._rank_next_patterns(
+                current_pattern, current_stage
+            )
+        return list(self._next_pattern_cache[key])
+    
+    def _rank_next_patterns(self, current_pattern: str,
+                            current_stage: str) -> List[Tuple[str, float]]:
         next_patterns = []
         
-        # Get evolution paths from pattern definition
-        pattern_def = self.pattern_library.get_pattern(current_pattern)
-        if pattern_def:
-            for next_pattern in pattern_def.evolution_paths:
-                # Simple probability based on stage progression
-                if current_stage in ['early', 'emerging']:
-                    probability = 0.7
-                elif current_stage in ['growing', 'scaling']:
-                    probability = 0.5
-                else:
-                    probability = 0.3
-                
-                next_patterns.append((next_pattern, probability))
+        # Get evolution paths from the precomputed graph
+        for next_pattern, _ in self.pattern_library.graph.get_successors(current_pattern):
+            # Simple probability based on stage progression
+            if current_stage in ['early', 'emerging']:
+                probability = 0.7
+            elif current_stage in ['growing', 'scaling']:
+                probability = 0.5
+            else:
+                probability = 0.3
+            
+            next_patterns.append((next_pattern, probability))
         
         # Add stage-based transitions
         if current_stage == 'early' and 'STRUGGLING' not in current_pattern:
@@ -485,14 +601,18 @@ class PatternMatcherV2:
         
         return next_patterns[:3]
     
-    def _calculate_stability(self, matches: List[PatternMatch]) -> float:
-        """Calculate how clearly the startup matches its primary pattern"""
-        if len(matches) < 2:
+    def _calculate_stability(self, confidences: np.ndarray) -> float:
+        """Calculate how clearly the startup matches its primary pattern
+        
+        Args:
+            confidences: Match confidences sorted in descending order
+        """
+        if len(confidences) < 2:
             return 1.0
         
         # Stability is high when primary pattern has much higher confidence
-        primary_conf = matches[0].confidence
-        secondary_conf = matches[1].confidence if len(matches) > 1 else 0
+        primary_conf = confidences[0]
+        secondary_conf = confidences[1]
         
         # Calculate relative difference
         if secondary_conf > 0:
@@ -500,13 +620,12 @@ class PatternMatcherV2:
         else:
             stability = 1.0
         
-        return max(0, min(1, stability))
+        return float(max(0, min(1, stability)))
     
-    def _calculate_uniqueness(self, primary: PatternMatch,
-                            all_matches: List[PatternMatch]) -> float:
+    def _calculate_uniqueness(self, confidences: np.ndarray) -> float:
         """Calculate how unique this pattern assignment is"""
         # High uniqueness when few other patterns match well
-        matching_patterns = sum(1 for m in all_matches if m.confidence > 0.5)
+        matching_patterns = int(np.sum(confidences > 0.5))
         
         if matching_patterns <= 1:
             uniqueness = 1.0
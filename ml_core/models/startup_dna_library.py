@@ -3,10 +3,12 @@ Comprehensive Startup DNA Library
 50+ startup patterns based on real-world success stories
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .pattern_graph import PatternGraph
+
 class DNACategory(Enum):
     GROWTH_FOCUSED = "growth_focused"
     EFFICIENCY_FOCUSED = "efficiency_focused"
@@ -36,6 +38,13 @@ class StartupDNALibrary:
     def __init__(self):
         self.patterns = self._initialize_patterns()
         self.pattern_index = {p.name: p for p in self.patterns}
+        self.graph = PatternGraph(
+            names=[p.name for p in self.patterns],
+            categories=[p.category.value for p in self.patterns],
+            stages=[p.typical_funding_stage for p in self.patterns],
+            evolution_paths=[p.evolution_paths for p in self.patterns],
+            success_rates=[p.success_rate for p in self.patterns]
+        )
         
     def _initialize_patterns(self) -> List[DNAPattern]:
         """Initialize all DNA patterns"""
@@ -828,32 +837,25 @@ class StartupDNALibrary:
     
     def get_patterns_by_category(self, category: DNACategory) -> List[DNAPattern]:
         """Get all patterns in a category"""
-        return [p for p in self.patterns if p.category == category]
+        return [self.pattern_index[name] for name in self.graph.get_patterns_by_category(category.value)]
     
     def get_patterns_by_stage(self, funding_stage: str) -> List[DNAPattern]:
         """Get patterns typical for a funding stage"""
-        return [p for p in self.patterns if funding_stage in p.typical_funding_stage]
+        return [self.pattern_index[name] for name in self.graph.get_patterns_by_stage(funding_stage)]
     
     def get_evolution_paths(self, current_pattern: str) -> List[str]:
         """Get possible evolution paths from current pattern"""
-        pattern = self.get_pattern(current_pattern)
-        return pattern.evolution_paths if pattern else []
+        return [name for name, _ in self.graph.get_successors(current_pattern)]
+    
+    def get_multi_step_evolution(self, current_pattern: str, max_steps: int = 3,
+                                 min_probability: float = 0.05) -> List[Tuple[List[str], float]]:
+        """Get multi-step evolution paths with their probabilities"""
+        return self.graph.get_evolution_paths(current_pattern, max_steps, min_probability)
     
     def get_similar_patterns(self, pattern_name: str, max_results: int = 5) -> List[str]:
         """Find similar patterns based on characteristics"""
-        pattern = self.get_pattern(pattern_name)
-        if not pattern:
-            return []
-        
-        # Simple similarity based on same category and success rate
-        similar = []
-        for p in self.patterns:
-            if p.name != pattern_name and p.category == pattern.category:
-                similarity_score = 1 - abs(p.success_rate - pattern.success_rate)
-                similar.append((p.name, similarity_score))
-        
-        similar.sort(key=lambda x: x[1], reverse=True)
-        return [name for name, _ in similar[:max_results]]
+        # Similarity based on same category and success rate
+        return [name for name, _ in self.graph.get_similar(pattern_name, max_results)]
 
 # Create global instance
 STARTUP_DNA_LIBRARY = StartupDNALibrary()
\ No newline at end of file
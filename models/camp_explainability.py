@@ -17,6 +17,7 @@ from feature_config import (
     CAPITAL_FEATURES, ADVANTAGE_FEATURES, MARKET_FEATURES, PEOPLE_FEATURES,
     ALL_FEATURES
 )
+from utils.shap_background import load_background_sample, BACKGROUND_SEED
 
 logger = logging.getLogger(__name__)
 
@@ -67,9 +68,13 @@ class CAMPExplainabilitySystem:
                     
     def _initialize_explainers(self):
         """Initialize SHAP explainers with background data"""
-        # Create synthetic background data representing typical startups
-        n_background = 100
-        self.background_data = self._create_background_data(n_background)
+        # Persisted sample of the training data, or of synthetic typical
+        # startups when no training data is available
+        self.background_data = load_background_sample(
+            ALL_FEATURES,
+            path=os.path.join(self.model_dir, 'shap_background.pkl'),
+            generator=self._create_background_data
+        )
         
         # Initialize explainer for the model that works best (industry_model)
         if 'industry_model' in self.models:
@@ -84,8 +89,11 @@ class CAMPExplainabilitySystem:
                 # Fallback to simple feature importance
                 self.explainers['industry_model'] = None
                 
-    def _create_background_data(self, n_samples: int) -> pd.DataFrame:
+    def _create_background_data(self, n_samples: int,
+                                rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
         """Create background data for SHAP"""
+        rng = rng if rng is not None else np.random.default_rng(BACKGROUND_SEED)
+        
         # Create realistic ranges for each feature
         background_data = {}
         
@@ -94,7 +102,7 @@ class CAMPExplainabilitySystem:
                            'monthly_burn_usd', 'tam_size_usd', 'sam_size_usd', 'som_size_usd']
         for feat in monetary_features:
             if feat in ALL_FEATURES:
-                background_data[feat] = np.random.lognormal(10, 2, n_samples)
+                background_data[feat] = rng.lognormal(10, 2, n_samples)
         
         # Percentage features (normal distribution, clipped)
         percentage_features = ['market_growth_rate_percent', 'user_growth_rate_percent',
@@ -102,9 +110,9 @@ class CAMPExplainabilitySystem:
         for feat in percentage_features:
             if feat in ALL_FEATURES:
                 if feat == 'net_dollar_retention_percent':
-                    background_data[feat] = np.clip(np.random.normal(110, 20, n_samples), 50, 200)
+                    background_data[feat] = np.clip(rng.normal(110, 20, n_samples), 50, 200)
                 else:
-                    background_data[feat] = np.clip(np.random.normal(30, 20, n_samples), -50, 100)
+                    background_data[feat] = np.clip(rng.normal(30, 20, n_samples), -50, 100)
         
         # Score features (1-5)
         score_features = ['tech_differentiation_score', 'switching_cost_score',
@@ -112,26 +120,26 @@ class CAMPExplainabilitySystem:
                          'board_advisor_experience_score', 'execution_risk_score']
         for feat in score_features:
             if feat in ALL_FEATURES:
-                background_data[feat] = np.random.randint(1, 6, n_samples)
+                background_data[feat] = rng.integers(1, 6, n_samples)
         
         # Binary features
         binary_features = ['has_debt', 'network_effects_present', 'has_data_moat',
                           'regulatory_advantage_present', 'has_repeat_founder']
         for feat in binary_features:
             if feat in ALL_FEATURES:
-                background_data[feat] = np.random.choice([0, 1], n_samples)
+                background_data[feat] = rng.choice([0, 1], n_samples)
         
         # Other numeric features
-        remaining_features = set(ALL_FEATURES) - set(background_data.keys())
+        remaining_features = [f for f in ALL_FEATURES if f not in background_data]
         for feat in remaining_features:
             if feat == 'runway_months':
-                background_data[feat] = np.clip(np.random.normal(12, 6, n_samples), 0, 36)
+                background_data[feat] = np.clip(rng.normal(12, 6, n_samples), 0, 36)
             elif feat == 'company_age_months':
-                background_data[feat] = np.clip(np.random.normal(24, 12, n_samples), 1, 120)
+                background_data[feat] = np.clip(rng.normal(24, 12, n_samples), 1, 120)
             elif 'count' in feat:
-                background_data[feat] = np.random.poisson(5, n_samples)
+                background_data[feat] = rng.poisson(5, n_samples)
             else:
-                background_data[feat] = np.random.normal(0, 1, n_samples)
+                background_data[feat] = rng.normal(0, 1, n_samples)
         
         return pd.DataFrame(background_data)[ALL_FEATURES]
     
@@ -139,46 +147,60 @@ class CAMPExplainabilitySystem:
         """
         Generate CAMP scores that explain the ML prediction
         """
-        # Convert features to DataFrame
-        feature_df = pd.DataFrame([features])[ALL_FEATURES]
+        return self.explain_batch([features], [prediction])[0]
+    
+    def explain_batch(self, features: List[Dict[str, Any]],
+                      predictions: List[float]) -> List[CAMPExplanation]:
+        """
+        Generate CAMP explanations for many startups with one SHAP pass
+        """
+        feature_df = pd.DataFrame(features)[ALL_FEATURES]
         
         # Get SHAP values if available
+        shap_matrix = None
         if self.explainers.get('industry_model'):
             try:
                 shap_values = self.explainers['industry_model'].shap_values(feature_df)
                 if isinstance(shap_values, list):
                     # For binary classification, use positive class
                     shap_values = shap_values[1]
-                
-                # Convert to feature impacts
-                feature_impacts = dict(zip(ALL_FEATURES, shap_values[0]))
+                shap_matrix = np.asarray(shap_values)
+                if shap_matrix.ndim == 3:
+                    shap_matrix = shap_matrix[:, :, -1]
             except Exception as e:
                 logger.warning(f"SHAP calculation failed: {e}, using fallback")
-                feature_impacts = self._calculate_fallback_impacts(features, prediction)
-        else:
-            feature_impacts = self._calculate_fallback_impacts(features, prediction)
-        
-        # Calculate CAMP scores based on feature impacts
-        camp_scores = self._calculate_camp_from_impacts(feature_impacts, features)
-        
-        # Identify critical factors
-        critical_factors = self._identify_critical_factors(feature_impacts, features)
         
-        # Generate alignment explanation
-        alignment = self._explain_alignment(
-            prediction, camp_scores, critical_factors, features
-        )
+        explanations = []
+        for row, (row_features, prediction) in enumerate(zip(features, predictions)):
+            if shap_matrix is not None:
+                # Convert to feature impacts
+                feature_impacts = dict(zip(ALL_FEATURES, shap_matrix[row]))
+            else:
+                feature_impacts = self._calculate_fallback_impacts(row_features, prediction)
+            
+            # Calculate CAMP scores based on feature impacts
+            camp_scores = self._calculate_camp_from_impacts(feature_impacts, row_features)
+            
+            # Identify critical factors
+            critical_factors = self._identify_critical_factors(feature_impacts, row_features)
+            
+            # Generate alignment explanation
+            alignment = self._explain_alignment(
+                prediction, camp_scores, critical_factors, row_features
+            )
+            
+            explanations.append(CAMPExplanation(
+                capital_score=camp_scores['capital'],
+                advantage_score=camp_scores['advantage'],
+                market_score=camp_scores['market'],
+                people_score=camp_scores['people'],
+                success_probability=prediction,
+                critical_factors=critical_factors,
+                feature_impacts=feature_impacts,
+                alignment_explanation=alignment
+            ))
         
-        return CAMPExplanation(
-            capital_score=camp_scores['capital'],
-            advantage_score=camp_scores['advantage'],
-            market_score=camp_scores['market'],
-            people_score=camp_scores['people'],
-            success_probability=prediction,
-            critical_factors=critical_factors,
-            feature_impacts=feature_impacts,
-            alignment_explanation=alignment
-        )
+        return explanations
     
     def _calculate_fallback_impacts(self, features: Dict[str, Any], 
                                   prediction: float) -> Dict[str, float]:
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Counterfactual Search
+Finds the cheapest edits to actionable features that move a startup across a verdict threshold
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ActionableFeature:
+    """A feature a startup can change, and how far the search may move it"""
+    name: str
+    direction: int                    # +1 if raising it helps, -1 if lowering it helps
+    scale: float                      # Step unit when the current value is zero
+    steps: Tuple[float, ...] = (0.1, 0.25, 0.5, 1.0)  # Relative changes, cheapest first
+    min_value: float = 0.0
+    max_value: Optional[float] = None
+    cost: float = 1.0                 # Effort per unit of relative change
+    integer: bool = False
+
+
+ACTIONABLE_FEATURES = [
+    # Burn
+    ActionableFeature("monthly_burn_usd", -1, scale=10_000, steps=(0.1, 0.2, 0.35, 0.5)),
+    ActionableFeature("burn_multiple", -1, scale=0.5, steps=(0.1, 0.25, 0.4, 0.6)),
+    # Runway
+    ActionableFeature("runway_months", 1, scale=6),
+    # Retention
+    ActionableFeature("product_retention_30d", 1, scale=0.1, max_value=1.0),
+    ActionableFeature("product_retention_90d", 1, scale=0.1, max_value=1.0),
+    ActionableFeature("net_dollar_retention_percent", 1, scale=10, max_value=300),
+    # Team
+    ActionableFeature("team_size_full_time", 1, scale=2, cost=1.5, integer=True),
+]
+
+
+class CounterfactualSearch:
+    """
+    Best-first search over bounded edits, scored in batches by the orchestrator
+
+    Candidates are vectors of step levels, one per actionable feature. Each
+    round expands the most promising non-crossing candidates by one step and
+    scores all children in a single score_batch call. Directions come from the
+    feature registry's monotonicity hints, so a candidate that moves every
+    feature at least as far as a known solution is pruned: it would cross the
+    threshold too, only at a higher cost.
+    """
+
+    def __init__(self, orchestrator, features: Optional[List[ActionableFeature]] = None,
+                 beam_width: int = 32, max_edits: int = 3):
+        self.orchestrator = orchestrator
+        self.features = self._apply_registry_hints(features or ACTIONABLE_FEATURES)
+        self.beam_width = beam_width
+        self.max_edits = max_edits
+
+    @staticmethod
+    def _apply_registry_hints(features: List[ActionableFeature]) -> List[ActionableFeature]:
+        """Take directions and bounds from the feature registry where it knows them"""
+        from core.feature_registry import feature_registry
+
+        hints = feature_registry.get_monotonicity_hints()
+        adjusted = []
+        for feature in features:
+            if feature.name in feature_registry.features:
+                definition = feature_registry.features[feature.name]
+                feature = ActionableFeature(
+                    name=feature.name,
+                    direction=hints.get(feature.name, feature.direction),
+                    scale=feature.scale,
+                    steps=feature.steps,
+                    min_value=max(feature.min_value, definition.min_value or 0.0),
+                    max_value=definition.max_value if feature.max_value is None else feature.max_value,
+                    cost=feature.cost,
+                    integer=feature.integer
+                )
+            adjusted.append(feature)
+        return adjusted
+
+    def target_threshold(self, verdict: str) -> float:
+        """Lowest success probability that earns a verdict"""
+        for threshold, name, _ in self.orchestrator.VERDICT_THRESHOLDS:
+            if name == verdict:
+                return threshold
+        raise ValueError(f"Unknown target verdict: {verdict}")
+
+    def search(self, startup: Dict[str, Any], target_verdict: Optional[str] = None,
+               time_budget: float = 0.5, max_results: int = 5) -> Dict[str, Any]:
+        """
+        Find the cheapest edits that reach the target verdict
+
+        Args:
+            startup: Backend feature dict
+            target_verdict: Verdict to reach (default: the next verdict up)
+            time_budget: Seconds to search before returning the best found
+            max_results: Number of counterfactuals to return
+
+        Returns:
+            Dictionary with the base score, the target and the counterfactuals
+            found, cheapest first
+        """
+        started = time.perf_counter()
+        base = self.orchestrator._prepare_features(pd.DataFrame([startup])).reset_index(drop=True)
+        base_probability = float(self.orchestrator.score_batch(base, prepared=True)["success_probability"][0])
+        base_verdict = self.orchestrator._determine_verdict(base_probability)["verdict"]
+
+        if target_verdict is None:
+            better = [t for t in self.orchestrator.VERDICT_THRESHOLDS if t[0] > base_probability]
+            if not better:
+                return self._result(base_probability, base_verdict, None, [], 0, started, True)
+            target_verdict = better[-1][1]
+        threshold = self.target_threshold(target_verdict)
+
+        if base_probability >= threshold:
+            return self._result(base_probability, base_verdict, target_verdict, [], 0, started, True)
+
+        features, tables = self._level_tables(base)
+        if not features:
+            return self._result(base_probability, base_verdict, target_verdict, [], 0, started, True)
+        step_costs = [
+            np.concatenate([[0.0], np.asarray(f.steps[:len(t) - 1]) * f.cost])
+            for f, t in zip(features, tables)
+        ]
+        max_levels = np.array([len(t) - 1 for t in tables])
+
+        solutions = []
+        survivors = [np.zeros(len(features), dtype=int)]
+        seen = set()
+        scored = 0
+        exhausted = False
+
+        while True:
+            children = []
+            for parent in survivors:
+                for i in range(len(features)):
+                    if parent[i] >= max_levels[i]:
+                        continue
+                    child = parent.copy()
+                    child[i] += 1
+                    key = child.tobytes()
+                    if key in seen or np.count_nonzero(child) > self.max_edits:
+                        continue
+                    seen.add(key)
+                    # Monotone in every feature, so this crosses too at a higher cost
+                    if any(np.all(child >= solution[0]) for solution in solutions):
+                        continue
+                    children.append(child)
+
+            if not children:
+                exhausted = True
+                break
+
+            levels = np.vstack(children)
+            probabilities = self._score(base, features, tables, levels)
+            costs = sum(step_costs[i][levels[:, i]] for i in range(len(features)))
+            scored += len(children)
+
+            crossed = probabilities >= threshold
+            for row in np.flatnonzero(crossed):
+                solutions.append((levels[row], float(costs[row]), float(probabilities[row])))
+
+            remaining = np.flatnonzero(~crossed)
+            order = remaining[np.argsort(-probabilities[remaining], kind="stable")][:self.beam_width]
+            survivors = [levels[row] for row in order]
+
+            if time.perf_counter() - started > time_budget:
+                break
+            if len(solutions) >= max_results and survivors:
+                # Children always cost more than their parents
+                kth_cost = sorted(cost for _, cost, _ in solutions)[max_results - 1]
+                if min(costs[row] for row in order) >= kth_cost:
+                    exhausted = True
+                    break
+
+        solutions.sort(key=lambda s: (s[1], -s[2]))
+        counterfactuals = [
+            self._describe(features, tables, level, cost, probability, base_probability)
+            for level, cost, probability in solutions[:max_results]
+        ]
+        return self._result(base_probability, base_verdict, target_verdict,
+                            counterfactuals, scored, started, exhausted)
+
+    def _level_tables(self, base: pd.DataFrame) -> Tuple[List[ActionableFeature], List[np.ndarray]]:
+        """Values each feature takes at each step level; level 0 is the current value"""
+        features = []
+        tables = []
+        for feature in self.features:
+            if feature.name not in base.columns:
+                continue
+            current = float(base[feature.name].iloc[0])
+            magnitude = max(abs(current), feature.scale)
+            values = current + feature.direction * np.asarray(feature.steps) * magnitude
+            values = np.clip(values, feature.min_value, feature.max_value)
+            if feature.integer:
+                values = np.round(values)
+
+            # Drop levels that do not move the value, e.g. retention already at 100%
+            table = [current]
+            for value in values:
+                if feature.direction * (value - table[-1]) > 0:
+                    table.append(value)
+            if len(table) > 1:
+                features.append(feature)
+                tables.append(np.array(table))
+        return features, tables
+
+    def _score(self, base: pd.DataFrame, features: List[ActionableFeature],
+               tables: List[np.ndarray], levels: np.ndarray) -> np.ndarray:
+        """Score every candidate level vector in one batch"""
+        rows = base.loc[base.index.repeat(len(levels))].reset_index(drop=True)
+        for i, feature in enumerate(features):
+            rows[feature.name] = tables[i][levels[:, i]]
+        return self.orchestrator.score_batch(rows, prepared=True)["success_probability"]
+
+    def _describe(self, features: List[ActionableFeature], tables: List[np.ndarray], level: np.ndarray,
+                  cost: float, probability: float, base_probability: float) -> Dict[str, Any]:
+        edits = [
+            {
+                "feature": feature.name,
+                "from": float(table[0]),
+                "to": float(table[level[i]]),
+                "change": float(feature.steps[level[i] - 1]) * feature.direction
+            }
+            for i, (feature, table) in enumerate(zip(features, tables)) if level[i] > 0
+        ]
+        return {
+            "edits": edits,
+            "cost": cost,
+            "success_probability": probability,
+            "delta": probability - base_probability,
+            "verdict": self.orchestrator._determine_verdict(probability)["verdict"]
+        }
+
+    @staticmethod
+    def _result(base_probability, base_verdict, target_verdict, counterfactuals,
+                scored, started, exhausted) -> Dict[str, Any]:
+        return {
+            "base": {"success_probability": base_probability, "verdict": base_verdict},
+            "target_verdict": target_verdict,
+            "counterfactuals": counterfactuals,
+            "candidates_scored": scored,
+            # False when the time budget ran out before the search finished
+            "complete": exhausted,
+            "elapsed_ms": (time.perf_counter() - started) * 1000
+        }
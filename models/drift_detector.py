@@ -0,0 +1,277 @@
+"""
+Streaming drift detection for model monitoring
+Input features and model outputs are counted into fixed bins as predictions
+arrive; each check compares the recent window against a persisted training
+baseline with PSI, KS and Jensen-Shannon divergence in O(bins) per feature.
+"""
+
+import json
+import time
+import bisect
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from feature_config import ALL_FEATURES, CATEGORICAL_FEATURES
+
+logger = logging.getLogger(__name__)
+
+# Quantile bins fitted on the training data for numeric features
+BASELINE_BINS = 10
+# Model outputs are probabilities, binned on a fixed grid
+PREDICTION_EDGES = np.linspace(0, 1, 11)[1:-1]
+OTHER_CATEGORY = "__other__"
+# Keeps empty bins from making PSI and KL infinite
+EPSILON = 1e-4
+
+PSI_THRESHOLDS = {"warning": 0.1, "critical": 0.25}
+
+
+@dataclass
+class DriftReport:
+    """Drift of one feature or model output over the current window"""
+    name: str
+    kind: str  # 'feature' or 'prediction'
+    samples: int
+    psi: float
+    js_divergence: float
+    ks_statistic: Optional[float]
+    severity: Optional[str]  # None, 'medium' or 'high'
+
+
+class BinnedDistribution:
+    """
+    Reference distribution of one feature over fixed bins
+
+    Numeric features are split at ``edges`` (values above the last edge go
+    in the last bin); categorical features have one bin per known category
+    plus one for anything unseen in training.
+    """
+
+    def __init__(self, reference: np.ndarray, edges: Optional[List[float]] = None,
+                 categories: Optional[List[str]] = None):
+        self.edges = None if edges is None else np.asarray(edges, dtype=float)
+        self._edge_list = None if edges is None else [float(e) for e in edges]
+        self.categories = categories
+        self._category_index = {c: i for i, c in enumerate(categories or [])}
+        self.reference = np.asarray(reference, dtype=float)
+
+    @property
+    def bins(self) -> int:
+        return len(self.reference)
+
+    @classmethod
+    def fit(cls, values: np.ndarray, categorical: bool = False) -> "BinnedDistribution":
+        """Bins and reference proportions from training values"""
+        if categorical:
+            labels, counts = np.unique(np.asarray(values, dtype=str), return_counts=True)
+            categories = [str(label) for label in labels] + [OTHER_CATEGORY]
+            return cls(np.append(counts, 0) / counts.sum(), categories=categories)
+
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, BASELINE_BINS + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        return cls(counts / counts.sum(), edges=edges.tolist())
+
+    def bin_of(self, value: Any) -> Optional[int]:
+        """Bin index of a raw value, or None when it cannot be binned"""
+        if value is None:
+            return None
+        if self.categories is not None:
+            return self._category_index.get(str(value), self.bins - 1)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        if value != value or value in (float("inf"), float("-inf")):
+            return None
+        return bisect.bisect_right(self._edge_list, value)
+
+    def compare(self, counts: np.ndarray) -> Dict[str, Optional[float]]:
+        """PSI, Jensen-Shannon divergence and (numeric only) KS of window counts against the reference"""
+        reference = np.clip(self.reference, EPSILON, None)
+        reference /= reference.sum()
+        current = np.clip(counts / counts.sum(), EPSILON, None)
+        current /= current.sum()
+
+        psi = float(np.sum((current - reference) * np.log(current / reference)))
+        mixture = (reference + current) / 2
+        js = float(0.5 * np.sum(reference * np.log2(reference / mixture))
+                   + 0.5 * np.sum(current * np.log2(current / mixture)))
+        ks = None
+        if self.categories is None:
+            ks = float(np.max(np.abs(np.cumsum(self.reference) - np.cumsum(counts / counts.sum()))))
+        return {"psi": psi, "js_divergence": js, "ks_statistic": ks}
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"reference": self.reference.tolist()}
+        if self.categories is not None:
+            data["categories"] = self.categories
+        else:
+            data["edges"] = self.edges.tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BinnedDistribution":
+        return cls(data["reference"], edges=data.get("edges"), categories=data.get("categories"))
+
+
+class _WindowCounts:
+    """Bin counts in hourly slots; the window is the sum of the slots still in range"""
+
+    def __init__(self, bins: int, slots: int):
+        # Plain lists: per-observation increments are much cheaper than on numpy scalars
+        self.counts = [[0] * bins for _ in range(slots)]
+        self.hours = [-1] * slots
+
+    def add(self, bin_index: int, hour: int):
+        slot = hour % len(self.hours)
+        if self.hours[slot] != hour:
+            self.hours[slot] = hour
+            self.counts[slot] = [0] * len(self.counts[slot])
+        self.counts[slot][bin_index] += 1
+
+    def window(self, hour: int) -> np.ndarray:
+        live = [counts for slot_hour, counts in zip(self.hours, self.counts)
+                if slot_hour > hour - len(self.hours)]
+        return np.sum(live, axis=0) if live else np.zeros(len(self.counts[0]), dtype=np.int64)
+
+
+class StreamingDriftDetector:
+    """
+    Per-feature and per-model drift against a persisted baseline
+
+    ``observe()`` costs one bin lookup per baselined feature. Model versions
+    without a training baseline for their outputs adopt their first
+    ``min_samples`` predictions as the reference, which is then persisted
+    with the rest of the baseline.
+    """
+
+    def __init__(self, baseline_path: str, window_hours: int = 24, min_samples: int = 200):
+        self.baseline_path = Path(baseline_path)
+        self.window_hours = window_hours
+        self.min_samples = min_samples
+        self.features: Dict[str, BinnedDistribution] = {}
+        self.predictions: Dict[str, BinnedDistribution] = {}
+        self._windows: Dict[str, _WindowCounts] = {}
+        self._pending_reference: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._load_baseline()
+
+    def _load_baseline(self):
+        if not self.baseline_path.exists():
+            return
+        try:
+            with open(self.baseline_path, 'r') as f:
+                data = json.load(f)
+            self.features = {name: BinnedDistribution.from_dict(d) for name, d in data.get("features", {}).items()}
+            self.predictions = {name: BinnedDistribution.from_dict(d)
+                                for name, d in data.get("predictions", {}).items()}
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not load drift baseline {self.baseline_path}: {e}")
+
+    def save_baseline(self):
+        """Persist the feature and prediction references"""
+        with self._lock:
+            data = {
+                "features": {name: d.to_dict() for name, d in self.features.items()},
+                "predictions": {name: d.to_dict() for name, d in self.predictions.items()}
+            }
+        tmp = self.baseline_path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        tmp.replace(self.baseline_path)
+
+    def fit_baseline(self, training_data, predictions: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Fit feature references from training data and persist them
+
+        Args:
+            training_data: DataFrame (or dict of columns) with the model features
+            predictions: Optional model version -> training-set predictions
+        """
+        features = {}
+        for name in ALL_FEATURES:
+            if name in training_data:
+                features[name] = BinnedDistribution.fit(
+                    np.asarray(training_data[name]), categorical=name in CATEGORICAL_FEATURES
+                )
+        with self._lock:
+            self.features = features
+            for version, values in (predictions or {}).items():
+                self.predictions[version] = self._prediction_distribution(np.asarray(values, dtype=float))
+            self._windows.clear()
+        self.save_baseline()
+        logger.info(f"Drift baseline fitted for {len(features)} features")
+
+    @staticmethod
+    def _prediction_distribution(values: np.ndarray) -> BinnedDistribution:
+        counts = np.bincount(np.searchsorted(PREDICTION_EDGES, values, side="right"),
+                             minlength=len(PREDICTION_EDGES) + 1)
+        return BinnedDistribution(counts / counts.sum(), edges=PREDICTION_EDGES.tolist())
+
+    def _window_for(self, key: str, bins: int) -> _WindowCounts:
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _WindowCounts(bins, self.window_hours)
+        return window
+
+    def observe(self, model_version: str, prediction: float, features: Dict[str, Any]):
+        """Count one prediction and its input features into the current window"""
+        hour = int(time.time() // 3600)
+        adopted = False
+        with self._lock:
+            for name, distribution in self.features.items():
+                bin_index = distribution.bin_of(features.get(name))
+                if bin_index is not None:
+                    self._window_for(f"feature:{name}", distribution.bins).add(bin_index, hour)
+
+            distribution = self.predictions.get(model_version)
+            if distribution is None:
+                pending = self._pending_reference.setdefault(
+                    model_version, np.zeros(len(PREDICTION_EDGES) + 1, dtype=np.int64)
+                )
+                pending[np.searchsorted(PREDICTION_EDGES, prediction, side="right")] += 1
+                if pending.sum() >= self.min_samples:
+                    self.predictions[model_version] = BinnedDistribution(
+                        pending / pending.sum(), edges=PREDICTION_EDGES.tolist()
+                    )
+                    del self._pending_reference[model_version]
+                    adopted = True
+            else:
+                bin_index = distribution.bin_of(prediction)
+                if bin_index is not None:
+                    self._window_for(f"prediction:{model_version}", distribution.bins).add(bin_index, hour)
+
+        if adopted:
+            logger.info(f"Adopted first {self.min_samples} predictions of {model_version} as drift reference")
+            self.save_baseline()
+
+    def check(self) -> List[DriftReport]:
+        """Drift of every feature and model output with enough samples in the window"""
+        hour = int(time.time() // 3600)
+        with self._lock:
+            windows = {key: window.window(hour) for key, window in self._windows.items()}
+            references = {f"feature:{name}": d for name, d in self.features.items()}
+            references.update({f"prediction:{name}": d for name, d in self.predictions.items()})
+
+        reports = []
+        for key, counts in windows.items():
+            distribution = references.get(key)
+            samples = int(counts.sum())
+            if distribution is None or samples < self.min_samples:
+                continue
+            kind, name = key.split(":", 1)
+            scores = distribution.compare(counts)
+            severity = None
+            if scores["psi"] >= PSI_THRESHOLDS["critical"]:
+                severity = "high"
+            elif scores["psi"] >= PSI_THRESHOLDS["warning"]:
+                severity = "medium"
+            reports.append(DriftReport(name=name, kind=kind, samples=samples, severity=severity, **scores))
+        return reports
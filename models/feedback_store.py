@@ -0,0 +1,269 @@
+"""
+Ground-truth feedback store for model monitoring
+Indexes predictions by ID and stable feature hash, joins late outcomes in
+bulk and keeps per-model quality statistics up to date incrementally
+"""
+
+import csv
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.explanation_cache import canonical_features
+
+logger = logging.getLogger(__name__)
+
+# Prediction scores are binned this finely for AUC; ties within a bin count half
+SCORE_BINS = 100
+CALIBRATION_BUCKETS = 10
+
+
+def stable_features_hash(features: Dict[str, Any]) -> str:
+    """Content hash of a feature dict, identical across processes and restarts"""
+    keys = sorted(features)
+    payload = json.dumps([keys, canonical_features(features[k] for k in keys)])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class FeedbackStore:
+    """
+    SQLite index of predictions with their eventual outcomes
+
+    Predictions are indexed when the monitor flushes them. Outcomes arrive
+    later, by prediction ID or by feature hash (every unlabelled prediction
+    of that startup is labelled), and are joined in one statement per batch.
+    Each join also folds the newly labelled rows into per-day, per-bin
+    counters, so AUC, calibration and Brier score for any trailing window
+    are read from a few hundred rows instead of recomputed from scratch.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS predictions (
+                prediction_id TEXT PRIMARY KEY,
+                features_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                prediction REAL NOT NULL,
+                ts REAL NOT NULL,
+                actual_outcome REAL,
+                feedback_ts REAL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_predictions_hash ON predictions (features_hash)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts)"
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS feedback_stats (
+                model_version TEXT NOT NULL,
+                day TEXT NOT NULL,
+                bin INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                positives INTEGER NOT NULL,
+                sum_prediction REAL NOT NULL,
+                sum_outcome REAL NOT NULL,
+                brier_sum REAL NOT NULL,
+                PRIMARY KEY (model_version, day, bin)
+            )"""
+        )
+        self._conn.commit()
+
+    def index_predictions(self, records: List[Dict[str, Any]]) -> None:
+        """Index flushed prediction records; records without a prediction_id are skipped"""
+        rows = [
+            (r["prediction_id"], r["features_hash"], r["model_version"], float(r["prediction"]),
+             r["ts"] if "ts" in r else datetime.fromisoformat(r["timestamp"]).timestamp())
+            for r in records if r.get("prediction_id")
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO predictions (prediction_id, features_hash, model_version, prediction, ts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def record_outcomes(self, outcomes: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Join outcomes onto indexed predictions
+
+        Args:
+            outcomes: Dicts with ``actual_outcome`` and either ``prediction_id``
+                or ``features_hash``
+
+        Returns:
+            Counts of outcomes received, predictions labelled and outcomes
+            that matched no indexed prediction
+        """
+        incoming = []
+        for outcome in outcomes:
+            if outcome.get("actual_outcome") in (None, ""):
+                continue
+            incoming.append((outcome.get("prediction_id") or None, outcome.get("features_hash") or None,
+                             float(outcome["actual_outcome"])))
+        if not incoming:
+            return {"received": 0, "labelled": 0, "unmatched": 0}
+
+        now = datetime.now().timestamp()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS incoming (prediction_id TEXT, features_hash TEXT, outcome REAL)"
+            )
+            self._conn.execute("DELETE FROM incoming")
+            self._conn.executemany("INSERT INTO incoming VALUES (?, ?, ?)", incoming)
+
+            # Both joins use an index; an ID match wins over a hash match
+            matched = self._conn.execute(
+                """SELECT p.prediction_id, p.model_version, p.prediction, p.ts, MIN(i.outcome)
+                   FROM incoming i JOIN predictions p ON p.prediction_id = i.prediction_id
+                   WHERE p.actual_outcome IS NULL
+                   GROUP BY p.prediction_id
+                   UNION
+                   SELECT p.prediction_id, p.model_version, p.prediction, p.ts, MIN(i.outcome)
+                   FROM incoming i JOIN predictions p ON p.features_hash = i.features_hash
+                   WHERE p.actual_outcome IS NULL AND i.prediction_id IS NULL
+                     AND p.prediction_id NOT IN (SELECT prediction_id FROM incoming WHERE prediction_id IS NOT NULL)
+                   GROUP BY p.prediction_id"""
+            ).fetchall()
+            matched_keys = self._conn.execute(
+                """SELECT COUNT(*) FROM incoming i
+                   WHERE EXISTS (SELECT 1 FROM predictions p WHERE p.prediction_id = i.prediction_id)
+                      OR EXISTS (SELECT 1 FROM predictions p WHERE p.features_hash = i.features_hash)"""
+            ).fetchone()[0]
+
+            self._conn.executemany(
+                "UPDATE predictions SET actual_outcome = ?, feedback_ts = ? WHERE prediction_id = ?",
+                [(row[4], now, row[0]) for row in matched]
+            )
+            self._update_stats(matched)
+            self._conn.commit()
+
+        return {"received": len(incoming), "labelled": len(matched),
+                "unmatched": len(incoming) - matched_keys}
+
+    def _update_stats(self, matched: List[tuple]) -> None:
+        """Fold newly labelled predictions into the per-day, per-bin counters"""
+        if not matched:
+            return
+        increments = {}
+        for _, model_version, prediction, ts, outcome in matched:
+            day = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+            score_bin = min(max(int(prediction * SCORE_BINS), 0), SCORE_BINS - 1)
+            key = (model_version, day, score_bin)
+            n, positives, sum_prediction, sum_outcome, brier_sum = increments.get(key, (0, 0, 0.0, 0.0, 0.0))
+            increments[key] = (n + 1, positives + (outcome > 0.5), sum_prediction + prediction,
+                               sum_outcome + outcome, brier_sum + (prediction - outcome) ** 2)
+
+        self._conn.executemany(
+            """INSERT INTO feedback_stats
+                   (model_version, day, bin, n, positives, sum_prediction, sum_outcome, brier_sum)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (model_version, day, bin) DO UPDATE SET
+                   n = n + excluded.n,
+                   positives = positives + excluded.positives,
+                   sum_prediction = sum_prediction + excluded.sum_prediction,
+                   sum_outcome = sum_outcome + excluded.sum_outcome,
+                   brier_sum = brier_sum + excluded.brier_sum""",
+            [(*key, *values) for key, values in increments.items()]
+        )
+
+    def ingest_csv(self, path: str) -> Dict[str, int]:
+        """Join outcomes from a CSV with prediction_id or features_hash and actual_outcome columns"""
+        with open(path, newline="") as f:
+            return self.record_outcomes(csv.DictReader(f))
+
+    def quality_metrics(self, model_version: Optional[str] = None, days: int = 30) -> Dict[str, Dict[str, Any]]:
+        """
+        AUC, Brier score, accuracy and calibration per model version over the
+        trailing window of prediction days
+        """
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        query = ("SELECT model_version, bin, SUM(n), SUM(positives), SUM(sum_prediction), "
+                 "SUM(sum_outcome), SUM(brier_sum) FROM feedback_stats WHERE day >= ?")
+        params = [since]
+        if model_version is not None:
+            query += " AND model_version = ?"
+            params.append(model_version)
+        query += " GROUP BY model_version, bin"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        by_version = {}
+        for version, score_bin, n, positives, sum_prediction, sum_outcome, brier_sum in rows:
+            table = by_version.setdefault(version, np.zeros((SCORE_BINS, 5)))
+            table[score_bin] = (n, positives, sum_prediction, sum_outcome, brier_sum)
+        return {version: self._summarise(table) for version, table in by_version.items()}
+
+    @staticmethod
+    def _summarise(table: np.ndarray) -> Dict[str, Any]:
+        n, positives, sum_prediction, sum_outcome, brier_sum = table.T
+        negatives = n - positives
+        total, total_positives = n.sum(), positives.sum()
+        total_negatives = total - total_positives
+
+        auc = None
+        if total_positives and total_negatives:
+            # Mann-Whitney over bins: positives outrank negatives in lower bins, tie within a bin
+            negatives_below = np.concatenate([[0], np.cumsum(negatives)[:-1]])
+            auc = float((positives * negatives_below).sum() + 0.5 * (positives * negatives).sum()) / (
+                total_positives * total_negatives)
+
+        predicted_positive = np.arange(SCORE_BINS) >= SCORE_BINS // 2
+        correct = positives[predicted_positive].sum() + negatives[~predicted_positive].sum()
+
+        calibration = []
+        per_bucket = SCORE_BINS // CALIBRATION_BUCKETS
+        for bucket in range(CALIBRATION_BUCKETS):
+            rows = slice(bucket * per_bucket, (bucket + 1) * per_bucket)
+            count = n[rows].sum()
+            if count:
+                calibration.append({
+                    "bucket": f"{bucket * 10}-{bucket * 10 + 10}%",
+                    "count": int(count),
+                    "mean_prediction": float(sum_prediction[rows].sum() / count),
+                    "observed_rate": float(sum_outcome[rows].sum() / count)
+                })
+
+        return {
+            "labelled": int(total),
+            "positive_rate": float(total_positives / total),
+            "auc": auc,
+            "brier_score": float(brier_sum.sum() / total),
+            "accuracy": float(correct / total),
+            "expected_calibration_error": float(sum(
+                c["count"] * abs(c["mean_prediction"] - c["observed_rate"]) for c in calibration
+            ) / total),
+            "calibration": calibration
+        }
+
+    def labelled_counts(self, since: datetime) -> Dict[str, int]:
+        """Predictions made since the given time that have an outcome, per model version"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model_version, COUNT(*) FROM predictions "
+                "WHERE ts >= ? AND actual_outcome IS NOT NULL GROUP BY model_version",
+                (since.timestamp(),)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -14,8 +14,13 @@ from dataclasses import dataclass, asdict
 from collections import defaultdict
 import threading
 import time
+import uuid
 from scipy import stats
 
+from .prediction_log import PredictionLog, records_to_columns
+from .feedback_store import FeedbackStore, stable_features_hash
+from .drift_detector import StreamingDriftDetector, PSI_THRESHOLDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +35,7 @@ class PredictionMetrics:
     features_hash: str
     actual_outcome: Optional[float] = None
     feedback_timestamp: Optional[str] = None
+    prediction_id: Optional[str] = None
 
 
 @dataclass
@@ -68,6 +74,11 @@ class ModelPerformanceMonitor:
         self.experiments_file = self.monitoring_dir / "experiments.json"
         
         self.metrics_buffer = []
+        self.prediction_log = PredictionLog(self.monitoring_dir / "predictions")
+        self.feedback_store = FeedbackStore(self.monitoring_dir / "feedback.db")
+        self.drift_detector = StreamingDriftDetector(self.monitoring_dir / "drift_baseline.json")
+        self._flush_lock = threading.Lock()
+        self._migrate_daily_files()
         self.alerts = self._load_alerts()
         self.experiments = self._load_experiments()
         
@@ -110,12 +121,8 @@ class ModelPerformanceMonitor:
     
     def record_prediction(self, model_type: str, model_version: str,
                          prediction: float, confidence: float,
-                         latency_ms: float, features: Dict[str, Any]):
-        """Record a prediction for monitoring"""
-        
-        # Create feature hash for tracking
-        features_str = json.dumps(features, sort_keys=True)
-        features_hash = str(hash(features_str))
+                         latency_ms: float, features: Dict[str, Any]) -> str:
+        """Record a prediction for monitoring; returns its prediction ID for feedback"""
         
         metric = PredictionMetrics(
             timestamp=datetime.now().isoformat(),
@@ -123,10 +130,12 @@ class ModelPerformanceMonitor:
             prediction=prediction,
             confidence=confidence,
             latency_ms=latency_ms,
-            features_hash=features_hash
+            features_hash=stable_features_hash(features),
+            prediction_id=uuid.uuid4().hex
         )
         
         self.metrics_buffer.append(metric)
+        self.drift_detector.observe(metric.model_version, prediction, features)
         
         # Check for immediate alerts
         self._check_latency_alert(model_type, model_version, latency_ms)
@@ -135,38 +144,50 @@ class ModelPerformanceMonitor:
         # Flush buffer if large
         if len(self.metrics_buffer) > 1000:
             self._flush_metrics()
+        
+        return metric.prediction_id
+    
+    def record_feedback(self, features_hash: Optional[str], actual_outcome: float,
+                        prediction_id: Optional[str] = None) -> Dict[str, int]:
+        """Record the actual outcome for a prediction, by prediction ID or features hash"""
+        return self.record_feedback_bulk([{
+            "prediction_id": prediction_id,
+            "features_hash": features_hash,
+            "actual_outcome": actual_outcome
+        }])
+    
+    def record_feedback_bulk(self, outcomes: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Join a batch of late outcomes onto their predictions"""
+        # Outcomes can arrive before the periodic flush has indexed the prediction
+        self._flush_metrics()
+        return self.feedback_store.record_outcomes(outcomes)
     
-    def record_feedback(self, features_hash: str, actual_outcome: float):
-        """Record actual outcome for a prediction"""
-        # Update metrics with feedback
-        for metric in self.metrics_buffer:
-            if metric.features_hash == features_hash and metric.actual_outcome is None:
-                metric.actual_outcome = actual_outcome
-                metric.feedback_timestamp = datetime.now().isoformat()
-                break
+    def ingest_feedback_csv(self, path: str) -> Dict[str, int]:
+        """Join outcomes from a CSV export with prediction_id or features_hash and actual_outcome"""
+        self._flush_metrics()
+        return self.feedback_store.ingest_csv(path)
     
     def _flush_metrics(self):
-        """Flush metrics buffer to disk"""
-        if not self.metrics_buffer:
-            return
-        
-        # Append to daily metrics file
-        date_str = datetime.now().strftime("%Y%m%d")
-        daily_file = self.monitoring_dir / f"metrics_{date_str}.json"
-        
-        existing_metrics = []
-        if daily_file.exists():
-            with open(daily_file, 'r') as f:
-                existing_metrics = json.load(f)
-        
-        # Add new metrics
-        existing_metrics.extend([asdict(m) for m in self.metrics_buffer])
-        
-        with open(daily_file, 'w') as f:
-            json.dump(existing_metrics, f, indent=2)
-        
-        # Clear buffer
-        self.metrics_buffer = []
+        """Append the metrics buffer to the prediction log and index it for feedback"""
+        with self._flush_lock:
+            if not self.metrics_buffer:
+                return
+            
+            buffer, self.metrics_buffer = self.metrics_buffer, []
+            records = [asdict(m) for m in buffer]
+            self.prediction_log.append(records)
+            self.feedback_store.index_predictions(records)
+    
+    def _migrate_daily_files(self):
+        """Move metrics from the old whole-day JSON files into the prediction log"""
+        for daily_file in sorted(self.monitoring_dir.glob("metrics_*.json")):
+            try:
+                with open(daily_file, 'r') as f:
+                    self.prediction_log.append(json.load(f))
+                daily_file.unlink()
+                logger.info(f"Migrated {daily_file.name} into the prediction log")
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not migrate {daily_file.name}: {e}")
     
     def _monitoring_loop(self):
         """Background monitoring loop"""
@@ -175,6 +196,9 @@ class ModelPerformanceMonitor:
                 # Flush metrics periodically
                 self._flush_metrics()
                 
+                # Compact closed hours of the prediction log
+                self.prediction_log.compact()
+                
                 # Check for drift
                 self._check_model_drift()
                 
@@ -228,43 +252,36 @@ class ModelPerformanceMonitor:
             )
     
     def _check_model_drift(self):
-        """Check for model drift using recent predictions"""
-        # Load recent metrics
-        recent_metrics = self._load_recent_metrics(hours=24)
-        
-        if len(recent_metrics) < 100:
-            return  # Not enough data
-        
-        # Group by model version
-        model_metrics = defaultdict(list)
-        for metric in recent_metrics:
-            model_metrics[metric["model_version"]].append(metric)
-        
-        for model_version, metrics in model_metrics.items():
-            # Check prediction distribution
-            predictions = [m["prediction"] for m in metrics]
-            confidences = [m["confidence"] for m in metrics]
+        """Raise alerts for input features and model outputs drifting from their baseline"""
+        for report in self.drift_detector.check():
+            if report.severity is None:
+                continue
             
-            # Simple drift detection: check if distribution has shifted
-            if len(predictions) > 1000:
-                # Compare first half vs second half
-                mid = len(predictions) // 2
-                first_half = predictions[:mid]
-                second_half = predictions[mid:]
-                
-                # Kolmogorov-Smirnov test for distribution change
-                ks_stat, p_value = stats.ks_2samp(first_half, second_half)
-                
-                if p_value < 0.01:  # Significant drift
-                    self._create_alert(
-                        alert_type="drift",
-                        severity="high",
-                        model_type=model_version.split('_')[0],
-                        model_version=model_version,
-                        metric_name="prediction_distribution",
-                        current_value=ks_stat,
-                        threshold=0.01
-                    )
+            if report.kind == "prediction":
+                model_type, model_version = report.name.split('_')[0], report.name
+                metric_name = "prediction_distribution"
+            else:
+                model_type, model_version = "input_features", "all"
+                metric_name = f"feature_psi:{report.name}"
+            
+            self._create_alert(
+                alert_type="drift",
+                severity=report.severity,
+                model_type=model_type,
+                model_version=model_version,
+                metric_name=metric_name,
+                current_value=report.psi,
+                threshold=PSI_THRESHOLDS["critical" if report.severity == "high" else "warning"]
+            )
+    
+    def set_drift_baseline(self, training_data: pd.DataFrame,
+                           predictions: Optional[Dict[str, np.ndarray]] = None):
+        """Fit and persist the drift baseline from the training set"""
+        self.drift_detector.fit_baseline(training_data, predictions)
+    
+    def get_drift_report(self) -> List[Dict]:
+        """Current drift scores for every feature and model output with enough samples"""
+        return [asdict(report) for report in self.drift_detector.check()]
     
     def _create_alert(self, **kwargs):
         """Create a new alert"""
@@ -297,30 +314,18 @@ class ModelPerformanceMonitor:
                 return True
         return False
     
-    def _load_recent_metrics(self, hours: int = 24) -> List[Dict]:
-        """Load recent metrics from files"""
-        metrics = []
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        # Include buffer metrics
-        metrics.extend([asdict(m) for m in self.metrics_buffer])
-        
-        # Load from daily files
-        for i in range(hours // 24 + 1):
-            date = datetime.now() - timedelta(days=i)
-            date_str = date.strftime("%Y%m%d")
-            daily_file = self.monitoring_dir / f"metrics_{date_str}.json"
-            
-            if daily_file.exists():
-                with open(daily_file, 'r') as f:
-                    daily_metrics = json.load(f)
-                    
-                # Filter by time
-                for metric in daily_metrics:
-                    if datetime.fromisoformat(metric["timestamp"]) > cutoff_time:
-                        metrics.append(metric)
-        
-        return metrics
+    def _load_recent_metrics(self, hours: int = 24,
+                             columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Column arrays of recent metrics, oldest first, including the unflushed buffer"""
+        since = datetime.now() - timedelta(hours=hours)
+        logged = self.prediction_log.read(start=since, columns=columns)
+        
+        buffered = [asdict(m) for m in list(self.metrics_buffer)
+                    if datetime.fromisoformat(m.timestamp) > since]
+        if not buffered:
+            return logged
+        buffered_columns = records_to_columns(buffered, logged)
+        return {name: np.concatenate([logged[name], buffered_columns[name]]) for name in logged}
     
     def create_ab_test(self, experiment_name: str, model_a: str, model_b: str,
                       traffic_split: float = 0.5, min_samples: int = 1000):
@@ -428,46 +433,48 @@ class ModelPerformanceMonitor:
     
     def get_performance_summary(self, model_type: str = None, hours: int = 24) -> Dict:
         """Get performance summary for models"""
-        metrics = self._load_recent_metrics(hours)
+        metrics = self._load_recent_metrics(hours, columns=[
+            "model_version", "prediction", "confidence", "latency_ms"
+        ])
+        versions = metrics["model_version"]
         
         if model_type:
-            metrics = [m for m in metrics if model_type in m["model_version"]]
+            keep = np.char.find(versions, model_type) >= 0
+            metrics = {name: values[keep] for name, values in metrics.items()}
+            versions = metrics["model_version"]
         
-        if not metrics:
+        if not len(versions):
             return {"error": "No metrics found"}
         
-        # Group by model version
-        version_metrics = defaultdict(list)
-        for metric in metrics:
-            version_metrics[metric["model_version"]].append(metric)
+        # Outcome metrics come from the feedback store, over whole days
+        labelled = self.feedback_store.labelled_counts(datetime.now() - timedelta(hours=hours))
+        quality = self.feedback_store.quality_metrics(days=max(1, -(-hours // 24)))
         
         summary = {}
-        for version, version_data in version_metrics.items():
-            predictions = [m["prediction"] for m in version_data]
-            confidences = [m["confidence"] for m in version_data]
-            latencies = [m["latency_ms"] for m in version_data]
+        for version in np.unique(versions):
+            rows = versions == version
+            predictions = metrics["prediction"][rows]
+            latencies = metrics["latency_ms"][rows]
+            outcome_metrics = quality.get(str(version), {})
             
-            # Get feedback metrics
-            with_feedback = [m for m in version_data if m.get("actual_outcome") is not None]
-            
-            accuracy = None
-            if with_feedback:
-                correct = sum(1 for m in with_feedback 
-                            if (m["prediction"] > 0.5) == (m["actual_outcome"] > 0.5))
-                accuracy = correct / len(with_feedback)
-            
-            summary[version] = {
-                "total_predictions": len(version_data),
-                "avg_prediction": np.mean(predictions),
-                "avg_confidence": np.mean(confidences),
-                "avg_latency_ms": np.mean(latencies),
-                "p95_latency_ms": np.percentile(latencies, 95),
-                "accuracy": accuracy,
-                "feedback_rate": len(with_feedback) / len(version_data) if version_data else 0
+            summary[str(version)] = {
+                "total_predictions": int(rows.sum()),
+                "avg_prediction": float(predictions.mean()),
+                "avg_confidence": float(metrics["confidence"][rows].mean()),
+                "avg_latency_ms": float(latencies.mean()),
+                "p95_latency_ms": float(np.percentile(latencies, 95)),
+                "accuracy": outcome_metrics.get("accuracy"),
+                "auc": outcome_metrics.get("auc"),
+                "brier_score": outcome_metrics.get("brier_score"),
+                "feedback_rate": min(1.0, labelled.get(str(version), 0) / int(rows.sum()))
             }
         
         return summary
     
+    def get_outcome_metrics(self, model_version: str = None, days: int = 30) -> Dict:
+        """Rolling AUC, Brier score and calibration per model version from joined feedback"""
+        return self.feedback_store.quality_metrics(model_version=model_version, days=days)
+    
     def get_active_alerts(self) -> List[Dict]:
         """Get active (unresolved) alerts"""
         return [asdict(alert) for alert in self.alerts if not alert.resolved]
@@ -483,16 +490,9 @@ class ModelPerformanceMonitor:
         # Keep only last 30 days of metrics
         cutoff_date = datetime.now() - timedelta(days=30)
         
-        for file in self.monitoring_dir.glob("metrics_*.json"):
-            try:
-                date_str = file.stem.split('_')[1]
-                file_date = datetime.strptime(date_str, "%Y%m%d")
-                
-                if file_date < cutoff_date:
-                    file.unlink()
-                    logger.info(f"Deleted old metrics file: {file.name}")
-            except:
-                pass
+        removed = self.prediction_log.prune(before=cutoff_date)
+        if removed:
+            logger.info(f"Deleted {removed} old prediction log files")
         
         # Archive old resolved alerts
         active_alerts = [a for a in self.alerts if not a.resolved or 
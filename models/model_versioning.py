@@ -9,7 +9,7 @@ import shutil
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import joblib
 import hashlib
 from dataclasses import dataclass, asdict
@@ -52,6 +52,18 @@ class ModelVersioningSystem:
         
         self.metadata = self._load_metadata()
         self.deployment_history = self._load_deployment_history()
+        self._deployment_listeners: List[Callable[[str, str], None]] = []
+    
+    def add_deployment_listener(self, listener: Callable[[str, str], None]):
+        """Register a callback run with (model_type, version_id) after each deployment or rollback"""
+        self._deployment_listeners.append(listener)
+    
+    def _notify_deployment(self, model_type: str, version_id: str):
+        for listener in self._deployment_listeners:
+            try:
+                listener(model_type, version_id)
+            except Exception as e:
+                logger.error(f"Deployment listener failed: {e}")
     
     def _load_metadata(self) -> dict:
         """Load version metadata"""
@@ -184,6 +196,7 @@ class ModelVersioningSystem:
             
             # Log deployment
             self._log_deployment(version_id, model_type, deployment_strategy, "success")
+            self._notify_deployment(model_type, version_id)
             
             logger.info(f"Successfully deployed {version_id} to production")
             return True
@@ -304,6 +317,7 @@ class ModelVersioningSystem:
             # Log rollback
             self._log_deployment(rollback_version, model_type, "rollback", "success", 
                                f"Rolled back from {current_version}")
+            self._notify_deployment(model_type, rollback_version)
             
         return success
     
@@ -346,6 +360,7 @@ class ModelVersioningSystem:
         if success:
             # Clean up canary config
             canary_file.unlink()
+            self._notify_deployment(model_type, version_id)
             logger.info(f"Promoted canary {version_id} to full production")
         
         return success
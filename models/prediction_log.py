@@ -0,0 +1,195 @@
+"""
+Append-only prediction log for model monitoring
+Workers append NDJSON segments (one per hour and process); closed hours are
+compacted into columnar .npz files so readers load only the columns and
+hours they ask for.
+"""
+
+import os
+import json
+import fcntl
+import logging
+from collections import defaultdict
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Column name -> kind; "float" columns use NaN for missing values, "str" columns ""
+COLUMNS = {
+    "ts": "float",
+    "timestamp": "str",
+    "model_version": "str",
+    "prediction": "float",
+    "confidence": "float",
+    "latency_ms": "float",
+    "features_hash": "str",
+    "actual_outcome": "float",
+    "feedback_timestamp": "str",
+    "prediction_id": "str",
+}
+
+HOUR_FORMAT = "%Y%m%d%H"
+
+
+def _empty(kind: str) -> np.ndarray:
+    return np.array([], dtype=float if kind == "float" else str)
+
+
+def records_to_columns(records: List[Dict[str, Any]], columns: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Column arrays from prediction records; ``ts`` is derived from ``timestamp`` when absent"""
+    result = {}
+    for name in columns:
+        if name == "ts":
+            values = [r["ts"] if "ts" in r else datetime.fromisoformat(r["timestamp"]).timestamp()
+                      for r in records]
+            result[name] = np.array(values, dtype=float)
+        elif COLUMNS[name] == "float":
+            values = [r.get(name) for r in records]
+            result[name] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        else:
+            values = [r.get(name) or "" for r in records]
+            result[name] = np.array(values, dtype=str) if values else _empty("str")
+    return result
+
+
+def _load_hour(path: Path, columns: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Columns of a compacted hour; columns added since it was written read as missing"""
+    with np.load(path) as data:
+        rows = len(data["ts"])
+        return {
+            name: data[name] if name in data.files
+            else np.full(rows, np.nan) if COLUMNS[name] == "float" else np.full(rows, "")
+            for name in columns
+        }
+
+
+def _concat(parts: List[Dict[str, np.ndarray]], columns: Iterable[str]) -> Dict[str, np.ndarray]:
+    return {
+        name: np.concatenate([p[name] for p in parts]) if parts else _empty(COLUMNS[name])
+        for name in columns
+    }
+
+
+class PredictionLog:
+    """
+    Hourly NDJSON segments plus compacted columnar hours
+
+    Appends never rewrite existing data, so a flush costs only the new rows.
+    ``compact()`` folds hours that writers have moved past into one
+    ``hour_<YYYYMMDDHH>.npz`` each, under a file lock so any worker can run it.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Append prediction records to this worker's segment for the current hour"""
+        if not records:
+            return
+        lines = []
+        for record in records:
+            if "ts" not in record:
+                record = {**record, "ts": datetime.fromisoformat(record["timestamp"]).timestamp()}
+            lines.append(json.dumps(record, default=str))
+        segment = self.directory / f"seg_{datetime.now().strftime(HOUR_FORMAT)}_{os.getpid()}.ndjson"
+        with open(segment, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def read(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Column arrays for predictions in [start, end), oldest first
+
+        Args:
+            start: Earliest prediction time (default: everything)
+            end: Latest prediction time, exclusive (default: no limit)
+            columns: Columns to load (default: all)
+        """
+        columns = list(columns or COLUMNS)
+        load = columns if "ts" in columns else ["ts"] + columns
+        first_hour = start.strftime(HOUR_FORMAT) if start else ""
+        # Segments are named by flush time, which can trail the prediction by a flush interval
+        last_hour = (end + timedelta(hours=1)).strftime(HOUR_FORMAT) if end else "9" * 10
+
+        parts = []
+        for path in sorted(self.directory.glob("hour_*.npz")):
+            hour = path.stem.split("_")[1]
+            if first_hour <= hour <= last_hour:
+                try:
+                    parts.append(_load_hour(path, load))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Unreadable prediction log file {path.name}: {e}")
+        for path in sorted(self.directory.glob("seg_*.ndjson")):
+            hour = path.stem.split("_")[1]
+            if first_hour <= hour <= last_hour:
+                parts.append(records_to_columns(self._read_segment(path), load))
+
+        result = _concat(parts, load)
+        mask = np.ones(len(result["ts"]), dtype=bool)
+        if start is not None:
+            mask &= result["ts"] >= start.timestamp()
+        if end is not None:
+            mask &= result["ts"] < end.timestamp()
+        order = np.argsort(result["ts"][mask], kind="stable")
+        return {name: result[name][mask][order] for name in columns}
+
+    @staticmethod
+    def _read_segment(path: Path) -> List[Dict[str, Any]]:
+        records = []
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Torn last line of a crashed writer
+        except OSError:
+            pass  # Compacted while listing
+        return records
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Fold segments of hours before the previous one into columnar files; returns hours compacted"""
+        now = now or datetime.now()
+        # Leave the current and previous hour to writers still flushing into them
+        cutoff = (now - timedelta(hours=1)).strftime(HOUR_FORMAT)
+
+        with open(self.directory / "compact.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            hours = defaultdict(list)
+            for path in self.directory.glob("seg_*.ndjson"):
+                hour = path.stem.split("_")[1]
+                if hour < cutoff:
+                    hours[hour].append(path)
+
+            for hour, segments in sorted(hours.items()):
+                target = self.directory / f"hour_{hour}.npz"
+                parts = []
+                if target.exists():
+                    # Late segments for an hour that was already compacted
+                    parts.append(_load_hour(target, COLUMNS))
+                records = [r for path in sorted(segments) for r in self._read_segment(path)]
+                parts.append(records_to_columns(records, COLUMNS))
+                merged = _concat(parts, COLUMNS)
+                order = np.argsort(merged["ts"], kind="stable")
+
+                tmp = self.directory / f"tmp_{target.name}"
+                np.savez(tmp, **{name: values[order] for name, values in merged.items()})
+                os.replace(tmp, target)
+                for path in segments:
+                    path.unlink(missing_ok=True)
+        return len(hours)
+
+    def prune(self, before: datetime) -> int:
+        """Delete data for hours before the given time; returns files removed"""
+        cutoff = before.strftime(HOUR_FORMAT)
+        removed = 0
+        for path in list(self.directory.glob("hour_*.npz")) + list(self.directory.glob("seg_*.ndjson")):
+            if path.stem.split("_")[1] < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
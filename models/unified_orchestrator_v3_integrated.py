@@ -16,12 +16,23 @@ import os
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from monitoring.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
 class UnifiedOrchestratorV3:
     """Enhanced orchestrator with pattern system integration"""
     
+    # Lowest score for each verdict, best first
+    VERDICT_THRESHOLDS = [
+        (0.80, "STRONG PASS", "high"),
+        (0.65, "PASS", "medium"),
+        (0.50, "CONDITIONAL PASS", "low"),
+        (0.35, "CONDITIONAL FAIL", "low"),
+        (0.20, "FAIL", "medium")
+    ]
+    
     def __init__(self, config_path: str = "models/orchestrator_config_integrated.json"):
         """Initialize with integrated configuration"""
         self.config = self._load_config(config_path)
@@ -58,31 +69,37 @@ class UnifiedOrchestratorV3:
     
     def _recalibrate_prediction(self, prob, model_name=None):
         """Recalibrate overly conservative model predictions"""
+        return self._recalibrate_predictions(np.array([prob]), model_name)[0]
+    
+    def _recalibrate_predictions(self, probs: np.ndarray, model_name=None) -> np.ndarray:
+        """Recalibrate an array of overly conservative model predictions"""
         # The temporal and industry models are returning < 0.01% probabilities
         # This is unrealistic and needs aggressive calibration
-        
-        if prob < 0.0001:  # Less than 0.01%
-            # Map to 10-20% range for extremely low predictions
-            recalibrated = 0.10 + (prob / 0.0001) * 0.10
-        elif prob < 0.001:  # Less than 0.1%
-            # Map to 20-30% range
-            recalibrated = 0.20 + ((prob - 0.0001) / 0.0009) * 0.10
-        elif prob < 0.01:  # Less than 1%
-            # Map to 30-40% range
-            recalibrated = 0.30 + ((prob - 0.001) / 0.009) * 0.10
-        elif prob < 0.1:  # Less than 10%
-            # Map to 40-50% range
-            recalibrated = 0.40 + ((prob - 0.01) / 0.09) * 0.10
-        elif prob < 0.2:  # Less than 20%
-            # Map to 50-60% range
-            recalibrated = 0.50 + ((prob - 0.1) / 0.1) * 0.10
-        else:
+        probs = np.asarray(probs, dtype=float)
+        
+        recalibrated = np.select(
+            [
+                probs < 0.0001,  # Less than 0.01%: map to 10-20% range
+                probs < 0.001,   # Less than 0.1%: map to 20-30% range
+                probs < 0.01,    # Less than 1%: map to 30-40% range
+                probs < 0.1,     # Less than 10%: map to 40-50% range
+                probs < 0.2      # Less than 20%: map to 50-60% range
+            ],
+            [
+                0.10 + (probs / 0.0001) * 0.10,
+                0.20 + ((probs - 0.0001) / 0.0009) * 0.10,
+                0.30 + ((probs - 0.001) / 0.009) * 0.10,
+                0.40 + ((probs - 0.01) / 0.09) * 0.10,
+                0.50 + ((probs - 0.1) / 0.1) * 0.10
+            ],
             # Slight boost for higher probabilities
-            recalibrated = min(0.95, prob * 1.2)
-            
+            default=np.minimum(0.95, probs * 1.2)
+        )
+        
         # Log the recalibration for debugging
-        if prob < 0.01:
-            logger.debug(f"Recalibrated {model_name}: {prob:.6f} → {recalibrated:.4f}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for prob, value in zip(probs[probs < 0.01], recalibrated[probs < 0.01]):
+                logger.debug(f"Recalibrated {model_name}: {prob:.6f} → {value:.4f}")
             
         # Ensure bounds
         return np.clip(recalibrated, 0.05, 0.95)
@@ -134,118 +151,161 @@ class UnifiedOrchestratorV3:
                 logger.error(f"Failed to load pattern system: {e}")
                 self.pattern_system = None
     
-    def predict(self, features: pd.DataFrame) -> Dict:
-        """Generate unified prediction with pattern analysis"""
-        try:
-            # Ensure features are properly prepared
-            features = self._prepare_features(features)
-            
-            predictions = {}
-            confidence_scores = []
-            
-            # Adjust weights if pattern system is disabled
-            weights = self.config["weights"].copy()
-            if self.pattern_system is None:
-                # Redistribute pattern weight proportionally to other models
-                pattern_weight = weights["pattern_analysis"]
-                remaining_weight = 1.0 - pattern_weight
-                scale_factor = 1.0 / remaining_weight
-                
-                weights["camp_evaluation"] *= scale_factor
-                weights["industry_specific"] *= scale_factor
-                weights["temporal_prediction"] *= scale_factor
-                weights["pattern_analysis"] = 0.0
-                
-                logger.info(f"Pattern system disabled - redistributed weights: {weights}")
-            
-            # 1. DNA/CAMP Analysis
-            if "dna_analyzer" in self.models:
+    def _effective_weights(self) -> Dict[str, float]:
+        """Configured weights, redistributed when the pattern system is disabled"""
+        weights = self.config["weights"].copy()
+        if self.pattern_system is None:
+            # Redistribute pattern weight proportionally to other models
+            pattern_weight = weights["pattern_analysis"]
+            remaining_weight = 1.0 - pattern_weight
+            scale_factor = 1.0 / remaining_weight
+            
+            weights["camp_evaluation"] *= scale_factor
+            weights["industry_specific"] *= scale_factor
+            weights["temporal_prediction"] *= scale_factor
+            weights["pattern_analysis"] = 0.0
+            
+            logger.debug(f"Pattern system disabled - redistributed weights: {weights}")
+        return weights
+    
+    def score_batch(self, features: pd.DataFrame, prepared: bool = False) -> Dict:
+        """
+        Score many startups with one model call per model
+        
+        Args:
+            features: One row per startup
+            prepared: Whether features already went through _prepare_features
+            
+        Returns:
+            Dict with success_probability, quality_score and model_agreement
+            arrays, per-model prediction arrays and the weights used
+        """
+        if not prepared:
+            with span("orchestrator.prepare_features"):
+                features = self._prepare_features(features)
+        
+        n = len(features)
+        predictions = {}
+        weighted_score = np.zeros(n)
+        weights = self._effective_weights()
+        
+        # 1. DNA/CAMP Analysis
+        if "dna_analyzer" in self.models:
+            with span("model.dna_analyzer"):
                 dna_features = self._prepare_dna_features(features)
                 dna_pred = self.models["dna_analyzer"].predict_proba(dna_features)[:, 1]
-                predictions["dna_analyzer"] = float(dna_pred[0])
-                confidence_scores.append(dna_pred[0] * weights["camp_evaluation"])
-            
-            # 2. Pattern Analysis (only if enabled)
-            if self.pattern_system is not None:
+            predictions["dna_analyzer"] = dna_pred.astype(float)
+            weighted_score += dna_pred * weights["camp_evaluation"]
+        
+        # 2. Pattern Analysis (only if enabled)
+        if self.pattern_system is not None:
+            with span("model.pattern_analysis"):
                 pattern_features = self._prepare_pattern_features(features)
                 pattern_pred = self.pattern_system.predict_proba(pattern_features)[:, 1]
-                predictions["pattern_analysis"] = float(pattern_pred[0])
-                confidence_scores.append(pattern_pred[0] * weights["pattern_analysis"])
-            
-            # 3. Industry-Specific
-            if "industry_model" in self.models:
+            predictions["pattern_analysis"] = pattern_pred.astype(float)
+            weighted_score += pattern_pred * weights["pattern_analysis"]
+        
+        # 3. Industry-Specific
+        if "industry_model" in self.models:
+            with span("model.industry_model"):
                 industry_features = self._prepare_industry_features(features)
                 industry_pred = self.models["industry_model"].predict_proba(industry_features)[:, 1]
-                # Recalibrate if prediction is extremely low
-                industry_calibrated = self._recalibrate_prediction(industry_pred[0], "industry")
-                predictions["industry_specific"] = float(industry_calibrated)
-                confidence_scores.append(industry_calibrated * weights["industry_specific"])
-            
-            # 4. Temporal Prediction
-            if "temporal_model" in self.models:
-                # Temporal model expects 45 features (same as base)
+            # Recalibrate if prediction is extremely low
+            industry_calibrated = self._recalibrate_predictions(industry_pred, "industry")
+            predictions["industry_specific"] = industry_calibrated
+            weighted_score += industry_calibrated * weights["industry_specific"]
+        
+        # 4. Temporal Prediction
+        if "temporal_model" in self.models:
+            # Temporal model expects 45 features (same as base)
+            with span("model.temporal_model"):
                 temporal_features = self._prepare_temporal_features(features)
                 temporal_pred = self.models["temporal_model"].predict_proba(temporal_features)[:, 1]
-                # Recalibrate if prediction is extremely low
-                temporal_calibrated = self._recalibrate_prediction(temporal_pred[0], "temporal")
-                predictions["temporal_prediction"] = float(temporal_calibrated)
-                confidence_scores.append(temporal_calibrated * weights["temporal_prediction"])
-
-            # 5. Ensemble Model (if available)
-            if "ensemble_model" in self.models and all(k in predictions for k in ["dna_analyzer", "temporal_prediction", "industry_specific"]):
-                # Ensemble expects predictions from the three base models
-                ensemble_features = pd.DataFrame({
-                    'dna_probability': [predictions["dna_analyzer"]],
-                    'temporal_probability': [predictions["temporal_prediction"]],
-                    'industry_probability': [predictions["industry_specific"]]
-                })
+            # Recalibrate if prediction is extremely low
+            temporal_calibrated = self._recalibrate_predictions(temporal_pred, "temporal")
+            predictions["temporal_prediction"] = temporal_calibrated
+            weighted_score += temporal_calibrated * weights["temporal_prediction"]
+        
+        # 5. Ensemble Model (if available)
+        if "ensemble_model" in self.models and all(k in predictions for k in ["dna_analyzer", "temporal_prediction", "industry_specific"]):
+            # Ensemble expects predictions from the three base models
+            ensemble_features = pd.DataFrame({
+                'dna_probability': predictions["dna_analyzer"],
+                'temporal_probability': predictions["temporal_prediction"],
+                'industry_probability': predictions["industry_specific"]
+            })
+            with span("model.ensemble_model"):
                 ensemble_pred = self.models["ensemble_model"].predict_proba(ensemble_features)[:, 1]
-                # Ensemble might also be conservative, recalibrate if needed
-                ensemble_calibrated = self._recalibrate_prediction(ensemble_pred[0], "ensemble")
-                predictions["ensemble"] = float(ensemble_calibrated)
-                # Add ensemble to the weighted score
-                if "ensemble" in weights:
-                    confidence_scores.append(ensemble_calibrated * weights["ensemble"])
-            
-            # Calculate final weighted score
-            final_score = sum(confidence_scores)
-            
-            # Apply quality-based adjustment for better differentiation
-            quality_score = self._calculate_quality_score(features)
-            
-            # Blend ML prediction with quality assessment
-            # This helps differentiate between startups when models are too conservative
-            if final_score < 0.3:
-                # For low ML scores, give more weight to quality indicators
-                adjusted_score = 0.6 * quality_score + 0.4 * final_score
-            elif final_score < 0.5:
-                # Balanced blend for medium scores
-                adjusted_score = 0.5 * quality_score + 0.5 * final_score
-            else:
-                # Trust ML more for higher scores
-                adjusted_score = 0.3 * quality_score + 0.7 * final_score
-            
-            final_score = np.clip(adjusted_score, 0.05, 0.95)
-            
-            # Determine verdict
+            # Ensemble might also be conservative, recalibrate if needed
+            ensemble_calibrated = self._recalibrate_predictions(ensemble_pred, "ensemble")
+            predictions["ensemble"] = ensemble_calibrated
+            # Add ensemble to the weighted score
+            if "ensemble" in weights:
+                weighted_score += ensemble_calibrated * weights["ensemble"]
+        
+        # Apply quality-based adjustment for better differentiation
+        with span("orchestrator.quality_score"):
+            quality_score = self._calculate_quality_scores(features)
+        
+        # Blend ML prediction with quality assessment
+        # This helps differentiate between startups when models are too conservative:
+        # low ML scores give more weight to quality indicators, medium scores are
+        # a balanced blend and higher scores trust ML more
+        adjusted_score = np.select(
+            [weighted_score < 0.3, weighted_score < 0.5],
+            [0.6 * quality_score + 0.4 * weighted_score, 0.5 * quality_score + 0.5 * weighted_score],
+            default=0.3 * quality_score + 0.7 * weighted_score
+        )
+        final_score = np.clip(adjusted_score, 0.05, 0.95)
+        
+        # Calculate model agreement
+        if len(predictions) > 1:
+            model_agreement = 1 - np.std(np.vstack(list(predictions.values())), axis=0)
+        else:
+            model_agreement = np.ones(n)
+        
+        return {
+            "success_probability": final_score,
+            "quality_score": quality_score,
+            "model_predictions": predictions,
+            "model_agreement": model_agreement,
+            "weights_used": weights
+        }
+    
+    def predict_batch(self, features: pd.DataFrame) -> List[Dict]:
+        """Generate unified predictions for many startups"""
+        with span("orchestrator.prepare_features"):
+            features = self._prepare_features(features)
+        scores = self.score_batch(features, prepared=True)
+        
+        results = []
+        for row in range(len(features)):
+            final_score = scores["success_probability"][row]
             verdict = self._determine_verdict(final_score)
-            
-            # Calculate model agreement
-            model_values = list(predictions.values())
-            model_agreement = 1 - np.std(model_values) if len(model_values) > 1 else 1.0
-            
-            result = {
+            results.append({
                 "success_probability": float(final_score),
                 "confidence_score": float(final_score),
                 "verdict": verdict["verdict"],
                 "verdict_strength": verdict["strength"],
-                "model_predictions": predictions,
-                "model_agreement": float(model_agreement),
-                "weights_used": weights,  # Use adjusted weights
-                "pattern_insights": self._get_pattern_insights(features) if self.pattern_system else []
-            }
-            
-            return result
+                "model_predictions": {
+                    name: float(values[row]) for name, values in scores["model_predictions"].items()
+                },
+                "model_agreement": float(scores["model_agreement"][row]),
+                "weights_used": scores["weights_used"],
+                "pattern_insights": self._pattern_insights_for_row(features, row)
+            })
+        return results
+    
+    def _pattern_insights_for_row(self, features: pd.DataFrame, row: int) -> List:
+        if not self.pattern_system:
+            return []
+        with span("orchestrator.pattern_insights"):
+            return self._get_pattern_insights(features.iloc[[row]])
+    
+    def predict(self, features: pd.DataFrame) -> Dict:
+        """Generate unified prediction with pattern analysis"""
+        try:
+            return self.predict_batch(features)[0]
             
         except Exception as e:
             import traceback
@@ -734,18 +794,10 @@ class UnifiedOrchestratorV3:
     
     def _determine_verdict(self, score: float) -> Dict:
         """Determine verdict based on score"""
-        if score >= 0.80:
-            return {"verdict": "STRONG PASS", "strength": "high"}
-        elif score >= 0.65:
-            return {"verdict": "PASS", "strength": "medium"}
-        elif score >= 0.50:
-            return {"verdict": "CONDITIONAL PASS", "strength": "low"}
-        elif score >= 0.35:
-            return {"verdict": "CONDITIONAL FAIL", "strength": "low"}
-        elif score >= 0.20:
-            return {"verdict": "FAIL", "strength": "medium"}
-        else:
-            return {"verdict": "STRONG FAIL", "strength": "high"}
+        for threshold, verdict, strength in self.VERDICT_THRESHOLDS:
+            if score >= threshold:
+                return {"verdict": verdict, "strength": strength}
+        return {"verdict": "STRONG FAIL", "strength": "high"}
     
     def _get_pattern_insights(self, features: pd.DataFrame) -> List[str]:
         """Generate insights based on pattern analysis"""
@@ -766,68 +818,72 @@ class UnifiedOrchestratorV3:
     
     def _calculate_quality_score(self, features: pd.DataFrame) -> float:
         """Calculate quality score based on key startup indicators"""
-        # Extract key metrics from features
-        row = features.iloc[0] if len(features) > 0 else {}
-        
-        scores = []
-        
-        # Revenue and growth
-        revenue = row.get('annual_revenue_run_rate', 0)
-        revenue_score = min(1.0, np.log10(revenue + 1) / 8) if revenue > 0 else 0
-        scores.append(revenue_score)
-        
-        growth_rate = row.get('revenue_growth_rate_percent', 0)
-        growth_score = min(1.0, growth_rate / 100) if growth_rate > 0 else 0
-        scores.append(growth_score)
-        
-        # Efficiency metrics
-        burn_multiple = row.get('burn_multiple', 10)
-        burn_score = max(0, 1.0 - (burn_multiple / 5)) if burn_multiple > 0 else 0.5
-        scores.append(burn_score)
-        
-        ltv_cac = row.get('ltv_cac_ratio', 0)
-        ltv_score = min(1.0, ltv_cac / 3) if ltv_cac > 0 else 0
-        scores.append(ltv_score)
-        
-        # Runway and funding
-        runway = row.get('runway_months', 0)
-        runway_score = min(1.0, runway / 24) if runway > 0 else 0
-        scores.append(runway_score)
-        
-        # Team quality
-        team_size = row.get('team_size_full_time', 0)
-        team_score = min(1.0, np.log10(team_size + 1) / 2) if team_size > 0 else 0
-        scores.append(team_score)
-        
-        founder_exp = row.get('founders_previous_experience_score', 0)
-        exp_score = founder_exp / 5.0 if founder_exp > 0 else 0
-        scores.append(exp_score)
-        
-        # Product metrics
-        retention = row.get('product_retention_90d', 0)
-        scores.append(retention)
+        if len(features) == 0:
+            return 0.3  # Default moderate score
+        return self._calculate_quality_scores(features.iloc[[0]])[0]
+    
+    def _calculate_quality_scores(self, features: pd.DataFrame) -> np.ndarray:
+        """Quality score for every row, based on key startup indicators"""
+        n = len(features)
         
-        nps = row.get('nps_score', 0)
-        nps_score = (nps + 100) / 200 if nps > -100 else 0.5
-        scores.append(nps_score)
+        def column(name, default):
+            if name in features.columns:
+                return pd.to_numeric(features[name], errors='coerce').to_numpy(dtype=float)
+            return np.full(n, float(default))
         
-        # Market size
-        market_size = row.get('tam_size_usd', 0)
-        market_score = min(1.0, np.log10(market_size + 1) / 11) if market_size > 0 else 0
-        scores.append(market_score)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Revenue and growth
+            revenue = column('annual_revenue_run_rate', 0)
+            revenue_score = np.where(revenue > 0, np.minimum(1.0, np.log10(revenue + 1) / 8), 0)
+            
+            growth_rate = column('revenue_growth_rate_percent', 0)
+            growth_score = np.where(growth_rate > 0, np.minimum(1.0, growth_rate / 100), 0)
+            
+            # Efficiency metrics
+            burn_multiple = column('burn_multiple', 10)
+            burn_score = np.where(burn_multiple > 0, np.maximum(0, 1.0 - (burn_multiple / 5)), 0.5)
+            
+            ltv_cac = column('ltv_cac_ratio', 0)
+            ltv_score = np.where(ltv_cac > 0, np.minimum(1.0, ltv_cac / 3), 0)
+            
+            # Runway and funding
+            runway = column('runway_months', 0)
+            runway_score = np.where(runway > 0, np.minimum(1.0, runway / 24), 0)
+            
+            # Team quality
+            team_size = column('team_size_full_time', 0)
+            team_score = np.where(team_size > 0, np.minimum(1.0, np.log10(team_size + 1) / 2), 0)
+            
+            founder_exp = column('founders_previous_experience_score', 0)
+            exp_score = np.where(founder_exp > 0, founder_exp / 5.0, 0)
+            
+            # Product metrics
+            retention = column('product_retention_90d', 0)
+            
+            nps = column('nps_score', 0)
+            nps_score = np.where(nps > -100, (nps + 100) / 200, 0.5)
+            
+            # Market size
+            market_size = column('tam_size_usd', 0)
+            market_score = np.where(market_size > 0, np.minimum(1.0, np.log10(market_size + 1) / 11), 0)
         
         # Funding stage bonus
-        funding_stage = row.get('funding_stage', 'Pre_Seed')
         stage_scores = {'Pre_Seed': 0.1, 'Seed': 0.3, 'Series_A': 0.5, 'Series_B': 0.7, 'Series_C': 0.9}
-        stage_score = stage_scores.get(funding_stage, 0.1)
-        scores.append(stage_score)
-        
-        # Calculate weighted average, ignoring zeros
-        valid_scores = [s for s in scores if s > 0]
-        if valid_scores:
-            return np.mean(valid_scores)
+        if 'funding_stage' in features.columns:
+            stage_score = np.array([stage_scores.get(stage, 0.1) for stage in features['funding_stage']])
         else:
-            return 0.3  # Default moderate score
+            stage_score = np.full(n, stage_scores['Pre_Seed'])
+        
+        scores = np.column_stack([
+            revenue_score, growth_score, burn_score, ltv_score, runway_score, team_score,
+            exp_score, retention, nps_score, market_score, stage_score
+        ])
+        
+        # Calculate average, ignoring zeros
+        valid = scores > 0
+        counts = valid.sum(axis=1)
+        totals = np.where(valid, scores, 0).sum(axis=1)
+        return np.where(counts > 0, totals / np.maximum(counts, 1), 0.3)
     
     def get_model_info(self) -> Dict:
         """Get information about loaded models"""
@@ -0,0 +1,10 @@
+"""
+Gunicorn server hooks for multi-worker metrics
+Use with: gunicorn -c python:monitoring.gunicorn_hooks ...
+"""
+from monitoring.multiprocess import mark_worker_dead
+
+
+def child_exit(server, worker):
+    """Archive the exited worker's metrics so recycled workers keep lifetime totals"""
+    mark_worker_dead(worker.pid)
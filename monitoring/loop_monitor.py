@@ -0,0 +1,208 @@
+"""
+Event-loop lag and blocking-call detector for FLASH
+A heartbeat task measures how late the loop wakes up; a watchdog thread
+samples the loop thread's stack whenever the heartbeat stalls, so the
+synchronous code holding the loop is reported with its call site.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import sysconfig
+import threading
+import traceback
+from collections import Counter as TallyCounter
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .quantile_sketch import WindowedSketch
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Histogram
+
+    loop_lag_histogram = Histogram(
+        'flash_event_loop_heartbeat_lag_seconds',
+        'Delay of the event loop heartbeat beyond its interval',
+        buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+    )
+    loop_blocked_seconds = Counter(
+        'flash_event_loop_blocked_seconds',
+        'Time the event loop was blocked, by call site',
+        ['site']
+    )
+    loop_stalls = Counter(
+        'flash_event_loop_stalls',
+        'Event loop stalls over the blocking threshold, by call site',
+        ['site']
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Frames from these trees (and this module) are never the call site worth reporting
+_LIBRARY_PATHS = tuple(
+    os.path.realpath(path) for path in {
+        sysconfig.get_paths()["stdlib"],
+        sysconfig.get_paths()["purelib"],
+        sysconfig.get_paths()["platlib"]
+    }
+)
+_THIS_FILE = os.path.realpath(os.path.abspath(__file__))
+
+
+def _call_site(stack: traceback.StackSummary) -> str:
+    """Innermost frame in application code, e.g. ``api_server_unified.py:870 predict``"""
+    for frame in reversed(stack):
+        path = os.path.realpath(frame.filename)
+        if path != _THIS_FILE and not path.startswith(_LIBRARY_PATHS):
+            return f"{os.path.relpath(frame.filename)}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+
+class EventLoopMonitor:
+    """
+    Continuous loop-lag measurement with stack sampling of blocking callbacks
+
+    The heartbeat sleeps ``interval`` seconds and records how much later it
+    actually woke. While a heartbeat is overdue by more than
+    ``block_threshold`` the watchdog samples the loop thread every
+    ``sample_interval``; when the loop recovers, the stall is charged to the
+    call site seen in most samples.
+    """
+
+    def __init__(self, interval: float = 0.05, block_threshold: float = 0.1,
+                 sample_interval: Optional[float] = None, max_offenders: int = 50,
+                 stack_depth: int = 12):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.sample_interval = sample_interval or block_threshold / 2
+        self.max_offenders = max_offenders
+        self.stack_depth = stack_depth
+
+        self.lag = WindowedSketch()
+        self.offenders: Dict[str, Dict[str, Any]] = {}
+        self.stall_count = 0
+
+        self._loop = None
+        self._loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_beat = None
+        self._stall_sites = TallyCounter()
+        self._stall_stacks: Dict[str, List[str]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start monitoring; call from the loop's own thread"""
+        if self.running:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started (threshold {self.block_threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        """Stop the heartbeat and the watchdog"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None and self._watchdog is not threading.current_thread():
+            self._watchdog.join(timeout=self.sample_interval + 1)
+        self._watchdog = None
+
+    async def _heartbeat(self):
+        while not self._stop.is_set():
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._last_beat = now
+            self._record_lag(max(0.0, now - expected))
+
+    def _record_lag(self, lag: float):
+        self.lag.add(lag * 1000)
+        if PROMETHEUS_AVAILABLE:
+            loop_lag_histogram.observe(lag)
+
+        with self._lock:
+            sites, stacks = self._stall_sites, self._stall_stacks
+            self._stall_sites, self._stall_stacks = TallyCounter(), {}
+        if lag < self.block_threshold or not sites:
+            return
+
+        # Charge the stall to the site seen in most samples
+        site = sites.most_common(1)[0][0]
+        self._record_offender(site, stacks[site], lag)
+
+    def _record_offender(self, site: str, stack: List[str], blocked: float):
+        with self._lock:
+            self.stall_count += 1
+            offender = self.offenders.get(site)
+            if offender is None:
+                if len(self.offenders) >= self.max_offenders:
+                    # Drop the least harmful site to stay bounded
+                    least = min(self.offenders, key=lambda s: self.offenders[s]["total_blocked_ms"])
+                    del self.offenders[least]
+                offender = self.offenders[site] = {
+                    "site": site, "stalls": 0, "total_blocked_ms": 0.0, "max_blocked_ms": 0.0
+                }
+            offender["stalls"] += 1
+            offender["total_blocked_ms"] += blocked * 1000
+            offender["max_blocked_ms"] = max(offender["max_blocked_ms"], blocked * 1000)
+            offender["last_seen"] = datetime.utcnow().isoformat()
+            offender["stack"] = stack
+
+        logger.warning(f"Event loop blocked for {blocked * 1000:.0f}ms at {site}")
+        if PROMETHEUS_AVAILABLE:
+            loop_blocked_seconds.labels(site=site).inc(blocked)
+            loop_stalls.labels(site=site).inc()
+
+    def _watch(self):
+        while not self._stop.wait(self.sample_interval):
+            overdue = time.perf_counter() - self._last_beat - self.interval
+            if overdue > self.block_threshold:
+                self._sample_stack()
+
+    def _sample_stack(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        site = _call_site(stack)
+        with self._lock:
+            self._stall_sites[site] += 1
+            self._stall_stacks[site] = [
+                f"{f.filename}:{f.lineno} in {f.name}" for f in stack[-self.stack_depth:]
+            ]
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Lag percentiles over the window and the worst blocking call sites"""
+        with self._lock:
+            offenders = sorted(self.offenders.values(), key=lambda o: -o["total_blocked_ms"])[:top]
+            offenders = [dict(o) for o in offenders]
+        return {
+            "running": self.running,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "lag_ms": self.lag.window().summary(),
+            "stalls": self.stall_count,
+            "offenders": offenders
+        }
+
+
+# Global monitor, started by the API server when ENABLE_LOOP_MONITOR is set
+loop_monitor = EventLoopMonitor(
+    block_threshold=float(os.getenv("FLASH_LOOP_BLOCK_MS", "100")) / 1000
+)
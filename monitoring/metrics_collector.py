@@ -1,8 +1,8 @@
 """
 Metrics collection and monitoring for FLASH Platform
 """
+import os
 import time
-import psutil
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -10,13 +10,18 @@ from collections import defaultdict, deque
 import json
 from pathlib import Path
 
+from .quantile_sketch import WindowedSketch
+from .multiprocess import MetricsSpool, merge_snapshots
+from .system_sampler import system_sampler
+
 logger = logging.getLogger(__name__)
 
 
 class MetricsCollector:
     """Collect and store application metrics"""
     
-    def __init__(self, max_history: int = 1000):
+    def __init__(self, max_history: int = 1000, spool: Optional[MetricsSpool] = None,
+                 flush_interval: float = 1.0):
         self.max_history = max_history
         self.metrics = {
             "requests": defaultdict(lambda: deque(maxlen=max_history)),
@@ -26,6 +31,12 @@ class MetricsCollector:
         }
         self.counters = defaultdict(int)
         self.start_time = time.time()
+        # Streaming quantiles: metric name -> key (endpoint, model, "all") -> sketch
+        self.sketches = defaultdict(lambda: defaultdict(WindowedSketch))
+        # Shared snapshot directory when running several workers
+        self.spool = spool
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
     
     def record_request(
         self,
@@ -54,7 +65,8 @@ class MetricsCollector:
         self.counters[f"status_{status_code}"] += 1
         
         # Track response time percentiles
-        self._update_percentiles("response_time", response_time_ms)
+        self._update_percentiles("response_time", response_time_ms, endpoint)
+        self._maybe_flush()
     
     def record_prediction(
         self,
@@ -86,6 +98,12 @@ class MetricsCollector:
         # Track prediction distribution
         prob_bucket = int(success_probability * 10) * 10
         self.counters[f"prob_bucket_{prob_bucket}"] += 1
+        
+        # Track processing time and probability percentiles per model
+        model = model_version or "unknown"
+        self._update_percentiles("processing_time", processing_time_ms, model)
+        self._update_percentiles("success_probability", success_probability, model)
+        self._maybe_flush()
     
     def record_error(
         self,
@@ -109,85 +127,193 @@ class MetricsCollector:
         # Update counters
         self.counters["total_errors"] += 1
         self.counters[f"error_{error_type}"] += 1
+        self._maybe_flush()
     
-    def record_system_metrics(self):
-        """Record system resource metrics"""
+    def record_system_metrics(self, sample: Optional[Dict[str, Any]] = None):
+        """Record a system resource sample, taking one now if none is given"""
         try:
-            # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            
-            # Memory metrics
-            memory = psutil.virtual_memory()
-            
-            # Disk metrics
-            disk = psutil.disk_usage('/')
-            
-            # Process metrics
-            process = psutil.Process()
-            process_memory = process.memory_info()
+            if sample is None:
+                sample = system_sampler.collect()
             
             metric = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_used_mb": memory.used / 1024 / 1024,
-                "memory_available_mb": memory.available / 1024 / 1024,
-                "disk_percent": disk.percent,
-                "disk_free_gb": disk.free / 1024 / 1024 / 1024,
-                "process_memory_mb": process_memory.rss / 1024 / 1024,
-                "process_cpu_percent": process.cpu_percent()
+                key: sample.get(key) for key in (
+                    "timestamp", "cpu_percent", "memory_percent", "memory_used_mb",
+                    "memory_available_mb", "disk_percent", "disk_free_gb",
+                    "process_memory_mb", "process_cpu_percent", "process_threads",
+                    "gc_pause_ms_total", "loop_lag_ms", "threadpool_busy", "threadpool_size"
+                )
             }
             
             self.metrics["system"]["resources"].append(metric)
+            self._maybe_flush()
             
         except Exception as e:
             logger.error(f"Failed to collect system metrics: {e}")
     
-    def _update_percentiles(self, metric_name: str, value: float):
-        """Update percentile calculations for a metric"""
-        key = f"{metric_name}_values"
-        if key not in self.metrics:
-            self.metrics[key] = deque(maxlen=self.max_history)
-        self.metrics[key].append(value)
+    def _update_percentiles(self, metric_name: str, value: float, key: Optional[str] = None):
+        """Record a value in the overall and per-key quantile sketches"""
+        now = time.time()
+        self.sketches[metric_name]["all"].add(value, now)
+        if key is not None:
+            self.sketches[metric_name][key].add(value, now)
+    
+    def get_percentiles(self, metric_name: str, key: str = "all", window: bool = False) -> Dict[str, Any]:
+        """p50/p95/p99 for a metric in this worker, over the lifetime or the sliding window"""
+        return self._percentiles(self.sketches, metric_name, key, window)
+    
+    @staticmethod
+    def _percentiles(sketches, metric_name: str, key: str = "all", window: bool = False) -> Dict[str, Any]:
+        if metric_name not in sketches or key not in sketches[metric_name]:
+            return {}
+        sketch = sketches[metric_name][key]
+        return (sketch.window() if window else sketch.lifetime).quantiles()
+    
+    @staticmethod
+    def _sketch_summary(sketches, metric_name: str) -> Dict[str, Any]:
+        """Lifetime and window summaries of a metric for every key"""
+        return {
+            key: sketch.summary()
+            for key, sketch in list(sketches.get(metric_name, {}).items())
+        }
+    
+    def export_sketches(self) -> Dict[str, Any]:
+        """Serialisable sketches, to be merged by another worker"""
+        return {
+            metric_name: {key: sketch.to_dict() for key, sketch in list(by_key.items())}
+            for metric_name, by_key in list(self.sketches.items())
+        }
+    
+    def merge_sketches(self, exported: Dict[str, Any]):
+        """Merge sketches exported by another worker into this collector"""
+        for metric_name, by_key in exported.items():
+            for key, data in by_key.items():
+                self.sketches[metric_name][key].merge(WindowedSketch.from_dict(data))
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """This worker's counters, sketches and latest system reading"""
+        resources = self.metrics["system"]["resources"]
+        return {
+            "start_time": self.start_time,
+            "counters": dict(self.counters),
+            "sketches": self.export_sketches(),
+            "system": resources[-1] if resources else None
+        }
+    
+    def flush(self):
+        """Write this worker's snapshot to the shared spool"""
+        if self.spool is None:
+            return
+        try:
+            self.spool.write(self.snapshot())
+            self._last_flush = time.time()
+        except Exception as e:
+            logger.error(f"Failed to flush metrics snapshot: {e}")
+    
+    def _maybe_flush(self):
+        if self.spool is not None and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
     
     def get_summary(self) -> Dict[str, Any]:
-        """Get summary of all metrics"""
-        uptime_seconds = time.time() - self.start_time
+        """Get summary of all metrics, across every worker when a spool is configured"""
+        if self.spool is None:
+            resources = self.metrics["system"]["resources"]
+            counters = self.counters
+            sketches = self.sketches
+            start_time = self.start_time
+            latest_system = resources[-1] if resources else {}
+            workers = 1
+        else:
+            self.flush()
+            snapshots = self.spool.read_all()
+            merged = merge_snapshots(snapshots)
+            counters = defaultdict(int, merged["counters"])
+            sketches = merged["sketches"]
+            start_time = merged["start_time"] or self.start_time
+            latest_system = merged["system"] or {}
+            workers = sum(1 for snapshot in snapshots if "pid" in snapshot)
         
-        # Calculate response time percentiles
-        response_times = list(self.metrics.get("response_time_values", []))
-        percentiles = {}
-        if response_times:
-            response_times.sort()
-            percentiles = {
-                "p50": response_times[len(response_times) // 2],
-                "p95": response_times[int(len(response_times) * 0.95)],
-                "p99": response_times[int(len(response_times) * 0.99)]
-            }
+        uptime_seconds = max(time.time() - start_time, 1e-9)
         
-        # Get latest system metrics
-        latest_system = {}
-        if self.metrics["system"]["resources"]:
-            latest_system = self.metrics["system"]["resources"][-1]
+        # Response time percentiles from the streaming sketches
+        percentiles = self._percentiles(sketches, "response_time")
         
         return {
             "uptime_seconds": uptime_seconds,
-            "total_requests": self.counters["total_requests"],
-            "total_predictions": self.counters["total_predictions"],
-            "total_errors": self.counters["total_errors"],
-            "requests_per_second": self.counters["total_requests"] / uptime_seconds,
-            "predictions_per_second": self.counters["total_predictions"] / uptime_seconds,
-            "error_rate": self.counters["total_errors"] / max(self.counters["total_requests"], 1),
+            "workers": workers,
+            "total_requests": counters["total_requests"],
+            "total_predictions": counters["total_predictions"],
+            "total_errors": counters["total_errors"],
+            "requests_per_second": counters["total_requests"] / uptime_seconds,
+            "predictions_per_second": counters["total_predictions"] / uptime_seconds,
+            "error_rate": counters["total_errors"] / max(counters["total_requests"], 1),
             "response_time_percentiles": percentiles,
+            "response_time_percentiles_window": self._percentiles(sketches, "response_time", window=True),
+            "endpoint_response_times": self._sketch_summary(sketches, "response_time"),
+            "model_processing_times": self._sketch_summary(sketches, "processing_time"),
+            "model_success_probabilities": self._sketch_summary(sketches, "success_probability"),
             "verdict_distribution": {
-                "PASS": self.counters.get("verdict_PASS", 0),
-                "CONDITIONAL PASS": self.counters.get("verdict_CONDITIONAL PASS", 0),
-                "FAIL": self.counters.get("verdict_FAIL", 0)
+                "PASS": counters.get("verdict_PASS", 0),
+                "CONDITIONAL PASS": counters.get("verdict_CONDITIONAL PASS", 0),
+                "FAIL": counters.get("verdict_FAIL", 0)
+            },
+            "probability_distribution": {
+                # A probability of exactly 1.0 lands in bucket 100
+                f"{bucket}-{bucket + 10}%": counters.get(f"prob_bucket_{bucket}", 0)
+                + (counters.get("prob_bucket_100", 0) if bucket == 90 else 0)
+                for bucket in range(0, 100, 10)
             },
             "system_metrics": latest_system,
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    def get_dashboard_metrics(self) -> Dict[str, Any]:
+        """Summary reshaped for the monitoring dashboard's live feed"""
+        summary = self.get_summary()
+        overall = summary["endpoint_response_times"].get("all", {})
+        latency = overall.get("window", {}) if overall.get("window", {}).get("count") else overall.get("lifetime", {})
+        system = summary["system_metrics"]
+        cpu_percent = system.get("cpu_percent", 0.0)
+        memory_percent = system.get("memory_percent", 0.0)
+        buckets = list(summary["probability_distribution"].values())
+        
+        by_model = {}
+        for model, times in summary["model_processing_times"].items():
+            if model == "all":
+                continue
+            probabilities = summary["model_success_probabilities"].get(model, {}).get("lifetime", {})
+            by_model[model] = {
+                "predictions_count": times["lifetime"]["count"],
+                "avg_confidence": probabilities.get("mean") or 0.0,
+                "avg_latency_ms": times["lifetime"]["mean"] or 0.0
+            }
+        
+        return {
+            "request_stats": {
+                "requests_per_minute": summary["requests_per_second"] * 60,
+                "success_rate": 1 - summary["error_rate"],
+                "p95_latency_ms": latency.get("p95") or 0.0,
+                "avg_latency_ms": latency.get("mean") or 0.0
+            },
+            "system_health": {
+                "status": "healthy" if cpu_percent < 80 and memory_percent < 90 else "degraded",
+                "cpu_percent": cpu_percent,
+                "memory_percent": memory_percent
+            },
+            "model_stats": {
+                "by_model": by_model,
+                "overall": {
+                    "prediction_distribution": {
+                        "very_low": sum(buckets[0:2]),
+                        "low": sum(buckets[2:4]),
+                        "medium": sum(buckets[4:6]),
+                        "high": sum(buckets[6:8]),
+                        "very_high": sum(buckets[8:10])
+                    }
+                }
+            },
+            "timestamp": summary["timestamp"]
+        }
+    
     def export_metrics(self, filepath: str = "metrics_export.json"):
         """Export metrics to file"""
         try:
@@ -210,13 +336,21 @@ class MetricsCollector:
             return False
 
 
-# Global metrics collector instance
-metrics_collector = MetricsCollector()
+# Global metrics collector instance, shared across workers when a spool directory is set
+metrics_collector = MetricsCollector(
+    spool=MetricsSpool.from_env(),
+    flush_interval=float(os.getenv("FLASH_METRICS_FLUSH_SECONDS", "1.0"))
+)
 
 
 # Prometheus metrics (if prometheus_client is available)
 try:
-    from prometheus_client import Counter, Histogram, Gauge, generate_latest
+    from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest
+    from prometheus_client import multiprocess as prometheus_multiprocess
+    
+    # With PROMETHEUS_MULTIPROC_DIR set (before import) every worker writes its
+    # samples to mmap files in that directory and exposition merges them
+    PROMETHEUS_MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
     
     # Define Prometheus metrics
     request_count = Counter(
@@ -250,13 +384,20 @@ try:
     )
     
     # System metrics
-    cpu_usage = Gauge('flash_cpu_usage_percent', 'CPU usage percentage')
-    memory_usage = Gauge('flash_memory_usage_bytes', 'Memory usage in bytes')
+    # Host-wide readings, identical in every worker, so report the max of live workers
+    cpu_usage = Gauge('flash_cpu_usage_percent', 'CPU usage percentage', multiprocess_mode='livemax')
+    memory_usage = Gauge('flash_memory_usage_bytes', 'Memory usage in bytes', multiprocess_mode='livemax')
+    process_memory = Gauge('flash_process_resident_bytes', 'Worker resident memory in bytes',
+                           multiprocess_mode='liveall')
+    event_loop_lag = Gauge('flash_event_loop_lag_seconds', 'Event loop scheduling lag', multiprocess_mode='livemax')
+    threadpool_busy = Gauge('flash_threadpool_busy_threads', 'Busy thread-pool workers', multiprocess_mode='livesum')
+    gc_pause = Counter('flash_gc_pause_seconds', 'Time spent in garbage collection', ['generation'])
     
     PROMETHEUS_ENABLED = True
     
 except ImportError:
     PROMETHEUS_ENABLED = False
+    PROMETHEUS_MULTIPROCESS = False
     logger.info("Prometheus client not available, metrics will be stored locally only")
 
 
@@ -280,18 +421,43 @@ def record_prometheus_error(error_type: str, endpoint: str = "unknown"):
         error_count.labels(error_type=error_type, endpoint=endpoint).inc()
 
 
-def update_prometheus_system_metrics():
-    """Update system metrics for Prometheus"""
+def update_prometheus_system_metrics(sample: Optional[Dict[str, Any]] = None):
+    """Update system gauges from a sampler snapshot; never samples on the caller's thread"""
     if PROMETHEUS_ENABLED:
+        sample = sample or system_sampler.latest()
+        if sample is None:
+            return
         try:
-            cpu_usage.set(psutil.cpu_percent())
-            memory_usage.set(psutil.virtual_memory().used)
+            cpu_usage.set(sample["cpu_percent"])
+            memory_usage.set(sample["memory_used_bytes"])
+            process_memory.set(sample["process_memory_mb"] * 1024 * 1024)
+            if sample.get("loop_lag_ms") is not None:
+                event_loop_lag.set(sample["loop_lag_ms"] / 1000)
+            if sample.get("threadpool_busy") is not None:
+                threadpool_busy.set(sample["threadpool_busy"])
         except Exception as e:
             logger.error(f"Failed to update Prometheus system metrics: {e}")
 
 
+def _record_prometheus_gc(sample: Dict[str, Any]):
+    if PROMETHEUS_ENABLED:
+        for generation, pause_ms in enumerate(sample["gc_pause_ms"]):
+            if pause_ms:
+                gc_pause.labels(generation=str(generation)).inc(pause_ms / 1000)
+
+
+# Samples from the background sampler feed the collector and the gauges
+system_sampler.add_listener(metrics_collector.record_system_metrics)
+system_sampler.add_listener(update_prometheus_system_metrics)
+system_sampler.add_listener(_record_prometheus_gc)
+
+
 def get_prometheus_metrics():
     """Get metrics in Prometheus format"""
     if PROMETHEUS_ENABLED:
+        if PROMETHEUS_MULTIPROCESS:
+            registry = CollectorRegistry()
+            prometheus_multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
         return generate_latest()
     return b""
\ No newline at end of file
@@ -13,7 +13,9 @@ from datetime import datetime
 from typing import List
 import logging
 
-from .metrics_collector import metrics_collector, performance_monitor
+from .metrics_collector import metrics_collector
+from .performance_monitor import performance_monitor
+from .loop_monitor import loop_monitor
 
 logger = logging.getLogger(__name__)
 
@@ -60,16 +62,25 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         while True:
-            # Send metrics every 2 seconds
-            metrics = metrics_collector.get_dashboard_metrics()
-            alerts = performance_monitor.get_recent_alerts(minutes=5)
-            
+            # Blocking call sites first, so they arrive even if the metrics feed fails
             await websocket.send_json({
-                'type': 'metrics_update',
-                'data': metrics,
-                'alerts': alerts
+                'type': 'event_loop_update',
+                'data': loop_monitor.report()
             })
             
+            # Send metrics every 2 seconds
+            try:
+                metrics = metrics_collector.get_dashboard_metrics()
+                alerts = performance_monitor.get_recent_alerts(minutes=5)
+            except Exception as e:
+                logger.warning(f"Dashboard metrics unavailable: {e}")
+            else:
+                await websocket.send_json({
+                    'type': 'metrics_update',
+                    'data': metrics,
+                    'alerts': alerts
+                })
+            
             await asyncio.sleep(2)
             
     except WebSocketDisconnect:
@@ -91,6 +102,12 @@ async def get_alerts(minutes: int = 60):
     return performance_monitor.get_recent_alerts(minutes)
 
 
+@dashboard_app.get("/api/event-loop")
+async def get_event_loop_report(top: int = 10):
+    """Event-loop lag and blocking call sites"""
+    return loop_monitor.report(top=top)
+
+
 @dashboard_app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -311,6 +328,14 @@ DASHBOARD_HTML = """
                 <p style="color: #7f8c8d;">No recent alerts</p>
             </div>
         </div>
+        
+        <!-- Event loop -->
+        <div class="alerts">
+            <h3>Event Loop</h3>
+            <div id="event-loop-container">
+                <p style="color: #7f8c8d;">Waiting for data</p>
+            </div>
+        </div>
     </div>
     
     <div class="connection-status connected" id="connection-status">
@@ -361,6 +386,8 @@ DASHBOARD_HTML = """
                 if (message.type === 'metrics_update') {
                     updateMetrics(message.data);
                     updateAlerts(message.alerts);
+                } else if (message.type === 'event_loop_update') {
+                    updateEventLoop(message.data);
                 }
             };
             
@@ -491,6 +518,31 @@ DASHBOARD_HTML = """
             }
         }
         
+        function updateEventLoop(report) {
+            const container = document.getElementById('event-loop-container');
+            const lag = report.lag_ms;
+            let html = `
+                <div class="metric-row">
+                    <span>Loop lag p99</span>
+                    <span>${lag.count ? lag.p99.toFixed(1) + 'ms' : (report.running ? '-' : 'monitor off')}</span>
+                </div>
+                <div class="metric-row">
+                    <span>Stalls over ${report.block_threshold_ms.toFixed(0)}ms</span>
+                    <span>${report.stalls}</span>
+                </div>
+            `;
+            for (const offender of report.offenders) {
+                html += `
+                    <div class="alert alert-warning" title="${offender.stack.join('\\n')}">
+                        <div><strong>${offender.site}</strong>
+                        <br>${offender.stalls} stalls, max ${offender.max_blocked_ms.toFixed(0)}ms</div>
+                        <span>${offender.total_blocked_ms.toFixed(0)}ms</span>
+                    </div>
+                `;
+            }
+            container.innerHTML = html;
+        }
+        
         function updateAlerts(alerts) {
             const container = document.getElementById('alerts-container');
             
@@ -0,0 +1,190 @@
+"""
+Cross-process metrics for FLASH
+Each worker spools a snapshot of its counters and sketches to a shared
+directory; readers merge every snapshot, so any worker can answer for all
+"""
+import os
+import json
+import time
+import uuid
+import fcntl
+import logging
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+from .quantile_sketch import WindowedSketch
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR_ENV = "FLASH_METRICS_DIR"
+PROMETHEUS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+ARCHIVE_NAME = "archive.json"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine worker snapshots into one
+
+    Counters are summed, sketches merged, the earliest start time kept and
+    the most recent system reading wins. Sketches in the result are
+    WindowedSketch objects; see export_snapshot for the serialisable form.
+    """
+    counters = defaultdict(int)
+    sketches = defaultdict(dict)
+    start_time = None
+    system = None
+
+    for snapshot in snapshots:
+        for name, value in snapshot.get("counters", {}).items():
+            counters[name] += value
+        for metric_name, by_key in snapshot.get("sketches", {}).items():
+            for key, data in by_key.items():
+                sketch = WindowedSketch.from_dict(data)
+                if key in sketches[metric_name]:
+                    sketches[metric_name][key].merge(sketch)
+                else:
+                    sketches[metric_name][key] = sketch
+        if snapshot.get("start_time") is not None:
+            start_time = min(start_time or snapshot["start_time"], snapshot["start_time"])
+        latest = snapshot.get("system")
+        if latest and (system is None or latest.get("timestamp", "") > system.get("timestamp", "")):
+            system = latest
+
+    return {"counters": dict(counters), "sketches": dict(sketches),
+            "start_time": start_time, "system": system}
+
+
+def export_snapshot(merged: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialisable form of a merged snapshot"""
+    return {
+        **merged,
+        "sketches": {
+            metric_name: {key: sketch.to_dict() for key, sketch in by_key.items()}
+            for metric_name, by_key in merged["sketches"].items()
+        }
+    }
+
+
+class MetricsSpool:
+    """
+    Per-worker snapshot files merged on read
+
+    Workers write ``worker_<pid>_<id>.json`` atomically (temp file and
+    rename), so readers never see a partial snapshot and no lock is taken on
+    the hot path. Snapshots of exited workers are folded into one archive
+    snapshot, so lifetime totals survive worker recycling without the
+    directory growing.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pid = None
+        self._path = None
+
+    @classmethod
+    def from_env(cls, subdirectory: Optional[str] = None) -> Optional["MetricsSpool"]:
+        """Spool in FLASH_METRICS_DIR, or beside the Prometheus multiprocess files"""
+        directory = os.getenv(SPOOL_DIR_ENV)
+        if not directory and os.getenv(PROMETHEUS_DIR_ENV):
+            directory = os.path.join(os.getenv(PROMETHEUS_DIR_ENV), "flash")
+        if not directory:
+            return None
+        if subdirectory:
+            directory = os.path.join(directory, subdirectory)
+        try:
+            return cls(directory)
+        except OSError as e:
+            logger.error(f"Metrics spool unavailable at {directory}: {e}")
+            return None
+
+    @property
+    def path(self) -> Path:
+        """This worker's snapshot file; a new one after fork"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._path = self.directory / f"worker_{self._pid}_{uuid.uuid4().hex[:8]}.json"
+        return self._path
+
+    def write(self, snapshot: Dict[str, Any]):
+        """Replace this worker's snapshot"""
+        path = self.path
+        snapshot = {**snapshot, "pid": self._pid, "written_at": time.time()}
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, default=str)
+        os.replace(tmp_path, path)
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Snapshots of every live worker plus the archive of exited ones"""
+        self.archive_dead_workers()
+        snapshots = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Archived or replaced while listing
+        return snapshots
+
+    def archive_dead_workers(self, pids: Optional[List[int]] = None):
+        """Fold snapshots of exited workers (or the given pids) into the archive"""
+        dead = []
+        for path in self.directory.glob("worker_*.json"):
+            pid = int(path.stem.split("_")[1])
+            if pid in pids if pids is not None else not _pid_alive(pid):
+                dead.append(path)
+        if not dead:
+            return
+
+        with open(self.directory / "archive.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive_path = self.directory / ARCHIVE_NAME
+            snapshots = []
+            if archive_path.exists():
+                with open(archive_path) as f:
+                    snapshots.append(json.load(f))
+
+            archived = []
+            for path in dead:
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                    archived.append(path)
+                except (OSError, ValueError):
+                    pass  # Another reader archived it first
+            if not archived:
+                return
+
+            tmp_path = archive_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(export_snapshot(merge_snapshots(snapshots)), f, default=str)
+            os.replace(tmp_path, archive_path)
+            for path in archived:
+                path.unlink(missing_ok=True)
+        logger.info(f"Archived metrics of {len(archived)} exited workers")
+
+
+def mark_worker_dead(pid: int):
+    """Release a dead worker's metrics; call from the process manager's child-exit hook"""
+    for subdirectory in (None, "performance"):
+        spool = MetricsSpool.from_env(subdirectory)
+        if spool is not None:
+            spool.archive_dead_workers([pid])
+    if os.getenv(PROMETHEUS_DIR_ENV):
+        try:
+            from prometheus_client import multiprocess
+            multiprocess.mark_process_dead(pid)
+        except ImportError:
+            pass
@@ -4,8 +4,8 @@ Real-time Performance Monitoring for FLASH
 KPI Impact: Maintain <200ms p99 latency, 99.9% uptime
 """
 
+import os
 import time
-import psutil
 import json
 from datetime import datetime, timedelta
 from collections import deque, defaultdict
@@ -14,13 +14,20 @@ import numpy as np
 from typing import Dict, List, Optional
 import logging
 
+from monitoring.quantile_sketch import WindowedSketch
+from monitoring.multiprocess import MetricsSpool, merge_snapshots
+from monitoring.system_sampler import system_sampler
+
 logger = logging.getLogger(__name__)
 
 
 class PerformanceMonitor:
     """Monitor and alert on system performance metrics"""
     
-    def __init__(self, window_size: int = 1000):
+    PREDICTION_BUCKETS = ['0-20%', '20-40%', '40-60%', '60-80%', '80-100%']
+    
+    def __init__(self, window_size: int = 1000, spool: Optional[MetricsSpool] = None,
+                 flush_interval: float = 1.0):
         self.window_size = window_size
         self.metrics = {
             'response_times': deque(maxlen=window_size),
@@ -28,12 +35,22 @@ class PerformanceMonitor:
             'error_counts': defaultdict(int),
             'feature_completeness': deque(maxlen=window_size),
             'cache_hits': 0,
-            'cache_misses': 0
+            'cache_misses': 0,
+            'prediction_buckets': defaultdict(int)
         }
         
+        self.response_time_sketch = WindowedSketch()
+        self.prediction_sketch = WindowedSketch()
+        self.completeness_sketch = WindowedSketch()
+        
         self.alerts = []
         self.start_time = datetime.now()
         
+        # Shared snapshot directory when running several workers
+        self.spool = spool
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        
     def record_prediction(self, 
                          response_time_ms: float,
                          prediction_score: float,
@@ -41,8 +58,13 @@ class PerformanceMonitor:
                          cache_hit: bool = False):
         """Record a prediction event"""
         self.metrics['response_times'].append(response_time_ms)
+        self.response_time_sketch.add(response_time_ms)
         self.metrics['prediction_scores'].append(prediction_score)
+        self.prediction_sketch.add(prediction_score)
+        bucket = self.PREDICTION_BUCKETS[min(max(int(prediction_score * 5), 0), 4)]
+        self.metrics['prediction_buckets'][bucket] += 1
         self.metrics['feature_completeness'].append(feature_count / 45)  # 45 total features
+        self.completeness_sketch.add(feature_count / 45)
         
         if cache_hit:
             self.metrics['cache_hits'] += 1
@@ -51,56 +73,120 @@ class PerformanceMonitor:
             
         # Check for anomalies
         self._check_alerts(response_time_ms, prediction_score)
+        self._maybe_flush()
         
     def record_error(self, error_type: str):
         """Record an error event"""
         self.metrics['error_counts'][error_type] += 1
+        self._maybe_flush()
+        
+    def snapshot(self) -> Dict:
+        """This worker's counters and sketches in spool form"""
+        counters = {
+            'cache_hits': self.metrics['cache_hits'],
+            'cache_misses': self.metrics['cache_misses'],
+            **{f'error_{k}': v for k, v in self.metrics['error_counts'].items()},
+            **{f'bucket_{k}': v for k, v in self.metrics['prediction_buckets'].items()}
+        }
+        return {
+            'start_time': self.start_time.timestamp(),
+            'counters': counters,
+            'sketches': {
+                'response_time': {'all': self.response_time_sketch.to_dict()},
+                'prediction_score': {'all': self.prediction_sketch.to_dict()},
+                'feature_completeness': {'all': self.completeness_sketch.to_dict()}
+            }
+        }
+        
+    def flush(self):
+        """Write this worker's snapshot to the shared spool"""
+        if self.spool is None:
+            return
+        try:
+            self.spool.write(self.snapshot())
+            self._last_flush = time.time()
+        except Exception as e:
+            logger.error(f"Failed to flush performance snapshot: {e}")
+            
+    def _maybe_flush(self):
+        if self.spool is not None and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+            
+    def _aggregate(self) -> Dict:
+        """Counters and sketches of this worker, or of every worker sharing the spool"""
+        if self.spool is None:
+            counters = {
+                'cache_hits': self.metrics['cache_hits'],
+                'cache_misses': self.metrics['cache_misses']
+            }
+            return {
+                'start_time': self.start_time.timestamp(),
+                'counters': counters,
+                'errors': dict(self.metrics['error_counts']),
+                'buckets': dict(self.metrics['prediction_buckets']),
+                'response_time': self.response_time_sketch,
+                'prediction_score': self.prediction_sketch,
+                'feature_completeness': self.completeness_sketch
+            }
+            
+        self.flush()
+        merged = merge_snapshots(self.spool.read_all())
+        counters = merged['counters']
+        return {
+            'start_time': merged['start_time'] or self.start_time.timestamp(),
+            'counters': counters,
+            'errors': {k[len('error_'):]: v for k, v in counters.items() if k.startswith('error_')},
+            'buckets': {k[len('bucket_'):]: v for k, v in counters.items() if k.startswith('bucket_')},
+            **{name: merged['sketches'].get(name, {}).get('all', WindowedSketch())
+               for name in ('response_time', 'prediction_score', 'feature_completeness')}
+        }
         
     def get_current_stats(self) -> Dict:
-        """Get current performance statistics"""
-        if not self.metrics['response_times']:
+        """Get current performance statistics, across every worker when a spool is configured"""
+        aggregate = self._aggregate()
+        response_sketch = aggregate['response_time']
+        if not response_sketch.lifetime.count:
             return {'status': 'no_data'}
             
-        response_times = list(self.metrics['response_times'])
-        prediction_scores = list(self.metrics['prediction_scores'])
+        response_window = self._recent(response_sketch)
+        predictions = aggregate['prediction_score'].lifetime
+        completeness = aggregate['feature_completeness'].lifetime
         
         # Calculate cache hit rate
-        total_requests = self.metrics['cache_hits'] + self.metrics['cache_misses']
-        cache_hit_rate = self.metrics['cache_hits'] / max(1, total_requests)
+        counters = aggregate['counters']
+        total_requests = counters.get('cache_hits', 0) + counters.get('cache_misses', 0)
+        cache_hit_rate = counters.get('cache_hits', 0) / max(1, total_requests)
         
         stats = {
-            'uptime_hours': (datetime.now() - self.start_time).total_seconds() / 3600,
-            'total_predictions': len(response_times),
+            'uptime_hours': (time.time() - aggregate['start_time']) / 3600,
+            'total_predictions': response_sketch.lifetime.count,
             'response_time': {
-                'mean': np.mean(response_times),
-                'p50': np.percentile(response_times, 50),
-                'p95': np.percentile(response_times, 95),
-                'p99': np.percentile(response_times, 99),
-                'max': np.max(response_times)
+                'mean': response_window.mean,
+                **response_window.quantiles(),
+                'max': response_window.max,
+                'window_seconds': response_sketch.window_seconds,
+                'lifetime': response_sketch.lifetime.summary()
             },
             'prediction_distribution': {
-                'min': np.min(prediction_scores),
-                'max': np.max(prediction_scores),
-                'mean': np.mean(prediction_scores),
-                'std': np.std(prediction_scores),
+                'min': predictions.min,
+                'max': predictions.max,
+                'mean': predictions.mean,
+                'std': predictions.std,
                 'buckets': {
-                    '0-20%': sum(1 for p in prediction_scores if p < 0.2) / len(prediction_scores),
-                    '20-40%': sum(1 for p in prediction_scores if 0.2 <= p < 0.4) / len(prediction_scores),
-                    '40-60%': sum(1 for p in prediction_scores if 0.4 <= p < 0.6) / len(prediction_scores),
-                    '60-80%': sum(1 for p in prediction_scores if 0.6 <= p < 0.8) / len(prediction_scores),
-                    '80-100%': sum(1 for p in prediction_scores if p >= 0.8) / len(prediction_scores),
+                    bucket: aggregate['buckets'].get(bucket, 0) / max(1, predictions.count)
+                    for bucket in self.PREDICTION_BUCKETS
                 }
             },
             'cache_performance': {
                 'hit_rate': cache_hit_rate,
-                'total_hits': self.metrics['cache_hits'],
-                'total_misses': self.metrics['cache_misses']
+                'total_hits': counters.get('cache_hits', 0),
+                'total_misses': counters.get('cache_misses', 0)
             },
-            'error_rate': sum(self.metrics['error_counts'].values()) / max(1, total_requests),
-            'errors_by_type': dict(self.metrics['error_counts']),
+            'error_rate': sum(aggregate['errors'].values()) / max(1, total_requests),
+            'errors_by_type': aggregate['errors'],
             'data_quality': {
-                'avg_feature_completeness': np.mean(list(self.metrics['feature_completeness'])),
-                'min_feature_completeness': np.min(list(self.metrics['feature_completeness']))
+                'avg_feature_completeness': completeness.mean,
+                'min_feature_completeness': completeness.min
             },
             'system_resources': self._get_system_resources(),
             'active_alerts': self.alerts[-10:]  # Last 10 alerts
@@ -108,6 +194,21 @@ class PerformanceMonitor:
         
         return stats
         
+    def get_recent_alerts(self, minutes: int = 60) -> List[Dict]:
+        """Alerts raised in the last ``minutes``, newest first"""
+        cutoff = datetime.now() - timedelta(minutes=minutes)
+        return [
+            {**alert, 'level': alert['severity']}
+            for alert in reversed(self.alerts)
+            if datetime.fromisoformat(alert['timestamp']) >= cutoff
+        ]
+        
+    @staticmethod
+    def _recent(sketch: WindowedSketch):
+        """Sketch for the sliding window, or lifetime if the window is empty"""
+        window = sketch.window()
+        return window if window.count else sketch.lifetime
+        
     def _check_alerts(self, response_time_ms: float, prediction_score: float):
         """Check for performance anomalies and generate alerts"""
         alerts = []
@@ -149,11 +250,12 @@ class PerformanceMonitor:
         self.alerts.extend(alerts)
         
     def _get_system_resources(self) -> Dict:
-        """Get current system resource usage"""
+        """Get current system resource usage from the background sampler"""
+        sample = system_sampler.latest() or system_sampler.collect()
         return {
-            'cpu_percent': psutil.cpu_percent(interval=0.1),
-            'memory_percent': psutil.virtual_memory().percent,
-            'disk_usage_percent': psutil.disk_usage('/').percent
+            'cpu_percent': sample['cpu_percent'],
+            'memory_percent': sample['memory_percent'],
+            'disk_usage_percent': sample['disk_percent']
         }
         
     def export_metrics(self, filepath: str = "metrics/performance_report.json"):
@@ -174,27 +276,30 @@ class PerformanceMonitor:
         
     def _calculate_sla_compliance(self) -> Dict:
         """Calculate SLA compliance metrics"""
-        if not self.metrics['response_times']:
+        aggregate = self._aggregate()
+        if not aggregate['response_time'].lifetime.count:
             return {'status': 'no_data'}
             
-        response_times = list(self.metrics['response_times'])
-        total_requests = len(response_times)
+        total_requests = aggregate['response_time'].lifetime.count
+        p99 = self._recent(aggregate['response_time']).quantile(0.99)
+        error_rate = sum(aggregate['errors'].values()) / max(1, total_requests)
+        predictions = aggregate['prediction_score'].lifetime
         
         return {
             'latency_sla': {
                 'target': '<200ms p99',
-                'actual': f"{np.percentile(response_times, 99):.0f}ms",
-                'compliant': np.percentile(response_times, 99) < 200
+                'actual': f"{p99:.0f}ms",
+                'compliant': p99 < 200
             },
             'availability_sla': {
                 'target': '99.9%',
-                'actual': f"{(1 - sum(self.metrics['error_counts'].values()) / max(1, total_requests)) * 100:.2f}%",
-                'compliant': sum(self.metrics['error_counts'].values()) / max(1, total_requests) < 0.001
+                'actual': f"{(1 - error_rate) * 100:.2f}%",
+                'compliant': error_rate < 0.001
             },
             'accuracy_sla': {
                 'target': 'Full 0-100% range',
-                'actual': f"{np.min(list(self.metrics['prediction_scores'])):.1%} - {np.max(list(self.metrics['prediction_scores'])):.1%}",
-                'compliant': np.ptp(list(self.metrics['prediction_scores'])) > 0.7
+                'actual': f"{predictions.min:.1%} - {predictions.max:.1%}",
+                'compliant': predictions.max - predictions.min > 0.7
             }
         }
         
@@ -237,7 +342,10 @@ class PerformanceMonitor:
 
 
 # Global monitor instance
-performance_monitor = PerformanceMonitor()
+performance_monitor = PerformanceMonitor(
+    spool=MetricsSpool.from_env("performance"),
+    flush_interval=float(os.getenv("FLASH_METRICS_FLUSH_SECONDS", "1.0"))
+)
 
 
 def create_dashboard_html(stats: Dict) -> str:
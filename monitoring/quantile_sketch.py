@@ -0,0 +1,299 @@
+"""
+Streaming quantile sketches for FLASH metrics
+Mergeable DDSketch-style histograms with lifetime and sliding-window views
+"""
+import math
+import time
+import threading
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+
+
+class DDSketch:
+    """
+    Log-bucketed quantile sketch with a relative accuracy guarantee
+
+    A value x is counted in bucket ceil(log_gamma(x)), so any quantile is
+    returned within ``relative_accuracy`` of the true value. Recording is
+    O(1), memory grows with the log of the value range (a few hundred
+    buckets for latencies from microseconds to minutes), and two sketches
+    with the same accuracy merge exactly by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint of (gamma^(key-1), gamma^key] in relative terms
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Record a value"""
+        if value > self.min_value:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + weight
+        elif value < -self.min_value:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + weight
+        else:
+            self.zero_count += weight
+
+        self.count += weight
+        self.sum += value * weight
+        self.sum_squares += value * value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's counts into this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "DDSketch":
+        """Point-in-time copy, safe to take while another thread records"""
+        sketch = DDSketch(self.relative_accuracy, self.min_value)
+        # dict.copy() runs without releasing the GIL, unlike iterating
+        sketch.positive = self.positive.copy()
+        sketch.negative = self.negative.copy()
+        sketch.zero_count = self.zero_count
+        sketch.count = self.count
+        sketch.sum = self.sum
+        sketch.sum_squares = self.sum_squares
+        sketch.min = self.min
+        sketch.max = self.max
+        return sketch
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), None if empty"""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(self.min, -self._value(key))
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self.max, self._value(key))
+        return self.max
+
+    def quantiles(self, qs: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, Optional[float]]:
+        """Several quantiles keyed like p50/p95/p99"""
+        return {f"p{q * 100:g}": self.quantile(q) for q in qs}
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return math.sqrt(max(0.0, self.sum_squares / self.count - self.mean ** 2))
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, extremes and standard percentiles"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            **self.quantiles()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable form for shipping sketches between workers"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "sum_squares": self.sum_squares,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], data.get("min_value", 1e-9))
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.sum_squares = data.get("sum_squares", 0.0)
+        if data["count"]:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class _Shard:
+    """One writer's lifetime sketch and time-sliced window slots"""
+
+    def __init__(self, slots: int, relative_accuracy: float):
+        self.lifetime = DDSketch(relative_accuracy)
+        # (slot_id, sketch) pairs, replaced as a unit so readers never see
+        # one slot's id next to another slot's sketch
+        self.slots: List[Tuple[int, Optional[DDSketch]]] = [(-1, None)] * slots
+
+
+class WindowedSketch:
+    """
+    Lifetime sketch plus a sliding window made of time-sliced sketches
+
+    The window is split into ``slots`` sub-sketches; a record lands in the
+    current slot and expired slots are reset lazily, so the window view
+    covers between ``window_seconds - slot`` and ``window_seconds``.
+
+    Each recording thread writes to its own shard without locking; reads
+    copy and merge the shards, and sketches merged in from other workers
+    go to a separate shard guarded by the lock.
+    """
+
+    def __init__(self, window_seconds: float = 300, slots: int = 10,
+                 relative_accuracy: float = 0.01):
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.slot_seconds = window_seconds / slots
+        self.relative_accuracy = relative_accuracy
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._merged = _Shard(slots, relative_accuracy)
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(self.slots, self.relative_accuracy)
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        """Record a value in the lifetime and current window sketches"""
+        now = time.time() if now is None else now
+        shard = self._shard()
+        shard.lifetime.add(value)
+        slot_id = int(now // self.slot_seconds)
+        index = slot_id % self.slots
+        current_id, sketch = shard.slots[index]
+        if current_id != slot_id:
+            sketch = DDSketch(self.relative_accuracy)
+            shard.slots[index] = (slot_id, sketch)
+        sketch.add(value)
+
+    def _snapshot(self) -> Tuple[DDSketch, Dict[int, DDSketch]]:
+        """Lifetime sketch and per-slot sketches merged over every shard"""
+        lifetime = DDSketch(self.relative_accuracy)
+        slots: Dict[int, DDSketch] = {}
+        with self._lock:
+            for shard in self._shards + [self._merged]:
+                lifetime.merge(shard.lifetime.copy())
+                for slot_id, sketch in list(shard.slots):
+                    if slot_id >= 0:
+                        slots.setdefault(slot_id, DDSketch(self.relative_accuracy)).merge(sketch.copy())
+        return lifetime, slots
+
+    @property
+    def lifetime(self) -> DDSketch:
+        """Merged sketch of every value recorded"""
+        return self._snapshot()[0]
+
+    def window(self, now: Optional[float] = None) -> DDSketch:
+        """Merged sketch of the slots still inside the window"""
+        now = time.time() if now is None else now
+        current = int(now // self.slot_seconds)
+        merged = DDSketch(self.relative_accuracy)
+        for slot_id, sketch in self._snapshot()[1].items():
+            if current - self.slots < slot_id <= current:
+                merged.merge(sketch)
+        return merged
+
+    def _merge_slots(self, slots: Dict[int, DDSketch]) -> None:
+        for slot_id, sketch in slots.items():
+            index = slot_id % self.slots
+            current_id, current = self._merged.slots[index]
+            if current_id < slot_id:
+                current = DDSketch(self.relative_accuracy)
+                self._merged.slots[index] = (slot_id, current)
+            elif current_id > slot_id:
+                continue
+            current.merge(sketch)
+
+    def merge(self, other: "WindowedSketch") -> None:
+        """Merge another worker's sketch, aligning window slots by time"""
+        lifetime, slots = other._snapshot()
+        with self._lock:
+            self._merged.lifetime.merge(lifetime)
+            self._merge_slots(slots)
+
+    def to_dict(self) -> Dict[str, Any]:
+        lifetime, slots = self._snapshot()
+        return {
+            "window_seconds": self.window_seconds,
+            "slots": self.slots,
+            "relative_accuracy": self.relative_accuracy,
+            "lifetime": lifetime.to_dict(),
+            "window_slots": [
+                {"slot_id": slot_id, "sketch": sketch.to_dict()}
+                for slot_id, sketch in sorted(slots.items())
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WindowedSketch":
+        windowed = cls(data["window_seconds"], data["slots"], data["relative_accuracy"])
+        windowed._merged.lifetime = DDSketch.from_dict(data["lifetime"])
+        windowed._merge_slots({
+            entry["slot_id"]: DDSketch.from_dict(entry["sketch"]) for entry in data["window_slots"]
+        })
+        return windowed
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Lifetime and window summaries side by side"""
+        return {
+            "lifetime": self.lifetime.summary(),
+            "window": self.window(now).summary(),
+            "window_seconds": self.window_seconds
+        }
@@ -0,0 +1,212 @@
+"""
+Background system metrics sampler for FLASH
+Collects host and process readings on a fixed interval so request handlers
+and /metrics only read the latest snapshot
+"""
+import gc
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class SystemSampler:
+    """
+    Daemon thread sampling CPU, memory, disk, GC pauses, event-loop lag and
+    thread-pool saturation into a ring buffer
+
+    CPU is read with ``cpu_percent(interval=None)``, the utilisation since the
+    previous sample, so nothing ever sleeps on the caller's thread. Listeners
+    receive each sample from the sampler thread.
+    """
+
+    def __init__(self, interval: float = 5.0, history: int = 720):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Re-entrant: a collection can start while collect() holds the lock
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._process = None
+        self._process_pid = None
+
+        # Event loop and thread pool to watch, set from inside the loop
+        self._loop = None
+        self._thread_limiter = None
+        self._loop_lag_ms = None
+        self._ping_sent = None
+
+        # GC pauses since the previous sample
+        self._gc_started = None
+        self._gc_collections = [0, 0, 0]
+        self._gc_pauses = [0.0, 0.0, 0.0]
+        self._gc_pause_max = 0.0
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener(sample) after every sample"""
+        self._listeners.append(listener)
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None, thread_limiter=None):
+        """
+        Start sampling in this process
+
+        Args:
+            loop: Event loop whose scheduling lag to measure
+            thread_limiter: anyio CapacityLimiter of the thread pool, e.g.
+                ``anyio.to_thread.current_default_thread_limiter()``
+        """
+        if loop is not None:
+            self._loop = loop
+        if thread_limiter is not None:
+            self._thread_limiter = thread_limiter
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        if self._gc_callback not in gc.callbacks:
+            gc.callbacks.append(self._gc_callback)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"System sampler started ({self.interval}s interval)")
+
+    def stop(self):
+        """Stop sampling and detach the GC hook"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample, None before the first"""
+        return self.samples[-1] if self.samples else None
+
+    def history(self, seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Samples from the last ``seconds``, or the whole buffer"""
+        samples = list(self.samples)
+        if seconds is None:
+            return samples
+        cutoff = time.time() - seconds
+        return [s for s in samples if s["sampled_at"] >= cutoff]
+
+    def collect(self) -> Dict[str, Any]:
+        """Take one sample now and append it to the buffer"""
+        process = self._get_process()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        process_memory = process.memory_info()
+
+        with self._lock:
+            gc_collections, self._gc_collections = self._gc_collections, [0, 0, 0]
+            gc_pauses, self._gc_pauses = self._gc_pauses, [0.0, 0.0, 0.0]
+            gc_pause_max, self._gc_pause_max = self._gc_pause_max, 0.0
+
+        sample = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "sampled_at": time.time(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "memory_used_mb": memory.used / 1024 / 1024,
+            "memory_available_mb": memory.available / 1024 / 1024,
+            "memory_used_bytes": memory.used,
+            "disk_percent": disk.percent,
+            "disk_free_gb": disk.free / 1024 / 1024 / 1024,
+            "process_memory_mb": process_memory.rss / 1024 / 1024,
+            "process_cpu_percent": process.cpu_percent(interval=None),
+            "process_threads": process.num_threads(),
+            "gc_collections": gc_collections,
+            "gc_pause_ms": [pause * 1000 for pause in gc_pauses],
+            "gc_pause_ms_total": sum(gc_pauses) * 1000,
+            "gc_pause_ms_max": gc_pause_max * 1000,
+            "loop_lag_ms": self._current_loop_lag(),
+            **self._thread_pool_usage()
+        }
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        # Prime the CPU counters; the first reading of cpu_percent(None) is meaningless
+        psutil.cpu_percent(interval=None)
+        self._get_process().cpu_percent(interval=None)
+
+        while not self._stop.wait(self.interval):
+            try:
+                sample = self.collect()
+                self._ping_loop()
+            except Exception as e:
+                logger.error(f"Failed to sample system metrics: {e}")
+                continue
+            for listener in self._listeners:
+                try:
+                    listener(sample)
+                except Exception as e:
+                    logger.error(f"System metrics listener failed: {e}")
+
+    def _get_process(self) -> psutil.Process:
+        # A forked worker must not report its parent
+        if self._process_pid != os.getpid():
+            self._process = psutil.Process()
+            self._process_pid = os.getpid()
+        return self._process
+
+    def _ping_loop(self):
+        """Schedule a callback on the loop; its delay is read at the next sample"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or self._ping_sent is not None:
+            return
+        sent = self._ping_sent = time.perf_counter()
+
+        def pong():
+            self._loop_lag_ms = (time.perf_counter() - sent) * 1000
+            self._ping_sent = None
+
+        try:
+            loop.call_soon_threadsafe(pong)
+        except RuntimeError:
+            self._loop = None  # Loop closed between the check and the call
+            self._ping_sent = None
+
+    def _current_loop_lag(self) -> Optional[float]:
+        # An unanswered ping means the loop is blocked right now
+        sent = self._ping_sent
+        if sent is not None:
+            return max(self._loop_lag_ms or 0.0, (time.perf_counter() - sent) * 1000)
+        return self._loop_lag_ms
+
+    def _thread_pool_usage(self) -> Dict[str, Any]:
+        limiter = self._thread_limiter
+        if limiter is None:
+            return {"threadpool_busy": None, "threadpool_size": None, "threadpool_waiting": None}
+        statistics = limiter.statistics()
+        return {
+            "threadpool_busy": statistics.borrowed_tokens,
+            "threadpool_size": statistics.total_tokens,
+            "threadpool_waiting": statistics.tasks_waiting
+        }
+
+    def _gc_callback(self, phase: str, info: Dict[str, Any]):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_started = None
+            with self._lock:
+                self._gc_collections[info["generation"]] += 1
+                self._gc_pauses[info["generation"]] += pause
+                self._gc_pause_max = max(self._gc_pause_max, pause)
+
+
+# Global sampler, started per worker by the API server
+system_sampler = SystemSampler(
+    interval=float(os.getenv("FLASH_SYSTEM_SAMPLE_SECONDS", "5.0"))
+)
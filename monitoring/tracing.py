@@ -0,0 +1,143 @@
+"""
+Per-stage latency tracing for FLASH
+Requests open a trace; code inside marks stages with ``span(name)``. With no
+open trace (tracing disabled, or code running outside a request) a span is a
+shared no-op, so instrumented code costs one context-variable lookup.
+"""
+import os
+import time
+import logging
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("FLASH_TRACING", "1") != "0"
+TIMING_HEADER = "X-Timing"
+
+try:
+    from prometheus_client import Histogram
+
+    stage_duration = Histogram(
+        'flash_stage_duration_seconds',
+        'Time spent in each request stage',
+        ['stage'],
+        buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("flash_trace", default=None)
+
+
+class Trace:
+    """Stage timings of one request, summed per stage name"""
+
+    __slots__ = ("name", "stages", "started", "duration", "_token")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: Dict[str, float] = {}
+        self.started = None
+        self.duration = None
+        self._token = None
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def breakdown(self) -> Dict[str, float]:
+        """Milliseconds per stage, in the order stages first ran, plus the total"""
+        result = {stage: seconds * 1000 for stage, seconds in self.stages.items()}
+        if self.duration is not None:
+            result["total"] = self.duration * 1000
+        return result
+
+    def header(self) -> str:
+        """Breakdown in Server-Timing syntax, e.g. ``validate;dur=1.20, total;dur=9.81``"""
+        return ", ".join(f"{stage};dur={ms:.2f}" for stage, ms in self.breakdown().items())
+
+    def __enter__(self) -> "Trace":
+        self.started = time.perf_counter()
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.started
+        _current_trace.reset(self._token)
+        if PROMETHEUS_AVAILABLE:
+            try:
+                for stage, seconds in self.stages.items():
+                    stage_duration.labels(stage=stage).observe(seconds)
+            except Exception as e:
+                logger.error(f"Failed to export stage timings: {e}")
+        return False
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "started")
+
+    def __init__(self, trace: Trace, stage: str):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.add(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _NoopTrace(_NoopSpan):
+    __slots__ = ()
+    stages = {}
+
+    def breakdown(self) -> Dict[str, float]:
+        return {}
+
+    def header(self) -> str:
+        return ""
+
+
+def start_trace(name: str):
+    """Trace to wrap a request in; a no-op when FLASH_TRACING=0"""
+    return Trace(name) if TRACING_ENABLED else _NoopTrace()
+
+
+def span(stage: str):
+    """Time a stage of the current request"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, stage)
+
+
+def traced(stage: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
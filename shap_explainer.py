@@ -11,13 +11,18 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from io import BytesIO
 import base64
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union
 import joblib
 from pathlib import Path
 import seaborn as sns
+import hashlib
 import logging
+import threading
 from datetime import datetime
 
+from utils.shap_background import load_background_sample
+from utils.explanation_cache import ExplanationCache, get_explanation_cache
+
 # Configure matplotlib for better quality
 plt.rcParams['figure.dpi'] = 150
 plt.rcParams['savefig.dpi'] = 150
@@ -28,14 +33,93 @@ plt.rcParams['figure.figsize'] = (10, 6)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# CAMP pillar membership of the explained features
+CAMP_FEATURE_GROUPS = {
+    'Capital': ['funding_stage', 'total_capital_raised_usd', 'cash_on_hand_usd',
+                'monthly_burn_usd', 'runway_months', 'annual_revenue_run_rate',
+                'revenue_growth_rate_percent', 'gross_margin_percent', 'burn_multiple',
+                'ltv_cac_ratio', 'investor_tier_primary', 'has_debt'],
+    'Advantage': ['patent_count', 'network_effects_present', 'has_data_moat',
+                  'regulatory_advantage_present', 'tech_differentiation_score',
+                  'switching_cost_score', 'brand_strength_score', 'scalability_score',
+                  'product_stage', 'product_retention_30d', 'product_retention_90d'],
+    'Market': ['sector', 'tam_size_usd', 'sam_size_usd', 'som_size_usd',
+               'market_growth_rate_percent', 'customer_count', 'customer_concentration_percent',
+               'user_growth_rate_percent', 'net_dollar_retention_percent',
+               'competition_intensity', 'competitors_named_count', 'dau_mau_ratio'],
+    'People': ['founders_count', 'team_size_full_time', 'years_experience_avg',
+               'domain_expertise_years_avg', 'prior_startup_experience_count',
+               'prior_successful_exits_count', 'board_advisor_experience_score',
+               'advisors_count', 'team_diversity_percent', 'key_person_dependency']
+}
+
+
+# Plot kinds rendered by _generate_plots
+PLOT_KINDS = ('model_consensus', 'feature_importance', 'camp_breakdown')
+# pyplot keeps global state, so server-side renders are serialised
+_render_lock = threading.Lock()
+
+
+def _positive_class(values: Any) -> np.ndarray:
+    """Select positive-class attributions from any SHAP output layout"""
+    if isinstance(values, list):
+        values = values[1] if len(values) > 1 else values[0]
+    values = np.asarray(values)
+    if values.ndim == 3:
+        values = values[:, :, -1]
+    return values
+
+
+def _positive_expected_value(expected_value: Any) -> float:
+    expected = np.atleast_1d(np.asarray(expected_value, dtype=float))
+    return float(expected[-1])
+
+
+class EnsembleTreeExplainer:
+    """
+    TreeExplainer over every member of a fitted ensemble
+
+    Used for ensembles that shap cannot explain directly (voting, stacking
+    and bagging wrappers). Attributions are the weighted average of the
+    member attributions, which is exact for soft voting over members that
+    share an output space and an approximation otherwise.
+    """
+    
+    def __init__(self, model):
+        members = model.estimators_
+        members = list(members.ravel()) if isinstance(members, np.ndarray) else list(members)
+        weights = getattr(model, 'weights', None)
+        if weights is None or len(weights) != len(members):
+            weights = np.ones(len(members))
+        
+        self.explainers = [shap.TreeExplainer(member) for member in members]
+        self.weights = np.asarray(weights, dtype=float) / np.sum(weights)
+        self.expected_value = float(sum(
+            w * _positive_expected_value(e.expected_value)
+            for w, e in zip(self.weights, self.explainers)
+        ))
+    
+    def shap_values(self, X) -> np.ndarray:
+        return sum(
+            w * _positive_class(e.shap_values(X))
+            for w, e in zip(self.weights, self.explainers)
+        )
+
+
 class FLASHExplainer:
     """SHAP-based explainability for FLASH predictions"""
     
-    def __init__(self, models_dir: str = "models"):
+    def __init__(self, models_dir: str = "models", cache: Optional[ExplanationCache] = None):
         self.models_dir = Path(models_dir)
         self.models = {}
         self.explainers = {}
+        self.model_checksums = {}
+        self.cache = cache
         self.feature_names = self._get_feature_names()
+        # Only the kernel fallback needs this; None without training data
+        self.background_data = load_background_sample(
+            self.feature_names, path=str(self.models_dir / 'shap_background.pkl')
+        )
         self._load_models()
         
     def _get_feature_names(self) -> List[str]:
@@ -143,45 +227,178 @@ class FLASHExplainer:
     def _create_explainers(self):
         """Create SHAP explainers for each loaded model"""
         for name, model in self.models.items():
+            self.model_checksums[name] = joblib.hash(model)
             try:
-                # For ensemble models, we need the base estimator
-                if hasattr(model, 'estimators_'):
-                    # Use the first estimator for explanation
-                    base_model = model.estimators_[0]
-                    self.explainers[name] = shap.TreeExplainer(base_model)
-                elif hasattr(model, 'model'):
-                    # Some models wrap the actual model
-                    self.explainers[name] = shap.TreeExplainer(model.model)
-                else:
-                    # Direct model
-                    self.explainers[name] = shap.TreeExplainer(model)
+                # Wrapped models expose the fitted estimator as .model
+                target = model.model if hasattr(model, 'model') else model
+                try:
+                    # Covers forests and boosted ensembles as a whole
+                    self.explainers[name] = shap.TreeExplainer(target)
+                except Exception:
+                    if not hasattr(target, 'estimators_'):
+                        raise
+                    self.explainers[name] = EnsembleTreeExplainer(target)
                 logger.info(f"Created explainer for {name}")
             except Exception as e:
                 logger.warning(f"Could not create explainer for {name}: {e}")
                 # Fallback to KernelExplainer for non-tree models
+                if self.background_data is None:
+                    logger.error(f"No background sample available for kernel explainer of {name}")
+                    continue
                 try:
-                    background = shap.sample(pd.DataFrame(
-                        np.zeros((100, len(self.feature_names))),
-                        columns=self.feature_names
-                    ), 100)
                     self.explainers[name] = shap.KernelExplainer(
                         model.predict_proba if hasattr(model, 'predict_proba') else model.predict,
-                        background
+                        self.background_data
                     )
                     logger.info(f"Created kernel explainer for {name}")
                 except Exception as e2:
                     logger.error(f"Could not create any explainer for {name}: {e2}")
     
+    def explain_batch(self, features: pd.DataFrame,
+                      model_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Predict and explain a batch of startups in one pass per model
+        
+        Args:
+            features: DataFrame with one row per startup
+            model_name: Specific model to use (None = all loaded models)
+            
+        Returns:
+            Dict with per-model prediction vectors, (rows, features) SHAP
+            matrices, expected values and the row-wise ensemble prediction
+        """
+        if isinstance(features, dict):
+            features = pd.DataFrame([features])
+        features = features[self.feature_names]
+        
+        if model_name and model_name in self.models:
+            models_to_use = {model_name: self.models[model_name]}
+        else:
+            models_to_use = self.models
+        
+        predictions = {}
+        shap_values = {}
+        expected_values = {}
+        errors = {}
+        
+        for name, model in models_to_use.items():
+            try:
+                if hasattr(model, 'predict_proba'):
+                    predictions[name] = np.asarray(model.predict_proba(features))[:, 1].astype(float)
+                else:
+                    predictions[name] = np.asarray(model.predict(features), dtype=float)
+            except Exception as e:
+                logger.error(f"Error predicting with {name}: {e}")
+                predictions[name] = np.full(len(features), 0.5)
+                errors[name] = str(e)
+                continue
+            
+            if name not in self.explainers:
+                errors[name] = 'No explainer available for this model'
+                continue
+            
+            try:
+                explainer = self.explainers[name]
+                shap_values[name] = self._shap_values(name, features)
+                expected_values[name] = _positive_expected_value(explainer.expected_value)
+            except Exception as e:
+                logger.error(f"Error explaining {name}: {e}")
+                errors[name] = str(e)
+        
+        if predictions:
+            ensemble = np.mean(np.vstack(list(predictions.values())), axis=0)
+        else:
+            ensemble = np.full(len(features), 0.5)
+        
+        return {
+            'feature_names': self.feature_names,
+            'features': features,
+            'predictions': predictions,
+            'ensemble_predictions': ensemble,
+            'shap_values': shap_values,
+            'expected_values': expected_values,
+            'errors': errors
+        }
+    
+    def _shap_values(self, name: str, features: pd.DataFrame) -> np.ndarray:
+        """Positive-class SHAP matrix, computing only rows missing from the cache"""
+        explainer = self.explainers[name]
+        if self.cache is None:
+            return _positive_class(explainer.shap_values(features))
+        
+        checksum = self.model_checksums[name]
+        keys = [
+            self.cache.make_key(checksum, 'shap', row)
+            for row in features.itertuples(index=False, name=None)
+        ]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        
+        values = np.empty((len(features), len(self.feature_names)))
+        for i, key in enumerate(keys):
+            if key in cached:
+                values[i] = cached[key]
+        
+        if missing:
+            computed = _positive_class(explainer.shap_values(features.iloc[missing]))
+            values[missing] = computed
+            self.cache.put_many(
+                {keys[i]: computed[j] for j, i in enumerate(missing)}, checksum
+            )
+        
+        return values
+    
+    def _combined_checksum(self) -> str:
+        """Checksum over every loaded model, for artefacts that depend on all of them"""
+        payload = "|".join(f"{name}:{self.model_checksums.get(name)}" for name in sorted(self.models))
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def summarize_batch(self, batch: Dict[str, Any], top_k: int = 10) -> Dict[str, Any]:
+        """
+        Portfolio-level attribution summary of an explain_batch result
+        
+        Returns:
+            Per-model top features by mean absolute SHAP value, mean signed
+            impact per feature and mean CAMP pillar contributions
+        """
+        feature_names = batch['feature_names']
+        positions = {f: i for i, f in enumerate(feature_names)}
+        summary = {}
+        
+        for name, values in batch['shap_values'].items():
+            mean_abs = np.abs(values).mean(axis=0)
+            mean_signed = values.mean(axis=0)
+            top = np.argsort(-mean_abs, kind='stable')[:top_k]
+            
+            summary[name] = {
+                'top_features': [
+                    {
+                        'feature': feature_names[i],
+                        'mean_abs_impact': float(mean_abs[i]),
+                        'mean_impact': float(mean_signed[i])
+                    }
+                    for i in top
+                ],
+                'camp_contributions': {
+                    pillar: float(values[:, [positions[f] for f in group if f in positions]].sum(axis=1).mean())
+                    for pillar, group in CAMP_FEATURE_GROUPS.items()
+                }
+            }
+        
+        return summary
+    
     def explain_prediction(self, features: pd.DataFrame, 
                          model_name: Optional[str] = None,
-                         include_plots: bool = True) -> Dict[str, Any]:
+                         include_plots: Union[bool, str] = True) -> Dict[str, Any]:
         """
         Generate comprehensive explanation for a prediction
         
         Args:
             features: DataFrame with startup features
             model_name: Specific model to use (None = use best available)
-            include_plots: Whether to generate visualization plots
+            include_plots: Whether to generate visualization plots. 'lazy'
+                returns numeric plot specs for client-side rendering plus a
+                plot_id whose PNGs are rendered on demand by render_plot
             
         Returns:
             Dict with explanations, predictions, and insights
@@ -194,65 +411,63 @@ class FLASHExplainer:
                 'insights': {}
             }
         
-        # Ensure features are in correct order
-        if isinstance(features, dict):
-            features = pd.DataFrame([features])
+        batch = self.explain_batch(features, model_name)
+        features = batch['features']
         
-        # Reorder columns to match expected feature order
-        features = features[self.feature_names]
-        
-        # Get predictions from each model
         predictions = {}
         explanations = {}
         
-        # If specific model requested
-        if model_name and model_name in self.models:
-            models_to_use = {model_name: self.models[model_name]}
-        else:
-            models_to_use = self.models
-        
-        for name, model in models_to_use.items():
-            try:
-                # Get prediction
-                if hasattr(model, 'predict_proba'):
-                    pred = model.predict_proba(features)[0, 1]
-                else:
-                    pred = model.predict(features)[0]
-                predictions[name] = float(pred)
-                
-                # Get SHAP values if explainer exists
-                if name in self.explainers:
-                    shap_values = self.explainers[name].shap_values(features)
-                    if isinstance(shap_values, list):
-                        shap_values = shap_values[1]  # For binary classification
-                    
-                    explanations[name] = {
-                        'prediction': float(pred),
-                        'shap_values': shap_values[0].tolist() if hasattr(shap_values[0], 'tolist') else shap_values[0],
-                        'feature_names': self.feature_names,
-                        'feature_values': features.iloc[0].tolist()
-                    }
-                else:
-                    explanations[name] = {
-                        'prediction': float(pred),
-                        'error': 'No explainer available for this model'
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Error explaining {name}: {e}")
-                predictions[name] = 0.5
-                explanations[name] = {'error': str(e)}
+        for name, model_predictions in batch['predictions'].items():
+            pred = float(model_predictions[0])
+            predictions[name] = pred
+            
+            if name in batch['shap_values']:
+                explanations[name] = {
+                    'prediction': pred,
+                    'expected_value': batch['expected_values'][name],
+                    'shap_values': batch['shap_values'][name][0].tolist(),
+                    'feature_names': self.feature_names,
+                    'feature_values': features.iloc[0].tolist()
+                }
+            else:
+                explanations[name] = {
+                    'prediction': pred,
+                    'error': batch['errors'][name]
+                }
         
-        # Calculate ensemble prediction
-        if predictions:
-            ensemble_pred = np.mean(list(predictions.values()))
-        else:
-            ensemble_pred = 0.5
+        ensemble_pred = float(batch['ensemble_predictions'][0])
         
-        # Generate plots if requested
+        # Generate plots if requested, reusing cached renders of the same input
         plots = {}
         if include_plots and explanations:
-            plots = self._generate_plots(explanations, ensemble_pred)
+            plot_id = None
+            entry = None
+            if self.cache is not None:
+                plot_id = self.cache.make_key(
+                    self._combined_checksum(), f"plots:{model_name or 'all'}", features.iloc[0]
+                )
+                entry = self.cache.get(plot_id)
+            
+            if include_plots == 'lazy':
+                plots = self._build_plot_specs(explanations, ensemble_pred)
+                plots['plot_id'] = plot_id
+                if plot_id is not None and entry is None:
+                    self.cache.put(plot_id, {
+                        'explanations': explanations,
+                        'ensemble_prediction': ensemble_pred,
+                        'images': {}
+                    }, self._combined_checksum())
+            elif entry is not None and set(entry['images']) >= self._available_plot_kinds(explanations):
+                plots = entry['images']
+            else:
+                with _render_lock:
+                    plots = self._generate_plots(explanations, ensemble_pred)
+                if plot_id is not None:
+                    self.cache.put(plot_id, {
+                        'explanations': explanations,
+                        'ensemble_prediction': ensemble_pred,
+                        'images': plots
+                    }, self._combined_checksum())
         
         # Generate insights
         insights = self._generate_insights(explanations, predictions)
@@ -266,12 +481,127 @@ class FLASHExplainer:
             'timestamp': datetime.now().isoformat()
         }
     
-    def _generate_plots(self, explanations: Dict, ensemble_pred: float) -> Dict[str, str]:
-        """Generate visualization plots"""
+    def render_plot(self, plot_id: str, kind: str) -> Optional[bytes]:
+        """
+        PNG for one plot of a lazy explanation, rendered on first request
+        
+        Returns:
+            PNG bytes, or None if the plot id or kind is unknown
+        """
+        if self.cache is None or kind not in PLOT_KINDS:
+            return None
+        entry = self.cache.get(plot_id)
+        if entry is None:
+            return None
+        
+        if kind not in entry['images']:
+            with _render_lock:
+                rendered = self._generate_plots(
+                    entry['explanations'], entry['ensemble_prediction'], kinds=[kind]
+                )
+            if kind not in rendered:
+                return None
+            entry['images'].update(rendered)
+            self.cache.put(plot_id, entry, self._combined_checksum())
+        
+        return base64.b64decode(entry['images'][kind].split(',', 1)[1])
+    
+    @staticmethod
+    def _best_explanation(explanations: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+        """First model with SHAP values"""
+        for name, exp in explanations.items():
+            if 'shap_values' in exp and not exp.get('error'):
+                return name, exp
+        return None, None
+    
+    def _available_plot_kinds(self, explanations: Dict) -> set:
+        kinds = set()
+        if len(explanations) > 1:
+            kinds.add('model_consensus')
+        if self._best_explanation(explanations)[1] is not None:
+            kinds.update(['feature_importance', 'camp_breakdown'])
+        return kinds
+    
+    def _camp_impacts(self, shap_values: List[float]) -> Dict[str, float]:
+        """Sum SHAP values by CAMP category"""
+        camp_impacts = {category: 0.0 for category in CAMP_FEATURE_GROUPS}
+        for i, feat in enumerate(self.feature_names):
+            for category, category_features in CAMP_FEATURE_GROUPS.items():
+                if feat in category_features:
+                    camp_impacts[category] += shap_values[i]
+                    break
+        return camp_impacts
+    
+    def _build_plot_specs(self, explanations: Dict, ensemble_pred: float,
+                          top_k: int = 20, waterfall_steps: int = 10) -> Dict[str, Any]:
+        """Numeric data behind each plot, for client-side rendering"""
+        specs = {}
+        
+        consensus = [
+            {'model': name, 'prediction': exp['prediction']}
+            for name, exp in explanations.items()
+            if 'prediction' in exp and not exp.get('error')
+        ]
+        if len(explanations) > 1 and consensus:
+            specs['model_consensus'] = {'models': consensus, 'ensemble': float(ensemble_pred)}
+        
+        best_model_name, best_explanation = self._best_explanation(explanations)
+        if best_explanation is None:
+            return specs
+        
+        shap_values = np.asarray(best_explanation['shap_values'], dtype=float)
+        feature_names = best_explanation['feature_names']
+        feature_values = [
+            float(v) if isinstance(v, (int, float, np.number)) and not isinstance(v, bool) else
+            (None if v is None else str(v))
+            for v in best_explanation['feature_values']
+        ]
+        order = np.argsort(-np.abs(shap_values), kind='stable')
+        
+        specs['feature_importance'] = {
+            'model': best_model_name,
+            'features': [
+                {'feature': feature_names[i], 'value': feature_values[i], 'impact': float(shap_values[i])}
+                for i in order[:top_k]
+            ]
+        }
+        
+        # Waterfall from the model's expected value to its prediction
+        base_value = float(best_explanation.get('expected_value', 0.0))
+        steps = []
+        running = base_value
+        for i in order[:waterfall_steps]:
+            steps.append({
+                'feature': feature_names[i],
+                'impact': float(shap_values[i]),
+                'start': running,
+                'end': running + float(shap_values[i])
+            })
+            running += float(shap_values[i])
+        remainder = float(shap_values[order[waterfall_steps:]].sum())
+        specs['waterfall'] = {
+            'model': best_model_name,
+            'base_value': base_value,
+            'steps': steps,
+            'other_features_impact': remainder,
+            'final_value': running + remainder
+        }
+        
+        specs['camp_breakdown'] = {
+            category: float(impact)
+            for category, impact in self._camp_impacts(best_explanation['shap_values']).items()
+        }
+        
+        return specs
+    
+    def _generate_plots(self, explanations: Dict, ensemble_pred: float,
+                        kinds: Optional[List[str]] = None) -> Dict[str, str]:
+        """Generate visualization plots (all kinds unless restricted)"""
         plots = {}
+        kinds = set(kinds) if kinds is not None else set(PLOT_KINDS)
         
         # 1. Model consensus plot
-        if len(explanations) > 1:
+        if 'model_consensus' in kinds and len(explanations) > 1:
             fig, ax = plt.subplots(figsize=(8, 6))
             
             model_names = []
@@ -310,17 +640,9 @@ class FLASHExplainer:
                 plt.close(fig)
         
         # 2. Feature importance plot (from best available model)
-        best_model_name = None
-        best_explanation = None
-        
-        # Find best model with SHAP values
-        for name, exp in explanations.items():
-            if 'shap_values' in exp and not exp.get('error'):
-                best_model_name = name
-                best_explanation = exp
-                break
+        best_model_name, best_explanation = self._best_explanation(explanations)
         
-        if best_explanation:
+        if 'feature_importance' in kinds and best_explanation:
             fig, ax = plt.subplots(figsize=(10, 8))
             
             shap_values = np.array(best_explanation['shap_values'])
@@ -368,50 +690,11 @@ class FLASHExplainer:
             plt.close(fig)
         
         # 3. CAMP category breakdown if we have the data
-        if best_explanation and 'feature_names' in best_explanation:
+        if 'camp_breakdown' in kinds and best_explanation and 'feature_names' in best_explanation:
             fig, ax = plt.subplots(figsize=(8, 6))
             
             # Calculate CAMP category impacts
-            camp_impacts = {
-                'Capital': 0,
-                'Advantage': 0,
-                'Market': 0,
-                'People': 0
-            }
-            
-            shap_values = best_explanation['shap_values']
-            
-            # Map features to categories
-            capital_features = ['funding_stage', 'total_capital_raised_usd', 'cash_on_hand_usd',
-                              'monthly_burn_usd', 'runway_months', 'annual_revenue_run_rate',
-                              'revenue_growth_rate_percent', 'gross_margin_percent', 'burn_multiple',
-                              'ltv_cac_ratio', 'investor_tier_primary', 'has_debt']
-            
-            advantage_features = ['patent_count', 'network_effects_present', 'has_data_moat',
-                                'regulatory_advantage_present', 'tech_differentiation_score',
-                                'switching_cost_score', 'brand_strength_score', 'scalability_score',
-                                'product_stage', 'product_retention_30d', 'product_retention_90d']
-            
-            market_features = ['sector', 'tam_size_usd', 'sam_size_usd', 'som_size_usd',
-                             'market_growth_rate_percent', 'customer_count', 'customer_concentration_percent',
-                             'user_growth_rate_percent', 'net_dollar_retention_percent',
-                             'competition_intensity', 'competitors_named_count', 'dau_mau_ratio']
-            
-            people_features = ['founders_count', 'team_size_full_time', 'years_experience_avg',
-                             'domain_expertise_years_avg', 'prior_startup_experience_count',
-                             'prior_successful_exits_count', 'board_advisor_experience_score',
-                             'advisors_count', 'team_diversity_percent', 'key_person_dependency']
-            
-            # Sum SHAP values by category
-            for i, feat in enumerate(self.feature_names):
-                if feat in capital_features:
-                    camp_impacts['Capital'] += shap_values[i]
-                elif feat in advantage_features:
-                    camp_impacts['Advantage'] += shap_values[i]
-                elif feat in market_features:
-                    camp_impacts['Market'] += shap_values[i]
-                elif feat in people_features:
-                    camp_impacts['People'] += shap_values[i]
+            camp_impacts = self._camp_impacts(best_explanation['shap_values'])
             
             # Create bar chart
             categories = list(camp_impacts.keys())
@@ -595,6 +878,30 @@ class FLASHExplainer:
         }
 
 
+_explainer_instance: Optional[FLASHExplainer] = None
+_explainer_lock = threading.Lock()
+
+
+def get_flash_explainer(models_dir: str = "models") -> FLASHExplainer:
+    """Shared explainer so models and SHAP explainers are built once per process"""
+    global _explainer_instance
+    if _explainer_instance is None:
+        with _explainer_lock:
+            if _explainer_instance is None:
+                cache = get_explanation_cache()
+                
+                # Drop cached explanations whenever production models change
+                if Path("model_versions/version_metadata.json").exists():
+                    try:
+                        from models.model_versioning import ModelVersioningSystem
+                        cache.attach_to_versioning(ModelVersioningSystem())
+                    except Exception as e:
+                        logger.warning(f"Could not attach explanation cache to model versioning: {e}")
+                
+                _explainer_instance = FLASHExplainer(models_dir, cache=cache)
+    return _explainer_instance
+
+
 if __name__ == "__main__":
     # Test the updated explainer
     explainer = FLASHExplainer()
@@ -50,6 +50,11 @@ else:
 # Create required directories
 mkdir -p logs data
 
+# Shared metrics directory so every worker reports for all of them
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/flash_metrics}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start the server
 echo ""
 echo "🚀 Starting FLASH API Server..."
@@ -64,6 +69,7 @@ echo ""
 if command -v gunicorn &> /dev/null; then
     echo "Using Gunicorn with Uvicorn workers..."
     exec gunicorn api_server_unified:app \
+        -c python:monitoring.gunicorn_hooks \
         --workers ${WORKERS:-4} \
         --worker-class uvicorn.workers.UvicornWorker \
         --bind ${HOST:-0.0.0.0}:${PORT:-8001} \
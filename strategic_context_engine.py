@@ -15,6 +15,9 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Pattern metrics compared against company data in _calculate_pattern_similarities
+PATTERN_SIMILARITY_METRICS = ["nrr", "growth", "ltv_cac"]
+
 
 class StrategicInflection(Enum):
     """Key strategic inflection points"""
@@ -155,6 +158,8 @@ class StrategicContextEngine:
     def __init__(self):
         self.industry_benchmarks = self._load_industry_benchmarks()
         self.pattern_library = self._load_successful_patterns()
+        self.pattern_metric_matrix = self._build_pattern_metric_matrix()
+        self.pattern_industries = np.array([p.industry for p in self.pattern_library])
         self.competitive_data = {}
         self.phd_enhancements = self._load_phd_enhancements()
         self.framework_synergies = self._load_framework_synergies()
@@ -266,6 +271,14 @@ class StrategicContextEngine:
             )
         ]
         
+    def _build_pattern_metric_matrix(self) -> np.ndarray:
+        """Pattern library metrics as a (patterns x metrics) matrix, 0 where absent"""
+        matrix = np.zeros((len(self.pattern_library), len(PATTERN_SIMILARITY_METRICS)))
+        for i, pattern in enumerate(self.pattern_library):
+            for j, metric in enumerate(PATTERN_SIMILARITY_METRICS):
+                matrix[i, j] = pattern.key_metrics.get(metric) or 0
+        return matrix
+        
     async def build_company_context(self, startup_data: Dict[str, Any]) -> CompanyContext:
         """Build comprehensive company context"""
         
@@ -516,16 +529,31 @@ class StrategicContextEngine:
         self, data: Dict[str, Any], industry: str, pattern_type: str
     ) -> List[StrategicPattern]:
         """Find similar success or failure patterns"""
-        relevant_patterns = []
-        
-        for pattern in self.pattern_library:
-            if pattern.industry == industry:
-                # Check if metrics are similar
-                similarity = self._calculate_pattern_similarity(data, pattern)
-                if similarity > 0.7:
-                    relevant_patterns.append(pattern)
-                    
-        return relevant_patterns[:3]  # Top 3 most relevant
+        if not self.pattern_library:
+            return []
+        
+        similarities = self._calculate_pattern_similarities(data)
+        candidates = np.flatnonzero(
+            (self.pattern_industries == industry) & (similarities > 0.7)
+        )
+        ranked = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        
+        return [self.pattern_library[i] for i in ranked[:3]]  # Top 3 most relevant
+    
+    def _calculate_pattern_similarities(self, data: Dict[str, Any]) -> np.ndarray:
+        """Similarity of the company to every library pattern in one pass"""
+        actual = np.array([
+            data.get(f"{metric}_percent", data.get(metric, 0)) or 0
+            for metric in PATTERN_SIMILARITY_METRICS
+        ], dtype=float)
+        expected = self.pattern_metric_matrix
+        
+        valid = (actual > 0) & (expected > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(valid, np.maximum(0, 1 - np.abs(actual - expected) / expected), 0)
+        
+        counts = valid.sum(axis=1)
+        return np.divide(scores.sum(axis=1), counts, out=np.zeros(len(counts)), where=counts > 0)
     
     def _load_phd_enhancements(self) -> Dict[str, Dict[str, Any]]:
         """Load PhD-level framework enhancements"""
@@ -553,31 +581,6 @@ class StrategicContextEngine:
             logger.error(f"Error loading framework synergies: {e}")
             return {"complementary_frameworks": {}, "synergy_scores": {}}
         
-    def _calculate_pattern_similarity(
-        self, data: Dict[str, Any], pattern: StrategicPattern
-    ) -> float:
-        """Calculate similarity to a pattern"""
-        similarity_scores = []
-        
-        for metric, value in pattern.key_metrics.items():
-            if metric in ["nrr", "growth", "ltv_cac"]:
-                actual = data.get(f"{metric}_percent", data.get(metric, 0))
-                if actual is None:
-                    actual = 0
-                if actual > 0 and value and value > 0:
-                    try:
-                        similarity = 1 - abs(actual - value) / value
-                        similarity_scores.append(max(0, similarity))
-                    except ZeroDivisionError:
-                        logger.warning(f"Division by zero in pattern matching: value={value}")
-                        continue
-                    
-        try:
-            return np.mean(similarity_scores) if similarity_scores else 0
-        except Exception as e:
-            logger.error(f"Error calculating similarity scores: {e}")
-            return 0
-        
     def _generate_primary_strategic_question(
         self, data: Dict[str, Any], 
         inflection: StrategicInflection,
@@ -0,0 +1,123 @@
+"""
+Unit tests for cached API-key authentication
+"""
+
+import uuid
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, APIKey
+from database.api_key_cache import APIKeyCache
+from database.repositories import APIKeyRepository
+import database.repositories as repositories
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    # The models target PostgreSQL; store UUIDs as hex text for these tests
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flash.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_session():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    cache = APIKeyCache(session_factory=get_session)
+    monkeypatch.setattr(repositories, "api_key_cache", cache)
+    return get_session, cache
+
+
+def create_key(get_session, expires_days=365):
+    key_id, raw_key = uuid.uuid4(), f"sk_{uuid.uuid4().hex}"
+    with get_session() as session:
+        session.execute(insert(APIKey.__table__).values(
+            id=key_id, key_hash=hashlib.sha256(raw_key.encode()).hexdigest(), name="partner",
+            is_active=True, expires_at=datetime.utcnow() + timedelta(days=expires_days)
+        ))
+    return key_id, raw_key
+
+
+class CountingSession:
+    """Session wrapper counting statements sent to the database"""
+
+    def __init__(self, session):
+        self.session = session
+        self.statements = 0
+
+    def execute(self, *args, **kwargs):
+        self.statements += 1
+        return self.session.execute(*args, **kwargs)
+
+    def flush(self):
+        self.session.flush()
+
+
+class TestAPIKeyCache:
+    """Test cached validation, bulk usage flushes and revocation"""
+
+    def test_repeat_validations_skip_database(self, db):
+        """Test only the first validation and the first miss reach the database"""
+        get_session, cache = db
+        key_id, raw_key = create_key(get_session)
+
+        with get_session() as session:
+            counting = CountingSession(session)
+            repo = APIKeyRepository(counting)
+            for _ in range(50):
+                assert repo.validate_key(raw_key).id == key_id
+            for _ in range(5):
+                assert repo.validate_key("sk_unknown") is None
+
+        assert counting.statements == 2
+        assert cache.stats["hits"] == 53
+
+    def test_usage_flushed_in_bulk(self, db):
+        """Test usage counters are summed in memory and written in one flush"""
+        get_session, cache = db
+        first_id, first_raw = create_key(get_session)
+        second_id, second_raw = create_key(get_session)
+
+        with get_session() as session:
+            repo = APIKeyRepository(session)
+            for _ in range(7):
+                repo.validate_key(first_raw)
+            repo.validate_key(second_raw)
+
+        assert cache.flush_usage() == 2
+        table = APIKey.__table__
+        with get_session() as session:
+            totals = dict(session.execute(select(table.c.id, table.c.total_requests)).all())
+            assert totals == {first_id: 7, second_id: 1}
+            assert session.execute(select(table.c.last_used_at).where(table.c.id == first_id)).scalar()
+
+    def test_revocation_and_expiry(self, db):
+        """Test a revoked key stops validating at once and expired keys never validate"""
+        get_session, cache = db
+        key_id, raw_key = create_key(get_session)
+        _, expired_raw = create_key(get_session, expires_days=-1)
+
+        with get_session() as session:
+            repo = APIKeyRepository(session)
+            assert repo.validate_key(raw_key) is not None
+            assert repo.validate_key(expired_raw) is None
+            assert repo.revoke(key_id)
+            assert repo.validate_key(raw_key) is None
+            assert not repo.revoke(uuid.uuid4())
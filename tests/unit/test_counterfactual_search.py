@@ -0,0 +1,91 @@
+"""
+Unit tests for counterfactual search
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from feature_config import ALL_FEATURES, CATEGORICAL_FEATURES
+from core.feature_registry import feature_registry
+from models.unified_orchestrator_v3_integrated import UnifiedOrchestratorV3
+from models.counterfactual_search import CounterfactualSearch
+
+
+@pytest.fixture(scope="module")
+def orchestrator_and_startup():
+    rng = np.random.default_rng(0)
+    n = 200
+    data = pd.DataFrame({
+        col: rng.uniform(0, 100, n) for col in ALL_FEATURES if col not in CATEGORICAL_FEATURES
+    })
+    data['funding_stage'] = 'Seed'
+    data['product_retention_90d'] = rng.uniform(0, 1, n)
+    data['monthly_burn_usd'] = rng.uniform(1e4, 5e5, n)
+
+    orchestrator = UnifiedOrchestratorV3()
+    prepared = orchestrator._prepare_features(data)
+    signal = (prepared['runway_months'] / 100 + prepared['product_retention_90d']
+              - prepared['monthly_burn_usd'] / 5e5 + rng.normal(0, 0.3, n))
+    orchestrator.pattern_system = None
+    orchestrator.models = {
+        'dna_analyzer': LogisticRegression(max_iter=2000).fit(prepared, (signal > 0.5).astype(int))
+    }
+
+    weakest = int(np.argmin(orchestrator.score_batch(data)['success_probability']))
+    return orchestrator, data.iloc[weakest].to_dict()
+
+
+class TestCounterfactualSearch:
+    """Test the cheapest verdict-crossing edits are found"""
+
+    def test_counterfactuals_cross_threshold(self, orchestrator_and_startup):
+        """Test each counterfactual reaches the target when re-scored"""
+        orchestrator, startup = orchestrator_and_startup
+        result = CounterfactualSearch(orchestrator).search(startup, time_budget=5.0)
+
+        assert result['base']['verdict'] == 'FAIL'
+        assert result['target_verdict'] == 'CONDITIONAL FAIL'
+        assert result['counterfactuals']
+
+        costs = [c['cost'] for c in result['counterfactuals']]
+        assert costs == sorted(costs)
+        for counterfactual in result['counterfactuals']:
+            edited = {**startup, **{e['feature']: e['to'] for e in counterfactual['edits']}}
+            rescored = orchestrator.predict(pd.DataFrame([edited]))
+            assert rescored['success_probability'] == pytest.approx(counterfactual['success_probability'])
+            assert rescored['success_probability'] >= 0.35
+            assert len(counterfactual['edits']) <= 3
+
+    def test_already_at_target(self, orchestrator_and_startup):
+        """Test nothing is searched when the verdict is already reached"""
+        orchestrator, startup = orchestrator_and_startup
+        result = CounterfactualSearch(orchestrator).search(startup, target_verdict='FAIL')
+
+        assert result['counterfactuals'] == []
+        assert result['candidates_scored'] == 0
+
+    def test_unknown_verdict(self, orchestrator_and_startup):
+        """Test the target must be a known verdict"""
+        orchestrator, startup = orchestrator_and_startup
+        with pytest.raises(ValueError):
+            CounterfactualSearch(orchestrator).search(startup, target_verdict='MAYBE')
+
+    def test_time_budget(self, orchestrator_and_startup):
+        """Test an exhausted budget returns what was found so far"""
+        orchestrator, startup = orchestrator_and_startup
+        result = CounterfactualSearch(orchestrator).search(startup, target_verdict='STRONG PASS',
+                                                           time_budget=0.0)
+
+        assert result['complete'] is False
+        assert result['candidates_scored'] > 0
+
+    def test_registry_hints(self, orchestrator_and_startup):
+        """Test directions and bounds come from the feature registry"""
+        orchestrator, _ = orchestrator_and_startup
+        hints = feature_registry.get_monotonicity_hints()
+        features = {f.name: f for f in CounterfactualSearch(orchestrator).features}
+
+        assert hints['burn_multiple'] == -1
+        assert features['burn_multiple'].direction == -1
+        assert features['runway_months'].max_value == feature_registry.features['runway_months'].max_value
@@ -0,0 +1,73 @@
+"""
+Unit tests for columnar startup data validation
+"""
+
+import pandas as pd
+
+from utils.data_validation import DataValidator
+
+
+GOOD = {
+    "startup_name": "Acme",
+    "funding_stage": "seed",
+    "product_stage": "beta",
+    "total_capital_raised_usd": 2_000_000,
+    "cash_on_hand_usd": 1_000_000,
+    "monthly_burn_usd": 100_000,
+    "runway_months": 10,
+    "team_size_full_time": 12,
+    "tam_size_usd": 1e9,
+    "sam_size_usd": 1e8,
+    "som_size_usd": 1e6,
+    "tech_differentiation_score": 4,
+}
+
+
+class TestDataValidator:
+    """Test the single-record wrapper and the batch entry points agree"""
+
+    def test_single_record(self):
+        """Test field, cross-field and business rule errors for one dict"""
+        validator = DataValidator()
+
+        is_valid, errors, cleaned = validator.validate({**GOOD, "extra": [1, 2], "customer_count": None})
+        assert is_valid and errors == []
+        assert cleaned["total_capital_raised_usd"] == 2_000_000.0
+        assert cleaned["extra"] == [1, 2] and cleaned["customer_count"] is None
+
+        is_valid, errors, cleaned = validator.validate({
+            **GOOD,
+            "tech_differentiation_score": 3.5,
+            "runway_months": "lots",
+            "sam_size_usd": 5e9,
+            "funding_stage": "series_b",
+            "product_stage": "concept",
+        })
+        assert not is_valid
+        assert errors == [
+            "runway_months must be a number (got str)",
+            "tech_differentiation_score must be an integer (got 3.5)",
+            "SAM ($5,000,000,000) cannot be larger than TAM ($1,000,000,000)",
+            "Unusual: series_b company still at concept stage",
+        ]
+        assert "runway_months" not in cleaned and "tech_differentiation_score" not in cleaned
+
+    def test_batches_match_single_records(self):
+        """Test validate_records and validate_frame give each row's validate() errors"""
+        validator = DataValidator()
+        records = [
+            GOOD,
+            {**GOOD, "founders_count": 0, "product_retention_30d": 0.2, "product_retention_90d": 0.4},
+            {**GOOD, "funding_stage": "growth", "sector": "not-a-sector"},
+            {"team_size_full_time": 100, "total_capital_raised_usd": 50_000},
+            {**GOOD, "monthly_burn_usd": "1_000"},
+        ]
+        expected = [validator.validate(record) for record in records]
+
+        assert validator.validate_records(records) == expected
+
+        is_valid, errors, cleaned = validator.validate_frame(pd.DataFrame(records))
+        assert list(is_valid) == [result[0] for result in expected] == [True, False, False, False, True]
+        assert [sorted(row) for row in errors] == [sorted(result[1]) for result in expected]
+        assert pd.isna(cleaned.loc[1, "founders_count"])
+        assert cleaned.loc[4, "monthly_burn_usd"] == 1000.0
@@ -0,0 +1,75 @@
+"""
+Unit tests for compiled DNA pattern matching
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from ml_core.models.dna_matcher import DNAMatcher
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return DNAMatcher()
+
+
+@pytest.fixture
+def startups():
+    return pd.DataFrame({
+        'revenue_growth_rate_percent': [250, 150, 20, np.nan],
+        'burn_multiple': [8, 3, 0.5, 1],
+        'user_growth_rate_percent': [200, 50, 5, 10],
+        'net_dollar_retention_percent': [100, 130, 95, 100],
+        'gross_margin_percent': [30, 80, 60, 50],
+        'funding_stage': ['series_b', 'series_a', 'seed', 'pre_seed']
+    })
+
+
+class TestDNAMatcher:
+    """Test vectorized DNA matching"""
+    
+    def test_compiled_indicators(self, matcher):
+        """Test indicators compile to mapped columns"""
+        compiled = matcher.compiled_indicators
+        
+        assert compiled.rule_membership.shape == (
+            len(matcher.dna_library.patterns), len(compiled.rule_funcs)
+        )
+        assert 'revenue_growth_rate_percent' in compiled.rule_columns
+        assert 'revenue_growth_rate' not in compiled.rule_columns
+    
+    def test_absent_columns_are_skipped(self, matcher, startups):
+        """Test rules on absent columns do not count against a pattern"""
+        outcomes = matcher._evaluate_indicators(startups)
+        absent = [
+            i for i, col in enumerate(matcher.compiled_indicators.rule_columns)
+            if col not in startups.columns
+        ]
+        
+        assert np.isnan(outcomes[:, absent]).all()
+    
+    def test_batch_matches_single(self, matcher, startups):
+        """Test batch matching agrees with row-by-row matching"""
+        batch = matcher.match_dna_batch(startups, top_k=3)
+        
+        for row, matches in enumerate(batch):
+            single = matcher.match_dna(startups.iloc[row:row + 1], top_k=3)
+            assert [m.pattern_name for m in matches] == [m.pattern_name for m in single]
+            assert [m.overall_score for m in matches] == \
+                pytest.approx([m.overall_score for m in single])
+    
+    def test_blitzscale_match(self, matcher, startups):
+        """Test a high-burn hypergrowth startup matches blitzscaling DNA"""
+        match = matcher.match_dna(startups, top_k=1)[0]
+        
+        assert match.pattern_name == 'BLITZSCALE_UNICORN'
+        assert 'revenue_growth_rate' in match.match_details['strengths']
+    
+    def test_pattern_distribution(self, matcher, startups):
+        """Test distribution agrees with top matches"""
+        distribution = matcher.get_pattern_distribution(startups)
+        top = [matcher.match_dna(startups.iloc[i:i + 1], top_k=1)[0].pattern_name
+               for i in range(len(startups))]
+        
+        assert sum(distribution.values()) == len(startups)
+        assert distribution == {name: top.count(name) for name in set(top)}
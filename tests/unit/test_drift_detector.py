@@ -0,0 +1,78 @@
+"""
+Unit tests for streaming drift detection
+"""
+
+import numpy as np
+import pandas as pd
+from models.drift_detector import StreamingDriftDetector, BinnedDistribution
+from models.model_monitoring import ModelPerformanceMonitor
+
+
+def training_frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "burn_multiple": rng.normal(3, 1, n),
+        "sector": rng.choice(["saas", "fintech", "healthtech"], n),
+        "has_debt": rng.random(n) < 0.3
+    })
+
+
+class TestStreamingDriftDetector:
+    """Test baselines, window counts and drift scores"""
+
+    def test_stable_traffic_does_not_drift(self, tmp_path):
+        """Test traffic from the training distribution scores near zero"""
+        detector = StreamingDriftDetector(tmp_path / "baseline.json")
+        detector.fit_baseline(training_frame(), predictions={"dna_v1": np.linspace(0, 1, 500)})
+        for row in training_frame(1000, seed=1).to_dict("records"):
+            detector.observe("dna_v1", 0.5, row)
+
+        reports = {r.name: r for r in detector.check()}
+        assert reports["burn_multiple"].psi < 0.05
+        assert reports["burn_multiple"].ks_statistic < 0.1
+        assert reports["sector"].ks_statistic is None
+        assert reports["has_debt"].severity is None
+        # Every prediction landed in one bin of a uniform reference
+        assert reports["dna_v1"].severity == "high"
+
+    def test_shifted_feature_and_unseen_category(self, tmp_path):
+        """Test a shifted numeric feature and a new category are flagged after reload"""
+        StreamingDriftDetector(tmp_path / "baseline.json").fit_baseline(training_frame())
+        detector = StreamingDriftDetector(tmp_path / "baseline.json")
+        shifted = training_frame(500, seed=2)
+        shifted["burn_multiple"] += 2
+        shifted["sector"] = "spacetech"
+        for row in shifted.to_dict("records"):
+            detector.observe("dna_v1", 0.5, row)
+
+        reports = {r.name: r for r in detector.check()}
+        assert reports["burn_multiple"].severity == "high"
+        assert reports["burn_multiple"].ks_statistic > 0.5
+        assert reports["sector"].severity == "high"
+        assert 0 < reports["sector"].js_divergence <= 1
+
+    def test_compare_is_exact_on_identical_counts(self):
+        """Test identical distributions score zero"""
+        distribution = BinnedDistribution([0.25, 0.25, 0.5], edges=[1.0, 2.0])
+        scores = distribution.compare(np.array([25, 25, 50]))
+        assert abs(scores["psi"]) < 1e-12
+        assert scores["ks_statistic"] == 0
+
+
+class TestMonitorDrift:
+    """Test drift alerts through the performance monitor"""
+
+    def test_prediction_reference_adopted_then_alerts(self, tmp_path):
+        """Test a model without a baseline adopts its first predictions and alerts on a shift"""
+        monitor = ModelPerformanceMonitor(monitoring_dir=str(tmp_path))
+        monitor.monitoring_active = False
+        monitor.drift_detector.min_samples = 50
+        for i in range(50):
+            monitor.record_prediction("dna", "v1", 0.2, 0.9, 10.0, {"i": i})
+        for i in range(60):
+            monitor.record_prediction("dna", "v1", 0.9, 0.9, 10.0, {"i": i})
+        monitor._check_model_drift()
+
+        drift = [a for a in monitor.get_active_alerts() if a["alert_type"] == "drift"]
+        assert [(a["model_version"], a["metric_name"]) for a in drift] == [("dna_v1", "prediction_distribution")]
+        assert (tmp_path / "drift_baseline.json").exists()
@@ -0,0 +1,88 @@
+"""
+Unit tests for blocked fuzzy duplicate detection
+"""
+
+import random
+import string
+from itertools import combinations
+
+import pandas as pd
+
+from utils.duplicate_detection import (
+    DuplicateDetector, normalize_name, normalize_domain, domain_stem, similarity
+)
+
+
+def random_companies(n=200, typos=20, seed=0):
+    rng = random.Random(seed)
+    consonants, vowels = "bcdfghjklmnprstvwz", "aeiou"
+    rows = []
+    for i in range(n):
+        name = "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 5))).title()
+        if rng.random() < 0.5:
+            name += " " + rng.choice(["Labs", "Health", "AI", "Capital"])
+        rows.append((f"c{i}", name, f"{name.split()[0].lower()}.com" if rng.random() < 0.5 else None))
+    for k in range(typos):
+        _, name, website = rows[rng.randrange(n)]
+        j = rng.randrange(len(name))
+        rows.append((f"d{k}", name[:j] + rng.choice(string.ascii_lowercase) + name[j + 1:] + " Inc", website))
+    return pd.DataFrame(rows, columns=["company_id", "company_name", "website"])
+
+
+class TestNormalisation:
+    """Test the keys names and websites are compared on"""
+
+    def test_names_and_domains(self):
+        """Test suffixes, punctuation and URL noise are removed"""
+        assert normalize_name("ACME, Inc.") == normalize_name("Acme Corp") == "acme"
+        assert normalize_name("Ben & Jerry's Holdings LLC") == "ben and jerry s"
+        assert normalize_domain("https://www.Acme.io:443/about?x=1") == "acme.io"
+        assert normalize_domain("acme.co.uk/") == "acme.co.uk"
+        assert domain_stem("app.acme.co.uk") == domain_stem("acme.io") == "acme"
+
+
+class TestDuplicateDetector:
+    """Test blocked detection finds what an all-pairs scan finds"""
+
+    def test_clusters(self):
+        """Test exact, typo and domain duplicates form scored clusters"""
+        df = pd.DataFrame([
+            ("1", "Acme Inc.", "https://acme.com"),
+            ("2", "ACME Corp", None),
+            ("3", "Acme", "www.acme.io"),
+            ("4", "Databricks", "databricks.com"),
+            ("5", "Databrics", None),
+            ("6", "Notion Labs", "https://www.notion.so"),
+            ("7", "Notion HQ", "notion.so/product"),
+            ("8", "Apex Robotics", "apexrobotics.com"),
+        ], columns=["company_id", "company_name", "website"])
+
+        clusters = DuplicateDetector().find_clusters(df)
+
+        by_first_id = {sorted(c.ids)[0]: c for c in clusters}
+        assert sorted(sorted(c.ids) for c in clusters) == [["1", "2", "3"], ["4", "5"], ["6", "7"]]
+        assert by_first_id["1"].score == by_first_id["6"].score == 100
+        assert 85 <= by_first_id["4"].min_score < 100
+
+    def test_matches_all_pairs_scan(self):
+        """Test every pair at or above the threshold ends up in one cluster"""
+        df = random_companies()
+        names = df["company_name"].map(normalize_name).tolist()
+        domains = df["website"].map(normalize_domain).tolist()
+        ids = df["company_id"].tolist()
+
+        expected = set()
+        for i, j in combinations(range(len(df)), 2):
+            score = similarity([names[i]], [names[j]])[0]
+            if domains[i] and domains[j]:
+                score = max(score, similarity([domains[i]], [domains[j]])[0])
+            if score >= 85:
+                expected.add((ids[i], ids[j]))
+
+        cluster_of = {}
+        for number, cluster in enumerate(DuplicateDetector().find_clusters(df)):
+            for company_id in cluster.ids:
+                cluster_of[company_id] = number
+
+        assert len(expected) >= 20
+        assert all(a in cluster_of and cluster_of[a] == cluster_of.get(b) for a, b in expected)
@@ -0,0 +1,72 @@
+"""
+Unit tests for the persistent explanation cache
+"""
+
+import pytest
+import numpy as np
+from utils.explanation_cache import ExplanationCache, canonical_features
+from models.model_versioning import ModelVersioningSystem
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExplanationCache(str(tmp_path / "explanations.db"))
+
+
+class TestExplanationCache:
+    """Test keys, storage, eviction and invalidation"""
+
+    def test_canonical_keys(self, cache):
+        """Test equal feature vectors give equal keys"""
+        assert canonical_features([5, np.int64(5), 5.0, np.nan, None, 'seed']) == [
+            5.0, 5.0, 5.0, None, None, 'seed'
+        ]
+        assert cache.make_key('m1', 'shap', [1, 2]) == cache.make_key('m1', 'shap', [1.0, np.float32(2)])
+        assert cache.make_key('m1', 'shap', [1, 2]) != cache.make_key('m2', 'shap', [1, 2])
+
+    def test_round_trip_and_persistence(self, cache, tmp_path):
+        """Test values survive reopening the cache"""
+        key = cache.make_key('m1', 'shap', [1, 2])
+        cache.put_many({key: np.array([0.1, -0.2])}, 'm1')
+
+        reopened = ExplanationCache(str(tmp_path / "explanations.db"))
+        np.testing.assert_array_equal(reopened.get(key), [0.1, -0.2])
+        assert reopened.get_many([key, 'missing']).keys() == {key}
+
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted past the size bound"""
+        cache = ExplanationCache(str(tmp_path / "small.db"), max_bytes=4000)
+        keys = [cache.make_key('m1', 'shap', [i]) for i in range(6)]
+        for key in keys[:3]:
+            cache.put(key, np.zeros(100), 'm1')
+        cache.get(keys[0])
+        for key in keys[3:]:
+            cache.put(key, np.zeros(100), 'm1')
+
+        assert cache.stats()['bytes'] <= 4000
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+
+    def test_invalidated_on_deployment(self, cache, tmp_path):
+        """Test deploying a model version clears cached explanations"""
+        model_path = tmp_path / "model.pkl"
+        model_path.write_bytes(b"model")
+        versioning = ModelVersioningSystem(str(tmp_path / "models"), str(tmp_path / "versions"))
+        cache.attach_to_versioning(versioning)
+
+        cache.put(cache.make_key('m1', 'shap', [1]), np.zeros(3), 'm1')
+        version = versioning.create_version(model_path, 'industry', {'auc': 0.8})
+        assert versioning.deploy_version(version.version, 'direct')
+
+        assert cache.stats()['entries'] == 0
+
+    def test_invalidated_after_external_deployment(self, cache, tmp_path):
+        """Test deployments made while detached are detected on attach"""
+        versioning = ModelVersioningSystem(str(tmp_path / "models"), str(tmp_path / "versions"))
+        cache.attach_to_versioning(versioning)
+        cache.put(cache.make_key('m1', 'shap', [1]), np.zeros(3), 'm1')
+
+        versioning.metadata['current_production']['industry'] = 'industry_v2'
+        cache.attach_to_versioning(versioning)
+
+        assert cache.stats()['entries'] == 0
@@ -0,0 +1,109 @@
+"""
+Unit tests for the ground-truth feedback store
+"""
+
+import subprocess
+import sys
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from sklearn.metrics import roc_auc_score
+from models.feedback_store import FeedbackStore, stable_features_hash
+from models.model_monitoring import ModelPerformanceMonitor
+
+
+def make_predictions(scores, version="dna_v1", start=None):
+    start = start or datetime.now() - timedelta(hours=1)
+    return [
+        {
+            "prediction_id": f"p{i}",
+            "features_hash": f"h{i % 10}",
+            "model_version": version,
+            "prediction": float(score),
+            "timestamp": (start + timedelta(seconds=i)).isoformat()
+        }
+        for i, score in enumerate(scores)
+    ]
+
+
+class TestFeedbackStore:
+    """Test joins of late outcomes and the incremental quality metrics"""
+
+    def test_hash_is_stable_across_processes(self):
+        """Test the features hash does not depend on the interpreter's hash salt"""
+        features = {"b": 1.0, "a": "fintech", "c": [1, 2]}
+        other = subprocess.run(
+            [sys.executable, "-c",
+             "from models.feedback_store import stable_features_hash;"
+             "print(stable_features_hash({'c': [1, 2], 'a': 'fintech', 'b': 1}))"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        assert stable_features_hash(features) == other
+        assert stable_features_hash({**features, "b": 2.0}) != other
+
+    def test_join_by_id_and_hash(self, tmp_path):
+        """Test outcomes label predictions by ID, or every unlabelled match of a hash"""
+        store = FeedbackStore(tmp_path / "feedback.db")
+        store.index_predictions(make_predictions([0.1] * 30))
+
+        result = store.record_outcomes([
+            {"prediction_id": "p0", "actual_outcome": 1},
+            {"features_hash": "h0", "actual_outcome": 0},
+            {"prediction_id": "missing", "actual_outcome": 1},
+        ])
+        assert result == {"received": 3, "labelled": 3, "unmatched": 1}
+
+        # p0 kept its ID-matched outcome; p10 and p20 took the hash outcome
+        assert store.record_outcomes([{"features_hash": "h0", "actual_outcome": 1}])["labelled"] == 0
+        assert store.quality_metrics()["dna_v1"]["positive_rate"] == pytest.approx(1 / 3)
+
+    def test_metrics_match_full_recompute(self, tmp_path):
+        """Test AUC and Brier score from the binned counters match a full recomputation"""
+        rng = np.random.default_rng(0)
+        scores = np.round(rng.random(2000), 2)
+        outcomes = (rng.random(2000) < scores).astype(float)
+        store = FeedbackStore(tmp_path / "feedback.db")
+        store.index_predictions(make_predictions(scores))
+
+        # Outcomes arrive in two late batches
+        rows = [{"prediction_id": f"p{i}", "actual_outcome": y} for i, y in enumerate(outcomes)]
+        store.record_outcomes(rows[:700])
+        store.record_outcomes(rows[700:])
+
+        metrics = store.quality_metrics(model_version="dna_v1")["dna_v1"]
+        assert metrics["labelled"] == 2000
+        assert metrics["auc"] == pytest.approx(roc_auc_score(outcomes, scores), abs=1e-3)
+        assert metrics["brier_score"] == pytest.approx(np.mean((scores - outcomes) ** 2))
+        assert metrics["expected_calibration_error"] < 0.05
+        assert sum(b["count"] for b in metrics["calibration"]) == 2000
+
+    def test_csv_ingest(self, tmp_path):
+        """Test outcomes are joined from a CSV export"""
+        store = FeedbackStore(tmp_path / "feedback.db")
+        store.index_predictions(make_predictions([0.9, 0.2]))
+        path = tmp_path / "outcomes.csv"
+        path.write_text("prediction_id,features_hash,actual_outcome\np0,,1\n,h1,0\np9,,\n")
+
+        assert store.ingest_csv(path) == {"received": 2, "labelled": 2, "unmatched": 0}
+        assert store.quality_metrics()["dna_v1"]["accuracy"] == 1.0
+
+
+class TestMonitorFeedback:
+    """Test the monitor routes feedback through the store"""
+
+    def test_feedback_for_flushed_predictions(self, tmp_path):
+        """Test feedback reaches predictions already flushed out of the buffer"""
+        monitor = ModelPerformanceMonitor(monitoring_dir=str(tmp_path))
+        monitor.monitoring_active = False
+        ids = [monitor.record_prediction("dna", "v1", 0.8, 0.9, 10.0, {"i": i}) for i in range(4)]
+        monitor._flush_metrics()
+        monitor.record_prediction("dna", "v1", 0.2, 0.9, 10.0, {"i": 9})
+
+        assert monitor.record_feedback(None, 1.0, prediction_id=ids[0])["labelled"] == 1
+        hash_of_last = stable_features_hash({"i": 9})
+        assert monitor.record_feedback(hash_of_last, 0.0)["labelled"] == 1
+
+        summary = monitor.get_performance_summary()["dna_v1"]
+        assert summary["accuracy"] == 1.0
+        assert summary["feedback_rate"] == pytest.approx(0.4)
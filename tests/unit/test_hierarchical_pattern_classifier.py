@@ -0,0 +1,99 @@
+"""
+Unit tests for batched hierarchical pattern inference
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+from ml_core.models.hierarchical_pattern_classifier import HierarchicalPatternClassifier
+from ml_core.models.pattern_definitions_v2 import ALL_PATTERNS, MasterCategory
+
+
+@pytest.fixture(scope="module")
+def classifier(tmp_path_factory):
+    """Classifier with small logistic models in place of trained ones"""
+    classifier = HierarchicalPatternClassifier(str(tmp_path_factory.mktemp("pattern_v2")))
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        rng.normal(size=(300, len(classifier.all_features))),
+        columns=classifier.all_features
+    )
+    
+    for i, category in enumerate(MasterCategory):
+        scaler = StandardScaler().fit(X)
+        classifier.scalers[category.value] = scaler
+        classifier.master_category_models[category.value] = LogisticRegression().fit(
+            scaler.transform(X), (X.iloc[:, i] > 0).astype(int)
+        )
+    
+    for pattern in ALL_PATTERNS[:12]:
+        features = sorted(classifier._select_pattern_features(pattern))
+        scaler = StandardScaler().fit(X[features])
+        classifier.scalers[pattern.name] = scaler
+        classifier.pattern_models[pattern.name] = {
+            'model': LogisticRegression().fit(
+                scaler.transform(X[features]), (X[features].iloc[:, 0] > 0).astype(int)
+            ),
+            'features': features,
+            'threshold': 0.4
+        }
+    
+    classifier.is_trained = True
+    return classifier
+
+
+@pytest.fixture
+def startups(classifier):
+    rng = np.random.default_rng(1)
+    return [
+        dict(zip(classifier.all_features, rng.normal(size=len(classifier.all_features)) * 2))
+        for _ in range(20)
+    ]
+
+
+class TestHierarchicalPatternClassifier:
+    """Test batched, category-gated inference"""
+    
+    def test_untrained(self, tmp_path):
+        """Test predicting before training"""
+        with pytest.raises(ValueError):
+            HierarchicalPatternClassifier(str(tmp_path)).predict_scores([{}])
+    
+    def test_score_shapes(self, classifier, startups):
+        """Test scores come back as compact arrays"""
+        scores = classifier.predict_scores(startups)
+        
+        assert scores.category_scores.shape == (20, len(MasterCategory))
+        assert scores.pattern_scores.shape == (20, 12)
+        assert scores.detected.dtype == bool
+    
+    def test_category_gate(self, classifier, startups):
+        """Test pattern models only run where their category passed"""
+        scores = classifier.predict_scores(startups)
+        category_cols = {name: i for i, name in enumerate(scores.category_names)}
+        
+        for col, pattern_name in enumerate(scores.pattern_names):
+            category = next(p for p in ALL_PATTERNS if p.name == pattern_name).master_category
+            gated = scores.category_scores[:, category_cols[category.value]] < 0.3
+            assert np.isnan(scores.pattern_scores[gated, col]).all()
+            assert not np.isnan(scores.pattern_scores[~gated, col]).any()
+    
+    def test_batch_matches_single(self, classifier, startups):
+        """Test batch profiles agree with single predictions"""
+        batch = classifier.predict_batch(startups)
+        
+        for features, profile in zip(startups, batch):
+            single = classifier.predict(features)
+            assert profile.to_dict() == single.to_dict()
+    
+    def test_missing_features_default_to_zero(self, classifier, startups):
+        """Test dict and DataFrame inputs fill absent features with 0"""
+        partial = [{k: v for k, v in row.items() if k != 'burn_multiple'} for row in startups]
+        frame = pd.DataFrame(partial)
+        
+        from_dicts = classifier.predict_scores(partial)
+        from_frame = classifier.predict_scores(frame)
+        
+        assert np.allclose(from_dicts.category_scores, from_frame.category_scores)
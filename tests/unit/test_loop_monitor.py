@@ -0,0 +1,92 @@
+"""
+Unit tests for the event-loop blocking detector
+"""
+
+import time
+import asyncio
+import traceback
+from fastapi.testclient import TestClient
+from monitoring import loop_monitor
+from monitoring.loop_monitor import EventLoopMonitor, _call_site
+from monitoring.monitoring_dashboard import dashboard_app
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+async def run_with_monitor(monitor, body):
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        await body()
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+
+class TestEventLoopMonitor:
+    """Test blocking callbacks are caught with their call site"""
+
+    def test_blocking_call_reported(self):
+        """Test a synchronous sleep on the loop is charged to its caller"""
+        monitor = EventLoopMonitor(interval=0.01, block_threshold=0.05)
+
+        async def body():
+            blocking_call()
+
+        asyncio.run(run_with_monitor(monitor, body))
+        report = monitor.report()
+
+        assert report["stalls"] == 1
+        offender = report["offenders"][0]
+        assert offender["site"].endswith("blocking_call")
+        assert "test_loop_monitor.py" in offender["site"]
+        assert offender["max_blocked_ms"] >= 250
+        assert report["lag_ms"]["max"] >= 250
+
+    def test_awaiting_is_not_blocking(self):
+        """Test a loop that yields reports lag but no offenders"""
+        monitor = EventLoopMonitor(interval=0.01, block_threshold=0.05)
+
+        async def body():
+            await asyncio.sleep(0.2)
+
+        asyncio.run(run_with_monitor(monitor, body))
+        report = monitor.report()
+
+        assert report["stalls"] == 0
+        assert report["offenders"] == []
+        assert report["lag_ms"]["count"] > 10
+
+    def test_offenders_bounded(self):
+        """Test the least harmful site is dropped when the table is full"""
+        monitor = EventLoopMonitor(max_offenders=2)
+        monitor._record_offender("a.py:1 f", [], 0.5)
+        monitor._record_offender("b.py:1 g", [], 0.2)
+        monitor._record_offender("c.py:1 h", [], 0.3)
+
+        assert set(monitor.offenders) == {"a.py:1 f", "c.py:1 h"}
+
+    def test_other_monitoring_modules_are_call_sites(self):
+        """Test only loop_monitor.py itself is skipped, not the whole package"""
+        dashboard = loop_monitor.__file__.replace("loop_monitor.py", "monitoring_dashboard.py")
+        stack = traceback.StackSummary.from_list([
+            (dashboard, 70, "websocket_endpoint", None),
+            (loop_monitor.__file__, 120, "_sample", None)
+        ])
+
+        assert _call_site(stack).endswith("monitoring_dashboard.py:70 websocket_endpoint")
+
+
+class TestDashboardFeed:
+    """Test the dashboard websocket keeps streaming"""
+
+    def test_updates_keep_flowing(self, monkeypatch):
+        """Test loop and metrics updates repeat on one connection"""
+        sleep = asyncio.sleep
+        monkeypatch.setattr("monitoring.monitoring_dashboard.asyncio.sleep", lambda _: sleep(0))
+        with TestClient(dashboard_app).websocket_connect("/ws") as websocket:
+            kinds = [websocket.receive_json()["type"] for _ in range(6)]
+
+        assert kinds == ["event_loop_update", "metrics_update"] * 3
@@ -0,0 +1,92 @@
+"""
+Unit tests for cross-process metrics aggregation
+"""
+
+import json
+import multiprocessing
+import pytest
+from monitoring.multiprocess import MetricsSpool, ARCHIVE_NAME
+from monitoring.metrics_collector import MetricsCollector
+from monitoring.performance_monitor import PerformanceMonitor
+
+
+def _worker(directory, count, latency):
+    collector = MetricsCollector(spool=MetricsSpool(directory), flush_interval=3600)
+    for _ in range(count):
+        collector.record_request("/predict", "POST", 200, latency)
+        collector.record_prediction(0.75, 0.8, "PASS", latency, model_version="v3")
+    collector.flush()
+
+
+def _run_workers(directory, workers):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_worker, args=(directory, count, latency))
+                 for count, latency in workers]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+class TestMetricsSpool:
+    """Test worker snapshots merge into one view"""
+
+    def test_summary_covers_all_workers(self, tmp_path):
+        """Test counters, percentiles and distributions aggregate across processes"""
+        _run_workers(str(tmp_path), [(30, 10.0), (70, 100.0)])
+
+        reader = MetricsCollector(spool=MetricsSpool(str(tmp_path)))
+        reader.record_request("/health", "GET", 200, 1.0)
+        summary = reader.get_summary()
+
+        assert summary["total_requests"] == 101
+        assert summary["total_predictions"] == 100
+        assert summary["verdict_distribution"]["PASS"] == 100
+        assert summary["probability_distribution"]["70-80%"] == 100
+        assert summary["endpoint_response_times"]["/predict"]["lifetime"]["count"] == 100
+        assert summary["response_time_percentiles"]["p95"] == pytest.approx(100.0, rel=0.01)
+
+    def test_exited_workers_are_archived(self, tmp_path):
+        """Test snapshots of exited workers fold into the archive without double counting"""
+        _run_workers(str(tmp_path), [(5, 10.0), (5, 20.0)])
+        spool = MetricsSpool(str(tmp_path))
+
+        first = spool.read_all()
+        second = spool.read_all()
+
+        assert [path.name for path in tmp_path.glob("*.json")] == [ARCHIVE_NAME]
+        assert len(first) == len(second) == 1
+        assert first[0]["counters"]["total_requests"] == 10
+
+    def test_write_replaces_snapshot(self, tmp_path):
+        """Test each flush replaces this worker's file rather than appending"""
+        spool = MetricsSpool(str(tmp_path))
+        spool.write({"counters": {"total_requests": 1}})
+        spool.write({"counters": {"total_requests": 2}})
+
+        files = list(tmp_path.glob("worker_*.json"))
+        assert len(files) == 1
+        assert json.loads(files[0].read_text())["counters"]["total_requests"] == 2
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestPerformanceMonitorSpool:
+    """Test the performance monitor reads every worker's snapshot"""
+
+    def test_stats_merge_workers(self, tmp_path):
+        """Test cache, error and distribution stats merge across monitors"""
+        first = PerformanceMonitor(spool=MetricsSpool(str(tmp_path)))
+        second = PerformanceMonitor(spool=MetricsSpool(str(tmp_path)))
+
+        for i in range(10):
+            first.record_prediction(50.0, 0.1, 45, cache_hit=True)
+            second.record_prediction(150.0, 0.9, 45)
+        second.record_error("timeout")
+        second.flush()
+
+        stats = first.get_current_stats()
+        assert stats['total_predictions'] == 20
+        assert stats['cache_performance']['hit_rate'] == pytest.approx(0.5)
+        assert stats['errors_by_type'] == {'timeout': 1}
+        assert stats['prediction_distribution']['buckets']['0-20%'] == pytest.approx(0.5)
+        assert stats['prediction_distribution']['std'] == pytest.approx(0.4)
@@ -0,0 +1,77 @@
+"""
+Unit tests for the precomputed pattern graph
+"""
+
+import pytest
+import numpy as np
+from ml_core.models.pattern_graph import PatternGraph
+from ml_core.models.startup_dna_library import StartupDNALibrary, DNACategory
+
+
+@pytest.fixture
+def graph():
+    return PatternGraph(
+        names=['A', 'B', 'C', 'D'],
+        categories=['growth', 'growth', 'growth', 'efficiency'],
+        stages=[['seed'], ['seed', 'series_a'], ['series_b'], ['seed']],
+        evolution_paths=[['B', 'C'], ['C'], ['EXIT'], []],
+        success_rates=[0.5, 0.6, 0.9, 0.5]
+    )
+
+
+class TestPatternGraph:
+    """Test graph construction and queries"""
+
+    def test_similar(self, graph):
+        """Test neighbours are same-category and ranked by success rate"""
+        similar = graph.get_similar('A')
+
+        assert [name for name, _ in similar] == ['B', 'C']
+        assert similar[0][1] == pytest.approx(0.9)
+        assert graph.get_similar('D') == []
+        assert graph.get_similar('missing') == []
+
+    def test_indexes(self, graph):
+        """Test stage and category lookups"""
+        assert graph.get_patterns_by_stage('seed') == ['A', 'B', 'D']
+        assert graph.get_patterns_by_category('growth') == ['A', 'B', 'C']
+        assert graph.get_patterns_by_stage('ipo') == []
+
+    def test_successors(self, graph):
+        """Test evolution probability is split evenly by default"""
+        assert graph.get_successors('A') == [('B', 0.5), ('C', 0.5)]
+        assert 'EXIT' in graph.node_names
+        assert graph.get_successors('EXIT') == []
+
+    def test_evolution_paths(self, graph):
+        """Test multi-step paths and their probabilities"""
+        paths = graph.get_evolution_paths('A', max_steps=3)
+
+        assert paths == [(['B', 'C', 'EXIT'], 0.5), (['C', 'EXIT'], 0.5)]
+        assert graph.get_evolution_paths('A', max_steps=1) == [(['B'], 0.5), (['C'], 0.5)]
+
+    def test_evolution_distribution(self, graph):
+        """Test step distributions match the transition matrix"""
+        distribution = graph.evolution_distribution(['A', 'missing'], steps=2)
+        positions = graph.node_positions
+
+        assert distribution[0, positions['C']] == pytest.approx(0.5)
+        assert distribution[0, positions['EXIT']] == pytest.approx(0.5)
+        assert np.all(distribution[1] == 0)
+
+
+class TestStartupDNALibraryGraph:
+    """Test the library answers lookups from its graph"""
+
+    def test_matches_scan(self):
+        """Test graph lookups agree with scanning the pattern list"""
+        library = StartupDNALibrary()
+
+        for category in DNACategory:
+            assert library.get_patterns_by_category(category) == [
+                p for p in library.patterns if p.category == category
+            ]
+        for pattern in library.patterns:
+            assert library.get_evolution_paths(pattern.name) == pattern.evolution_paths
+            for name in library.get_similar_patterns(pattern.name):
+                assert library.get_pattern(name).category == pattern.category
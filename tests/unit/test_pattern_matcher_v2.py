@@ -0,0 +1,87 @@
+"""
+Unit tests for vectorized pattern matching
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from ml_core.models.pattern_matcher_v2 import PatternMatcherV2
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return PatternMatcherV2()
+
+
+@pytest.fixture
+def startups():
+    data = pd.DataFrame({
+        'burn_multiple': [1.5, 8.0, np.nan],
+        'revenue_growth_rate_percent': [120, 300, 10],
+        'gross_margin_percent': [80, 40, 60],
+        'net_dollar_retention_percent': [125, 90, 100],
+        'ltv_cac_ratio': [4, 1, 2],
+        'funding_stage': ['series_a', 'series_b', 'seed']
+    })
+    camp_scores = [
+        {'capital_score': 75, 'advantage_score': 70, 'market_score': 65, 'people_score': 65},
+        {'capital_score': 30, 'advantage_score': 60, 'market_score': 80, 'people_score': 70},
+        {'capital_score': 35, 'advantage_score': 30, 'market_score': 40, 'people_score': 45}
+    ]
+    return data, camp_scores
+
+
+class TestPatternMatcherV2:
+    """Test compiled pattern matching"""
+    
+    def test_compiled_shapes(self, matcher):
+        """Test the library compiles into aligned matrices"""
+        rules = matcher.compiled_rules
+        n_patterns = len(matcher.pattern_library.patterns)
+        
+        assert rules.camp_min.shape == (n_patterns, 4)
+        assert rules.rule_membership.shape == (n_patterns, len(rules.rule_funcs))
+        assert rules.rule_counts.sum() == len(rules.rule_funcs)
+    
+    def test_batch_matches_single(self, matcher, startups):
+        """Test batch matching agrees with row-by-row matching"""
+        data, camp_scores = startups
+        
+        batch = matcher.match_patterns_batch(data, camp_scores, top_k=3)
+        
+        for row, analysis in enumerate(batch):
+            single = matcher.match_patterns(data.iloc[row:row + 1], camp_scores[row], top_k=3)
+            assert analysis.primary_pattern.pattern_name == single.primary_pattern.pattern_name
+            assert analysis.primary_pattern.confidence == pytest.approx(single.primary_pattern.confidence)
+            assert analysis.pattern_mixture == pytest.approx(single.pattern_mixture)
+    
+    def test_efficient_saas_match(self, matcher, startups):
+        """Test a textbook efficient SaaS startup matches its pattern"""
+        data, camp_scores = startups
+        
+        analysis = matcher.match_patterns(data.iloc[:1], camp_scores[0])
+        
+        assert analysis.primary_pattern.pattern_name == 'EFFICIENT_B2B_SAAS'
+        assert analysis.primary_pattern.feature_match_score == pytest.approx(1.0)
+        assert analysis.primary_pattern.camp_distances == {
+            'capital': 0, 'advantage': 0, 'market': 0, 'people': 0
+        }
+    
+    def test_details_only_for_top_k(self, matcher, startups):
+        """Test gap analysis is built only for returned matches"""
+        data, camp_scores = startups
+        
+        analysis = matcher.match_patterns(data.iloc[1:2], camp_scores[1], top_k=2)
+        
+        assert len(analysis.secondary_patterns) <= 1
+        assert len(analysis.pattern_mixture) >= len(analysis.secondary_patterns) + 1
+    
+    def test_data_frame_camp_scores(self, matcher, startups):
+        """Test CAMP scores can be passed as a DataFrame"""
+        data, camp_scores = startups
+        
+        from_frame = matcher.match_patterns_batch(data, pd.DataFrame(camp_scores))
+        from_dicts = matcher.match_patterns_batch(data, camp_scores)
+        
+        assert [a.primary_pattern.pattern_name for a in from_frame] == \
+            [a.primary_pattern.pattern_name for a in from_dicts]
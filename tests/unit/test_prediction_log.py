@@ -0,0 +1,87 @@
+"""
+Unit tests for the append-only prediction log
+"""
+
+import json
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from models.prediction_log import PredictionLog
+from models.model_monitoring import ModelPerformanceMonitor
+
+
+def make_records(n, start, version="dna_v1"):
+    return [
+        {
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "model_version": version,
+            "prediction": i / n,
+            "confidence": 0.8,
+            "latency_ms": float(i),
+            "features_hash": f"h{i}"
+        }
+        for i in range(n)
+    ]
+
+
+class TestPredictionLog:
+    """Test appends, time-range reads and compaction"""
+
+    def test_appends_do_not_rewrite(self, tmp_path):
+        """Test each flush only adds its own rows to the segment"""
+        log = PredictionLog(tmp_path)
+        start = datetime.now() - timedelta(minutes=5)
+        log.append(make_records(3, start))
+        segment = next(tmp_path.glob("seg_*.ndjson"))
+        first_size = segment.stat().st_size
+        log.append(make_records(3, start + timedelta(minutes=1)))
+
+        assert segment.stat().st_size == 2 * first_size
+        assert len(log.read(columns=["prediction"])["prediction"]) == 6
+
+    def test_compacted_hours_read_by_column(self, tmp_path):
+        """Test compaction keeps the data and readers select columns and range"""
+        log = PredictionLog(tmp_path)
+        start = datetime.now() - timedelta(minutes=10)
+        log.append(make_records(100, start))
+
+        assert log.compact(now=datetime.now() + timedelta(hours=3)) == 1
+        assert not list(tmp_path.glob("seg_*.ndjson"))
+
+        data = log.read(start=start + timedelta(seconds=50), columns=["prediction", "model_version"])
+        assert set(data) == {"prediction", "model_version"}
+        assert len(data["prediction"]) == 50
+        assert np.all(np.diff(data["prediction"]) > 0)
+        assert np.isnan(log.read(columns=["actual_outcome"])["actual_outcome"]).all()
+
+    def test_prune(self, tmp_path):
+        """Test hours before the cutoff are removed"""
+        log = PredictionLog(tmp_path)
+        log.append(make_records(5, datetime.now()))
+
+        assert log.prune(before=datetime.now() + timedelta(hours=2)) == 1
+        assert len(log.read(columns=["ts"])["ts"]) == 0
+
+
+class TestMonitorOnLog:
+    """Test the performance monitor reads through the log"""
+
+    def test_summary_includes_flushed_and_buffered(self, tmp_path):
+        """Test summaries cover flushed rows, buffered rows and migrated daily files"""
+        legacy = make_records(10, datetime.now() - timedelta(hours=1), version="legacy_v0")
+        (tmp_path / "metrics_20260101.json").write_text(json.dumps(legacy))
+
+        monitor = ModelPerformanceMonitor(monitoring_dir=str(tmp_path))
+        monitor.monitoring_active = False
+        for i in range(20):
+            monitor.record_prediction("dna", "v1", 0.7, 0.8, 10.0, {"i": i})
+        monitor._flush_metrics()
+        for i in range(5):
+            monitor.record_prediction("dna", "v1", 0.3, 0.8, 30.0, {"i": i})
+
+        summary = monitor.get_performance_summary()
+        assert summary["dna_v1"]["total_predictions"] == 25
+        assert summary["dna_v1"]["avg_prediction"] == pytest.approx(0.62)
+        assert summary["legacy_v0"]["total_predictions"] == 10
+        assert not list(tmp_path.glob("metrics_*.json"))
+        assert list(monitor.get_performance_summary(model_type="dna")) == ["dna_v1"]
@@ -0,0 +1,124 @@
+"""
+Unit tests for the startup profile time series
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, ProfileRevision
+from database.profile_history import (
+    SNAPSHOT_EVERY, append_revisions, apply_delta, feature_delta, features_as_of, score_trajectory
+)
+from database.write_behind import WriteBehindQueue, prediction_records
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    # The models target PostgreSQL; store UUIDs as hex text for these tests
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flash.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_session():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    return get_session
+
+
+revisions = ProfileRevision.__table__
+START = datetime(2024, 1, 1)
+
+
+def monthly_features(n):
+    """45 features where one or two drift each month"""
+    base = {f"feature_{i}": i * 1.5 for i in range(45)}
+    history = []
+    for month in range(n):
+        base = {**base, "monthly_burn_usd": 50000 + 1000 * month, f"feature_{month % 45}": month}
+        if month == 7:
+            base.pop("feature_44")
+        history.append(base)
+    return history
+
+
+def revision_rows(history, name="acme"):
+    return [
+        {"name": name, "created_at": START + timedelta(days=30 * i), "input_features": features,
+         "success_probability": 0.4 + i / 100, "confidence_score": 0.7, "verdict": "PASS"}
+        for i, features in enumerate(history)
+    ]
+
+
+class TestProfileHistory:
+    """Test deltas, point-in-time reads and trajectories"""
+
+    def test_delta_round_trip(self):
+        """Test a delta holds only changes and replays to the new features"""
+        old = {"a": 1, "b": 2.0, "c": "x"}
+        new = {"a": 1, "b": 2.5, "d": None}
+        delta = feature_delta(old, new)
+
+        assert delta == {"set": {"b": 2.5, "d": None}, "unset": ["c"]}
+        assert apply_delta(old, delta) == new
+
+    def test_features_as_of(self, session_factory):
+        """Test every revision reads back exactly, across snapshots and batches"""
+        history = monthly_features(30)
+        rows = revision_rows(history)
+        with session_factory() as session:
+            assert append_revisions(session, rows[:10]) == 10
+        with session_factory() as session:
+            append_revisions(session, rows[10:])
+
+        with session_factory() as session:
+            snapshots = session.execute(
+                select(func.count()).select_from(revisions).where(revisions.c.is_snapshot.is_(True))
+            ).scalar()
+            assert snapshots == -(-30 // SNAPSHOT_EVERY)
+            delta = session.execute(select(revisions.c.features).where(revisions.c.revision == 2)).scalar()
+            assert len(delta["set"]) <= 2
+
+            for i, features in enumerate(history):
+                at = START + timedelta(days=30 * i, hours=1)
+                assert features_as_of(session, "acme", at) == features
+            assert features_as_of(session, "acme") == history[-1]
+            assert features_as_of(session, "acme", START - timedelta(days=1)) is None
+            assert features_as_of(session, "unknown") is None
+
+    def test_trajectory_from_write_behind(self, session_factory):
+        """Test predictions queued for a named startup build its trajectory"""
+        writer = WriteBehindQueue(session_factory=session_factory, batch_size=7)
+        for i, features in enumerate(monthly_features(20)):
+            _, records = prediction_records(
+                prediction=dict(input_features=features, success_probability=i / 20, confidence_score=0.8,
+                                verdict="PASS", camp_scores={}, model_predictions={}, startup_name="acme"),
+                profile=dict(name="acme")
+            )
+            writer.submit(*records)
+        writer.stop()
+
+        with session_factory() as session:
+            trajectory = score_trajectory(session, "acme")
+            assert [point["revision"] for point in trajectory] == list(range(1, 21))
+            assert [point["success_probability"] for point in trajectory] == [i / 20 for i in range(20)]
+            assert features_as_of(session, "acme") == monthly_features(20)[-1]
+
+            middle = trajectory[10]["recorded_at"]
+            assert len(score_trajectory(session, "acme", since=middle)) == 10
@@ -0,0 +1,161 @@
+"""
+Unit tests for streaming quantile sketches
+"""
+
+import json
+import threading
+import pytest
+import numpy as np
+from monitoring.quantile_sketch import DDSketch, WindowedSketch
+from monitoring.metrics_collector import MetricsCollector
+from monitoring.performance_monitor import PerformanceMonitor
+
+
+@pytest.fixture
+def latencies():
+    return np.random.default_rng(0).lognormal(mean=4, sigma=1, size=20000)
+
+
+def exact_quantile(values, q):
+    return np.sort(values)[int(q * (len(values) - 1))]
+
+
+class TestDDSketch:
+    """Test accuracy, merging and serialisation"""
+
+    def test_relative_accuracy(self, latencies):
+        """Test quantiles are within the configured relative error"""
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in latencies:
+            sketch.add(value)
+
+        for q in (0.5, 0.9, 0.95, 0.99, 0.999):
+            expected = exact_quantile(latencies, q)
+            assert abs(sketch.quantile(q) - expected) <= 0.01 * expected
+        assert sketch.count == len(latencies)
+        assert sketch.mean == pytest.approx(latencies.mean())
+        assert len(sketch.positive) < 2000
+
+    def test_merge_matches_single_sketch(self, latencies):
+        """Test merging per-worker sketches equals one sketch of all values"""
+        combined = DDSketch()
+        workers = [DDSketch() for _ in range(4)]
+        for i, value in enumerate(latencies):
+            combined.add(value)
+            workers[i % 4].add(value)
+
+        merged = DDSketch()
+        for worker in workers:
+            merged.merge(worker)
+
+        assert merged.positive == combined.positive
+        assert merged.quantiles() == combined.quantiles()
+
+    def test_zero_and_negative_values(self):
+        """Test values at or below zero are ranked correctly"""
+        sketch = DDSketch()
+        for value in [-10, -1, 0, 0, 1, 10]:
+            sketch.add(value)
+
+        assert sketch.quantile(0) == -10
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1) == 10
+        assert DDSketch().quantile(0.5) is None
+
+    def test_round_trip(self, latencies):
+        """Test sketches survive JSON serialisation"""
+        sketch = DDSketch()
+        for value in latencies[:1000]:
+            sketch.add(value)
+
+        restored = DDSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        assert restored.quantiles() == sketch.quantiles()
+        assert restored.count == sketch.count
+
+
+class TestWindowedSketch:
+    """Test lifetime and sliding-window views"""
+
+    def test_window_expires_old_values(self):
+        """Test values older than the window leave the window view only"""
+        sketch = WindowedSketch(window_seconds=60, slots=6)
+        for _ in range(100):
+            sketch.add(1000.0, now=0)
+        for _ in range(100):
+            sketch.add(10.0, now=90)
+
+        window = sketch.window(now=95)
+        assert window.count == 100
+        assert window.quantile(0.99) == pytest.approx(10.0, rel=0.01)
+        assert sketch.lifetime.count == 200
+        assert sketch.lifetime.quantile(0.99) == pytest.approx(1000.0, rel=0.01)
+
+    def test_merge_aligns_slots(self):
+        """Test merged workers share window slots by time"""
+        first = WindowedSketch(window_seconds=60, slots=6)
+        second = WindowedSketch(window_seconds=60, slots=6)
+        first.add(5.0, now=100)
+        second.add(50.0, now=100)
+        second.add(500.0, now=10)
+
+        first.merge(WindowedSketch.from_dict(json.loads(json.dumps(second.to_dict()))))
+
+        assert first.lifetime.count == 3
+        assert first.window(now=100).count == 2
+
+    def test_threads_record_without_losing_values(self):
+        """Test per-thread shards add up to every recorded value"""
+        sketch = WindowedSketch(window_seconds=60, slots=6)
+
+        def record(value):
+            for _ in range(2000):
+                sketch.add(value, now=30)
+
+        threads = [threading.Thread(target=record, args=(float(i + 1),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            sketch.window(now=30)
+            thread.join()
+
+        assert sketch.lifetime.count == 8000
+        assert sketch.window(now=30).count == 8000
+        assert sketch.lifetime.max == 4.0
+
+
+class TestCollectorSketches:
+    """Test metrics collectors report sketch percentiles"""
+
+    def test_summary_per_endpoint_and_model(self):
+        """Test percentiles are kept overall, per endpoint and per model"""
+        collector = MetricsCollector()
+        for i in range(1, 101):
+            collector.record_request("/predict", "POST", 200, float(i))
+            collector.record_prediction(0.6, 0.8, "PASS", float(i) * 2, model_version="v3")
+        collector.record_request("/health", "GET", 200, 1000.0)
+
+        summary = collector.get_summary()
+        assert summary["response_time_percentiles"]["p50"] == pytest.approx(51, rel=0.02)
+        assert summary["endpoint_response_times"]["/predict"]["lifetime"]["max"] == 100.0
+        assert summary["model_processing_times"]["v3"]["window"]["count"] == 100
+
+    def test_export_and_merge(self):
+        """Test one worker's sketches merge into another's"""
+        first, second = MetricsCollector(), MetricsCollector()
+        first.record_request("/predict", "POST", 200, 10.0)
+        second.record_request("/predict", "POST", 200, 30.0)
+
+        first.merge_sketches(json.loads(json.dumps(second.export_sketches())))
+
+        assert first.sketches["response_time"]["/predict"].lifetime.count == 2
+        assert first.sketches["response_time"]["all"].lifetime.max == 30.0
+
+    def test_performance_monitor_stats(self):
+        """Test the performance monitor reads latency percentiles from its sketch"""
+        monitor = PerformanceMonitor(window_size=10)
+        for i in range(1, 1001):
+            monitor.record_prediction(float(i), 0.5, 45)
+
+        stats = monitor.get_current_stats()
+        assert stats['total_predictions'] == 1000
+        assert stats['response_time']['p99'] == pytest.approx(990, rel=0.02)
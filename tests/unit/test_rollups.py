@@ -0,0 +1,148 @@
+"""
+Unit tests for prediction rollups and keyset-paginated history
+"""
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Prediction, PredictionRollup
+from database.repositories import PredictionRepository
+from database.rollups import HyperLogLog, rebuild_rollups, read_statistics
+from database.write_behind import WriteBehindQueue, prediction_records
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    # The models target PostgreSQL; store UUIDs as hex text for these tests
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flash.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_session():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    return get_session
+
+
+predictions = Prediction.__table__
+rollups = PredictionRollup.__table__
+
+
+def prediction_rows(now, n=300):
+    verdicts = ["PASS", "FAIL", "CONDITIONAL PASS"]
+    return [
+        dict(id=uuid.uuid4(), created_at=now - timedelta(hours=i), input_features={},
+             success_probability=(i % 10) / 10, confidence_score=0.5, verdict=verdicts[i % 3],
+             user_id=f"user{i % 40}")
+        for i in range(n)
+    ]
+
+
+def scanned_statistics(rows, since):
+    window = [r for r in rows if r["created_at"] >= since.replace(minute=0, second=0, microsecond=0)]
+    verdicts = {}
+    for r in window:
+        verdicts[r["verdict"]] = verdicts.get(r["verdict"], 0) + 1
+    return len(window), sum(r["success_probability"] for r in window) / len(window), verdicts
+
+
+class TestRollups:
+    """Test rollups agree with a scan of the predictions"""
+
+    def test_hyperloglog_estimate(self):
+        """Test distinct counts stay within a few percent and merge like a union"""
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(20000):
+            a.add(f"user{i}")
+            b.add(f"user{i + 10000}")
+        a.merge(HyperLogLog(registers=b.to_bytes()))
+
+        assert a.count() == pytest.approx(30000, rel=0.05)
+        assert HyperLogLog().count() == 0
+
+    def test_write_behind_maintains_rollups(self, session_factory):
+        """Test stats read from rollups match the rows the writer inserted"""
+        writer = WriteBehindQueue(session_factory=session_factory, batch_size=64)
+        for i in range(150):
+            _, records = prediction_records(dict(
+                input_features={}, success_probability=(i % 4) / 4, confidence_score=0.9,
+                verdict="PASS" if i % 4 > 1 else "FAIL", camp_scores={}, model_predictions={},
+                user_id=f"user{i % 25}"
+            ))
+            writer.submit(*records)
+        writer.stop()
+
+        with session_factory() as session:
+            stats = PredictionRepository(session).get_statistics(days=1)
+            assert stats["total_predictions"] == 150
+            assert stats["avg_success_probability"] == pytest.approx(sum((i % 4) / 4 for i in range(150)) / 150)
+            assert stats["avg_confidence_score"] == pytest.approx(0.9)
+            assert stats["verdict_distribution"] == {"PASS": 74, "FAIL": 76}
+            assert stats["unique_users"] == pytest.approx(25, rel=0.05)
+
+    def test_rebuild_and_ranges(self, session_factory):
+        """Test rebuilt rollups answer windows that mix daily and hourly buckets"""
+        now = datetime.utcnow()
+        rows = prediction_rows(now)
+        with session_factory() as session:
+            session.execute(insert(predictions), rows)
+            assert rebuild_rollups(session) == 300
+
+        with session_factory() as session:
+            assert session.execute(
+                select(func.sum(rollups.c.prediction_count)).where(rollups.c.period == "day")
+            ).scalar() == 300
+            for days in (1, 3, 7, 30):
+                since = now - timedelta(days=days, minutes=30)
+                stats = read_statistics(session, since=since, until=now)
+                total, average, verdicts = scanned_statistics(rows, since)
+                assert stats["total_predictions"] == total
+                assert stats["avg_success_probability"] == pytest.approx(average)
+                assert stats["verdict_distribution"] == verdicts
+                users = {r["user_id"] for r in rows if r["created_at"] >= since.replace(minute=0, second=0,
+                                                                                         microsecond=0)}
+                assert stats["unique_users"] == pytest.approx(len(users), rel=0.05)
+
+    def test_keyset_history(self, session_factory):
+        """Test cursor pages walk the whole history once, newest first"""
+        now = datetime.utcnow()
+        rows = prediction_rows(now, n=45)
+        for row in rows:
+            row["user_id"] = "user1"
+        # Ties on created_at are broken by id
+        for row in rows[:10]:
+            row["created_at"] = now
+        with session_factory() as session:
+            session.execute(insert(predictions), rows)
+
+        seen, before = [], None
+        with session_factory() as session:
+            repo = PredictionRepository(session)
+            while True:
+                page = repo.get_user_predictions("user1", limit=10, before=before)
+                seen.extend(p.id for p in page)
+                if len(page) < 10:
+                    break
+                before = (page[-1].created_at, page[-1].id)
+
+            expected = [r["id"] for r in sorted(rows, key=lambda r: (r["created_at"], r["id"].hex), reverse=True)]
+            assert seen == expected
+            assert [p.id for p in repo.get_user_predictions("user1", limit=5, offset=10)] == expected[10:15]
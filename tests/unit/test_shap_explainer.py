@@ -0,0 +1,176 @@
+"""
+Unit tests for batch SHAP explanations
+"""
+
+import pytest
+import shap
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.tree import DecisionTreeClassifier
+from shap_explainer import FLASHExplainer, EnsembleTreeExplainer
+from utils.shap_background import load_background_sample
+from utils.explanation_cache import ExplanationCache
+
+
+@pytest.fixture(scope="module")
+def explainer(tmp_path_factory):
+    explainer = FLASHExplainer(str(tmp_path_factory.mktemp("models")))
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, len(explainer.feature_names))),
+                     columns=explainer.feature_names)
+    y = (X.iloc[:, 0] + X.iloc[:, 5] > 0).astype(int)
+
+    explainer.models = {
+        'forest': RandomForestClassifier(n_estimators=10, max_depth=3, random_state=0).fit(X, y),
+        'voting': VotingClassifier([
+            ('shallow', DecisionTreeClassifier(max_depth=2, random_state=0)),
+            ('deep', DecisionTreeClassifier(max_depth=4, random_state=0))
+        ], voting='soft').fit(X, y)
+    }
+    explainer.explainers = {}
+    explainer._create_explainers()
+    explainer.sample = X.iloc[:20]
+    return explainer
+
+
+class TestFLASHExplainer:
+    """Test batch explanations"""
+
+    def test_full_ensemble_explainers(self, explainer):
+        """Test voting ensembles are explained across all members"""
+        assert isinstance(explainer.explainers['voting'], EnsembleTreeExplainer)
+        assert len(explainer.explainers['voting'].explainers) == 2
+
+    def test_batch_attributions_are_additive(self, explainer):
+        """Test SHAP rows sum to the predicted probability"""
+        batch = explainer.explain_batch(explainer.sample)
+
+        for name in ['forest', 'voting']:
+            values = batch['shap_values'][name]
+            assert values.shape == (20, len(explainer.feature_names))
+            np.testing.assert_allclose(
+                values.sum(axis=1) + batch['expected_values'][name],
+                batch['predictions'][name], atol=1e-6
+            )
+
+    def test_single_matches_batch(self, explainer):
+        """Test single-row explanations match the batch rows"""
+        batch = explainer.explain_batch(explainer.sample)
+        single = explainer.explain_prediction(explainer.sample.iloc[[7]], include_plots=False)
+
+        assert single['model_predictions']['forest'] == pytest.approx(batch['predictions']['forest'][7])
+        np.testing.assert_allclose(
+            single['explanations']['forest']['shap_values'], batch['shap_values']['forest'][7]
+        )
+
+    def test_summarize_batch(self, explainer):
+        """Test portfolio summary ranks features by mean absolute impact"""
+        summary = explainer.summarize_batch(explainer.explain_batch(explainer.sample), top_k=3)
+
+        top = summary['forest']['top_features']
+        assert len(top) == 3
+        assert top[0]['mean_abs_impact'] >= top[-1]['mean_abs_impact']
+        assert set(summary['forest']['camp_contributions']) == {'Capital', 'Advantage', 'Market', 'People'}
+
+
+class TestBackgroundSample:
+    """Test persisted background samples"""
+
+    def test_drawn_once_and_reused(self, tmp_path):
+        """Test the sample is persisted and reloaded unchanged"""
+        training = pd.DataFrame({'a': np.arange(500), 'b': np.arange(500) * 2.0})
+        training.to_csv(tmp_path / "train.csv", index=False)
+        path = str(tmp_path / "background.pkl")
+
+        first = load_background_sample(['a', 'b'], path, str(tmp_path / "train.csv"), n_samples=50)
+        (tmp_path / "train.csv").unlink()
+        second = load_background_sample(['a', 'b'], path, str(tmp_path / "train.csv"), n_samples=50)
+
+        assert len(first) == 50
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_encoded_for_tree_explainer(self, tmp_path):
+        """Test string categoricals and gaps are encoded before persisting"""
+        rng = np.random.default_rng(0)
+        training = pd.DataFrame({
+            'funding_stage': rng.choice(['seed', 'series_a', 'series_b'], 300),
+            'sector': rng.choice(['saas', 'fintech', None], 300),
+            'runway_months': np.where(rng.random(300) < 0.2, np.nan, rng.normal(12, 4, 300)),
+        })
+        training.to_csv(tmp_path / "train.csv", index=False)
+        path = str(tmp_path / "background.pkl")
+        features = list(training.columns)
+
+        load_background_sample(features, path, str(tmp_path / "train.csv"), n_samples=50)
+        sample = load_background_sample(features, path, str(tmp_path / "missing.csv"), n_samples=50)
+
+        encoded = training.copy()
+        for column in ['funding_stage', 'sector']:
+            encoded[column] = pd.Categorical(encoded[column]).codes
+        encoded = encoded.fillna(0)
+        model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(
+            encoded, encoded['runway_months'] > 12
+        )
+        values = shap.TreeExplainer(model, sample).shap_values(encoded.iloc[:5])
+
+        assert sample.notna().all().all()
+        assert set(sample['funding_stage']) <= {0, 1, 2}
+        assert np.asarray(values).shape[0] in (2, 5)
+
+    def test_generator_fallback(self, tmp_path):
+        """Test a seeded generator is used without training data"""
+        def generator(n, rng):
+            return pd.DataFrame({'a': rng.normal(size=n)})
+
+        sample = load_background_sample(
+            ['a'], str(tmp_path / "bg.pkl"), str(tmp_path / "missing.csv"), 10, generator
+        )
+        expected = generator(10, np.random.default_rng(42))
+        pd.testing.assert_frame_equal(sample, expected)
+        assert load_background_sample(['a'], str(tmp_path / "none.pkl"), str(tmp_path / "missing.csv")) is None
+
+
+class TestCachedExplanations:
+    """Test SHAP rows are served from the explanation cache"""
+
+    def test_cache_matches_uncached(self, explainer, tmp_path):
+        """Test cached and freshly computed attributions agree"""
+        uncached = explainer.explain_batch(explainer.sample)
+
+        explainer.cache = ExplanationCache(str(tmp_path / "explanations.db"))
+        try:
+            explainer.explain_batch(explainer.sample.iloc[:5])
+            cached = explainer.explain_batch(explainer.sample)
+            stats = explainer.cache.stats()
+        finally:
+            explainer.cache = None
+
+        assert stats['hits'] == 5 * len(explainer.models)
+        for name in explainer.models:
+            np.testing.assert_allclose(cached['shap_values'][name], uncached['shap_values'][name])
+
+
+class TestLazyPlots:
+    """Test client-side plot specs and on-demand rendering"""
+
+    def test_lazy_specs_and_render(self, explainer, tmp_path):
+        """Test specs describe the attribution and PNGs render on demand"""
+        explainer.cache = ExplanationCache(str(tmp_path / "explanations.db"))
+        try:
+            result = explainer.explain_prediction(explainer.sample.iloc[[2]], include_plots='lazy')
+            plots = result['plots']
+            image = explainer.render_plot(plots['plot_id'], 'camp_breakdown')
+            cached_images = explainer.cache.get(plots['plot_id'])['images']
+            missing = explainer.render_plot('unknown', 'camp_breakdown')
+        finally:
+            explainer.cache = None
+
+        impacts = [f['impact'] for f in plots['feature_importance']['features']]
+        assert impacts == sorted(impacts, key=abs, reverse=True)
+        assert plots['waterfall']['final_value'] == pytest.approx(result['model_predictions']['forest'])
+        assert [m['model'] for m in plots['model_consensus']['models']] == ['forest', 'voting']
+
+        assert image.startswith(b'\x89PNG')
+        assert set(cached_images) == {'camp_breakdown'}
+        assert missing is None
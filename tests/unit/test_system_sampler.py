@@ -0,0 +1,71 @@
+"""
+Unit tests for the background system sampler
+"""
+
+import gc
+import time
+import asyncio
+from monitoring.system_sampler import SystemSampler
+from monitoring.metrics_collector import MetricsCollector
+
+
+class TestSystemSampler:
+    """Test sampling stays off the caller's thread and covers the runtime"""
+
+    def test_collect_does_not_block(self):
+        """Test a sample is taken without sleeping for CPU readings"""
+        sampler = SystemSampler()
+        started = time.perf_counter()
+        sample = sampler.collect()
+
+        assert time.perf_counter() - started < 0.09
+        assert sampler.latest() is sample
+        assert sample["process_memory_mb"] > 0
+        assert sample["threadpool_busy"] is None
+
+    def test_gc_pauses(self):
+        """Test collections between samples are counted and timed"""
+        sampler = SystemSampler()
+        gc.callbacks.append(sampler._gc_callback)
+        try:
+            gc.collect()
+        finally:
+            gc.callbacks.remove(sampler._gc_callback)
+
+        sample = sampler.collect()
+        assert sample["gc_collections"][2] >= 1
+        assert sample["gc_pause_ms_total"] > 0
+        assert sampler.collect()["gc_collections"] == [0, 0, 0]
+
+    def test_blocked_loop_lag(self):
+        """Test a loop that cannot answer the ping reports growing lag"""
+        sampler = SystemSampler()
+        loop = asyncio.new_event_loop()
+        try:
+            sampler.start(loop=loop)
+            sampler.stop()
+            sampler._ping_loop()
+            time.sleep(0.05)
+            assert sampler.collect()["loop_lag_ms"] >= 50
+
+            loop.run_until_complete(asyncio.sleep(0))
+            assert sampler._ping_sent is None
+            assert sampler.collect()["loop_lag_ms"] >= 50
+        finally:
+            loop.close()
+
+    def test_listeners_receive_samples(self):
+        """Test the sampler thread feeds the metrics collector"""
+        sampler = SystemSampler(interval=0.01)
+        collector = MetricsCollector()
+        sampler.add_listener(collector.record_system_metrics)
+
+        sampler.start()
+        deadline = time.time() + 2
+        while not collector.metrics["system"]["resources"] and time.time() < deadline:
+            time.sleep(0.01)
+        sampler.stop()
+
+        latest = collector.metrics["system"]["resources"][-1]
+        assert latest["cpu_percent"] is not None
+        assert "loop_lag_ms" in latest
@@ -0,0 +1,51 @@
+"""
+Unit tests for per-stage tracing
+"""
+
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from monitoring.tracing import Trace, span, traced, current_trace, _NOOP_SPAN
+from models.unified_orchestrator_v3_integrated import UnifiedOrchestratorV3
+
+
+class TestTracing:
+    """Test spans record into the open trace only"""
+
+    def test_span_outside_trace_is_noop(self):
+        """Test untraced code gets the shared no-op span"""
+        assert current_trace() is None
+        assert span("validate") is _NOOP_SPAN
+
+    def test_stages_sum_per_name(self):
+        """Test repeated stages accumulate and the total covers them"""
+        @traced("convert")
+        def convert():
+            return 1
+
+        with Trace("/predict") as trace:
+            with span("validate"):
+                pass
+            convert()
+            convert()
+
+        breakdown = trace.breakdown()
+        assert list(breakdown) == ["validate", "convert", "total"]
+        assert breakdown["total"] >= breakdown["validate"] + breakdown["convert"]
+        assert trace.header().startswith("validate;dur=")
+        assert current_trace() is None
+
+    def test_orchestrator_model_spans(self):
+        """Test the orchestrator reports feature preparation and each model"""
+        orchestrator = UnifiedOrchestratorV3()
+        data = pd.DataFrame([{'funding_stage': 'seed', 'runway_months': 12}] * 4)
+        prepared = orchestrator._prepare_features(data)
+        orchestrator.pattern_system = None
+        orchestrator.models = {
+            'dna_analyzer': LogisticRegression().fit(prepared, [0, 1, 0, 1])
+        }
+
+        with Trace("/predict") as trace:
+            orchestrator.predict(data.iloc[[0]])
+
+        assert {"orchestrator.prepare_features", "model.dna_analyzer",
+                "orchestrator.quality_score"} <= set(trace.stages)
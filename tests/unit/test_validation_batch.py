@@ -0,0 +1,70 @@
+"""
+Unit tests for chunked batch validation of startup records
+"""
+
+import json
+
+import pandas as pd
+
+from data_validation_pipeline import DataValidator, BatchValidator
+
+
+RECORDS = [
+    {'company_name': 'Acme Inc.', 'founded_date': '03/15/2012', 'total_funding': '$5M', 'team_size': 40,
+     'outcome': 'active', 'website': 'acme.com/', 'headquarters_location': 'SF, USA'},
+    {'company_name': 'test co', 'founded_date': 'garbage', 'total_funding': 0, 'team_size': 'many',
+     'outcome': 'bogus', 'website': None, 'headquarters_location': None},
+    {'company_name': 'Zeta Labs LLC', 'founded_date': '2015-01-01', 'total_funding': '1,200,000', 'team_size': 12,
+     'outcome': 'ipo', 'exit_value': '', 'outcome_date': '2015-03-01',
+     'funding_rounds': json.dumps([{'amount': 1000000}]), 'website': 'https://zeta.io'},
+    {'company_name': 'Beta', 'founded_date': 'March 5, 2010', 'total_funding': 2e6, 'team_size': 3.5,
+     'outcome': 'acquired', 'exit_value': '$100k', 'acquirer': 'BigCo', 'website': ''},
+    {'company_name': 'Foo@Bar', 'founded_date': '1850-01-01', 'total_funding': 'abc', 'team_size': 0,
+     'outcome': 'shutdown', 'shutdown_reason': 'ran out of money'},
+]
+
+
+class TestBatchValidator:
+    """Test the column-wise pipeline against the per-record one"""
+
+    def test_matches_validate_record(self):
+        """Test cleaning and issues match clean_and_standardize and validate_record"""
+        validator = DataValidator()
+        cleaned_records = [validator.clean_and_standardize(r) for r in RECORDS]
+
+        batch = BatchValidator(validator)
+        cleaned = batch.clean(pd.DataFrame(RECORDS))
+        valid, issues, counts = batch.validate(cleaned)
+
+        for i, record in enumerate(cleaned_records):
+            for field in ['company_name', 'founded_date', 'total_funding', 'website', 'data_completeness']:
+                value = cleaned[field].iloc[i]
+                assert record.get(field) == value or (record.get(field) is None and pd.isna(value))
+            assert (valid[i], issues[i]) == validator.validate_record(record)
+
+        assert list(valid) == [True, False, False, False, False]
+        assert counts['outcome.allowed_values'] == 1
+        assert counts['cross.short_lifespan'] == 1
+        assert sum(counts.values()) == sum(len(row) for row in issues)
+
+    def test_run_reports_rejects_and_skips_seen_rows(self, tmp_path):
+        """Test chunked runs write rejects and only validate new rows incrementally"""
+        rejected_path = tmp_path / 'rejected.ndjson'
+        state_path = tmp_path / 'seen.npy'
+        frame = pd.DataFrame(RECORDS)
+        batch = BatchValidator(chunk_size=2)
+
+        report = batch.run([frame.iloc[:3], frame.iloc[3:]], str(rejected_path), str(state_path))
+
+        assert (report.total_rows, report.valid_rows, report.skipped_rows) == (5, 1, 0)
+        assert list(report.accepted['company_name']) == ['Acme']
+        rejected = [json.loads(line) for line in rejected_path.read_text().splitlines()]
+        assert [row['company_name'] for row in rejected] == ['Test Co', 'Zeta Labs', 'Beta', 'Foo@Bar']
+        assert 'outcome not in allowed values: bogus' in rejected[0]['validation_issues']
+
+        changed = frame.copy()
+        changed.loc[1, 'outcome'] = 'active'
+        report = batch.run(changed, state_path=str(state_path))
+
+        assert (report.total_rows, report.skipped_rows) == (1, 4)
+        assert report.rule_counts.get('outcome.allowed_values') is None
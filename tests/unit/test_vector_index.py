@@ -0,0 +1,72 @@
+"""
+Unit tests for the nearest-neighbour vector index
+"""
+
+import pytest
+import numpy as np
+from utils.vector_index import VectorIndex
+
+
+class TestVectorIndex:
+    """Test exact cosine search"""
+    
+    def test_empty_index(self):
+        """Test searching an empty index"""
+        index = VectorIndex(dim=3)
+        assert len(index) == 0
+        assert index.search(np.ones(3)) == []
+    
+    def test_top_k_order(self):
+        """Test results are sorted by descending similarity"""
+        index = VectorIndex(dim=2)
+        index.add(np.array([[1, 0], [0, 1], [1, 1]]), ["x", "y", "xy"])
+        
+        results = index.search(np.array([1, 0.1]), k=2)
+        
+        assert [payload for _, payload in results] == ["x", "xy"]
+        assert results[0][0] > results[1][0]
+    
+    def test_min_similarity(self):
+        """Test results below the similarity floor are dropped"""
+        index = VectorIndex(dim=2)
+        index.add(np.array([[1, 0], [0, 1]]), ["x", "y"])
+        
+        results = index.search(np.array([1, 0]), k=2, min_similarity=0.5)
+        
+        assert [payload for _, payload in results] == ["x"]
+        assert results[0][0] == pytest.approx(1.0)
+    
+    def test_growth_beyond_capacity(self):
+        """Test the index grows and matches brute force"""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(1000, 8))
+        index = VectorIndex(dim=8)
+        for chunk in np.array_split(vectors, 7):
+            index.add(chunk)
+        
+        query = rng.normal(size=8)
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ query))[:5]
+        
+        assert len(index) == 1000
+        assert [payload for _, payload in index.search(query, k=5)] == list(expected)
+    
+    def test_batch_search(self):
+        """Test batch queries match single queries"""
+        rng = np.random.default_rng(1)
+        index = VectorIndex(dim=4)
+        index.add(rng.normal(size=(50, 4)))
+        queries = rng.normal(size=(3, 4))
+        
+        batch = index.search_batch(queries, k=3)
+        
+        for query, results in zip(queries, batch):
+            single = index.search(query, k=3)
+            assert [p for _, p in results] == [p for _, p in single]
+            assert [s for s, _ in results] == pytest.approx([s for s, _ in single])
+    
+    def test_dimension_mismatch(self):
+        """Test adding vectors of the wrong width"""
+        index = VectorIndex(dim=3)
+        with pytest.raises(ValueError):
+            index.add(np.ones((2, 4)))
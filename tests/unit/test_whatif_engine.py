@@ -0,0 +1,139 @@
+"""
+Unit tests for batch re-scoring and the what-if engine
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from feature_config import ALL_FEATURES, CATEGORICAL_FEATURES
+from models.unified_orchestrator_v3_integrated import UnifiedOrchestratorV3
+from whatif_calculator import WhatIfEngine, ScenarioValidationError
+
+
+@pytest.fixture(scope="module")
+def startups():
+    rng = np.random.default_rng(0)
+    n = 30
+    data = pd.DataFrame({
+        col: rng.normal(50, 40, n) for col in ALL_FEATURES if col not in CATEGORICAL_FEATURES
+    })
+    data['funding_stage'] = rng.choice(['Pre_Seed', 'Seed', 'Series_A', 'Series_C'], n)
+    data['investor_tier_primary'] = 'Tier_1'
+    data['product_stage'] = 'MVP'
+    data['sector'] = 'SaaS'
+    return data
+
+
+@pytest.fixture(scope="module")
+def orchestrator(startups):
+    orchestrator = UnifiedOrchestratorV3()
+    prepared = orchestrator._prepare_features(startups)
+    y = (prepared['runway_months'] > 50).astype(int)
+    rng = np.random.default_rng(1)
+
+    orchestrator.pattern_system = None
+    orchestrator.models = {
+        'dna_analyzer': LogisticRegression(max_iter=500).fit(prepared, y),
+        'industry_model': LogisticRegression(max_iter=500, C=1e-4).fit(prepared, y),
+        'temporal_model': LogisticRegression(max_iter=500).fit(
+            orchestrator._prepare_temporal_features(prepared), y
+        ),
+        'ensemble_model': LogisticRegression().fit(pd.DataFrame({
+            'dna_probability': rng.random(len(y)),
+            'temporal_probability': rng.random(len(y)),
+            'industry_probability': rng.random(len(y))
+        }), y)
+    }
+    return orchestrator
+
+
+class StubExplainer:
+    """Attributes each feature its own value, like a linear model"""
+    feature_names = ['runway_months', 'burn_multiple', 'team_size_full_time']
+
+    def explain_batch(self, features):
+        return {
+            'feature_names': self.feature_names,
+            'shap_values': {'linear': features.to_numpy(dtype=float)}
+        }
+
+
+class TestScoreBatch:
+    """Test vectorized scoring matches single predictions"""
+
+    def test_batch_matches_predict(self, orchestrator, startups):
+        """Test every batch row equals the single-row prediction"""
+        batch = orchestrator.predict_batch(startups)
+
+        for row in range(len(startups)):
+            single = orchestrator.predict(startups.iloc[[row]])
+            assert single['success_probability'] == pytest.approx(batch[row]['success_probability'])
+            assert single['verdict'] == batch[row]['verdict']
+            assert single['model_predictions'] == pytest.approx(batch[row]['model_predictions'])
+
+    def test_recalibration_is_monotonic(self, orchestrator):
+        """Test vectorized recalibration keeps the scalar mapping"""
+        probs = np.array([0.0, 5e-5, 5e-4, 5e-3, 0.05, 0.15, 0.5, 0.9])
+        recalibrated = orchestrator._recalibrate_predictions(probs)
+
+        assert np.all(np.diff(recalibrated) >= 0)
+        assert recalibrated == pytest.approx([orchestrator._recalibrate_prediction(p) for p in probs])
+
+
+class TestWhatIfEngine:
+    """Test scenarios are re-scored with the models"""
+
+    def test_scenarios(self, orchestrator, startups):
+        """Test deltas and per-edit contributions against direct predictions"""
+        startup = startups.iloc[0].to_dict()
+        engine = WhatIfEngine(orchestrator)
+        result = engine.evaluate(startup, [
+            {'id': 'runway', 'edits': {'runway_months': 110.0}},
+            {'id': 'both', 'edits': {'runway_months': 110.0, 'burn_multiple': 0.5}}
+        ])
+
+        base = orchestrator.predict(startups.iloc[[0]])['success_probability']
+        edited = orchestrator.predict(pd.DataFrame([{**startup, 'runway_months': 110.0}]))
+        runway, both = result['scenarios']
+
+        assert result['base']['success_probability'] == pytest.approx(base)
+        assert runway['delta'] == pytest.approx(edited['success_probability'] - base)
+        assert both['edit_contributions']['runway_months'] == pytest.approx(runway['delta'])
+        assert sum(both['edit_contributions'].values()) + both['interaction'] == pytest.approx(both['delta'])
+        # Base, two scenarios and the two single edits of the combined scenario
+        assert result['rows_scored'] == 5
+
+    def test_unknown_feature(self, orchestrator, startups):
+        """Test edits must name model features"""
+        with pytest.raises(ValueError):
+            WhatIfEngine(orchestrator).evaluate(
+                startups.iloc[0].to_dict(), [{'id': 'bad', 'edits': {'not_a_feature': 1}}]
+            )
+
+    def test_invalid_edits(self, orchestrator, startups):
+        """Test edits that break validation are reported per scenario"""
+        startup = startups.iloc[0].to_dict()
+        with pytest.raises(ScenarioValidationError) as excinfo:
+            WhatIfEngine(orchestrator).evaluate(startup, [
+                {'id': 'ok', 'edits': {'runway_months': 20.0}},
+                {'id': 'bad', 'edits': {'runway_months': -5, 'sector': 'pets'}}
+            ])
+
+        errors = excinfo.value.errors
+        assert list(errors) == ['bad']
+        assert any(error.startswith('runway_months must be >= 0') for error in errors['bad'])
+        assert any(error.startswith('sector must be one of') for error in errors['bad'])
+
+    def test_attribution_deltas(self, orchestrator, startups):
+        """Test attribution deltas only report features that moved"""
+        engine = WhatIfEngine(orchestrator, StubExplainer())
+        startup = startups.iloc[0].to_dict()
+        result = engine.evaluate(
+            startup, [{'id': 'runway', 'edits': {'runway_months': startup['runway_months'] + 10}}],
+            include_attributions=True
+        )
+
+        assert result['scenarios'][0]['attribution_deltas'] == {
+            'linear': [{'feature': 'runway_months', 'delta': pytest.approx(10.0)}]
+        }
@@ -0,0 +1,136 @@
+"""
+Unit tests for write-behind persistence
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Prediction, StartupProfile, AuditLog
+from database.write_behind import (
+    WriteBehindQueue, WriteBehindFull, prediction_records, audit_record
+)
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    # The models target PostgreSQL; store UUIDs as hex text for these tests
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'flash.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_session():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    return get_session
+
+
+predictions = Prediction.__table__
+profiles = StartupProfile.__table__
+audit_logs = AuditLog.__table__
+
+
+def count(session, table, *where):
+    return session.execute(select(func.count()).select_from(table).where(*where)).scalar()
+
+
+def records_for(name, probability):
+    return prediction_records(
+        prediction=dict(input_features={"sector": "saas"}, success_probability=probability,
+                        confidence_score=0.8, verdict="PASS", camp_scores={"capital": 0.5},
+                        model_predictions={}, startup_name=name, user_id="u1"),
+        profile=dict(name=name, sector="saas"),
+        audit=dict(action="prediction", user_id="u1")
+    )
+
+
+class TestWriteBehindQueue:
+    """Test batching, backpressure and shutdown flushing"""
+
+    def test_batches_and_profile_folding(self, session_factory):
+        """Test queued predictions land in bulk with one profile per startup"""
+        writer = WriteBehindQueue(session_factory=session_factory, batch_size=50, flush_interval=0.01)
+        ids = []
+        for i in range(120):
+            prediction_id, records = records_for(f"startup{i % 3}", i / 120)
+            ids.append(prediction_id)
+            writer.submit(*records)
+        writer.submit(audit_record(action="prediction_cached", details={"cached": True}))
+
+        writer.start()
+        writer.stop()
+
+        assert writer.stats["written"] == 361
+        assert writer.stats["batches"] >= 8
+        with session_factory() as session:
+            assert count(session, predictions) == 120
+            assert count(session, audit_logs, audit_logs.c.entity_id == str(ids[0])) == 1
+            first = session.execute(select(predictions).where(predictions.c.id == ids[0])).one()
+            assert first.capital_score == 0.5
+
+            profile = session.execute(select(profiles).where(profiles.c.name == "startup2")).one()
+            assert profile.total_predictions == 40
+            assert profile.avg_success_probability == pytest.approx(sum(i / 120 for i in range(2, 120, 3)) / 40)
+            assert profile.latest_prediction_id == ids[119]
+
+    def test_stop_flushes_without_worker(self, session_factory):
+        """Test records queued but never picked up are written on shutdown"""
+        writer = WriteBehindQueue(session_factory=session_factory)
+        writer.submit(*records_for("late", 0.4)[1])
+        writer.stop()
+
+        with session_factory() as session:
+            assert count(session, predictions) == 1
+
+    def test_backpressure(self, session_factory):
+        """Test a full queue makes producers wait, then reject"""
+        writer = WriteBehindQueue(session_factory=session_factory, max_pending=2, enqueue_timeout=0.05)
+        writer.submit(audit_record(action="a"), audit_record(action="b"))
+        with pytest.raises(WriteBehindFull):
+            writer.submit(audit_record(action="c"))
+
+        # A waiting async producer gets in once the writer drains the queue
+        async def produce():
+            threading.Timer(0.01, writer.start).start()
+            writer.enqueue_timeout = 5
+            await writer.asubmit(audit_record(action="d"))
+
+        asyncio.run(produce())
+        writer.stop()
+        assert writer.stats["written"] == 3
+        assert writer.stats["rejected"] == 1
+
+    def test_failed_batches_are_dead_lettered(self, tmp_path):
+        """Test a batch the database rejects is kept on disk"""
+        @contextmanager
+        def broken_session():
+            raise RuntimeError("database down")
+            yield
+
+        writer = WriteBehindQueue(session_factory=broken_session, max_retries=1,
+                                  dead_letter_path=str(tmp_path / "failed.ndjson"))
+        writer.submit(audit_record(action="prediction"))
+        writer.stop()
+
+        assert writer.stats["dead_lettered"] == 1
+        assert '"kind": "audit"' in (tmp_path / "failed.ndjson").read_text()
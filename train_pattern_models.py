@@ -83,25 +83,15 @@ class PatternModelTrainer:
         self.pattern_assignments = []
         self.pattern_details = []
         
-        for i in range(len(self.X)):
-            if i % 1000 == 0:
-                logger.info(f"Processing sample {i}/{len(self.X)}")
-            
-            # Get CAMP scores for this sample
-            camp_dict = {
-                'capital_score': self.camp_scores.iloc[i]['capital_score'],
-                'advantage_score': self.camp_scores.iloc[i]['advantage_score'],
-                'market_score': self.camp_scores.iloc[i]['market_score'],
-                'people_score': self.camp_scores.iloc[i]['people_score']
-            }
-            
-            # Match pattern
-            analysis = self.pattern_matcher.match_patterns(
-                self.X.iloc[i:i+1],
-                camp_dict,
-                top_k=3
-            )
-            
+        # Match patterns for all samples in one vectorized pass
+        camp_columns = ['capital_score', 'advantage_score', 'market_score', 'people_score']
+        analyses = self.pattern_matcher.match_patterns_batch(
+            self.X,
+            self.camp_scores[camp_columns],
+            top_k=3
+        )
+        
+        for analysis in analyses:
             self.pattern_assignments.append(analysis.primary_pattern.pattern_name)
             self.pattern_details.append({
                 'primary': analysis.primary_pattern.pattern_name,
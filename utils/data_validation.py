@@ -2,10 +2,13 @@
 Comprehensive data validation for startup predictions
 """
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Callable, List, Tuple, Optional
 from datetime import datetime
 import re
 
+import numpy as np
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -297,172 +300,216 @@ class DataValidator:
             - errors: List of error messages
             - cleaned_data: Cleaned and validated data
         """
-        errors = []
-        warnings = []
-        cleaned_data = {}
+        return self.validate_records([data])[0]
+    
+    def validate_records(self, records: List[Dict[str, Any]]) -> List[Tuple[bool, List[str], Dict[str, Any]]]:
+        """Validate a batch of startup dicts; one (is_valid, errors, cleaned_data) per record"""
+        if not records:
+            return []
+        
+        is_valid, errors, cols = self._validate_columns(_record_columns(records))
+        
+        # Validated fields take their cleaned value; invalid ones are dropped
+        fields = [field for field in cols.columns if field in self.validation_rules]
+        cleaned = {field: cols.cleaned(field).tolist() for field in fields}
+        valid = {field: cols.has(field).tolist() for field in fields}
+        dropped = {field: (~cols.has(field) & ~cols.missing(field)).tolist() for field in fields}
+        
+        results = []
+        for i, record in enumerate(records):
+            cleaned_data = dict(record)
+            for field in fields:
+                if valid[field][i]:
+                    cleaned_data[field] = cleaned[field][i]
+                elif dropped[field][i]:
+                    del cleaned_data[field]
+            results.append((bool(is_valid[i]), errors[i], cleaned_data))
+        return results
+    
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[List[str]], pd.DataFrame]:
+        """
+        Validate one startup per row, e.g. a bulk scoring CSV
+        
+        Returns:
+            - is_valid: Boolean mask over the rows
+            - errors: List of error messages for each row
+            - cleaned: The frame with validated fields converted, and invalid values blanked
+        """
+        is_valid, errors, cols = self._validate_columns({field: df[field].to_numpy() for field in df.columns})
+        
+        cleaned = df.copy()
+        for field in df.columns:
+            if field in self.validation_rules:
+                cleaned[field] = cols.cleaned(field)
+        return is_valid, errors, cleaned
+    
+    def _validate_columns(self, columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, List[List[str]], "_Columns"]:
+        """Run every rule over whole columns, collecting messages per row"""
+        cols = _Columns(columns)
+        errors = _RowMessages(cols.n)
+        warnings = _RowMessages(cols.n)
         
         # 1. Field-level validation
-        for field, value in data.items():
-            if field not in self.validation_rules:
-                # Unknown field - just pass through
-                cleaned_data[field] = value
-                continue
-            
-            rule = self.validation_rules[field]
-            field_errors, cleaned_value = self._validate_field(field, value, rule)
-            
-            if field_errors:
-                errors.extend(field_errors)
-            else:
-                cleaned_data[field] = cleaned_value
+        self._validate_fields(cols, errors)
         
-        # 2. Cross-field validation
+        # 2. Cross-field validation, for rows where all of the rule's fields are valid
         for rule in self.cross_field_rules:
-            # Check if all required fields are present
-            if all(field in cleaned_data for field in rule["fields"]):
-                rule_errors, rule_warnings = rule["validator"](cleaned_data)
-                errors.extend(rule_errors)
-                warnings.extend(rule_warnings)
+            applies = np.logical_and.reduce([cols.has(field) for field in rule["fields"]])
+            if applies.any():
+                rule["validator"](cols, applies, errors, warnings)
         
         # 3. Business logic validation
-        business_errors = self._validate_business_logic(cleaned_data)
-        errors.extend(business_errors)
-        
-        is_valid = len(errors) == 0
+        self._validate_business_logic(cols, errors)
         
         # Log warnings (non-blocking)
-        for warning in warnings:
-            logger.warning(f"Validation warning: {warning}")
+        for row in warnings.rows:
+            for warning in row:
+                logger.warning(f"Validation warning: {warning}")
         
-        return is_valid, errors, cleaned_data
+        is_valid = np.fromiter((not row for row in errors.rows), dtype=bool, count=cols.n)
+        return is_valid, errors.rows, cols
     
-    def _validate_field(self, field: str, value: Any, rule: Dict[str, Any]) -> Tuple[List[str], Any]:
-        """Validate a single field"""
-        errors = []
-        cleaned_value = value
-        
-        # Check if field is required
-        if rule.get("required", False) and (value is None or value == ""):
-            errors.append(f"{field} is required")
-            return errors, None
-        
-        # Skip validation if value is None and not required
-        if value is None:
-            return errors, None
-        
-        # Type validation
-        if rule["type"] == "numeric":
+    def _validate_fields(self, cols: "_Columns", errors: "_RowMessages"):
+        """Validate every field in the batch; numeric rules are checked as one matrix"""
+        fields = [field for field in cols.columns if field in self.validation_rules]
+        numeric = [field for field in fields if self.validation_rules[field]["type"] == "numeric"]
+        messages = {}
+        
+        if numeric:
+            rules = [self.validation_rules[field] for field in numeric]
+            raw = np.stack([cols.raw(field).astype(object) for field in numeric], axis=1)
+            missing = pd.isna(raw)
+            for j, field in enumerate(numeric):
+                cols.set_missing(field, missing[:, j].copy())
+            
+            # Check if field is required
+            required = np.array([rule.get("required", False) for rule in rules])
+            empty = required & (missing | (raw == ""))
+            missing |= empty
+            
+            # Type validation
             try:
-                cleaned_value = float(value)
-                
-                # Range validation
-                if "min" in rule and cleaned_value < rule["min"]:
-                    errors.append(f"{field} must be >= {rule['min']} (got {cleaned_value})")
-                
-                if "max" in rule and cleaned_value > rule["max"]:
-                    errors.append(f"{field} must be <= {rule['max']} (got {cleaned_value})")
-                
-                # Integer validation
-                if rule.get("integer", False) and not cleaned_value.is_integer():
-                    errors.append(f"{field} must be an integer (got {cleaned_value})")
-                    
+                value = np.where(missing, np.nan, raw).astype(float)
+                invalid = np.zeros(raw.shape, dtype=bool)
             except (ValueError, TypeError):
-                errors.append(f"{field} must be a number (got {type(value).__name__})")
-        
-        elif rule["type"] == "enum":
-            if value not in rule["values"]:
-                errors.append(f"{field} must be one of {rule['values']} (got {value})")
-        
-        return errors, cleaned_value
+                value = np.empty(raw.shape)
+                invalid = np.zeros(raw.shape, dtype=bool)
+                for j in range(len(numeric)):
+                    try:
+                        value[:, j] = np.where(missing[:, j], np.nan, raw[:, j]).astype(float)
+                    except (ValueError, TypeError):
+                        value[:, j], invalid[:, j] = _to_float(raw[:, j], missing[:, j])
+            checked = ~missing & ~invalid
+            
+            # Range and integer validation
+            minimum = np.array([rule.get("min", -np.inf) for rule in rules])
+            maximum = np.array([rule.get("max", np.inf) for rule in rules])
+            integer = np.array([rule.get("integer", False) for rule in rules])
+            below = checked & (value < minimum)
+            above = checked & (value > maximum)
+            fractional = checked & integer & ~(np.isfinite(value) & (np.floor(value) == value))
+            failed = empty | invalid | below | above | fractional
+            
+            for j in np.flatnonzero(failed.any(axis=0)):
+                field, rule, column = numeric[j], rules[j], value[:, j]
+                messages[field] = [
+                    (empty[:, j], lambda i, field=field: f"{field} is required"),
+                    (invalid[:, j], lambda i, field=field, j=j: f"{field} must be a number (got {type(raw[i, j]).__name__})"),
+                    (below[:, j], lambda i, field=field, rule=rule, column=column:
+                        f"{field} must be >= {rule['min']} (got {float(column[i])})"),
+                    (above[:, j], lambda i, field=field, rule=rule, column=column:
+                        f"{field} must be <= {rule['max']} (got {float(column[i])})"),
+                    (fractional[:, j], lambda i, field=field, column=column:
+                        f"{field} must be an integer (got {float(column[i])})"),
+                ]
+            valid = ~missing & ~failed
+            for j, field in enumerate(numeric):
+                cols.set(field, value[:, j], valid[:, j])
+        
+        for field in fields:
+            rule = self.validation_rules[field]
+            if rule["type"] != "enum":
+                continue
+            raw_values = cols.raw(field)
+            missing = cols.missing(field)
+            empty = (missing | (raw_values == "")) if rule.get("required", False) else np.zeros(cols.n, dtype=bool)
+            invalid = ~missing & ~empty & ~_isin(raw_values, rule["values"])
+            messages[field] = [
+                (empty, lambda i, field=field: f"{field} is required"),
+                (invalid, lambda i, field=field, rule=rule, raw_values=raw_values:
+                    f"{field} must be one of {rule['values']} (got {raw_values[i]})"),
+            ]
+            cols.set(field, raw_values, ~missing & ~empty & ~invalid)
+        
+        # Messages follow the order fields appear in the batch
+        for field in fields:
+            for mask, message in messages.get(field, ()):
+                errors.add(mask, message)
     
-    def _validate_runway_consistency(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    def _validate_runway_consistency(self, cols: "_Columns", applies: np.ndarray,
+                                     errors: "_RowMessages", warnings: "_RowMessages"):
         """Validate runway calculation consistency"""
-        errors = []
-        warnings = []
-        
-        cash = data.get("cash_on_hand_usd")
-        burn = data.get("monthly_burn_usd")
-        runway = data.get("runway_months")
+        cash = cols.number("cash_on_hand_usd")
+        burn = cols.number("monthly_burn_usd")
+        runway = cols.number("runway_months")
         
-        if cash is not None and burn is not None and burn > 0 and runway is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
             calculated_runway = cash / burn
-            
-            # Allow 20% tolerance
-            if abs(calculated_runway - runway) > max(2, runway * 0.2):
-                warnings.append(
-                    f"Runway inconsistency: {runway} months reported, "
-                    f"but {calculated_runway:.1f} months calculated from cash/burn"
-                )
         
-        return errors, warnings
+        # Allow 20% tolerance
+        inconsistent = applies & (burn > 0) & (np.abs(calculated_runway - runway) > np.maximum(2, runway * 0.2))
+        warnings.add(inconsistent, lambda i: (
+            f"Runway inconsistency: {float(runway[i])} months reported, "
+            f"but {calculated_runway[i]:.1f} months calculated from cash/burn"
+        ))
     
-    def _validate_market_hierarchy(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    def _validate_market_hierarchy(self, cols: "_Columns", applies: np.ndarray,
+                                   errors: "_RowMessages", warnings: "_RowMessages"):
         """Validate TAM > SAM > SOM"""
-        errors = []
-        warnings = []
-        
-        tam = data.get("tam_size_usd")
-        sam = data.get("sam_size_usd")
-        som = data.get("som_size_usd")
+        tam = cols.number("tam_size_usd")
+        sam = cols.number("sam_size_usd")
+        som = cols.number("som_size_usd")
         
         # Skip validation if TAM is 0 (user hasn't entered market data yet)
-        if tam == 0:
-            if sam != 0 or som != 0:
-                warnings.append("TAM is 0 but SAM/SOM have values - please enter TAM first")
-            return errors, warnings
-        
-        if tam is not None and sam is not None and sam > tam:
-            errors.append(f"SAM (${sam:,.0f}) cannot be larger than TAM (${tam:,.0f})")
-        
-        if sam is not None and som is not None and som > sam:
-            errors.append(f"SOM (${som:,.0f}) cannot be larger than SAM (${sam:,.0f})")
-        
-        if tam is not None and som is not None and som > tam:
-            errors.append(f"SOM (${som:,.0f}) cannot be larger than TAM (${tam:,.0f})")
-        
-        return errors, warnings
+        no_tam = applies & (tam == 0)
+        warnings.add(no_tam & ((sam != 0) | (som != 0)),
+                     lambda i: "TAM is 0 but SAM/SOM have values - please enter TAM first")
+        applies = applies & ~no_tam
+        
+        errors.add(applies & (sam > tam),
+                   lambda i: f"SAM (${sam[i]:,.0f}) cannot be larger than TAM (${tam[i]:,.0f})")
+        errors.add(applies & (som > sam),
+                   lambda i: f"SOM (${som[i]:,.0f}) cannot be larger than SAM (${sam[i]:,.0f})")
+        errors.add(applies & (som > tam),
+                   lambda i: f"SOM (${som[i]:,.0f}) cannot be larger than TAM (${tam[i]:,.0f})")
     
-    def _validate_retention_consistency(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    def _validate_retention_consistency(self, cols: "_Columns", applies: np.ndarray,
+                                        errors: "_RowMessages", warnings: "_RowMessages"):
         """Validate that 90d retention <= 30d retention"""
-        errors = []
-        warnings = []
+        retention_30d = cols.number("product_retention_30d")
+        retention_90d = cols.number("product_retention_90d")
         
-        retention_30d = data.get("product_retention_30d")
-        retention_90d = data.get("product_retention_90d")
-        
-        if retention_30d is not None and retention_90d is not None:
-            if retention_90d > retention_30d:
-                errors.append(
-                    f"90-day retention ({retention_90d:.1%}) cannot be higher than "
-                    f"30-day retention ({retention_30d:.1%})"
-                )
-        
-        return errors, warnings
+        errors.add(applies & (retention_90d > retention_30d), lambda i: (
+            f"90-day retention ({retention_90d[i]:.1%}) cannot be higher than "
+            f"30-day retention ({retention_30d[i]:.1%})"
+        ))
     
-    def _validate_experience_logic(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    def _validate_experience_logic(self, cols: "_Columns", applies: np.ndarray,
+                                   errors: "_RowMessages", warnings: "_RowMessages"):
         """Validate that domain expertise <= total experience"""
-        errors = []
-        warnings = []
-        
-        total_exp = data.get("years_experience_avg")
-        domain_exp = data.get("domain_expertise_years_avg")
-        
-        if total_exp is not None and domain_exp is not None:
-            if domain_exp > total_exp:
-                warnings.append(
-                    f"Domain expertise ({domain_exp} years) exceeds total experience "
-                    f"({total_exp} years)"
-                )
+        total_exp = cols.number("years_experience_avg")
+        domain_exp = cols.number("domain_expertise_years_avg")
         
-        return errors, warnings
+        warnings.add(applies & (domain_exp > total_exp), lambda i: (
+            f"Domain expertise ({float(domain_exp[i])} years) exceeds total experience "
+            f"({float(total_exp[i])} years)"
+        ))
     
-    def _validate_funding_capital_consistency(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    def _validate_funding_capital_consistency(self, cols: "_Columns", applies: np.ndarray,
+                                              errors: "_RowMessages", warnings: "_RowMessages"):
         """Validate funding stage matches capital raised"""
-        errors = []
-        warnings = []
-        
-        stage = data.get("funding_stage")
-        capital = data.get("total_capital_raised_usd", 0)
+        stage = cols.cleaned("funding_stage")
+        capital = cols.number("total_capital_raised_usd")
         
         # Typical ranges by stage
         stage_ranges = {
@@ -474,76 +521,157 @@ class DataValidator:
             "growth": (50_000_000, float('inf'))
         }
         
-        if stage in stage_ranges and capital > 0:
-            min_cap, max_cap = stage_ranges[stage]
-            if capital < min_cap * 0.5:  # Allow some flexibility
-                warnings.append(
-                    f"Capital raised (${capital:,.0f}) seems low for {stage} stage "
-                    f"(typical: ${min_cap:,.0f}-${max_cap:,.0f})"
-                )
-            elif capital > max_cap * 2:  # Allow some flexibility
-                warnings.append(
-                    f"Capital raised (${capital:,.0f}) seems high for {stage} stage "
-                    f"(typical: ${min_cap:,.0f}-${max_cap:,.0f})"
-                )
-        
-        return errors, warnings
+        for name, (min_cap, max_cap) in stage_ranges.items():
+            at_stage = applies & (stage == name) & (capital > 0)
+            low = at_stage & (capital < min_cap * 0.5)  # Allow some flexibility
+            high = at_stage & ~low & (capital > max_cap * 2)  # Allow some flexibility
+            warnings.add(low, lambda i: (
+                f"Capital raised (${capital[i]:,.0f}) seems low for {name} stage "
+                f"(typical: ${min_cap:,.0f}-${max_cap:,.0f})"
+            ))
+            warnings.add(high, lambda i: (
+                f"Capital raised (${capital[i]:,.0f}) seems high for {name} stage "
+                f"(typical: ${min_cap:,.0f}-${max_cap:,.0f})"
+            ))
     
-    def _validate_ltv_cac_consistency(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    def _validate_ltv_cac_consistency(self, cols: "_Columns", applies: np.ndarray,
+                                      errors: "_RowMessages", warnings: "_RowMessages"):
         """Validate LTV/CAC ratio makes sense"""
-        errors = []
-        warnings = []
-        
-        ltv_cac = data.get("ltv_cac_ratio")
-        
-        if ltv_cac is not None:
-            if ltv_cac < 0:
-                errors.append("LTV/CAC ratio cannot be negative")
-            elif ltv_cac < 1:
-                warnings.append(
-                    f"LTV/CAC ratio of {ltv_cac:.2f} indicates negative unit economics"
-                )
-            elif ltv_cac > 20:
-                warnings.append(
-                    f"LTV/CAC ratio of {ltv_cac:.2f} seems unusually high"
-                )
+        ltv_cac = cols.number("ltv_cac_ratio")
         
-        return errors, warnings
+        errors.add(applies & (ltv_cac < 0), lambda i: "LTV/CAC ratio cannot be negative")
+        warnings.add(applies & (ltv_cac >= 0) & (ltv_cac < 1),
+                     lambda i: f"LTV/CAC ratio of {ltv_cac[i]:.2f} indicates negative unit economics")
+        warnings.add(applies & (ltv_cac > 20),
+                     lambda i: f"LTV/CAC ratio of {ltv_cac[i]:.2f} seems unusually high")
     
-    def _validate_business_logic(self, data: Dict[str, Any]) -> List[str]:
+    def _validate_business_logic(self, cols: "_Columns", errors: "_RowMessages"):
         """Additional business logic validations"""
-        errors = []
-        
         # Check for suspicious combinations
-        stage = data.get("funding_stage")
-        product_stage = data.get("product_stage")
+        stage = cols.cleaned("funding_stage")
+        product_stage = cols.cleaned("product_stage")
         
         # Series B+ should not be at concept/prototype stage
-        if stage in ["series_b", "series_c", "growth"] and product_stage in ["concept", "prototype"]:
-            errors.append(
-                f"Unusual: {stage} company still at {product_stage} stage"
-            )
+        late_stage = _isin(stage, ["series_b", "series_c", "growth"])
+        early_product = _isin(product_stage, ["concept", "prototype"])
+        errors.add(late_stage & early_product,
+                   lambda i: f"Unusual: {stage[i]} company still at {product_stage[i]} stage")
         
         # Growth stage checks
-        if stage == "growth":
-            revenue = data.get("annual_revenue_run_rate", 0)
-            if revenue < 10_000_000:  # $10M ARR
-                errors.append(
-                    f"Growth stage companies typically have >$10M ARR (reported: ${revenue:,.0f})"
-                )
+        revenue = cols.number("annual_revenue_run_rate", default=0)
+        errors.add((stage == "growth") & (revenue < 10_000_000),  # $10M ARR
+                   lambda i: f"Growth stage companies typically have >$10M ARR (reported: ${revenue[i]:,.0f})")
         
         # Team size checks
-        team_size = data.get("team_size_full_time", 0)
-        capital = data.get("total_capital_raised_usd", 0)
+        team_size = cols.number("team_size_full_time", default=0)
+        capital = cols.number("total_capital_raised_usd", default=0)
         
-        if team_size > 0 and capital > 0:
+        with np.errstate(divide="ignore", invalid="ignore"):
             capital_per_employee = capital / team_size
-            if capital_per_employee < 10_000:  # Less than $10K per employee
-                errors.append(
-                    f"Unusually low capital per employee: ${capital_per_employee:,.0f}"
-                )
-        
-        return errors
+        errors.add((team_size > 0) & (capital > 0) & (capital_per_employee < 10_000),  # Less than $10K per employee
+                   lambda i: f"Unusually low capital per employee: ${capital_per_employee[i]:,.0f}")
+
+
+class _Columns:
+    """Column-wise view of a batch of startups: raw values plus validated ones per field"""
+    
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.n = len(next(iter(columns.values()))) if columns else 0
+        self._validated: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._missing: Dict[str, np.ndarray] = {}
+    
+    def raw(self, field: str) -> np.ndarray:
+        if field not in self.columns:
+            return np.full(self.n, None, dtype=object)
+        return self.columns[field]
+    
+    def missing(self, field: str) -> np.ndarray:
+        if field not in self._missing:
+            self._missing[field] = pd.isna(self.raw(field))
+        return self._missing[field]
+    
+    def set_missing(self, field: str, missing: np.ndarray):
+        self._missing[field] = missing
+    
+    def set(self, field: str, values: np.ndarray, valid: np.ndarray):
+        self._validated[field] = (values, valid)
+    
+    def has(self, field: str) -> np.ndarray:
+        """Rows where the field is present (and passed its field rule, if it has one)"""
+        if field in self._validated:
+            return self._validated[field][1]
+        return ~self.missing(field)
+    
+    def cleaned(self, field: str) -> np.ndarray:
+        """Validated values, NaN / None where missing or invalid"""
+        if field not in self._validated:
+            return np.where(self.has(field), self.raw(field), None)
+        values, valid = self._validated[field]
+        if values.dtype == object:
+            return np.where(valid, values, None)
+        return np.where(valid, values, np.nan)
+    
+    def number(self, field: str, default: float = np.nan) -> np.ndarray:
+        """Validated values as floats, ``default`` where missing or invalid"""
+        if field in self._validated:
+            values, valid = self._validated[field]
+        else:
+            values, invalid = _to_float(self.raw(field), self.missing(field))
+            valid = ~self.missing(field) & ~invalid
+        return np.where(valid, values, default).astype(float)
+
+
+class _RowMessages:
+    """Messages collected per row"""
+    
+    def __init__(self, n: int):
+        self.rows: List[List[str]] = [[] for _ in range(n)]
+    
+    def add(self, mask: np.ndarray, message: Callable[[int], str]):
+        if not mask.any():
+            return
+        for i in np.flatnonzero(mask):
+            self.rows[i].append(message(i))
+
+
+def _record_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """One array per field, in the order fields first appear"""
+    if len(records) == 1:
+        # Building a DataFrame costs more than validating a single record
+        columns = {}
+        for field, value in records[0].items():
+            columns[field] = np.empty(1, dtype=object)
+            columns[field][0] = value
+        return columns
+    frame = pd.DataFrame(records)
+    return {field: frame[field].to_numpy() for field in frame.columns}
+
+
+def _isin(values: np.ndarray, allowed: List[Any]) -> np.ndarray:
+    """``value in allowed`` per value"""
+    try:
+        lookup = set(allowed)
+        return np.fromiter((value in lookup for value in values), dtype=bool, count=len(values))
+    except TypeError:
+        # Unhashable values: fall back to list membership
+        return np.fromiter((value in allowed for value in values), dtype=bool, count=len(values))
+
+
+def _to_float(raw: np.ndarray, missing: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(float(value), conversion failed) per value; NaN where missing"""
+    if raw.dtype.kind in "biuf":
+        return raw.astype(float), np.zeros(len(raw), dtype=bool)
+    
+    values = np.asarray(pd.to_numeric(raw, errors="coerce"), dtype=float)
+    invalid = np.zeros(len(raw), dtype=bool)
+    # float() also accepts spellings pandas doesn't ("1_000", "nan"), so those are retried one by one
+    for i in np.flatnonzero(~missing & np.isnan(values)):
+        try:
+            values[i] = float(raw[i])
+        except (ValueError, TypeError):
+            invalid[i] = True
+    return values, invalid
 
 
 # Global validator instance
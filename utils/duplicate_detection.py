@@ -0,0 +1,333 @@
+"""
+Blocked fuzzy duplicate detection for company databases
+Candidate pairs come from cheap blocking keys (exact normalised name, domain
+stem, MinHash LSH buckets over name trigrams); only those pairs are scored, so
+the cost grows with the number of near-duplicates rather than with n².
+"""
+
+import re
+import zlib
+import logging
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Words dropped before names are compared
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'gmbh', 'ag', 'sa', 'sas', 'bv', 'plc', 'pty', 'oy', 'ab', 'srl', 'holdings', 'group'
+}
+# Second-level labels that are part of a country TLD (acme.co.uk -> acme)
+COMPOUND_TLD_LABELS = {'co', 'com', 'org', 'net', 'ac', 'gov', 'edu'}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+
+
+def normalize_name(name: Any) -> str:
+    """Lower-case name with punctuation and legal suffixes removed"""
+    if not isinstance(name, str):
+        return ''
+    words = _NON_ALNUM.sub(' ', name.lower().replace('&', ' and ')).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def normalize_domain(url: Any) -> str:
+    """Host of a website without scheme, port, path or leading www."""
+    if not isinstance(url, str) or not url.strip():
+        return ''
+    url = url.strip().lower()
+    host = urlsplit(url if '//' in url else f'//{url}').hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def domain_stem(domain: str) -> str:
+    """Registrable label of a domain (acme.io, app.acme.co.uk -> acme)"""
+    labels = domain.split('.')
+    if len(labels) > 2 and labels[-2] in COMPOUND_TLD_LABELS and len(labels[-1]) == 2:
+        labels = labels[:-1]
+    return labels[-2] if len(labels) >= 2 else domain
+
+
+def similarity(a: Sequence[str], b: Sequence[str]) -> np.ndarray:
+    """Element-wise 0-100 similarity of two equal-length string lists (fuzz.ratio)"""
+    if not len(a):
+        return np.zeros(0, dtype=np.float32)
+    if RAPIDFUZZ_AVAILABLE and hasattr(process, 'cpdist'):
+        return process.cpdist(a, b, scorer=fuzz.ratio, dtype=np.float32, workers=-1)
+    if RAPIDFUZZ_AVAILABLE:
+        return np.fromiter((fuzz.ratio(x, y) for x, y in zip(a, b)), dtype=np.float32, count=len(a))
+    return np.fromiter(
+        (100.0 * SequenceMatcher(None, x, y).ratio() if x and y else 0.0 for x, y in zip(a, b)),
+        dtype=np.float32, count=len(a)
+    )
+
+
+@dataclass
+class DuplicateCluster:
+    """Records judged to be the same company, linked by scored pairs"""
+    ids: List[Any]
+    names: List[str]
+    score: float  # mean score of the linking pairs
+    min_score: float
+    pair_count: int
+
+
+class DuplicateDetector:
+    """
+    Finds duplicate companies in a DataFrame of ids, names and websites
+
+    Blocking: records with the same normalised name are linked directly;
+    distinct names are grouped by MinHash LSH over character trigrams
+    (``bands`` x ``rows`` hash functions) and compared with their ``window``
+    neighbours in sorted and reverse-sorted order, which catches typos in
+    short names; domain stems are blocked the same two ways. Candidate pairs from every block are deduplicated, then scored with
+    fuzz.ratio on names and domains in one vectorised pass, keeping pairs
+    whose better score reaches ``threshold``. Blocks larger than
+    ``max_block_size`` are compared only within a sliding ``window`` over
+    their sorted members, so a single very common key cannot bring back n²
+    work.
+    """
+
+    def __init__(self, threshold: float = 85.0, bands: int = 20, rows: int = 4,
+                 max_block_size: int = 200, window: int = 10, max_shingle_share: float = 0.005,
+                 chunk_size: int = 5000, seed: int = 42):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.max_block_size = max_block_size
+        self.window = window
+        self.max_shingle_share = max_shingle_share
+        self.chunk_size = chunk_size
+
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        # Coefficients below 2**32 keep a * x + b within uint64 for 32-bit shingle hashes
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        if not RAPIDFUZZ_AVAILABLE:
+            logger.info("rapidfuzz not installed. Scoring candidate pairs with difflib.")
+
+    def find_pairs(self, df: pd.DataFrame, id_col: str = 'company_id', name_col: str = 'company_name',
+                   website_col: Optional[str] = 'website') -> pd.DataFrame:
+        """
+        Scored pairs linking duplicate records (id_a, id_b, name_score, domain_score, score)
+
+        Records sharing a normalised name are linked to the first of them
+        rather than to each other, so the pairs form a spanning set for the
+        clusters instead of every combination.
+        """
+        ids = df[id_col].to_numpy()
+        names = df[name_col].map(normalize_name).to_numpy(dtype=object)
+        domains = (df[website_col].map(normalize_domain).to_numpy(dtype=object)
+                   if website_col and website_col in df else np.full(len(df), '', dtype=object))
+
+        left, right = self._candidates(names, domains)
+
+        # fuzz.ratio can't exceed 200 * shorter / (sum of lengths); drop pairs that can't reach the threshold
+        has_domains = (domains[left] != '') & (domains[right] != '')
+        bound = np.maximum(_ratio_bound(names, left, right),
+                           np.where(has_domains, _ratio_bound(domains, left, right), 0.0))
+        reachable = bound >= self.threshold
+        left, right, has_domains = left[reachable], right[reachable], has_domains[reachable]
+
+        name_score = similarity(names[left].tolist(), names[right].tolist())
+        domain_score = np.zeros_like(name_score)
+        domain_score[has_domains] = similarity(domains[left][has_domains].tolist(),
+                                               domains[right][has_domains].tolist())
+        score = np.maximum(name_score, domain_score)
+        keep = score >= self.threshold
+
+        return pd.DataFrame({
+            'index_a': left[keep], 'index_b': right[keep],
+            'id_a': ids[left[keep]], 'id_b': ids[right[keep]],
+            'name_score': name_score[keep], 'domain_score': domain_score[keep], 'score': score[keep]
+        })
+
+    def find_clusters(self, df: pd.DataFrame, id_col: str = 'company_id', name_col: str = 'company_name',
+                      website_col: Optional[str] = 'website') -> List[DuplicateCluster]:
+        """Connected groups of duplicate records, largest first"""
+        pairs = self.find_pairs(df, id_col=id_col, name_col=name_col, website_col=website_col)
+        if pairs.empty:
+            return []
+
+        n = len(df)
+        graph = coo_matrix((np.ones(len(pairs)), (pairs['index_a'], pairs['index_b'])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        sizes = np.bincount(labels)
+
+        pair_labels = labels[pairs['index_a'].to_numpy()]
+        scores = pd.Series(pairs['score'].to_numpy()).groupby(pair_labels).agg(['mean', 'min', 'size'])
+        ids = df[id_col].to_numpy()
+        raw_names = df[name_col].to_numpy()
+
+        order = np.argsort(labels, kind='stable')
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        clusters = []
+        for members in np.split(order, bounds):
+            label = labels[members[0]]
+            if sizes[label] < 2:
+                continue
+            stats = scores.loc[label]
+            clusters.append(DuplicateCluster(
+                ids=ids[members].tolist(), names=raw_names[members].tolist(),
+                score=float(stats['mean']), min_score=float(stats['min']), pair_count=int(stats['size'])
+            ))
+        clusters.sort(key=lambda c: (-len(c.ids), -c.score))
+        return clusters
+
+    def _candidates(self, names: np.ndarray, domains: np.ndarray):
+        """Deduplicated (left, right) record index pairs from every blocking key"""
+        n = len(names)
+        pair_keys = []
+
+        def add(left: np.ndarray, right: np.ndarray):
+            # One int64 per unordered pair keeps the candidate set compact before deduplication
+            lo, hi = np.minimum(left, right).astype(np.int64), np.maximum(left, right).astype(np.int64)
+            pair_keys.append(lo[lo != hi] * n + hi[lo != hi])
+
+        # Exact normalised names: star links to the group's first record
+        unique_names, first, inverse = np.unique(names, return_index=True, return_inverse=True)
+        duplicates = np.flatnonzero(first[inverse] != np.arange(n))
+        named = unique_names != ''
+        duplicates = duplicates[named[inverse[duplicates]]]
+        add(first[inverse[duplicates]], duplicates)
+
+        # Near-identical names, compared once per distinct name via its first record
+        distinct, representatives = unique_names[named], first[named]
+        signatures = self._minhash(distinct.tolist())
+        for band in range(self.bands):
+            keys = self._band_keys(signatures[:, band * self.rows:(band + 1) * self.rows])
+            add(*self._pairs_within(keys, representatives, distinct))
+
+        # Typos: neighbours in the sorted and in the reverse-sorted name lists
+        add(*self._neighbours(distinct, representatives))
+
+        # Same company on another TLD or subdomain, and typos in the domain
+        stems = np.array([domain_stem(d) if d else '' for d in domains], dtype=object)
+        has_stem = np.flatnonzero(stems != '')
+        if len(has_stem):
+            _, stem_keys = np.unique(stems[has_stem], return_inverse=True)
+            add(*self._pairs_within(stem_keys, has_stem, domains[has_stem]))
+            add(*self._neighbours(stems[has_stem], has_stem))
+
+        keys = np.unique(np.concatenate(pair_keys))
+        return keys // n, keys % n
+
+    def _minhash(self, names: List[str]) -> np.ndarray:
+        """
+        (len(names), bands * rows) MinHash signatures of padded character trigrams
+
+        Trigrams found in more than ``max_shingle_share`` of names (those of
+        "technologies", "health", ...) are left out, as they would put
+        unrelated companies in the same buckets; a name made only of such
+        trigrams keeps them all.
+        """
+        shingles, owners = [], []
+        for owner, name in enumerate(names):
+            padded = f' {name} '
+            grams = {zlib.crc32(padded[i:i + 3].encode()) for i in range(len(padded) - 2)}
+            shingles.extend(grams)
+            owners.extend([owner] * len(grams))
+        hashes = np.array(shingles, dtype=np.uint64)
+        owners = np.array(owners, dtype=np.int64)
+
+        _, inverse, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+        common = counts[inverse.ravel()] > max(2, self.max_shingle_share * len(names))
+        rare_per_name = np.bincount(owners[~common], minlength=len(names))
+        keep = ~common | (rare_per_name[owners] == 0)
+        hashes, owners = hashes[keep], owners[keep]
+
+        signatures = np.empty((len(names), len(self._a)), dtype=np.uint64)
+        starts = np.searchsorted(owners, np.arange(len(names)))
+        for first in range(0, len(names), self.chunk_size):
+            last = min(first + self.chunk_size, len(names))
+            lo, hi = starts[first], starts[last] if last < len(names) else len(hashes)
+            permuted = (np.outer(hashes[lo:hi], self._a) + self._b) % _MERSENNE_PRIME
+            signatures[first:last] = np.minimum.reduceat(permuted, starts[first:last] - lo, axis=0)
+        return signatures
+
+    def _neighbours(self, values: np.ndarray, members: np.ndarray):
+        """Pairs of ``members`` within ``window`` of each other when sorted by value and by reversed value"""
+        left, right = [], []
+        for sort_key in (values, np.array([value[::-1] for value in values], dtype=object)):
+            order = members[np.argsort(sort_key, kind='stable')]
+            i, j = _window_indices(len(order), self.window)
+            left.append(order[i])
+            right.append(order[j])
+        return np.concatenate(left), np.concatenate(right)
+
+    @staticmethod
+    def _band_keys(band: np.ndarray) -> np.ndarray:
+        """One integer per row of a signature band; equal bands give equal keys"""
+        keys = band[:, 0].copy()
+        for column in range(1, band.shape[1]):
+            keys *= np.uint64(0x9E3779B97F4A7C15)
+            keys ^= band[:, column]
+        return keys
+
+    def _pairs_within(self, keys: np.ndarray, members: np.ndarray, sort_values: np.ndarray):
+        """Index pairs of ``members`` sharing a key, windowed inside oversized blocks"""
+        order = np.argsort(keys, kind='stable')
+        keys, members, sort_values = keys[order], members[order], sort_values[order]
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        starts = np.concatenate(([0], bounds))
+        sizes = np.diff(np.concatenate((starts, [len(keys)])))
+
+        left, right = [], []
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            block = members[start:start + size]
+            if size <= self.max_block_size:
+                i, j = _triu_indices(size)
+            else:
+                logger.debug(f"Block of {size} records compared within a window of {self.window}")
+                block = block[np.argsort(sort_values[start:start + size], kind='stable')]
+                i, j = _window_indices(size, self.window)
+            left.append(block[i])
+            right.append(block[j])
+        if not left:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(left), np.concatenate(right)
+
+
+def _ratio_bound(values: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Highest fuzz.ratio each pair could score given only the string lengths"""
+    lengths = np.fromiter((len(v) for v in values), dtype=np.float32, count=len(values))
+    a, b = lengths[left], lengths[right]
+    total = a + b
+    return np.divide(200.0 * np.minimum(a, b), total, out=np.zeros_like(total), where=total > 0)
+
+
+_TRIU_CACHE: Dict[int, tuple] = {}
+
+
+def _triu_indices(size: int):
+    if size not in _TRIU_CACHE:
+        _TRIU_CACHE[size] = np.triu_indices(size, k=1)
+    return _TRIU_CACHE[size]
+
+
+def _window_indices(size: int, window: int):
+    """Pairs (i, i + 1..window) of a sorted block"""
+    offsets = np.arange(1, window)
+    i = np.repeat(np.arange(size), len(offsets))
+    j = i + np.tile(offsets, size)
+    inside = j < size
+    return i[inside], j[inside]
@@ -0,0 +1,259 @@
+"""
+Persistent explanation cache
+SHAP vectors and rendered plots keyed by model checksum and feature vector
+"""
+
+import os
+import json
+import math
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import numbers
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("EXPLANATION_CACHE_PATH", "data/explanation_cache.db")
+DEFAULT_MAX_BYTES = int(os.getenv("EXPLANATION_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# Eviction trims the cache to this fraction of max_bytes so it does not run on every put
+EVICTION_TARGET = 0.9
+# SQLite limits the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+
+def canonical_features(values: Iterable[Any]) -> List[Any]:
+    """
+    Normalise a feature vector so equal inputs produce equal keys
+
+    Numbers of any type become floats (5, 5.0 and np.int64(5) are the same
+    value), missing values become None and everything else is a string.
+    """
+    canonical = []
+    for value in values:
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            canonical.append(None)
+        elif isinstance(value, (bool, numbers.Number)):
+            number = float(value)
+            canonical.append(None if math.isnan(number) else number)
+        else:
+            canonical.append(str(value))
+    return canonical
+
+
+class ExplanationCache:
+    """
+    SQLite-backed cache of explanation artefacts
+
+    Entries are keyed by a hash of (model checksum, artefact kind, canonical
+    feature vector), so a retrained or redeployed model never reads another
+    model's attributions. Total payload size is bounded; the least recently
+    used entries are evicted first.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS explanations (
+                key TEXT PRIMARY KEY,
+                model_checksum TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_explanations_access ON explanations (last_access)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM explanations"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(model_checksum: str, kind: str, features: Iterable[Any]) -> str:
+        payload = json.dumps([model_checksum, kind, canonical_features(features)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def put(self, key: str, value: Any, model_checksum: str) -> None:
+        self.put_many({key: value}, model_checksum)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Look up many keys at once; missing keys are absent from the result"""
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(unique_keys), QUERY_CHUNK_SIZE):
+                chunk = unique_keys[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM explanations WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = pickle.loads(value)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE explanations SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, Any], model_checksum: str) -> None:
+        """Store many values computed with the same model"""
+        if not entries:
+            return
+
+        now = time.time()
+        rows = []
+        for key, value in entries.items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, model_checksum, blob, len(blob), now))
+
+        with self._lock:
+            keys = [row[0] for row in rows]
+            replaced = 0
+            for start in range(0, len(keys), QUERY_CHUNK_SIZE):
+                chunk = keys[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM explanations WHERE key IN ({placeholders})", chunk
+                ).fetchone()[0]
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO explanations (key, model_checksum, value, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._total_bytes += sum(row[3] for row in rows) - replaced
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries down to the eviction target"""
+        target = self.max_bytes * EVICTION_TARGET
+        cursor = self._conn.execute(
+            "SELECT key, size FROM explanations ORDER BY last_access ASC"
+        )
+
+        evicted = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+
+        self._conn.executemany("DELETE FROM explanations WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} cached explanations")
+
+    def invalidate(self, model_checksum: Optional[str] = None) -> int:
+        """
+        Remove cached explanations for one model checksum, or all of them
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if model_checksum is None:
+                removed = self._conn.execute("DELETE FROM explanations").rowcount
+            else:
+                removed = self._conn.execute(
+                    "DELETE FROM explanations WHERE model_checksum = ?", (model_checksum,)
+                ).rowcount
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM explanations"
+            ).fetchone()[0]
+
+        if removed:
+            logger.info(f"Invalidated {removed} cached explanations")
+        return removed
+
+    def attach_to_versioning(self, versioning) -> None:
+        """
+        Invalidate whenever a ModelVersioningSystem deploys or rolls back
+
+        Deployments made by other processes since this cache last saw the
+        versioning metadata are detected here as well.
+        """
+        state = json.dumps(versioning.metadata.get("current_production", {}), sort_keys=True)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM metadata WHERE name = 'current_production'"
+            ).fetchone()
+
+        if row is not None and row[0] != state:
+            logger.info("Production models changed since last run, invalidating explanations")
+            self.invalidate()
+        self._record_production_state(state)
+
+        def on_deployment(model_type: str, version_id: str) -> None:
+            logger.info(f"{model_type} deployed as {version_id}, invalidating explanations")
+            self.invalidate()
+            self._record_production_state(
+                json.dumps(versioning.metadata.get("current_production", {}), sort_keys=True)
+            )
+
+        versioning.add_deployment_listener(on_deployment)
+
+    def _record_production_state(self, state: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES ('current_production', ?)",
+                (state,)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+_cache_instance: Optional[ExplanationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_explanation_cache() -> ExplanationCache:
+    """Process-wide explanation cache at the configured path"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = ExplanationCache()
+    return _cache_instance
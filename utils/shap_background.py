@@ -0,0 +1,105 @@
+"""
+SHAP background samples
+Fixed reference samples drawn once from the training distribution and persisted
+"""
+
+import os
+import logging
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from feature_config import CATEGORICAL_FEATURES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKGROUND_PATH = os.getenv("SHAP_BACKGROUND_PATH", "models/shap_background.pkl")
+DEFAULT_TRAINING_DATA_PATH = os.getenv(
+    "SHAP_TRAINING_DATA_PATH", "data/final_100k_dataset_45features.csv"
+)
+DEFAULT_BACKGROUND_SIZE = 100
+BACKGROUND_SEED = 42
+
+
+def encode_features(data: pd.DataFrame) -> pd.DataFrame:
+    """Encode categoricals and fill gaps the way the training scripts do"""
+    data = data.copy()
+    for cat_feat in CATEGORICAL_FEATURES:
+        if cat_feat in data.columns:
+            data[cat_feat] = pd.Categorical(data[cat_feat]).codes
+    return data.fillna(0)
+
+
+def load_background_sample(
+    feature_names: Sequence[str],
+    path: str = DEFAULT_BACKGROUND_PATH,
+    training_data_path: str = DEFAULT_TRAINING_DATA_PATH,
+    n_samples: int = DEFAULT_BACKGROUND_SIZE,
+    generator: Optional[Callable[[int, np.random.Generator], pd.DataFrame]] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Load the persisted background sample, creating it on first use
+
+    The sample is read from ``path`` when it exists and covers the requested
+    features. Otherwise it is drawn with a fixed seed from the training data,
+    or built by ``generator`` when no training data is available, and written
+    to ``path`` so every process and restart explains against the same rows.
+    Categoricals are coded over the whole training column and gaps filled
+    with 0, matching train_all_models_45features.py, so the sample can be
+    passed straight to ``shap.TreeExplainer``. Without training data or a
+    generator there is no sample and None is returned.
+
+    Returns:
+        DataFrame with ``feature_names`` columns, or None if no source exists
+    """
+    feature_names = list(feature_names)
+    background_path = Path(path)
+
+    if background_path.exists():
+        try:
+            background = joblib.load(background_path)
+            missing = set(feature_names) - set(background.columns)
+            encoded = all(pd.api.types.is_numeric_dtype(t) for t in background.dtypes)
+            if not missing and encoded:
+                return background[feature_names]
+            logger.warning(
+                f"Background sample at {background_path} lacks {len(missing)} features "
+                f"or is not encoded, rebuilding"
+            )
+        except Exception as e:
+            logger.warning(f"Could not load background sample {background_path}: {e}")
+
+    background = None
+    training_path = Path(training_data_path)
+    if training_path.exists():
+        try:
+            available = set(pd.read_csv(training_path, nrows=0).columns)
+            data = encode_features(pd.read_csv(
+                training_path, usecols=[f for f in feature_names if f in available]
+            ))
+            background = data.sample(
+                n=min(n_samples, len(data)), random_state=BACKGROUND_SEED
+            ).reindex(columns=feature_names, fill_value=0).reset_index(drop=True)
+            logger.info(f"Drew {len(background)} background rows from {training_path}")
+        except Exception as e:
+            logger.warning(f"Could not sample background from {training_path}: {e}")
+
+    if background is None and generator is not None:
+        background = encode_features(
+            generator(n_samples, np.random.default_rng(BACKGROUND_SEED))[feature_names]
+        )
+
+    if background is None:
+        return None
+
+    try:
+        background_path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(background, background_path)
+        logger.info(f"Saved background sample to {background_path}")
+    except Exception as e:
+        logger.warning(f"Could not save background sample {background_path}: {e}")
+
+    return background
@@ -0,0 +1,187 @@
+"""
+Nearest-neighbour vector index
+Exact cosine search over a NumPy matrix, with an optional approximate (HNSW) backend
+"""
+
+import numpy as np
+from typing import Any, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Numerical constants
+EPSILON = 1e-10
+INITIAL_CAPACITY = 256
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over fixed-width vectors with attached payloads
+
+    Vectors are L2-normalised on insert and stored in a pre-allocated matrix
+    that grows geometrically, so adding entries is amortised O(1) and a query
+    is a single matrix-vector product followed by an O(n) top-k partition.
+    When ``approximate`` is requested and hnswlib is installed, queries switch
+    to an HNSW graph once the index holds ``approximate_threshold`` entries.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        approximate: bool = False,
+        approximate_threshold: int = 20000,
+        ef_search: int = 64,
+        hnsw_m: int = 16
+    ):
+        self.dim = dim
+        self.approximate_threshold = approximate_threshold
+        self.ef_search = ef_search
+        self.hnsw_m = hnsw_m
+
+        self._matrix = np.zeros((INITIAL_CAPACITY, dim), dtype=np.float32)
+        self._size = 0
+        self._payloads: List[Any] = []
+        self._ann = None
+
+        self.approximate = approximate and HNSWLIB_AVAILABLE
+        if approximate and not HNSWLIB_AVAILABLE:
+            logger.info("hnswlib not installed. Using exact vector search.")
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Normalised vectors currently in the index"""
+        return self._matrix[:self._size]
+
+    def add(self, vectors: np.ndarray, payloads: Optional[Sequence[Any]] = None) -> None:
+        """
+        Add one or more vectors to the index
+
+        Args:
+            vectors: Array of shape (dim,) or (n, dim)
+            payloads: Objects returned alongside each vector on search
+                (defaults to the insertion position)
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of width {self.dim}, got {vectors.shape[1]}")
+
+        n = vectors.shape[0]
+        if payloads is None:
+            payloads = list(range(self._size, self._size + n))
+        elif len(payloads) != n:
+            raise ValueError(f"Got {len(payloads)} payloads for {n} vectors")
+
+        self._reserve(self._size + n)
+        start = self._size
+        self._matrix[start:start + n] = self._normalize(vectors)
+        self._size += n
+        self._payloads.extend(payloads)
+
+        if self._ann is not None:
+            self._ann.resize_index(self._matrix.shape[0])
+            self._ann.add_items(self._matrix[start:self._size], np.arange(start, self._size))
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        min_similarity: Optional[float] = None
+    ) -> List[Tuple[float, Any]]:
+        """
+        Find the k most similar entries to a single query vector
+
+        Returns:
+            List of (similarity, payload) sorted by descending similarity
+        """
+        return self.search_batch(np.atleast_2d(query), k, min_similarity)[0]
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int = 5,
+        min_similarity: Optional[float] = None
+    ) -> List[List[Tuple[float, Any]]]:
+        """
+        Find the k most similar entries for each row of a query matrix
+
+        Returns:
+            One list of (similarity, payload) per query row
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self._size == 0 or k <= 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        k = min(k, self._size)
+        normalized = self._normalize(queries)
+
+        if self._use_ann():
+            ann = self._get_ann()
+            ann.set_ef(max(self.ef_search, k))
+            indices, distances = ann.knn_query(normalized, k=k)
+            similarities = 1.0 - distances
+        else:
+            indices, similarities = self._exact_top_k(normalized, k)
+
+        results = []
+        for row_indices, row_similarities in zip(indices, similarities):
+            row = []
+            for idx, similarity in zip(row_indices, row_similarities):
+                if min_similarity is not None and similarity < min_similarity:
+                    break
+                row.append((float(similarity), self._payloads[int(idx)]))
+            results.append(row)
+        return results
+
+    def _exact_top_k(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k by cosine similarity"""
+        similarities = queries @ self.vectors.T
+
+        if k < self._size:
+            candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(self._size), similarities.shape)
+
+        top = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.argsort(-top, axis=1, kind="stable")
+        return (
+            np.take_along_axis(candidates, order, axis=1),
+            np.take_along_axis(top, order, axis=1)
+        )
+
+    def _use_ann(self) -> bool:
+        return self.approximate and self._size >= self.approximate_threshold
+
+    def _get_ann(self):
+        """Build the HNSW graph on first use"""
+        if self._ann is None:
+            ann = hnswlib.Index(space="cosine", dim=self.dim)
+            ann.init_index(max_elements=self._matrix.shape[0], M=self.hnsw_m)
+            ann.add_items(self.vectors, np.arange(self._size))
+            self._ann = ann
+            logger.info(f"Built approximate vector index over {self._size} entries")
+        return self._ann
+
+    def _reserve(self, size: int) -> None:
+        """Grow the backing matrix geometrically"""
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, EPSILON)
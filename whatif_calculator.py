@@ -5,12 +5,21 @@ Provides realistic score calculations based on proposed improvements
 """
 
 import logging
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 
+class ScenarioValidationError(ValueError):
+    """Raised when scenario edits produce startups that fail validation"""
+    
+    def __init__(self, errors: Dict[str, List[str]]):
+        self.errors = errors
+        super().__init__(f"Invalid edits in scenarios {sorted(errors)}")
+
+
 class WhatIfCalculator:
     """Calculate realistic score impacts from improvements"""
     
@@ -497,5 +506,160 @@ class WhatIfCalculator:
         return reasoning
 
 
+class WhatIfEngine:
+    """Re-score feature edits with the production models"""
+    
+    def __init__(self, orchestrator, explainer=None):
+        """
+        Args:
+            orchestrator: UnifiedOrchestratorV3 (anything with score_batch)
+            explainer: Optional FLASHExplainer for attribution deltas
+        """
+        self.orchestrator = orchestrator
+        self.explainer = explainer
+    
+    def evaluate(
+        self,
+        startup: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        include_attributions: bool = False,
+        top_k: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Score a base startup and every edited variant in one batch
+        
+        Args:
+            startup: Backend feature dict for the base startup
+            scenarios: List of {"id": ..., "edits": {feature: new_value}}
+            include_attributions: Add SHAP attribution deltas per scenario
+            top_k: Number of attribution deltas to return per model
+            
+        Returns:
+            Dictionary with the base score and, per scenario, the new score,
+            per-model deltas and the contribution of each individual edit
+            
+        Raises:
+            ScenarioValidationError: If an edit makes the startup fail
+                validation; only errors the base startup does not already
+                have are reported, keyed by scenario id
+        """
+        from feature_config import ALL_FEATURES
+        from utils.data_validation import data_validator
+        
+        known_features = set(ALL_FEATURES)
+        for scenario in scenarios:
+            unknown = set(scenario["edits"]) - known_features
+            if unknown:
+                raise ValueError(f"Unknown features in scenario {scenario['id']}: {sorted(unknown)}")
+        
+        checked = data_validator.validate_records(
+            [dict(startup)] + [{**startup, **scenario["edits"]} for scenario in scenarios]
+        )
+        base_errors = set(checked[0][1])
+        invalid = {}
+        for scenario, (_, errors, _) in zip(scenarios, checked[1:]):
+            introduced = [error for error in errors if error not in base_errors]
+            if introduced:
+                invalid[scenario["id"]] = introduced
+        if invalid:
+            raise ScenarioValidationError(invalid)
+        
+        # Row 0 is the base, then one row per scenario, then one row per
+        # distinct single edit so each edit's own contribution is known
+        rows = [dict(startup)]
+        scenario_rows = []
+        edit_rows = {}
+        for scenario in scenarios:
+            scenario_rows.append(len(rows))
+            rows.append({**startup, **scenario["edits"]})
+        for scenario in scenarios:
+            if len(scenario["edits"]) < 2:
+                continue
+            for feature, value in scenario["edits"].items():
+                key = (feature, repr(value))
+                if key not in edit_rows:
+                    edit_rows[key] = len(rows)
+                    rows.append({**startup, feature: value})
+        
+        frame = pd.DataFrame(rows)
+        scores = self.orchestrator.score_batch(frame)
+        probabilities = scores["success_probability"]
+        model_predictions = scores["model_predictions"]
+        
+        attributions = None
+        if include_attributions and self.explainer is not None:
+            attributions = self._attribution_batch(frame)
+        
+        base_probability = float(probabilities[0])
+        base_verdict = self.orchestrator._determine_verdict(base_probability)["verdict"]
+        
+        results = []
+        for scenario, row in zip(scenarios, scenario_rows):
+            probability = float(probabilities[row])
+            delta = probability - base_probability
+            verdict = self.orchestrator._determine_verdict(probability)["verdict"]
+            
+            if len(scenario["edits"]) < 2:
+                edit_contributions = {feature: delta for feature in scenario["edits"]}
+            else:
+                edit_contributions = {
+                    feature: float(probabilities[edit_rows[(feature, repr(value))]]) - base_probability
+                    for feature, value in scenario["edits"].items()
+                }
+            
+            result = {
+                "id": scenario["id"],
+                "edits": scenario["edits"],
+                "success_probability": probability,
+                "delta": delta,
+                "verdict": verdict,
+                "verdict_changed": verdict != base_verdict,
+                "model_deltas": {
+                    name: float(values[row] - values[0]) for name, values in model_predictions.items()
+                },
+                "quality_delta": float(scores["quality_score"][row] - scores["quality_score"][0]),
+                "edit_contributions": edit_contributions,
+                # Part of the change not explained by the edits individually
+                "interaction": delta - sum(edit_contributions.values())
+            }
+            if attributions is not None:
+                result["attribution_deltas"] = self._attribution_deltas(attributions, row, top_k)
+            results.append(result)
+        
+        return {
+            "base": {
+                "success_probability": base_probability,
+                "verdict": base_verdict,
+                "model_predictions": {
+                    name: float(values[0]) for name, values in model_predictions.items()
+                }
+            },
+            "scenarios": results,
+            "rows_scored": len(rows)
+        }
+    
+    def _attribution_batch(self, frame: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """SHAP values for every row; unchanged rows come from the explanation cache"""
+        try:
+            return self.explainer.explain_batch(frame.reindex(columns=self.explainer.feature_names))
+        except Exception as e:
+            logger.warning(f"Attribution deltas unavailable: {e}")
+            return None
+    
+    @staticmethod
+    def _attribution_deltas(batch: Dict[str, Any], row: int, top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Features whose attribution moved most between the base and a variant"""
+        feature_names = batch["feature_names"]
+        deltas = {}
+        for name, values in batch["shap_values"].items():
+            change = values[row] - values[0]
+            top = np.argsort(-np.abs(change), kind="stable")[:top_k]
+            deltas[name] = [
+                {"feature": feature_names[i], "delta": float(change[i])}
+                for i in top if change[i] != 0
+            ]
+        return deltas
+
+
 # Global calculator instance
 whatif_calculator = WhatIfCalculator()
\ No newline at end of file